@@ -0,0 +1,34 @@
+# demos/dp_lcs.py
+from __future__ import annotations
+
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+from algoviz.components.grid import Grid
+
+
+def build():
+    """
+    最长公共子序列（LCS）的 DP 表：逐格高亮依赖的格子并填值；字符相同时从左上角复制 +1。
+    """
+    a, b = "ABCBDAB", "BDCABA"
+    n, m = len(a), len(b)
+    scene = Scene(width=200, height=180)
+    grid = Grid([[0.0] * (m + 1)] + [[0.0] + [float("nan")] * m for _ in range(n)], name="T",
+                x=10, y=10, cell_w=20, cell_h=20)
+    scene.add(grid)
+
+    tl = Timeline(fps=20)
+    dp = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(1, n + 1):
+        tl.add("T", "highlight_row", {"r": i}, note=f"row {i}: '{a[i - 1]}'")
+        for j in range(1, m + 1):
+            if a[i - 1] == b[j - 1]:
+                dp[i][j] = dp[i - 1][j - 1] + 1
+                tl.add("T", "highlight_cell", {"cells": [[i - 1, j - 1]]},
+                       note=f"'{a[i - 1]}' == '{b[j - 1]}'")
+            else:
+                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+                tl.add("T", "highlight_cell", {"cells": [[i - 1, j], [i, j - 1]]})
+            tl.add("T", "set_cell", {"r": i, "c": j, "value": dp[i][j]}, duration=3)
+    tl.add("T", "highlight_cell", {"cells": [[n, m]]}, duration=10, note=f"LCS length = {dp[n][m]}")
+    return scene, tl
@@ -0,0 +1,56 @@
+# demos/graph_bfs.py
+from __future__ import annotations
+from collections import deque
+
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+from algoviz.components.graph import Graph
+
+
+def build():
+    """
+    网格图上的 BFS：入队 -> 出队 -> 沿边访问，最后高亮起点到终点的最短路径。
+    """
+    rows, cols = 5, 7
+    n = rows * cols
+    edges = []
+    for r in range(rows):
+        for c in range(cols):
+            v = r * cols + c
+            if c + 1 < cols:
+                edges.append((v, v + 1))
+            if r + 1 < rows:
+                edges.append((v, v + cols))
+    positions = [(v % cols, v // cols) for v in range(n)]
+
+    scene = Scene(width=320, height=200)
+    scene.add(Graph(n, edges, name="G", x=10, y=10, width=300, height=180, positions=positions))
+
+    adj = {v: [] for v in range(n)}
+    for a, b in edges:
+        adj[a].append(b)
+        adj[b].append(a)
+
+    tl = Timeline(fps=20)
+    start, goal = 0, n - 1
+    parent = {start: -1}
+    queue = deque([start])
+    tl.add("G", "enqueue", {"node": start}, note=f"enqueue {start}")
+    while queue:
+        u = queue.popleft()
+        tl.add("G", "dequeue", {"node": u}, duration=2, note=f"dequeue {u}")
+        for v in adj[u]:
+            if v not in parent:
+                parent[v] = u
+                tl.add("G", "visit", {"node": v, "from": u}, duration=4, note=f"visit {v} from {u}")
+                tl.add("G", "enqueue", {"node": v})
+                queue.append(v)
+        tl.add("G", "visit", {"node": u})
+    path = []
+    v = goal
+    while v != -1:
+        path.append(v)
+        v = parent[v]
+    tl.add("G", "highlight_path", {"nodes": path[::-1]}, duration=10,
+           note=f"shortest path {start} -> {goal}")
+    return scene, tl
@@ -0,0 +1,47 @@
+# demos/heap_sort.py
+from __future__ import annotations
+
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+from algoviz.components.tree import Tree
+
+
+def build():
+    """
+    堆排序的二叉堆视图：先自底向上建大根堆，再反复把堆顶换到末尾、缩小堆并下沉；
+    每次 swap 两个值沿树边交换。
+    """
+    data = [4, 10, 3, 5, 1, 8, 7, 2, 9, 6]
+    n = len(data)
+    scene = Scene(width=320, height=180)
+    scene.add(Tree(data, name="H", x=10, y=10, width=300, height=160))
+
+    tl = Timeline(fps=20)
+    a = list(data)
+
+    def sift_down(i: int, size: int) -> None:
+        while True:
+            big = i
+            for c in (2 * i + 1, 2 * i + 2):
+                if c < size:
+                    tl.add("H", "compare", {"i": big, "j": c}, duration=2)
+                    if a[c] > a[big]:
+                        big = c
+            if big == i:
+                return
+            a[i], a[big] = a[big], a[i]
+            tl.add("H", "swap", {"i": i, "j": big}, duration=8, note=f"sift down {a[big]}")
+            i = big
+
+    for i in range(n // 2 - 1, -1, -1):
+        tl.add("H", "highlight", {"idx": i}, note=f"heapify at {i}")
+        sift_down(i, n)
+    tl.add("H", "highlight", {"nodes": []})
+    for end in range(n - 1, 0, -1):
+        a[0], a[end] = a[end], a[0]
+        tl.add("H", "swap", {"i": 0, "j": end}, duration=8, note=f"move max {a[end]} to the end")
+        tl.add("H", "heap_size", {"size": end})
+        tl.add("H", "mark_sorted", {"idx": end})
+        sift_down(0, end)
+    tl.add("H", "mark_sorted", {"idx": 0}, duration=10, note="sorted")
+    return scene, tl
@@ -2,22 +2,58 @@
 """
 后端统一导出清单。
 保持轻量，禁止在此做任何渲染/构帧逻辑，避免环依赖。
+各后端按需懒加载（PEP 562 模块级 __getattr__）：只用 SVG 时不会导入 Matplotlib/NumPy/Pillow，
+只用 TUI 时也不会。
 """
 
-from .gif_mpl import export_gif, GifOptions  # GIF 导出（Matplotlib + Pillow）
-from .svg_svgwrite import export_svg, SvgOptions  # SVG 导出（svgwrite 或纯字符串）
-from .tui_rich import (
-    play_tui,            # 终端预览播放器
-    PlayerState,         # （供测试使用）
-    render_sidebar,      # （供测试快照使用）
-    advance_idx,         # （tests/test_tui_player_logic.py 依赖）
-    adjust_speed,        # idem
-    seek_percent,        # idem
-)
-
-__all__ = [
-    "export_gif", "GifOptions",
-    "export_svg", "SvgOptions",
-    "play_tui", "PlayerState", "render_sidebar",
-    "advance_idx", "adjust_speed", "seek_percent",
-]
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:  # 仅供类型检查器/IDE 使用，运行期不导入
+    from .gif_mpl import export_gif, GifOptions  # noqa: F401
+    from .svg_svgwrite import export_svg, SvgOptions  # noqa: F401
+    from .aio import export_gif_async, export_svg_async, configure_executor  # noqa: F401
+    from .tui_rich import (  # noqa: F401
+        play_tui, play_tui_async, apply_key, PlayerState, render_sidebar,
+        advance_idx, adjust_speed, seek_percent, PrerenderBuffer,
+        export_cast, CastOptions,
+    )
+
+# 导出名 -> 所在子模块
+_EXPORTS: Dict[str, str] = {
+    "export_gif": "gif_mpl",           # GIF 导出（Matplotlib + Pillow）
+    "GifOptions": "gif_mpl",
+    "export_svg": "svg_svgwrite",      # SVG 导出（svgwrite 或纯字符串）
+    "SvgOptions": "svg_svgwrite",
+    "export_gif_async": "aio",         # asyncio 版本：执行器线程 + 异步字节汇
+    "export_svg_async": "aio",
+    "configure_executor": "aio",       # 调整共享导出线程池大小
+    "play_tui": "tui_rich",            # 终端预览播放器
+    "play_tui_async": "tui_rich",      # asyncio 播放器核心（可注入键流）
+    "apply_key": "tui_rich",           # 按键 -> 状态（纯逻辑，可单测）
+    "PlayerState": "tui_rich",         # （供测试使用）
+    "render_sidebar": "tui_rich",      # （供测试快照使用）
+    "advance_idx": "tui_rich",         # （tests/test_tui_player_logic.py 依赖）
+    "adjust_speed": "tui_rich",        # idem
+    "seek_percent": "tui_rich",        # idem
+    "PrerenderBuffer": "tui_rich",     # 预渲染环形缓冲（命中统计用于调 lookahead）
+    "export_cast": "tui_rich",         # TUI 画面录制为 asciicast（tui-cast）
+    "CastOptions": "tui_rich",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    mod_name = _EXPORTS.get(name)
+    if mod_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{mod_name}", __name__), name)
+    globals()[name] = value  # 缓存：之后的访问不再经过 __getattr__
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
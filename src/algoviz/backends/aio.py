@@ -0,0 +1,183 @@
+#src/algoviz/backends/aio.py
+"""
+asyncio 导出接口：供 aiohttp 等异步服务按需生成动画，不阻塞事件循环。
+
+    async def handler(request):
+        resp = web.StreamResponse(headers={"Content-Type": "image/gif"})
+        await resp.prepare(request)
+        await export_gif_async(scene, tl, resp, options=GifOptions(size=(320, 180)))
+        return resp
+
+  - 编译/栅格化/编码仍是同步代码，放到执行器线程里跑；所有并发请求默认共用一个有界线程池
+    （configure_executor(max_workers=...) 调整，或逐次传 executor=）
+  - outfile 可以是路径，也可以是异步字节汇（有 `async write(bytes)` 的对象，如 aiohttp 的
+    StreamResponse；或 asyncio.StreamWriter）：工作线程每攒够 chunk_size 字节就提交到事件循环写出，
+    并等待写完再继续（天然背压）
+  - await 到导出完成；取消外层任务时通过 CancelToken 在帧边界停止工作线程，
+    等它清理完（路径输出会删除半成品）再把 CancelledError 抛给调用方
+  - progress 回调在事件循环线程上调用
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional, Protocol, Sequence, Union
+
+from ..core.progress import CancelToken, ExportCancelled, ProgressCallback
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class AsyncByteSink(Protocol):
+    def write(self, data: bytes) -> Any: ...  # 协程函数，或同步 write + async drain()
+
+
+# --------------------- 共享执行器 ---------------------
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def _default_workers() -> int:
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """进程内共享的有界导出线程池（首次使用时创建）。"""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=_default_workers(),
+                                           thread_name_prefix="algoviz-export")
+        return _EXECUTOR
+
+
+def configure_executor(max_workers: Optional[int] = None) -> ThreadPoolExecutor:
+    """替换共享线程池（旧池中已提交的任务会跑完）；max_workers=None 时按 CPU 数取默认值。"""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        old = _EXECUTOR
+        _EXECUTOR = ThreadPoolExecutor(max_workers=max_workers or _default_workers(),
+                                       thread_name_prefix="algoviz-export")
+    if old is not None:
+        old.shutdown(wait=False)
+    return _EXECUTOR
+
+
+# --------------------- 线程 -> 事件循环的字节桥 ---------------------
+
+class _SinkBridge:
+    """
+    供工作线程使用的同步文件对象：缓冲到 chunk_size 后把数据提交到事件循环上的异步汇，
+    并阻塞等待写完。str 按 UTF-8 编码（SVG 导出写入文本）。
+    """
+
+    def __init__(self, sink: AsyncByteSink, loop: asyncio.AbstractEventLoop, token: CancelToken,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        self.sink = sink
+        self.loop = loop
+        self.token = token
+        self.chunk_size = max(1, int(chunk_size))
+        self.bytes_written = 0
+        self._buf = bytearray()
+
+    def write(self, data: Union[bytes, bytearray, memoryview, str]) -> int:
+        b = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        self._buf += b
+        if len(self._buf) >= self.chunk_size:
+            self._push()
+        return len(data)
+
+    def flush(self) -> None:
+        if self._buf:
+            self._push()
+
+    def close(self) -> None:
+        """文件对象协议：只提交缓冲，异步汇由调用方关闭。"""
+        self.flush()
+
+    def _push(self) -> None:
+        self.token.raise_if_cancelled()
+        data, self._buf = bytes(self._buf), bytearray()
+        asyncio.run_coroutine_threadsafe(_sink_write(self.sink, data), self.loop).result()
+        self.bytes_written += len(data)
+
+
+async def _sink_write(sink: AsyncByteSink, data: bytes) -> None:
+    r = sink.write(data)
+    if asyncio.iscoroutine(r) or isinstance(r, asyncio.Future):
+        await r
+    elif hasattr(sink, "drain"):  # asyncio.StreamWriter：同步 write + async drain
+        await sink.drain()
+
+
+# --------------------- 通用驱动 ---------------------
+
+async def _run_export(fn: Callable[..., None], outfile: Any, *,
+                      progress: Optional[ProgressCallback], cancel: Optional[CancelToken],
+                      executor: Optional[Executor], chunk_size: int, **kwargs: Any) -> None:
+    loop = asyncio.get_running_loop()
+    token = cancel if cancel is not None else CancelToken()
+    target: Any = outfile
+    bridge: Optional[_SinkBridge] = None
+    if not isinstance(outfile, (str, os.PathLike)):
+        target = bridge = _SinkBridge(outfile, loop, token, chunk_size)
+
+    cb: Optional[ProgressCallback] = None
+    if progress is not None:
+        def cb(p: Any) -> None:
+            loop.call_soon_threadsafe(progress, p)
+
+    def work() -> None:
+        fn(target, progress=cb, cancel=token, **kwargs)
+        if bridge is not None:
+            bridge.flush()
+
+    fut: Awaitable[None] = loop.run_in_executor(executor or get_executor(), work)
+    try:
+        await asyncio.shield(fut)
+    except asyncio.CancelledError:
+        # 外层任务被取消：通知工作线程在下一帧边界停下，等它清理完再传播取消
+        token.cancel()
+        try:
+            await fut
+        except ExportCancelled:
+            pass
+        raise
+
+
+async def export_gif_async(scene: Any, timeline: Any,
+                           outfile: Union[str, os.PathLike, AsyncByteSink], *,
+                           options: Any = None, frames: Optional[Sequence] = None,
+                           progress: Optional[ProgressCallback] = None,
+                           cancel: Optional[CancelToken] = None,
+                           executor: Optional[Executor] = None,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """export_gif 的异步版本；参数含义同 export_gif，另见模块说明。"""
+    from .gif_mpl import export_gif
+
+    def fn(target: Any, **kw: Any) -> None:
+        export_gif(scene, timeline, target, options=options, frames=frames, **kw)
+
+    await _run_export(fn, outfile, progress=progress, cancel=cancel, executor=executor,
+                      chunk_size=chunk_size)
+
+
+async def export_svg_async(scene: Any, timeline: Any,
+                           outfile: Union[str, os.PathLike, AsyncByteSink],
+                           frame_index: Optional[int] = None, options: Any = None, *,
+                           frames: Optional[Sequence] = None,
+                           progress: Optional[ProgressCallback] = None,
+                           cancel: Optional[CancelToken] = None,
+                           executor: Optional[Executor] = None,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+    """export_svg 的异步版本；写入异步汇时输出为 UTF-8 字节。"""
+    from .svg_svgwrite import export_svg
+
+    def fn(target: Any, **kw: Any) -> None:
+        export_svg(scene, timeline, target, frame_index, options, frames=frames, **kw)
+
+    await _run_export(fn, outfile, progress=progress, cancel=cancel, executor=executor,
+                      chunk_size=chunk_size)
@@ -1,8 +1,10 @@
 #src/algoviz/backends/gif_mpl.py
 from __future__ import annotations
 
+import os
+import struct
 from dataclasses import dataclass
-from typing import List, Optional, Sequence, Tuple
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple
 
 # —— 关键：在导入 pyplot 之前强制使用 Agg（无 GUI 后端）——
 # 官方文档：可通过 matplotlib.use() / MPLBACKEND / rcParams 设后端；Agg 是非交互后端，适合脚本/CI。:contentReference[oaicite:2]{index=2}
@@ -10,10 +12,22 @@ import matplotlib
 matplotlib.use("Agg")
 
 import numpy as np
-import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+from matplotlib.artist import Artist
+from matplotlib.axes import Axes
+from matplotlib.collections import CircleCollection, Collection, LineCollection, PolyCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.image import AxesImage
 import imageio.v3 as iio
 
+from ..core import fingerprint, trace
+from ..core.drawops import Cells, Circles, DrawOp, Rects, Segments
+from ..core.scene import Scene
+from ..core.timeline import Frame, Timeline, uniform_indices
+from ..core.progress import CancelToken, ProgressCallback, ProgressTracker
+
 
 @dataclass
 class GifOptions:
@@ -26,73 +40,469 @@ class GifOptions:
     min_frame_ms: Optional[int] = 100
     per_frame_ms: Optional[List[int]] = None
     repeat_each: int = 1
+    # 预览/缩略图：最多导出 max_frames 帧（None 不限制）；sampling 为 "uniform"（等间隔）
+    # 或 "keyframes"（各事件的最后一帧），见 Timeline.sample_indices
+    max_frames: Optional[int] = None
+    sampling: str = "uniform"
 
 
-def _render_frame(scene, frame, size: Tuple[int, int], facecolor: str = "white") -> np.ndarray:
-    W, H = size
-    dpi = 100
-    fig = plt.figure(figsize=(W / dpi, H / dpi), dpi=dpi)
-    ax = fig.add_axes([0, 0, 1, 1])
-    ax.set_xlim(0, scene.width)
-    ax.set_ylim(scene.height, 0)  # y 向下
-    ax.set_axis_off()
-    fig.patch.set_facecolor(facecolor)
-    ax.set_facecolor(facecolor)
-
-    ops = scene.render(frame.states)
-    for op in ops:
-        # Rect
-        if hasattr(op, "w") and hasattr(op, "h") and hasattr(op, "x") and hasattr(op, "y"):
-            ec = getattr(op, "stroke", None)
-            fc = getattr(op, "fill", None) or "#000"
-            ax.add_patch(
-                mpatches.Rectangle((op.x, op.y), op.w, op.h, linewidth=0 if ec is None else 1, edgecolor=ec, facecolor=fc)
-            )
-        # Text
-        if hasattr(op, "content") and hasattr(op, "size") and hasattr(op, "x") and hasattr(op, "y"):
-            color = getattr(op, "fill", "#000")
-            weight = getattr(op, "weight", "normal")
-            ax.text(op.x, op.y, op.content, fontsize=op.size, color=color, fontweight=weight,
-                    ha="center", va="bottom")
-
-    fig.canvas.draw()
-    buf = np.asarray(fig.canvas.buffer_rgba(), dtype=np.uint8)
-    plt.close(fig)
-    return buf
-
-
-def _frames_to_arrays(scene, frames: Sequence, size: Tuple[int, int]) -> List[np.ndarray]:
-    return [_render_frame(scene, f, size) for f in frames]
-
-
-def export_gif(scene, timeline, outfile: str, *, options: GifOptions | None = None) -> None:
-    opt = options or GifOptions()
-    frames = timeline.build_frames(scene)
-    if not frames:
-        raise ValueError("timeline has no frames")
+def _render_frame(scene: Scene, frame: Frame, size: Tuple[int, int], facecolor: str = "white",
+                  raster: Optional["FrameRasterizer"] = None) -> np.ndarray:
+    """栅格化一帧；导出时传入同一个 FrameRasterizer 复用画布与静态层，单独调用时临时建一个。"""
+    with trace.span("gif.raster"):
+        if raster is None:
+            raster = FrameRasterizer(scene, size, facecolor)
+        return raster(frame)
+
+
+class FrameRasterizer:
+    """
+    一次导出内复用的栅格化器
+    （不经过 pyplot 的全局图形管理器；实例之间互不相关，不同线程各用一个即可并发）：
+      - Figure/Axes 只建一次，每帧只创建、绘制、移除本帧的图元
+      - 场景最下方的静态段连同底色只画一次，保存为背景（Agg copy_from_bbox），
+        每帧 restore_region 恢复
+      - 位于动态层之上的静态段各栅格化一次（透明底，裁剪到非空区域），每帧作为一幅图像按 z 序合成
+    没有静态层时输出与逐帧新建 Figure 完全相同。
+    """
+
+    def __init__(self, scene: Scene, size: Tuple[int, int], facecolor: str = "white") -> None:
+        W, H = size
+        dpi = 100
+        self.scene = scene
+        self.size = (W, H)
+        self.fig = Figure(figsize=(W / dpi, H / dpi), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = ax = self.fig.add_axes((0, 0, 1, 1))
+        ax.set_xlim(0, scene.width)
+        ax.set_ylim(scene.height, 0)  # y 向下
+        ax.set_axis_off()
+        self.fig.patch.set_facecolor(facecolor)
+        ax.set_facecolor(facecolor)
+        self.px = W / max(1, scene.width)  # 场景单位 -> 像素
+        self.py = H / max(1, scene.height)
+        self._bg: Any = None
+        # 背景之上的段：动态段为 actor 名元组，静态段为图像（或 None）
+        self._plan: Optional[List[Any]] = None
+
+    def _bands(self) -> List[Tuple[bool, Tuple[str, ...]]]:
+        if hasattr(self.scene, "bands"):
+            return list(self.scene.bands())
+        return [(False, ())]   # 只有 render() 的场景：整帧作为一个动态段
+
+    def _ops(self, names: Tuple[str, ...], states: Dict[str, Any]) -> List[DrawOp]:
+        if hasattr(self.scene, "draw_layers"):
+            return self.scene.draw_layers(names, states, px=self.px)
+        return self.scene.render(states)
+
+    def _artists(self, ops: Iterable[Any]) -> List[Artist]:
+        """
+        把绘制指令加到 Axes 上，返回新建的图元
+        （按 zorder 稳定排序，与整图绘制的叠放次序一致）。
+        """
+        ax = self.ax
+        out: List[Artist] = []
+        for op in ops:
+            kind = getattr(op, "kind", None)
+            if kind == "segments":
+                out.append(_add_segments(ax, op))
+            elif kind == "circles":
+                out.append(_add_circles(ax, op, self.px * 72.0 / 100))
+            elif kind == "rects":
+                out.append(_add_rects(ax, op))
+            elif kind == "cells":
+                out.append(_add_cells(ax, op, self.px, self.py))
+            else:
+                # Rect
+                if hasattr(op, "w") and hasattr(op, "h") and hasattr(op, "x") and hasattr(op, "y"):
+                    ec = getattr(op, "stroke", None)
+                    fc = getattr(op, "fill", None) or "#000"
+                    out.append(ax.add_patch(mpatches.Rectangle((op.x, op.y), op.w, op.h,
+                                                               linewidth=0 if ec is None else 1,
+                                                               edgecolor=ec, facecolor=fc)))
+                # Text
+                if (hasattr(op, "content") and hasattr(op, "size")
+                        and hasattr(op, "x") and hasattr(op, "y")):
+                    color = getattr(op, "fill", "#000")
+                    weight = getattr(op, "weight", "normal")
+                    out.append(ax.text(op.x, op.y, op.content, fontsize=op.size, color=color,
+                                       fontweight=weight, ha="center", va="bottom"))
+        return sorted(out, key=lambda a: a.get_zorder())
+
+    def _setup(self, states: Dict[str, Any]) -> None:
+        bands = self._bands()
+        k = 0
+        below: List[str] = []
+        while k < len(bands) and bands[k][0]:
+            below.extend(bands[k][1])
+            k += 1
+        arts = self._artists(self._ops(tuple(below), states)) if below else []
+        self.canvas.draw()
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        for a in arts:
+            a.remove()
+        # 上层静态段：透明底各画一次；全部栅格化完之后再建图像，避免互相混入
+        crops: List[Tuple[bool, Any]] = [
+            (static, self._static_crop(names, states) if static else names)
+            for static, names in bands[k:]]
+        self._plan = [self._static_image(c) if static else c for static, c in crops]
+
+    def _static_crop(self, names: Tuple[str, ...],
+                     states: Dict[str, Any]) -> Optional[Tuple[np.ndarray, Tuple[int, int]]]:
+        """静态段单独栅格化（透明底），裁剪到非透明像素的包围盒：(RGBA, 左上角像素坐标)。"""
+        arts = self._artists(self._ops(names, states))
+        self.fig.patch.set_visible(False)
+        try:
+            self.canvas.draw()
+            rgba = np.array(self.canvas.buffer_rgba(), dtype=np.uint8)
+        finally:
+            self.fig.patch.set_visible(True)
+            for a in arts:
+                a.remove()
+        ys, xs = np.nonzero(rgba[..., 3])
+        if not len(ys):
+            return None
+        return rgba[ys.min():ys.max() + 1, xs.min():xs.max() + 1], (int(xs.min()), int(ys.min()))
+
+    def _static_image(self, crop: Optional[Tuple[np.ndarray, Tuple[int, int]]],
+                      ) -> Optional[AxesImage]:
+        """裁剪后的静态栅格 -> 像素对齐的 AxesImage（每帧直接绘制，不再重新生成图元）。"""
+        if crop is None:
+            return None
+        img, (x0, y0) = crop
+        h, w = img.shape[:2]
+        extent = (x0 / self.px, (x0 + w) / self.px, (y0 + h) / self.py, y0 / self.py)
+        return self.ax.imshow(img, extent=extent, origin="upper", interpolation="nearest",
+                              aspect="auto", zorder=1)
+
+    def __call__(self, frame: Frame) -> np.ndarray:
+        if self._plan is None:
+            self._setup(frame.states)
+        canvas = self.canvas
+        canvas.restore_region(self._bg)
+        renderer = canvas.get_renderer()
+        for item in self._plan:  # type: ignore[union-attr]
+            if isinstance(item, tuple):
+                arts = self._artists(self._ops(item, frame.states))
+                for a in arts:
+                    a.draw(renderer)
+                for a in arts:
+                    a.remove()
+            elif item is not None:
+                item.draw(renderer)
+        return np.array(canvas.buffer_rgba(), dtype=np.uint8)
+
+
+def _facecolors(palette: Sequence[str], colors: Any, n: int) -> np.ndarray:
+    rgba = to_rgba_array(list(palette))
+    if colors is None:
+        return np.repeat(rgba[:1], n, axis=0)
+    return rgba[np.asarray(colors, dtype=np.intp)]
+
+
+def _add_segments(ax: Axes, op: Segments) -> Collection:
+    """整组线段 -> 一个 LineCollection（线宽按像素给出）；zorder 与 Rect 相同，按 op 顺序叠放。"""
+    x0, y0, x1, y1 = (np.asarray(c, dtype=float) for c in (op.x0, op.y0, op.x1, op.y1))
+    segs = np.stack([np.column_stack([x0, y0]), np.column_stack([x1, y1])], axis=1)
+    colors = _facecolors(op.palette, op.colors, len(segs))
+    coll = LineCollection(segs, colors=colors,  # type: ignore[arg-type]
+                          linewidths=op.width * 72.0 / 100, zorder=1)
+    return ax.add_collection(coll)
+
+
+def _add_circles(ax: Axes, op: Circles, pt: float) -> Collection:
+    """整组圆 -> 一个 CircleCollection（sizes 为磅²面积，由场景半径换算）。"""
+    x, y = np.asarray(op.x, dtype=float), np.asarray(op.y, dtype=float)
+    r_pt = np.broadcast_to(np.asarray(op.r, dtype=float), x.shape) * pt
+    return ax.add_collection(CircleCollection(np.pi * r_pt ** 2, offsets=np.column_stack([x, y]),
+                                              offset_transform=ax.transData,
+                                              facecolors=_facecolors(op.palette, op.colors, len(x)),
+                                              edgecolors=op.stroke or "none", linewidths=0.5,
+                                              zorder=1))
+
+
+def _add_rects(ax: Axes, op: Rects) -> Collection:
+    """整组矩形 -> 一个 PolyCollection（filled=False 时只描边）。"""
+    x = np.asarray(op.x, dtype=float)
+    y = np.broadcast_to(np.asarray(op.y, dtype=float), x.shape)
+    w = np.broadcast_to(np.asarray(op.w, dtype=float), x.shape)
+    h = np.broadcast_to(np.asarray(op.h, dtype=float), x.shape)
+    corners = ((x, y), (x + w, y), (x + w, y + h), (x, y + h))
+    verts = np.stack([np.column_stack(p) for p in corners], axis=1)
+    colors = _facecolors(op.palette, op.colors, len(x))
+    if op.filled:
+        edge = op.stroke or "none"
+        coll = PolyCollection(verts, facecolors=colors, edgecolors=edge,  # type: ignore[arg-type]
+                              linewidths=0 if op.stroke is None else 1, zorder=1)
+    else:
+        coll = PolyCollection(verts, facecolors="none", edgecolors=colors,  # type: ignore[arg-type]
+                              linewidths=1.5, zorder=1)
+    return ax.add_collection(coll)
 
-    imgs = _frames_to_arrays(scene, frames, opt.size)
 
-    # 每帧毫秒（Pillow 读回 info['duration'] 为 ms）
+def _add_cells(ax: Axes, op: Cells, px: float, py: float) -> AxesImage:
+    """
+    规则网格 -> 一幅 imshow 图像（调色板下标 -> RGBA）。格子比输出像素多时先按像素中心最近邻抽样，
+    图像尺寸不超过网格在画布上占的像素数，与表格大小无关。
+    """
+    codes = np.asarray(op.codes)
+    rows, cols = codes.shape
+    tr, tc = max(1, int(np.ceil(rows * op.ch * py))), max(1, int(np.ceil(cols * op.cw * px)))
+    if rows > tr or cols > tc:
+        ri = ((np.arange(min(rows, tr)) + 0.5) * rows / min(rows, tr)).astype(np.intp)
+        ci = ((np.arange(min(cols, tc)) + 0.5) * cols / min(cols, tc)).astype(np.intp)
+        codes = codes[ri[:, None], ci[None, :]]
+    img = to_rgba_array(list(op.palette))[codes]
+    extent = (op.x, op.x + cols * op.cw, op.y + rows * op.ch, op.y)
+    return ax.imshow(img, extent=extent, origin="upper", interpolation="nearest", aspect="auto",
+                     zorder=1)
+
+
+def _gif_image(data: bytes) -> Tuple[int, bytes, bytes]:
+    """
+    拆开一个单帧 GIF：返回 (颜色表大小位 | 交错标志, 颜色表, 图像数据)。
+    图像数据为 LZW 最小码长 + 数据子块 + 块结束符，可原样放到另一个图像描述符之后。
+    """
+    pos = 13                                   # 文件头 6 字节 + 逻辑屏幕描述符 7 字节
+    packed = data[10]
+    table = b""
+    if packed & 0x80:
+        table = data[pos:pos + 3 * (2 << (packed & 7))]
+        pos += len(table)
+    while data[pos] == 0x21:                   # 跳过扩展块（图形控制、注释等）
+        pos += 2
+        while data[pos]:
+            pos += data[pos] + 1
+        pos += 1
+    if data[pos] != 0x2C:
+        raise ValueError("unexpected GIF block while splitting a frame")
+    desc = data[pos + 9]
+    pos += 10
+    if desc & 0x80:                            # 局部颜色表优先于全局颜色表
+        packed = desc
+        table = data[pos:pos + 3 * (2 << (desc & 7))]
+        pos += len(table)
+    start = pos
+    pos += 1
+    while data[pos]:
+        pos += data[pos] + 1
+    return (packed & 0x07) | (desc & 0x40), table, data[start:pos + 1]
+
+
+class GifStreamWriter:
+    """
+    逐帧流式写出 GIF：每帧写入即交给 fp，内存占用与总帧数无关。
+      - 单帧经 imageio（Pillow 插件，bits 由 palettesize 向上取 2 的幂）量化、LZW 编码，
+        再按 GIF89a 的块结构拼到输出流里；每帧带自己的局部颜色表
+      - subrectangles=True 时只写与上一帧不同的包围盒（处置方式 1：保留上一帧）
+      - 与上一帧完全相同的帧不重复写出，而是把时长累加到上一帧（推迟一帧写出以便合并）
+    frames_encoded 为字节已写出的 write() 调用数（被合并的帧随所合并到的帧一起计入）。
+    """
+
+    def __init__(self, fp: BinaryIO, *, loop: int = 0, palettesize: int = 256,
+                 subrectangles: bool = True) -> None:
+        self.fp = fp
+        self.loop = int(loop)
+        self.bits = max(1, min(8, int(np.ceil(np.log2(max(2, int(palettesize)))))))
+        self.subrectangles = subrectangles
+        self.frames_written = 0
+        self.frames_encoded = 0
+        self._prev: Optional[np.ndarray] = None      # 上一帧已写出的 RGB 像素
+        self._pending: Optional[np.ndarray] = None
+        self._pending_ms = 0
+        self._pending_n = 0
+
+    def write(self, img: np.ndarray, duration_ms: int) -> None:
+        rgb = np.ascontiguousarray(img[..., :3])
+        if self._pending is not None and np.array_equal(self._pending, rgb):
+            self._pending_ms += int(duration_ms)
+            self._pending_n += 1
+            return
+        self._flush()
+        self._pending, self._pending_ms, self._pending_n = rgb, int(duration_ms), 1
+
+    def close(self) -> None:
+        self._flush()
+        if self.frames_written:
+            self.fp.write(b";")  # GIF trailer
+        self.fp.flush()
+
+    def _flush(self) -> None:
+        rgb, ms = self._pending, self._pending_ms
+        if rgb is None:
+            return
+        self._pending = None
+        with trace.span("gif.encode"):
+            x, y = 0, 0
+            region = rgb
+            if self._prev is None:
+                # 首帧：逻辑屏幕（无全局颜色表）+ NETSCAPE 循环扩展
+                h, w = rgb.shape[:2]
+                self.fp.write(b"GIF89a" + struct.pack("<HHBBB", w, h, 0x70, 0, 0))
+                self.fp.write(b"\x21\xff\x0bNETSCAPE2.0\x03\x01"
+                              + struct.pack("<H", self.loop) + b"\x00")
+            elif self.subrectangles:
+                diff = np.any(self._prev != rgb, axis=2)
+                ys, xs = np.nonzero(diff.any(axis=1))[0], np.nonzero(diff.any(axis=0))[0]
+                x, y = int(xs[0]), int(ys[0])
+                region = rgb[ys[0]:ys[-1] + 1, xs[0]:xs[-1] + 1]
+            flags, table, image = _gif_image(iio.imwrite("<bytes>", region, extension=".gif",
+                                                         bits=self.bits))
+            h, w = region.shape[:2]
+            # 图形控制扩展：处置方式 1，时长以 1/100 秒计（与 Pillow 相同取整）
+            self.fp.write(b"\x21\xf9\x04\x04" + struct.pack("<H", int(ms / 10)) + b"\x00\x00")
+            self.fp.write(b"\x2c" + struct.pack("<HHHHB", x, y, w, h, 0x80 | flags))
+            self.fp.write(table)
+            self.fp.write(image)
+        self._prev = rgb
+        self.frames_written += 1
+        self.frames_encoded += self._pending_n
+
+
+def _frame_durations(opt: GifOptions, total: int) -> List[int]:
+    # 每帧毫秒（Pillow 读回 info['duration'] 为 ms；GIF 内部以 1/100s 精度存储）
     if opt.per_frame_ms is not None:
         durations = list(opt.per_frame_ms)
-        if len(durations) != len(imgs):
+        if len(durations) != total:
             raise ValueError("per_frame_ms length must equal number of frames")
+        return durations
+    base_ms = max(1, int(round(1000.0 / max(1, opt.fps))))
+    if opt.min_frame_ms:
+        base_ms = max(base_ms, int(opt.min_frame_ms))
+    return [base_ms] * total
+
+
+def export_gif(scene: Scene, timeline: Timeline, outfile: str | BinaryIO, *,
+               options: GifOptions | None = None, frames: Optional[Sequence[Frame]] = None,
+               progress: Optional[ProgressCallback] = None,
+               cancel: Optional[CancelToken] = None, skip_unchanged: bool = False,
+               source: Optional[str] = None) -> bool:
+    """
+    编译 -> 栅格化 -> 编码 逐帧流水线导出 GIF（GifStreamWriter 逐帧写出）。
+      - frames：可传入已编译好的帧（如 batch 一次编译、多路输出），此时不再重新构帧
+      - progress：每帧回调一次 ExportProgress（已编译/已渲染/已编码帧数、吞吐、ETA）；
+        帧的字节写出后才计为已编码（写出器推迟一帧以合并相同帧，因此 encoded 落后一帧）
+      - cancel：CancelToken；在帧边界检查，取消时关闭并删除未写完的文件后抛出 ExportCancelled
+    outfile 也可以是可写的二进制文件对象（取消时只停止写入，不负责删除）。
+    skip_unchanged：输出旁的 .fingerprint 与本次指纹（source 为 demo 源文件，参与指纹）相同时
+    直接跳过，导出成功后更新指纹。返回 False 表示已跳过。
+    """
+    digest = None
+    if skip_unchanged and isinstance(outfile, (str, os.PathLike)):
+        digest = fingerprint.compute(scene, timeline, options or GifOptions(), kind="gif",
+                                     source=source)
+        if fingerprint.is_fresh(outfile, digest):
+            return False
+        fingerprint.invalidate(outfile)
+    with trace.span("gif.export"):
+        _export_gif(scene, timeline, outfile, options, frames, progress, cancel)
+    if digest is not None:
+        fingerprint.record(outfile, digest)  # type: ignore[arg-type]
+    return True
+
+
+def _export_gif(scene: Scene, timeline: Timeline, outfile: str | BinaryIO,
+                options: GifOptions | None, frames: Optional[Sequence[Frame]],
+                progress: Optional[ProgressCallback],
+                cancel: Optional[CancelToken]) -> None:
+    opt = options or GifOptions()
+    if opt.max_frames is not None:
+        # 抽样导出：只构造被选中的帧；已编译好的帧直接取用（尚未编译的惰性帧序列不触发整段编译）
+        indices = timeline.sample_indices(max(1, int(opt.max_frames)), opt.sampling)
+        total = len(indices)
+        if frames is not None and getattr(frames, "compiled", True):
+            source: Iterable = [frames[i] for i in indices]
+        else:
+            source = timeline.iter_frames_at(scene, indices)
+    elif frames is not None:
+        total = len(frames)
+        source = frames
     else:
-        base_ms = max(1, int(round(1000.0 / max(1, opt.fps))))
-        if opt.min_frame_ms:
-            base_ms = max(base_ms, int(opt.min_frame_ms))
-        durations = [base_ms] * len(imgs)
-
-    if opt.repeat_each > 1:
-        imgs = [img for img in imgs for _ in range(opt.repeat_each)]
-        durations = [d for d in durations for _ in range(opt.repeat_each)]
-
-    # 流式逐帧写入；GIF 内部以 1/100s 精度存储，但此处统一以 ms 传入，Pillow 读取时也是 ms。
-    with iio.imopen(outfile, "w", plugin="pillow") as writer:
-        for idx, (img, ms) in enumerate(zip(imgs, durations)):
-            if idx == 0:
-                writer.write(img, duration=ms, loop=opt.loop,
-                             palettesize=opt.palettesize, subrectangles=opt.subrectangles)
-            else:
-                writer.write(img, duration=ms)
+        total = timeline.frame_count()
+        source = timeline.iter_frames(scene)  # 边编译边渲染，不保留整段帧序列
+    if total <= 0:
+        raise ValueError("timeline has no frames")
+
+    durations = _frame_durations(opt, total)
+    tracker = ProgressTracker(total, progress, cancel)
+    owns_file = isinstance(outfile, (str, os.PathLike))
+    fp: BinaryIO = open(outfile, "wb") if isinstance(outfile, (str, os.PathLike)) else outfile
+    try:
+        writer = GifStreamWriter(fp, loop=opt.loop, palettesize=opt.palettesize,
+                                 subrectangles=opt.subrectangles)
+        raster = FrameRasterizer(scene, opt.size, opt.facecolor)
+        repeat = max(1, opt.repeat_each)
+        for idx, fr in enumerate(source):
+            tracker.check()
+            tracker.step("compile")
+            img = _render_frame(scene, fr, opt.size, opt.facecolor, raster)
+            tracker.step("render")
+            for _ in range(repeat):
+                writer.write(img, durations[idx])
+            tracker.step("encode", writer.frames_encoded // repeat - tracker.state.encoded)
+            tracker.report()
+        writer.close()
+        tracker.step("encode", writer.frames_encoded // repeat - tracker.state.encoded)
+    except BaseException:
+        # 取消/异常：关闭并清理未写完的文件，避免留下损坏的 GIF
+        if owns_file:
+            fp.close()
+            try:
+                os.remove(outfile)  # type: ignore[arg-type]
+            except OSError:
+                pass
+        raise
+    if owns_file:
+        fp.close()
+    tracker.report("done")
+
+
+class IncrementalGifExporter:
+    """
+    watch 模式的 GIF 输出：保留上次导出的各帧栅格，update() 时只重新栅格化 first_changed 之后的帧，
+    再把整段帧重新编码；写入临时文件后原子替换，预览程序不会读到半个 GIF。
+    产物与对新帧序列完整调用 export_gif 逐字节相同。
+    """
+
+    def __init__(self, outfile: str, options: GifOptions | None = None) -> None:
+        self.outfile = str(outfile)
+        self.options = options or GifOptions()
+        self._images: List[np.ndarray] = []   # 上次导出的各帧 RGB 栅格
+
+    def update(self, scene: Scene, frames: Sequence[Frame], first_changed: int = 0) -> int:
+        """写出新的帧序列；返回实际重新渲染的帧数。"""
+        opt = self.options
+        if not frames:
+            raise ValueError("timeline has no frames")
+        if opt.max_frames is not None and len(frames) > opt.max_frames:
+            # 抽样位置随总帧数变化：整段重写（至多 max_frames 帧）
+            frames = [frames[i] for i in uniform_indices(len(frames), opt.max_frames)]
+            first_changed = 0
+        if not os.path.exists(self.outfile):
+            first_changed = 0  # 旧文件不在：整段重写
+        start = max(0, min(first_changed, len(self._images), len(frames)))
+        durations = _frame_durations(opt, len(frames))
+        raster = FrameRasterizer(scene, opt.size, opt.facecolor)
+        images = self._images[:start] + [
+            np.ascontiguousarray(_render_frame(scene, fr, opt.size, opt.facecolor, raster)[..., :3])
+            for fr in frames[start:]]
+
+        tmp = f"{self.outfile}.tmp{os.getpid()}"
+        with trace.span("gif.export"):
+            try:
+                with open(tmp, "wb") as fp:
+                    writer = GifStreamWriter(fp, loop=opt.loop, palettesize=opt.palettesize,
+                                             subrectangles=opt.subrectangles)
+                    for img, ms in zip(images, durations):
+                        for _ in range(max(1, opt.repeat_each)):
+                            writer.write(img, ms)
+                    writer.close()
+                os.replace(tmp, self.outfile)
+            except BaseException:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+        self._images = images
+        return len(frames) - start
@@ -1,11 +1,14 @@
 #src/algoviz/backends/svg_svgwrite.py
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass
-from typing import Any, List, Optional, Tuple
+from typing import Any, List, Optional, Sequence, TextIO, Tuple
 
-from ..core.timeline import Timeline
-from ..core.drawops import Rect, Text
+from ..core.timeline import Frame, Timeline
+from ..core.drawops import Cells, Circles, Rect, Rects, Segments, Text, color_groups
+from ..core import fingerprint, trace
+from ..core.progress import CancelToken, ProgressCallback, ProgressTracker
 
 
 @dataclass
@@ -55,6 +58,69 @@ def _text_to_svg(t: Text) -> str:
     return f'<text {" ".join(attrs)}>{_esc(t.content)}</text>'
 
 
+def _segments_to_svg(op: Segments) -> str:
+    # 每种颜色一条 <path>（M x0 y0 L x1 y1 …），不逐条输出 <line>
+    import numpy as np
+
+    coords = np.column_stack([np.asarray(c, dtype=float) for c in (op.x0, op.y0, op.x1, op.y1)])
+    parts = []
+    for color, idx in color_groups(op.palette, op.colors, len(coords)):
+        d = " ".join("M%.2f %.2fL%.2f %.2f" % tuple(row) for row in coords[idx].tolist())
+        parts.append(f'<path d="{d}" style="fill:none;stroke:{color};stroke-width:{op.width:g};'
+                     f'vector-effect:non-scaling-stroke" />')
+    return "\n".join(parts)
+
+
+def _circles_to_svg(op: Circles) -> str:
+    # 同色圆放进一个 <g>，填充/描边写在组上
+    import numpy as np
+
+    n = len(op)
+    xy = np.column_stack([np.asarray(op.x, dtype=float), np.asarray(op.y, dtype=float),
+                          np.broadcast_to(np.asarray(op.r, dtype=float), (n,))])
+    stroke = op.stroke or "none"
+    parts = []
+    for color, idx in color_groups(op.palette, op.colors, n):
+        body = "".join('<circle cx="%.2f" cy="%.2f" r="%.2f" />' % tuple(row)
+                       for row in xy[idx].tolist())
+        parts.append(f'<g style="fill:{color};stroke:{stroke}">{body}</g>')
+    return "\n".join(parts)
+
+
+def _rects_to_svg(op: Rects) -> str:
+    # 同色矩形合成一条 <path>（M x y h w v h h -w z）
+    import numpy as np
+
+    n = len(op)
+    xywh = np.column_stack([np.broadcast_to(np.asarray(v, dtype=float), (n,))
+                            for v in (op.x, op.y, op.w, op.h)])
+    parts = []
+    for color, idx in color_groups(op.palette, op.colors, n):
+        d = " ".join("M%.2f %.2fh%.2fv%.2fh%.2fz" % (x, y, w, h, -w)
+                     for x, y, w, h in xywh[idx].tolist())
+        if op.filled:
+            style = f"fill:{color};stroke:{op.stroke or 'none'}"
+        else:
+            style = f"fill:none;stroke:{color};stroke-width:1.5"
+        parts.append(f'<path d="{d}" style="{style};vector-effect:non-scaling-stroke" />')
+    return "\n".join(parts)
+
+
+def _cells_to_svg(op: Cells) -> str:
+    # 规则网格：每种状态一条 <path>，格子坐标由行列号向量化算出
+    import numpy as np
+
+    codes = np.asarray(op.codes)
+    rows, cols = np.divmod(np.arange(codes.size), codes.shape[1])
+    xs, ys = op.x + cols * op.cw, op.y + rows * op.ch
+    parts = []
+    for color, idx in color_groups(op.palette, codes.ravel(), codes.size):
+        d = " ".join("M%.2f %.2fh%.2fv%.2fh%.2fz" % (x, y, op.cw, op.ch, -op.cw)
+                     for x, y in zip(xs[idx].tolist(), ys[idx].tolist()))
+        parts.append(f'<path d="{d}" style="fill:{color};stroke:none" />')
+    return "\n".join(parts)
+
+
 def _ops_to_svg(ops: List[Any]) -> str:
     parts = []
     for op in ops:
@@ -62,57 +128,125 @@ def _ops_to_svg(ops: List[Any]) -> str:
             parts.append(_rect_to_svg(op))
         elif isinstance(op, Text):
             parts.append(_text_to_svg(op))
+        elif isinstance(op, Segments):
+            parts.append(_segments_to_svg(op))
+        elif isinstance(op, Circles):
+            parts.append(_circles_to_svg(op))
+        elif isinstance(op, Rects):
+            parts.append(_rects_to_svg(op))
+        elif isinstance(op, Cells):
+            parts.append(_cells_to_svg(op))
         # 其他形状可以在此扩展
     return "\n".join(parts)
 
 
+def _layered_svg(scene: Any, states: Any, px: float = 1.0) -> str:
+    parts = []
+    for k, (static, names) in enumerate(scene.bands()):
+        if static:
+            parts.append(scene.static_cache(
+                ("svg", k),
+                lambda: '<g class="static-layer">\n'
+                        f'{_ops_to_svg(scene.draw_layers(names, states))}\n</g>'))
+        else:
+            parts.append(_ops_to_svg(scene.draw_layers(names, states, px=px)))
+    return "\n".join(p for p in parts if p)
+
+
 def export_svg(
     scene: Any,
     tl: Timeline,
-    outfile: str,
+    outfile: str | TextIO,
     frame_index: Optional[int] = None,
     options: Optional[SvgOptions] = None,
-) -> None:
+    *,
+    frames: Optional[Sequence[Frame]] = None,
+    progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelToken] = None,
+    skip_unchanged: bool = False,
+    source: Optional[str] = None,
+) -> bool:
     """
     导出指定帧（或最后一帧）的 SVG。
     兼容两种指定帧的方式：
       - frame_index: 传 -1 表示最后一帧；>=0 表示具体索引
       - options.frame: None 表示最后一帧；>=0 表示具体索引
     两者同时提供时，以 frame_index 优先。
+    frames 可传入已编译好的帧，此时不再重新构帧；否则只编译到目标帧为止。
+    progress / cancel 语义同 export_gif：取消在帧粒度检查，文件只在最后一次性写出，不会留下半成品。
+    outfile 也可以是可写的文本文件对象。
+    skip_unchanged / source 语义同 export_gif；返回 False 表示指纹未变、已跳过。
     """
+    digest = None
+    if skip_unchanged and isinstance(outfile, (str, os.PathLike)):
+        digest = fingerprint.compute(scene, tl, options or SvgOptions(), kind="svg", source=source,
+                                     extra=frame_index)
+        if fingerprint.is_fresh(outfile, digest):
+            return False
+        fingerprint.invalidate(outfile)
+    with trace.span("svg.export"):
+        _export_svg(scene, tl, outfile, frame_index, options, frames, progress, cancel)
+    if digest is not None:
+        fingerprint.record(outfile, digest)  # type: ignore[arg-type]
+    return True
+
+
+def _export_svg(scene: Any, tl: Timeline, outfile: str | TextIO, frame_index: Optional[int],
+                options: Optional[SvgOptions], frames: Optional[Sequence[Frame]],
+                progress: Optional[ProgressCallback], cancel: Optional[CancelToken]) -> None:
     opt = options or SvgOptions()
     W, H = opt.size
 
-    frames = tl.build_frames(scene)
-    if not frames:
+    total = len(frames) if frames is not None else tl.frame_count()
+    if total <= 0:
         raise RuntimeError("no frames to export")
 
     # 选择帧索引：frame_index 优先，其次 opt.frame，默认最后一帧
     if frame_index is not None:
-        idx = len(frames) - 1 if int(frame_index) < 0 else int(frame_index)
+        idx = total - 1 if int(frame_index) < 0 else int(frame_index)
     elif opt.frame is not None:
-        idx = len(frames) - 1 if int(opt.frame) < 0 else int(opt.frame)
+        idx = total - 1 if int(opt.frame) < 0 else int(opt.frame)
     else:
-        idx = len(frames) - 1
+        idx = total - 1
 
-    if idx < 0 or idx >= len(frames):
+    if idx < 0 or idx >= total:
         raise IndexError(f"frame index out of range: {idx}")
 
-    fr = frames[idx]
+    tracker = ProgressTracker(idx + 1, progress, cancel)
+    if frames is not None:
+        tracker.check()
+        fr = frames[idx]
+        tracker.step("compile", idx + 1)
+    else:
+        # 只编译到目标帧为止
+        for k, fr in enumerate(tl.iter_frames(scene)):
+            tracker.check()
+            tracker.step("compile")
+            if k == idx:
+                break
+            if (k & 63) == 0:
+                tracker.report()
 
-    # 让每个 actor 输出 DrawOps
+    # 让每个 actor 输出 DrawOps：分层场景按 z 序逐段输出，静态段序列化一次后缓存为共享的 <g>
+    tracker.check()
     ops: List[Any] = []
-    if hasattr(scene, "actors"):
+    if hasattr(scene, "bands"):
+        body = _layered_svg(scene, fr.states, W / max(1, scene.width))
+    elif hasattr(scene, "actors"):
         for name, st in fr.states.items():
             actor = scene.resolve_actor(name) if hasattr(scene, "resolve_actor") else scene.actors[name]
             if hasattr(actor, "draw"):
                 ops.extend(actor.draw(st))
+        body = _ops_to_svg(ops)
     else:
         # 如你的 Scene 有自定义接口，可在此分支适配
         for name, st in fr.states.items():
             actor = getattr(scene, name, None)
             if actor and hasattr(actor, "draw"):
                 ops.extend(actor.draw(st))
+        body = _ops_to_svg(ops)
+    tracker.step("render")
+    tracker.report()
 
     bg_rect = ""
     if opt.background:
@@ -122,9 +256,15 @@ def export_svg(
     svg = (
         f'<svg xmlns="http://www.w3.org/2000/svg" '
         f'width="{W}" height="{H}" viewBox="0 0 {W} {H}">\n'
-        f'{bg_rect}{_ops_to_svg(ops)}\n'
+        f'{bg_rect}{body}\n'
         f'</svg>'
     )
 
-    with open(outfile, "w", encoding="utf-8") as f:
-        f.write(svg)
+    tracker.check()
+    if isinstance(outfile, (str, os.PathLike)):
+        with open(outfile, "w", encoding="utf-8") as f:
+            f.write(svg)
+    else:
+        outfile.write(svg)
+    tracker.step("encode", tracker.state.total)
+    tracker.report("done")
@@ -1,9 +1,15 @@
 #algoviz/backends/tui_rich.py
 from __future__ import annotations
+import asyncio
+import io
+import json
+import os
 import sys
-import time
+import threading
+from collections import deque
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import (Any, AsyncIterable, AsyncIterator, Callable, Deque, Dict, List, Optional,
+                    Sequence, Tuple)
 
 from rich.console import Console, RenderableType
 from rich.panel import Panel
@@ -14,7 +20,12 @@ from rich.live import Live
 
 from ..core.scene import Scene
 from ..core.timeline import Timeline, Frame
-from ..core.drawops import DrawOp, Rect, Text as TextOp
+from ..core.compiler import BackgroundCompiler, StaticFrames
+from ..core.drawops import Cells, Circles, DrawOp, Rect, Rects, Segments, Text as TextOp
+from ..core import fingerprint, trace
+
+# 一个字符格约合的输出像素宽（换算 View.px，决定 actor 的细节层次与标签取舍）
+CELL_PX = 8.0
 
 
 # --------------------- 播放器状态 & 纯逻辑函数（可单测） ---------------------
@@ -27,21 +38,35 @@ class PlayerState:
     total_frames: int
     fps: int
     note: Optional[str] = None
+    # 预渲染缓冲命中统计（lookahead 关闭时保持 None，不在侧栏显示）
+    buffer_hits: Optional[int] = None
+    buffer_misses: Optional[int] = None
+    # 渐进编译进度（None = 已全部编译 / 未启用）
+    compiled: Optional[int] = None
+    # 播放/浏览方向：+1 向后；-1 表示最近一次是逆向单步（预渲染据此决定方向）
+    direction: int = 1
 
 def clamp(n: int, lo: int, hi: int) -> int:
     return lo if n < lo else hi if n > hi else n
 
-def advance_idx(idx: int, paused: bool, fps: int, speed: float, dt: float, total: int) -> int:
+def advance_idx(idx: int, paused: bool, fps: int, speed: float, dt: float, total: int,
+                stride: int = 1) -> int:
     """
     按 fps * speed * dt 推进帧索引；暂停则不前进；越界夹取到 total-1。
+    stride > 1 时增量向下取整到 stride 的倍数（只落在预渲染生产的帧上）。
     """
     if paused or total <= 0:
         return idx
-    inc = int(fps * max(speed, 0.0) * max(dt, 0.0))
+    stride = max(1, int(stride))
+    inc = int(fps * max(speed, 0.0) * max(dt, 0.0)) // stride * stride
     if inc <= 0:
         return idx
     return clamp(idx + inc, 0, max(0, total - 1))
 
+def _playback_stride(fps: int, speed: float, refresh: int) -> int:
+    """每次显示刷新跨过的帧数：fps*speed 超过刷新率时时钟与预渲染都按此步长跳帧。"""
+    return max(1, round(fps * max(speed, 0.0) / refresh))
+
 def adjust_speed(speed: float, delta_steps: int) -> float:
     """
     倍速调节：每一步 0.25 倍速增减，范围 [0.25, 4.0]。
@@ -55,6 +80,32 @@ def adjust_speed(speed: float, delta_steps: int) -> float:
     # 避免浮点误差
     return round(new_speed + 1e-9, 2)
 
+def apply_key(state: PlayerState, key: str) -> bool:
+    """
+    把一个按键作用到播放器状态上；返回 True 表示请求退出。
+    键位：" " 播放/暂停；"left"/"right" 单步；"[" / "]" 倍速；"0".."9" 百分位跳转；"q" 退出。
+    """
+    total = state.total_frames
+    if key == "q":
+        return True
+    if key == " ":
+        state.paused = not state.paused
+        state.direction = 1
+    elif key == "left":
+        state.frame_idx = clamp(state.frame_idx - 1, 0, total - 1)
+        state.direction = -1
+    elif key == "right":
+        state.frame_idx = clamp(state.frame_idx + 1, 0, total - 1)
+        state.direction = 1
+    elif key == "[":
+        state.speed = adjust_speed(state.speed, -1)
+    elif key == "]":
+        state.speed = adjust_speed(state.speed, +1)
+    elif key.isdigit():
+        # 数字键 0..9 -> 百分位跳转
+        state.frame_idx = seek_percent(total, int(key) / 10.0)
+    return False
+
 def seek_percent(total: int, percent: float) -> int:
     """
     百分比跳转：p ∈ [0,1] -> floor(total * p)，再夹取到 [0, total-1]
@@ -82,6 +133,15 @@ def _rasterize_ops_to_canvas(ops: List[DrawOp], scene: Scene, cols: int, rows: i
 
     # 初始化空白画布
     grid = [[" " for _ in range(cols)] for _ in range(rows)]
+    _paint(grid, ops, scene)
+
+    # 拼成 Rich Text
+    lines = ["".join(r) for r in grid]
+    return Text("\n".join(lines))
+
+def _paint(grid: List[List[Any]], ops: List[DrawOp], scene: Scene) -> None:
+    """把一组绘制指令画到字符网格上（先 Rect，再批量图元，最后 Text）；None 格为透明。"""
+    rows, cols = len(grid), len(grid[0])
 
     def to_cell_x(x: float) -> int:
         return int(x / max(1, scene.width) * (cols - 1))
@@ -106,6 +166,12 @@ def _rasterize_ops_to_canvas(ops: List[DrawOp], scene: Scene, cols: int, rows: i
                 for xx in range(x1, x2 + 1):
                     row[xx] = "█"
 
+    # 批量图元（网格、矩形组、边、节点）：整组换算到字符格后去重落点
+    for op in ops:
+        if isinstance(op, (Segments, Circles, Rects, Cells)):
+            _plot_batch(grid, op, (cols - 1) / max(1, scene.width),
+                        (rows - 1) / max(1, scene.height))
+
     # 再放 Text
     for op in ops:
         if isinstance(op, TextOp):
@@ -117,43 +183,311 @@ def _rasterize_ops_to_canvas(ops: List[DrawOp], scene: Scene, cols: int, rows: i
                 if xx < cols:
                     grid[cy][xx] = ch
 
-    # 拼成 Rich Text
-    lines = ["".join(r) for r in grid]
-    return Text("\n".join(lines))
+def _layer_plan(scene: Scene, states: Dict[str, Any], cols: int,
+                rows: int) -> Tuple[List[str], List[object]]:
+    """
+    静态段的字符画缓存：(最下方静态段画好的底图各行, 其上各段)。其上各段中，动态段为 actor 名元组，
+    静态段为预先画好的非空字符 [(行, 列, 字符)]，每帧直接覆盖。
+    """
+    bands = list(scene.bands())
+    k = 0
+    base = [[" " for _ in range(cols)] for _ in range(rows)]
+    while k < len(bands) and bands[k][0]:
+        _paint(base, scene.draw_layers(bands[k][1], states), scene)
+        k += 1
+    plan: List[object] = []
+    for static, names in bands[k:]:
+        if not static:
+            plan.append(names)
+            continue
+        layer: List[List[Optional[str]]] = [[None] * cols for _ in range(rows)]
+        _paint(layer, scene.draw_layers(names, states), scene)
+        plan.append([(r, c, ch) for r, line in enumerate(layer)
+                     for c, ch in enumerate(line) if ch is not None])
+    return ["".join(r) for r in base], plan
+
+def _rasterize_frame(scene: Scene, states: Dict[str, Any], cols: int, rows: int) -> RenderableType:
+    """整帧字符画：静态段按 (cols, rows) 缓存在场景上，每帧只画动态段。"""
+    rows = max(6, rows)
+    cols = max(20, cols)
+    if not hasattr(scene, "bands"):
+        return _rasterize_ops_to_canvas(scene.render(states), scene, cols, rows)
+    base, plan = scene.static_cache(("tui", cols, rows),
+                                    lambda: _layer_plan(scene, states, cols, rows))
+    px = (cols - 1) / max(1, scene.width) * CELL_PX
+    grid = [list(line) for line in base]
+    for item in plan:
+        if isinstance(item, tuple):
+            _paint(grid, scene.draw_layers(item, states, px=px), scene)
+        else:
+            for r, c, ch in item:  # type: ignore[attr-defined]
+                grid[r][c] = ch
+    return Text("\n".join("".join(r) for r in grid))
+
+def _plot_batch(grid: List[List[Optional[str]]], op: DrawOp, sx: float, sy: float) -> None:
+    """
+    Segments 沿线取样画 "·"，Circles 在圆心画 "●"，Rects 填 "█"（只描边时画边框），
+    Cells 在每个字符格中心取样（空格 "░"、其余 "█"）；向量化换算坐标，只逐个写入去重后的字符格。
+    """
+    import numpy as np
+
+    rows, cols = len(grid), len(grid[0])
+    if isinstance(op, Cells):
+        codes = np.asarray(op.codes)
+        gy = ((np.arange(rows) + 0.5) / sy - op.y) / op.ch
+        gx = ((np.arange(cols) + 0.5) / sx - op.x) / op.cw
+        ri = np.flatnonzero((gy >= 0) & (gy < codes.shape[0]))
+        ci = np.flatnonzero((gx >= 0) & (gx < codes.shape[1]))
+        sample = codes[gy[ri].astype(np.int64)[:, None], gx[ci].astype(np.int64)[None, :]]
+        for a, row in zip(ri.tolist(), sample.tolist()):
+            line = grid[a]
+            for b, code in zip(ci.tolist(), row):
+                line[b] = "█" if code else "░"
+        return
+    if isinstance(op, Rects):
+        n = len(op)
+        x0 = np.asarray(op.x, dtype=float) * sx
+        y0 = np.broadcast_to(np.asarray(op.y, dtype=float), (n,)) * sy
+        x1 = x0 + np.broadcast_to(np.asarray(op.w, dtype=float), (n,)) * sx
+        y1 = y0 + np.broadcast_to(np.asarray(op.h, dtype=float), (n,)) * sy
+        for a, b, c, d in np.column_stack([x0, y0, x1, y1]).astype(np.int64).tolist():
+            a, c = max(0, a), min(cols - 1, c)
+            b, d = max(0, b), min(rows - 1, d)
+            for yy in range(b, d + 1):
+                for xx in range(a, c + 1):
+                    if op.filled or yy in (b, d) or xx in (a, c):
+                        grid[yy][xx] = "█"
+        return
+    if isinstance(op, Segments):
+        x0, y0 = np.asarray(op.x0, dtype=float) * sx, np.asarray(op.y0, dtype=float) * sy
+        x1, y1 = np.asarray(op.x1, dtype=float) * sx, np.asarray(op.y1, dtype=float) * sy
+        steps = (np.maximum(np.abs(x1 - x0), np.abs(y1 - y0)).astype(np.int64) + 1)
+        seg = np.repeat(np.arange(len(steps)), steps)
+        t = ((np.arange(int(steps.sum())) - np.repeat(np.cumsum(steps) - steps, steps))
+             / np.repeat(steps, steps))
+        xs, ys = x0[seg] + (x1 - x0)[seg] * t, y0[seg] + (y1 - y0)[seg] * t
+        ch = "·"
+    elif isinstance(op, Circles):
+        xs, ys = np.asarray(op.x, dtype=float) * sx, np.asarray(op.y, dtype=float) * sy
+        ch = "●"
+    else:
+        return
+    cx = np.clip(xs.astype(np.int64), 0, cols - 1)
+    cy = np.clip(ys.astype(np.int64), 0, rows - 1)
+    for cell in np.unique(cy * cols + cx).tolist():
+        grid[cell // cols][cell % cols] = ch
+
 
 def render_sidebar(state: PlayerState) -> RenderableType:
     table = Table.grid(expand=True)
     table.add_row(f"[bold]Frame:[/bold] {state.frame_idx + 1}/{state.total_frames}")
+    if state.compiled is not None:
+        table.add_row(f"[bold]Compiled:[/bold] {state.compiled}/{state.total_frames}")
     table.add_row(f"[bold]Speed:[/bold] {state.speed:.2f}x")
     table.add_row(f"[bold]FPS:[/bold] {state.fps}")
     table.add_row(f"[bold]Paused:[/bold] {state.paused}")
+    if state.buffer_hits is not None and state.buffer_misses is not None:
+        table.add_row(f"[bold]Buffer:[/bold] {state.buffer_hits} hit / {state.buffer_misses} miss")
     if state.note:
         table.add_row(f"[bold]Note:[/bold] {state.note}")
     help_text = Text("Space=Play/Pause  ←/→=Step  [ / ]=Speed  0..9=Seek  Q=Quit", style="dim")
     return Panel.fit(Columns([table, help_text], expand=True), title="Algoviz TUI")
 
-def _compose_view(scene: Scene, frame: Frame, state: PlayerState, term_cols: int, term_rows: int) -> RenderableType:
+def _canvas_size(term_cols: int, term_rows: int) -> Tuple[int, int]:
     # 左画布 2/3 宽；右侧栏 1/3 宽
     canvas_cols = max(20, int(term_cols * 0.66))
     sidebar_cols = term_cols - canvas_cols - 1
     if sidebar_cols < 20:
         sidebar_cols = 20
         canvas_cols = max(20, term_cols - sidebar_cols - 1)
-    canvas_rows = term_rows - 2
+    return canvas_cols, term_rows - 2
 
-    ops = scene.render(frame.states)
-    canvas = _rasterize_ops_to_canvas(ops, scene, canvas_cols, canvas_rows)
-    sidebar = render_sidebar(state)
-    return Columns([Panel(canvas, title="Canvas"), sidebar], expand=True)
+def _render_canvas(scene: Scene, frame: Frame, cols: int, rows: int) -> RenderableType:
+    with trace.span("tui.rasterize"):
+        return Panel(_rasterize_frame(scene, frame.states, cols, rows), title="Canvas")
 
+def _compose_view(scene: Scene, frame: Frame, state: PlayerState, term_cols: int,
+                  term_rows: int) -> RenderableType:
+    canvas_cols, canvas_rows = _canvas_size(term_cols, term_rows)
+    canvas = _render_canvas(scene, frame, canvas_cols, canvas_rows)
+    return Columns([canvas, render_sidebar(state)], expand=True)
+
+
+# --------------------- 预渲染：后台生产者线程 + 有界环形缓冲 ---------------------
+
+class PrerenderBuffer:
+    """
+    后台线程从当前帧开始、沿播放方向按步长预先栅格化后续帧，放入容量为 depth 的环形缓冲；
+    显示循环只取现成的 renderable。
+      - reset(): 跳转 / 倍速变化 / 终端尺寸变化时调用，整体失效并从新位置重新生产
+      - get():   命中直接返回；未命中（生产者还没追上）则同步渲染，计入 misses；
+                 若该帧不在生产者将要渲染的序列上（已越过或不在步长网格上），生产者从其后重新对齐
+    render(idx, cols, rows) 必须是纯函数（可在后台线程调用）；available() 返回当前可渲染的帧数上界
+    （渐进编译时即编译前沿），生产者不会越过它。
+    """
+
+    def __init__(self, render: Callable[[int, int, int], RenderableType], total: int,
+                 depth: int = 32, available: Optional[Callable[[], int]] = None) -> None:
+        self._render = render
+        self._available = available
+        self.total = int(total)
+        self.depth = max(1, int(depth))
+        self.hits = 0
+        self.misses = 0
+        self._ring: Deque[Tuple[int, RenderableType]] = deque()
+        self._next = 0          # 生产者下一个要渲染的帧
+        self._direction = 1     # +1 向后播放；-1 逆向单步浏览
+        self._stride = 1        # 每次显示刷新大约跨过的帧数（与 fps*speed 相关）
+        self._size = (0, 0)
+        self._gen = 0           # 失效代数：生产者渲染完成时代数已变则丢弃结果
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- 生命周期 ----
+    def start(self) -> "PrerenderBuffer":
+        self._thread = threading.Thread(target=self._produce, name="algoviz-prerender", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def __enter__(self) -> "PrerenderBuffer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # ---- 消费端 ----
+    def reset(self, idx: int, *, direction: int = 1, stride: int = 1,
+              size: Tuple[int, int] = (0, 0)) -> None:
+        with self._cond:
+            self._ring.clear()
+            self._gen += 1
+            self._next = clamp(int(idx), 0, max(0, self.total - 1))
+            self._direction = 1 if direction >= 0 else -1
+            self._stride = max(1, int(stride))
+            self._size = size
+            self._cond.notify_all()
+
+    def matches(self, *, direction: int, stride: int, size: Tuple[int, int]) -> bool:
+        return (self._direction == (1 if direction >= 0 else -1)
+                and self._stride == max(1, int(stride)) and self._size == size)
+
+    def get(self, idx: int) -> RenderableType:
+        with self._cond:
+            # 丢弃已被播放位置越过的缓冲项，为生产者腾出空间
+            d = self._direction
+            while self._ring and (self._ring[0][0] - idx) * d < 0:
+                self._ring.popleft()
+                self._cond.notify_all()
+            if self._ring and self._ring[0][0] == idx:
+                self.hits += 1
+                return self._ring[0][1]
+            self.misses += 1
+            ahead = (idx - self._next) * d
+            if ahead < 0 or ahead % self._stride:
+                # 生产者不会渲染 idx：丢掉错位的缓冲，从 idx 的下一步长处继续生产
+                self._ring.clear()
+                self._gen += 1
+                self._next = idx + d * self._stride
+                self._cond.notify_all()
+            cols, rows = self._size
+        return self._render(idx, cols, rows)
+
+    # ---- 生产端 ----
+    def _produce(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and (len(self._ring) >= self.depth
+                                            or not 0 <= self._next < self.total):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                if self._available is not None and self._next >= self._available():
+                    # 生产者追上了编译前沿：稍后再试
+                    self._cond.wait(timeout=0.02)
+                    continue
+                idx, gen = self._next, self._gen
+                cols, rows = self._size
+            view = self._render(idx, cols, rows)
+            with self._cond:
+                if gen != self._gen:
+                    continue
+                self._ring.append((idx, view))
+                self._next = idx + self._direction * self._stride
+
+
+# --------------------- 键盘输入源（可注入的异步键流） ---------------------
+#
+# 输入源就是一个产出键位字符串的异步可迭代对象：
+#   " " 空格; "q"; "[" 或 "]"; "left"/"right"; "0".."9"
+# 测试/无头环境可直接注入任意 async generator。
+
+KeySource = AsyncIterable[str]
+
+_ESCAPES = {b"\x1b[D": "left", b"\x1b[C": "right", b"\x1bOD": "left", b"\x1bOC": "right"}
+
+
+def _decode_keys(data: bytes) -> List[str]:
+    """把一次 read() 得到的字节解码成键位序列（未知字节忽略）。"""
+    keys: List[str] = []
+    i = 0
+    while i < len(data):
+        seq = data[i:i + 3]
+        if seq in _ESCAPES:
+            keys.append(_ESCAPES[seq])
+            i += 3
+            continue
+        ch = data[i:i + 1]
+        i += 1
+        if ch in (b"q", b"Q"):
+            keys.append("q")
+        elif ch in (b" ", b"[", b"]") or ch.isdigit():
+            keys.append(ch.decode())
+    return keys
+
+
+async def posix_keys(fd: Optional[int] = None) -> AsyncIterator[str]:
+    """
+    POSIX：终端切到 cbreak（逐字符、无回显）模式，并把 fd 注册到事件循环的 selector 上；
+    有输入时循环被立即唤醒，无需轮询。退出时恢复终端属性。
+    """
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno() if fd is None else fd
+    loop = asyncio.get_running_loop()
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+
+    def on_readable() -> None:
+        try:
+            data = os.read(fd, 64)
+        except OSError:
+            return
+        for k in _decode_keys(data):
+            queue.put_nowait(k)
+
+    saved = termios.tcgetattr(fd)
+    tty.setcbreak(fd)
+    loop.add_reader(fd, on_readable)
+    try:
+        while True:
+            yield await queue.get()
+    finally:
+        loop.remove_reader(fd)
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
 
-# --------------------- 键盘（Windows 原生；非 Windows 自动降级无键） ---------------------
 
 def _read_key_nonblocking() -> Optional[str]:
     """
-    返回一个简单键位字符串：
-      " " 空格; "q"; "[" 或 "]"; "left"/"right"; "0".."9"
-    非 Windows 返回 None（降级为无键交互）。
+    Windows 控制台句柄无法注册到 selector，只能非阻塞探测 msvcrt；其余平台返回 None。
     """
     if sys.platform.startswith("win"):
         try:
@@ -182,63 +516,262 @@ def _read_key_nonblocking() -> Optional[str]:
                 if k == b"M":
                     return "right"
         return None
+    return None
+
+
+async def windows_keys(interval: float = 0.02) -> AsyncIterator[str]:
+    """Windows：低频探测 msvcrt（让出事件循环，不占满 CPU）。"""
+    while True:
+        key = _read_key_nonblocking()
+        if key is None:
+            await asyncio.sleep(interval)
+        else:
+            yield key
+
+
+def _default_key_source() -> Optional[KeySource]:
+    if sys.platform.startswith("win"):
+        return windows_keys()
+    try:
+        if sys.stdin is not None and sys.stdin.isatty():
+            return posix_keys()
+    except (AttributeError, ValueError, OSError):
+        pass
+    return None  # 非 TTY（CI/管道）：无键，靠 exit_after 退出
+
+
+# --------------------- 主入口：play_tui / play_tui_async ---------------------
+
+async def play_tui_async(scene: Scene, timeline: Timeline, fps: int = 20, speed: float = 1.0,
+                         exit_after: float | None = None, lookahead: int = 32, *,
+                         keys: Optional[KeySource] = None,
+                         console: Optional[Console] = None,
+                         reloads: Optional[AsyncIterable[Tuple[Scene, Sequence[Frame]]]] = None,
+                         frames: Optional[Sequence[Frame]] = None,
+                         ) -> Optional[PlayerState]:
+    """
+    asyncio 播放器核心：输入、帧时钟、渲染是同一事件循环上的三个任务。
+      - 输入：按键一到就唤醒时钟与渲染，暂停时没有任何轮询
+      - 时钟：按 fps*speed 推进帧索引；暂停或到达末帧时挂起等待唤醒
+      - 渲染：只在状态变化时重绘，且不超过刷新率
+    keys 为可注入的异步键流（默认按平台选择；非 TTY 时无键）。
+    reloads（watch 模式）每产出一组 (scene, 已编译帧) 就原地换上新帧，保持当前播放位置。
+    frames 为调用方已编译好的帧（如 watch 首次加载）；给出时直接播放，不再后台编译 timeline。
+    """
+    compiler: BackgroundCompiler | StaticFrames
+    if frames is not None:
+        compiler = StaticFrames(frames)
     else:
-        # 非 Windows：为简洁与稳定，此版不启用原始模式读键，直接降级为无键
+        compiler = BackgroundCompiler(scene, timeline).start()
+    total = compiler.total
+    if total == 0:
+        compiler.close()
         return None
 
+    loop = asyncio.get_running_loop()
+    console = console or Console()
+    state = PlayerState(frame_idx=0, paused=False, speed=speed, total_frames=total, fps=fps,
+                        note=compiler.get(0).note, compiled=compiler.compiled)
+    refresh = max(10, fps)
+    source = keys if keys is not None else _default_key_source()
 
-# --------------------- 主入口：play_tui ---------------------
+    def render(idx: int, cols: int, rows: int) -> RenderableType:
+        return _render_canvas(scene, compiler.get(idx), cols, rows)
 
-def play_tui(scene: Scene, timeline: Timeline, fps: int = 20, speed: float = 1.0, exit_after: float | None = None) -> None:
+    def make_buffer() -> Optional[PrerenderBuffer]:
+        if lookahead <= 0:
+            return None
+        state.buffer_hits = state.buffer_misses = 0
+        return PrerenderBuffer(render, total, depth=lookahead,
+                               available=lambda: compiler.compiled).start()
+
+    buffer = make_buffer()
+
+    stop = asyncio.Event()
+    wake = asyncio.Event()    # 唤醒时钟（按键）
+    dirty = asyncio.Event()   # 唤醒渲染（任意状态变化）
+    seeked = False            # 数字键跳转：预渲染缓冲需整体失效
+
+    async def input_task() -> None:
+        nonlocal seeked
+        if source is None:
+            return
+        async for key in source:
+            if apply_key(state, key):
+                stop.set()
+                return
+            seeked = seeked or key.isdigit()
+            wake.set()
+            dirty.set()
+
+    async def clock_task() -> None:
+        last = loop.time()
+        while True:
+            if state.paused or state.frame_idx >= total - 1:
+                wake.clear()
+                await wake.wait()
+                last = loop.time()
+                continue
+            rate = state.fps * max(state.speed, 0.0)
+            # 高倍速时每次前进 stride 帧，与预渲染生产的帧序列保持对齐
+            stride = _playback_stride(state.fps, state.speed, refresh)
+            wake.clear()
+            try:
+                delay = max(stride / max(rate, 1e-6), 1.0 / refresh)
+                await asyncio.wait_for(wake.wait(), timeout=delay)
+                last = loop.time()  # 按键打断：以按键时刻为新的计时基准
+                continue
+            except asyncio.TimeoutError:
+                pass
+            now = loop.time()
+            nxt = advance_idx(state.frame_idx, state.paused, state.fps, state.speed, now - last,
+                              total, stride)
+            if nxt != state.frame_idx:
+                # 保留不足一帧的余量，长时间播放不漂移
+                last += (nxt - state.frame_idx) / max(rate, 1e-6)
+                state.frame_idx = nxt
+                dirty.set()
+
+    async def reload_task() -> None:
+        nonlocal scene, compiler, total, buffer, seeked
+        if reloads is None:
+            return
+        async for new_scene, frames in reloads:
+            if not frames:
+                continue
+            # 先停掉旧的预渲染线程，避免它拿旧帧序号去读新帧
+            if buffer is not None:
+                await loop.run_in_executor(None, buffer.close)
+            compiler.close()
+            scene, compiler, total = new_scene, StaticFrames(frames), len(frames)
+            state.total_frames = total
+            state.frame_idx = min(state.frame_idx, total - 1)
+            buffer = make_buffer()
+            seeked = True
+            wake.set()
+            dirty.set()
+
+    async def render_task() -> None:
+        nonlocal seeked
+        prev_speed = state.speed
+        with Live(console=console, refresh_per_second=refresh, auto_refresh=False) as live:
+            while True:
+                await dirty.wait()
+                dirty.clear()
+                idx = state.frame_idx
+                if idx >= compiler.compiled:
+                    # 越过编译前沿：在线程池里等待该帧，不阻塞事件循环
+                    await loop.run_in_executor(None, compiler.wait_for, idx)
+                state.note = compiler.get(idx).note
+                state.compiled = compiler.compiled
+
+                with trace.span("tui.draw"):
+                    term = console.size
+                    size = _canvas_size(term.width, term.height)
+                    if buffer is not None:
+                        stride = 1
+                        if not state.paused:
+                            stride = _playback_stride(state.fps, state.speed, refresh)
+                        if seeked or state.speed != prev_speed or not buffer.matches(
+                                direction=state.direction, stride=stride, size=size):
+                            buffer.reset(idx, direction=state.direction, stride=stride, size=size)
+                        seeked, prev_speed = False, state.speed
+                        canvas = buffer.get(idx)
+                        state.buffer_hits, state.buffer_misses = buffer.hits, buffer.misses
+                    else:
+                        canvas = render(idx, *size)
+                    live.update(Columns([canvas, render_sidebar(state)], expand=True), refresh=True)
+                trace.count("tui.frames")
+                await asyncio.sleep(1.0 / refresh)  # 限制重绘频率
+
+    tasks = [loop.create_task(t()) for t in (input_task, clock_task, render_task, reload_task)]
+    stopper = loop.create_task(stop.wait())
+    deadline = None if exit_after is None else loop.time() + exit_after
+    dirty.set()
+    try:
+        pending = {stopper, *tasks}
+        while not stop.is_set():
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            done, pending = await asyncio.wait(pending, timeout=timeout,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break  # exit_after 到期（用于 CI/自动测试）
+            for t in done:
+                # 输入源正常耗尽时继续播放；任一任务异常则向上抛出
+                if t is not stopper and t.exception() is not None:
+                    raise t.exception()  # type: ignore[misc]
+    finally:
+        for t in (stopper, *tasks):
+            t.cancel()
+        await asyncio.gather(stopper, *tasks, return_exceptions=True)
+        if buffer is not None:
+            buffer.close()
+        compiler.close()
+    return state
+
+
+def play_tui(scene: Scene, timeline: Timeline, fps: int = 20, speed: float = 1.0,
+             exit_after: float | None = None, lookahead: int = 32, *,
+             keys: Optional[KeySource] = None,
+             reloads: Optional[AsyncIterable[Tuple[Scene, Sequence[Frame]]]] = None,
+             frames: Optional[Sequence[Frame]] = None) -> Optional[PlayerState]:
     """
-    在终端播放 Scene+Timeline 生成的帧序列；支持（Windows）键控。
+    在终端播放 Scene+Timeline 生成的帧序列；Linux/macOS（TTY）与 Windows 均支持键控。
     非 TTY 或无键平台也能播放，并可通过 exit_after 自动退出（用于 CI）。
+    帧在后台线程中渐进编译，播放立即开始；跳转到尚未编译的位置时只等待到该帧就绪。
+    lookahead>0 时启用后台预渲染线程（缓冲深度 = lookahead 帧）；返回最终播放器状态（含命中统计）。
+    已在事件循环中时请直接 await play_tui_async()。
     """
-    frames: List[Frame] = timeline.build_frames(scene)
-    total = len(frames) if frames else 0
-    if total == 0:
-        return
+    return asyncio.run(play_tui_async(scene, timeline, fps=fps, speed=speed, exit_after=exit_after,
+                                      lookahead=lookahead, keys=keys, reloads=reloads,
+                                      frames=frames))
 
-    console = Console()
-    state = PlayerState(frame_idx=0, paused=False, speed=speed, total_frames=total, fps=fps, note=frames[0].note)
 
-    last_ts = time.monotonic()
-    start_ts = last_ts
+# --------------------- 离线录制：asciicast v2（tui-cast） ---------------------
 
-    with Live(console=console, refresh_per_second=max(10, fps)) as live:
-        while True:
-            now = time.monotonic()
-            dt = now - last_ts
-            last_ts = now
-
-            # 按键（可能为 None）
-            key = _read_key_nonblocking()
-            if key == "q":
-                break
-            elif key == " ":
-                state.paused = not state.paused
-            elif key == "left":
-                state.frame_idx = clamp(state.frame_idx - 1, 0, total - 1)
-            elif key == "right":
-                state.frame_idx = clamp(state.frame_idx + 1, 0, total - 1)
-            elif key == "[":
-                state.speed = adjust_speed(state.speed, -1)
-            elif key == "]":
-                state.speed = adjust_speed(state.speed, +1)
-            elif key and key.isdigit():
-                # 数字键 0..9 -> 百分位跳转
-                percent = int(key) / 10.0
-                state.frame_idx = seek_percent(total, percent)
-
-            # 时间推进
-            state.frame_idx = advance_idx(state.frame_idx, state.paused, state.fps, state.speed, dt, total)
-            state.note = frames[state.frame_idx].note
-
-            # 退出门槛（用于 CI/自动测试）
-            if exit_after is not None and (now - start_ts) >= exit_after:
-                break
-
-            # 渲染
-            term = console.size
-            view = _compose_view(scene, frames[state.frame_idx], state, term.width, term.height)
-            live.update(view)
+@dataclass
+class CastOptions:
+    size: Tuple[int, int] = (100, 30)   # 终端列数 x 行数
+    fps: int = 20
+
+
+def export_cast(scene: Scene, timeline: Timeline, outfile: str, *,
+                options: Optional[CastOptions] = None,
+                frames: Optional[Sequence[Frame]] = None, skip_unchanged: bool = False,
+                source: Optional[str] = None) -> bool:
+    """
+    把 TUI 播放画面逐帧录制为 asciicast v2 文件（可用 asciinema play 回放）。
+    frames 可传入已编译好的帧，此时不再重新构帧。
+    skip_unchanged / source 语义同 export_gif；返回 False 表示指纹未变、已跳过。
+    """
+    opt = options or CastOptions()
+    digest = None
+    if skip_unchanged:
+        digest = fingerprint.compute(scene, timeline, opt, kind="cast", source=source)
+        if fingerprint.is_fresh(outfile, digest):
+            return False
+        fingerprint.invalidate(outfile)
+    cols, rows = opt.size
+    if frames is None:
+        frames = timeline.build_frames(scene)
+    if not frames:
+        raise ValueError("timeline has no frames")
+
+    buf = io.StringIO()
+    console = Console(file=buf, width=cols, height=rows, force_terminal=True,
+                      color_system="standard", legacy_windows=False)
+    dt = 1.0 / max(1, opt.fps)
+    with open(outfile, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"version": 2, "width": cols, "height": rows,
+                            "env": {"TERM": "xterm-256color"}}) + "\n")
+        for idx, fr in enumerate(frames):
+            state = PlayerState(frame_idx=idx, paused=False, speed=1.0, total_frames=len(frames),
+                                fps=opt.fps, note=fr.note)
+            buf.seek(0)
+            buf.truncate()
+            console.print(_compose_view(scene, fr, state, cols, rows))
+            text = "\x1b[H\x1b[2J" + buf.getvalue().replace("\n", "\r\n")
+            f.write(json.dumps([round(idx * dt, 6), "o", text]) + "\n")
+    if digest is not None:
+        fingerprint.record(outfile, digest)
+    return True
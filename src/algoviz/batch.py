@@ -0,0 +1,242 @@
+#algoviz/batch.py
+"""
+批量导出：一个清单（TOML/JSON）描述 demos × outputs。
+每个 demo 只加载、build()、编译帧各一次，再把同一份帧分发给各路输出；
+相互独立的 demo 通过进程池并行，最后汇总各阶段耗时。
+
+清单示例（TOML；JSON 结构相同）：
+
+    jobs = 4
+    [[demos]]
+    path = "demos/sort_bubble_full.py"
+    easing = "linear"                 # 可选
+      [[demos.outputs]]
+      outfile = "out/bubble.gif"      # format 缺省时按扩展名推断（.gif/.svg/.cast）
+      size = "320x180"
+      fps = 20
+      [[demos.outputs]]
+      format = "svg"
+      outfile = "out/bubble.svg"
+      frame = "last"
+
+相对路径均相对清单文件所在目录解析。
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, cast
+
+from .demo import apply_easing, load_demo, parse_size
+
+FORMATS = ("gif", "svg", "cast")
+_EXT_FORMAT = {".gif": "gif", ".svg": "svg", ".cast": "cast"}
+
+
+@dataclass
+class OutputSpec:
+    format: str
+    outfile: str
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class DemoJob:
+    demo: str
+    outputs: List[OutputSpec]
+    easing: Optional[str] = None
+
+
+@dataclass
+class JobResult:
+    demo: str
+    # 阶段 -> 秒：load（导入 + build）、compile（构帧）、gif/svg/cast（各格式输出合计）
+    timings: Dict[str, float] = field(default_factory=dict)
+    outputs: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)   # 指纹未变而跳过的输出
+    error: Optional[str] = None
+
+
+# --------------------- 清单解析 ---------------------
+
+def _read_manifest(path: Path) -> Dict[str, Any]:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".json":
+        return cast(Dict[str, Any], json.loads(text))
+    try:
+        import tomllib  # Python 3.11+
+    except ModuleNotFoundError:  # pragma: no cover - 3.10
+        try:
+            import tomli as tomllib  # type: ignore[no-redef]
+        except ModuleNotFoundError:
+            raise RuntimeError("读取 TOML 清单需要 Python 3.11+ 或安装 tomli；也可改用 JSON 清单")
+    return cast(Dict[str, Any], tomllib.loads(text))
+
+
+def _output_from_dict(d: Dict[str, Any], base: Path) -> OutputSpec:
+    d = dict(d)
+    if "outfile" not in d:
+        raise ValueError("output 缺少 outfile")
+    outfile = str((base / str(d.pop("outfile"))).resolve())
+    fmt = d.pop("format", None) or _EXT_FORMAT.get(Path(outfile).suffix.lower())
+    if fmt not in FORMATS:
+        raise ValueError(f"不支持的输出格式：{fmt}（可选：{', '.join(FORMATS)}）")
+    return OutputSpec(format=fmt, outfile=outfile, options=d)
+
+
+def load_manifest(path: str) -> Tuple[List[DemoJob], Optional[int]]:
+    """解析清单，返回 (jobs 列表, 清单里声明的并行数或 None)。"""
+    p = Path(path)
+    data = _read_manifest(p)
+    base = p.resolve().parent
+    jobs: List[DemoJob] = []
+    for d in data.get("demos", []):
+        if "path" not in d:
+            raise ValueError("demo 缺少 path")
+        outputs = [_output_from_dict(o, base) for o in d.get("outputs", [])]
+        if not outputs:
+            raise ValueError(f"demo {d['path']} 没有任何 outputs")
+        jobs.append(DemoJob(demo=str((base / str(d["path"])).resolve()), outputs=outputs,
+                            easing=d.get("easing")))
+    if not jobs:
+        raise ValueError(f"清单中没有 demos：{p}")
+    n = data.get("jobs")
+    return jobs, None if n is None else int(n)
+
+
+# --------------------- 单个 demo：一次编译，多路输出 ---------------------
+
+def _size(v: Any, default: Tuple[int, int]) -> Tuple[int, int]:
+    if v is None:
+        return default
+    if isinstance(v, str):
+        return parse_size(v)
+    w, h = v
+    return int(w), int(h)
+
+
+class _LazyFrames(Sequence[Any]):
+    """首次访问时才编译的帧序列：所有输出都因指纹未变而跳过时，完全不编译。"""
+
+    def __init__(self, scene: Any, tl: Any, timings: Dict[str, float]) -> None:
+        self._scene, self._tl, self._timings = scene, tl, timings
+        self._frames: Optional[List[Any]] = None
+
+    def _get(self) -> List[Any]:
+        if self._frames is None:
+            t0 = time.perf_counter()
+            self._frames = self._tl.build_frames(self._scene)
+            self._timings["compile"] = time.perf_counter() - t0
+        return self._frames
+
+    def __len__(self) -> int:
+        return len(self._get())
+
+    def __getitem__(self, idx: Any) -> Any:
+        return self._get()[idx]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._get())
+
+    @property
+    def compiled(self) -> bool:
+        return self._frames is not None
+
+
+def _write_output(scene: Any, tl: Any, frames: Sequence[Any], spec: OutputSpec, *,
+                  skip_unchanged: bool = False, source: Optional[str] = None) -> bool:
+    opts = dict(spec.options)
+    Path(spec.outfile).parent.mkdir(parents=True, exist_ok=True)
+    kw: Dict[str, Any] = {"frames": frames, "skip_unchanged": skip_unchanged, "source": source}
+    if spec.format == "gif":
+        from .backends.gif_mpl import export_gif, GifOptions
+        opts["size"] = _size(opts.get("size"), GifOptions.size)
+        return export_gif(scene, tl, spec.outfile, options=GifOptions(**opts), **kw)
+    elif spec.format == "svg":
+        from .backends.svg_svgwrite import export_svg, SvgOptions
+        opts["size"] = _size(opts.get("size"), SvgOptions.size)
+        frame = opts.get("frame")
+        opts["frame"] = None if frame is None or str(frame).lower() == "last" else int(frame)
+        return export_svg(scene, tl, spec.outfile, options=SvgOptions(**opts), **kw)
+    else:
+        from .backends.tui_rich import export_cast, CastOptions
+        opts["size"] = _size(opts.get("size"), CastOptions.size)
+        return export_cast(scene, tl, spec.outfile, options=CastOptions(**opts), **kw)
+
+
+def run_job(job: DemoJob, force: bool = False) -> JobResult:
+    """
+    加载 + build 一次、最多编译一次，然后把同一份帧写到所有输出。异常记录在结果里而非抛出。
+    指纹（demo 源码 + 事件 + 场景 + 选项 + 版本）未变且输出仍在的输出直接跳过；全部跳过时不编译。
+    force=True 时忽略已有指纹、全部重写。
+    """
+    from .core import fingerprint
+
+    res = JobResult(demo=job.demo)
+    try:
+        t0 = time.perf_counter()
+        scene, tl = load_demo(job.demo)
+        apply_easing(tl, job.easing)
+        res.timings["load"] = time.perf_counter() - t0
+        frames = _LazyFrames(scene, tl, res.timings)
+        for spec in job.outputs:
+            if force:
+                fingerprint.invalidate(spec.outfile)
+            ts = time.perf_counter()
+            built = frames.compiled
+            written = _write_output(scene, tl, frames, spec, skip_unchanged=True, source=job.demo)
+            spent = time.perf_counter() - ts
+            if not built and frames.compiled:
+                spent -= res.timings["compile"]  # 编译时间单独计入 compile
+            res.timings[spec.format] = res.timings.get(spec.format, 0.0) + spent
+            (res.outputs if written else res.skipped).append(spec.outfile)
+    except Exception as e:
+        res.error = f"{type(e).__name__}: {e}"
+    return res
+
+
+def run_batch(jobs: List[DemoJob], n_jobs: Optional[int] = None, *,
+              force: bool = False) -> List[JobResult]:
+    """按清单顺序返回结果；n_jobs<=1 或只有一个 demo 时在当前进程内顺序执行。"""
+    n = n_jobs if n_jobs is not None else (os.cpu_count() or 1)
+    n = max(1, min(int(n), len(jobs)))
+    if n == 1:
+        return [run_job(j, force) for j in jobs]
+    with ProcessPoolExecutor(max_workers=n) as pool:
+        return list(pool.map(run_job, jobs, [force] * len(jobs)))
+
+
+# --------------------- 汇总 ---------------------
+
+def format_summary(results: List[JobResult], wall: Optional[float] = None) -> str:
+    stages = ["load", "compile"] + [f for f in FORMATS if any(f in r.timings for r in results)]
+    name_w = max([4] + [len(Path(r.demo).name) for r in results])
+    header = f"{'demo':<{name_w}}  " + "  ".join(f"{s:>8}" for s in stages) + "     total"
+    lines = [header, "-" * len(header)]
+    totals = {s: 0.0 for s in stages}
+    for r in results:
+        cells = []
+        for s in stages:
+            v = r.timings.get(s)
+            totals[s] += v or 0.0
+            cells.append(f"{v:8.3f}" if v is not None else f"{'-':>8}")
+        row = (f"{Path(r.demo).name:<{name_w}}  " + "  ".join(cells)
+               + f"  {sum(r.timings.values()):8.3f}")
+        if r.skipped:
+            row += f"  (跳过 {len(r.skipped)} 个未变化输出)"
+        if r.error:
+            row += f"  ERROR {r.error}"
+        lines.append(row)
+    lines.append("-" * len(header))
+    lines.append(f"{'sum':<{name_w}}  " + "  ".join(f"{totals[s]:8.3f}" for s in stages)
+                 + f"  {sum(totals.values()):8.3f}")
+    skipped = sum(len(r.skipped) for r in results)
+    if skipped:
+        lines.append(f"up-to-date: {skipped} 个输出指纹未变，已跳过（--force 强制重写）")
+    if wall is not None:
+        lines.append(f"wall time: {wall:.3f}s")
+    return "\n".join(lines)
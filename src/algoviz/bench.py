@@ -0,0 +1,235 @@
+#algoviz/bench.py
+"""
+性能基准：分阶段计时 + 规模曲线 + JSON 基线对比。
+
+阶段（stage）：
+  build_frames   Timeline.build_frames（每帧耗时）
+  render         Scene.render / ArrayBar.draw（每帧耗时，抽样）
+  gif_raster     GIF 栅格化 _render_frame（每帧耗时，抽样）
+  gif_encode     GIF 编码（每帧耗时，抽样帧写入内存）
+  svg_write      SVG 导出（每次导出耗时）
+  tui_rasterize  TUI 字符栅格化（每帧耗时，抽样）
+
+用例为合成的 ArrayBar 冒泡式排序：n 个元素、恰好 events 个事件（compare / swap）。
+渲染类阶段只抽样 sample_frames 帧，因此 n=10^5、events=10^6 这样的规模也能在可接受时间内跑完。
+"""
+from __future__ import annotations
+
+import io
+import json
+import platform
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, cast
+
+from . import __version__
+from .components.arraybar import ArrayBar
+from .core.scene import Scene
+from .core.timeline import Timeline
+
+STAGES = ("build_frames", "render", "gif_raster", "gif_encode", "svg_write", "tui_rasterize")
+DEFAULT_SIZES = (10, 100, 1000, 10_000)
+DEFAULT_EVENTS = (1_000,)
+
+
+@dataclass
+class StageResult:
+    seconds: float          # 多次重复取最小值后的总耗时
+    units: int              # 计量单位数（帧数或导出次数）
+    unit: str = "frame"
+
+    @property
+    def per_unit(self) -> float:
+        return self.seconds / max(1, self.units)
+
+
+@dataclass
+class CaseResult:
+    n: int
+    events: int
+    frames: int
+    stages: Dict[str, StageResult] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"n={self.n},events={self.events}"
+
+
+# --------------------- 合成用例 ---------------------
+
+def synthetic_sort(n: int, events: int, *, seed: int = 0) -> Tuple[Scene, Timeline]:
+    """n 个随机值上的冒泡式扫描：相邻 compare，逆序则 swap，直到恰好 events 个事件。"""
+    rng = random.Random(seed)
+    values: List[float] = [rng.randint(1, 1000) for _ in range(n)]
+    scene = Scene(width=max(120, 14 * n + 12), height=80)
+    scene.add(ArrayBar(values, name="A", x=6, y=10, bar_width=10, bar_gap=4, height=60,
+                       show_value=n <= 200))
+    tl = Timeline(fps=20)
+    shadow = list(values)
+    count, i = 0, 0
+    while count < events and n > 1:
+        tl.compare("A", i, i + 1, duration=1)
+        count += 1
+        if count < events and shadow[i] > shadow[i + 1]:
+            tl.swap("A", i, i + 1, duration=2)
+            shadow[i], shadow[i + 1] = shadow[i + 1], shadow[i]
+            count += 1
+        i = i + 1 if i + 2 < n else 0
+    return scene, tl
+
+
+def _sample(frames: Sequence[Any], k: int) -> List[Any]:
+    if k <= 0 or not frames:
+        return []
+    if len(frames) <= k:
+        return list(frames)
+    step = (len(frames) - 1) / (k - 1) if k > 1 else 0
+    return [frames[int(round(j * step))] for j in range(k)]
+
+
+def _best(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+# --------------------- 运行 ---------------------
+
+def run_case(n: int, events: int, *, stages: Sequence[str] = STAGES, sample_frames: int = 20,
+             repeat: int = 3, size: Tuple[int, int] = (320, 180)) -> CaseResult:
+    scene, tl = synthetic_sort(n, events)
+    frames = tl.build_frames(scene)
+    res = CaseResult(n=n, events=events, frames=len(frames))
+    sample = _sample(frames, sample_frames)
+
+    if "build_frames" in stages:
+        res.stages["build_frames"] = StageResult(_best(lambda: tl.build_frames(scene), repeat),
+                                                 len(frames))
+
+    if "render" in stages and sample:
+        res.stages["render"] = StageResult(
+            _best(lambda: [scene.render(f.states) for f in sample], repeat), len(sample))
+
+    if ("gif_raster" in stages or "gif_encode" in stages) and sample:
+        from .backends.gif_mpl import FrameRasterizer, GifStreamWriter, _render_frame
+
+        raster = FrameRasterizer(scene, size)   # 与导出相同：一次导出复用一个栅格化器
+        if "gif_raster" in stages:
+            res.stages["gif_raster"] = StageResult(
+                _best(lambda: [_render_frame(scene, f, size, raster=raster) for f in sample],
+                      repeat),
+                len(sample))
+        if "gif_encode" in stages:
+            imgs = [_render_frame(scene, f, size, raster=raster) for f in sample]
+
+            def encode() -> None:
+                w = GifStreamWriter(io.BytesIO())
+                for img in imgs:
+                    w.write(img, 50)
+                w.close()
+
+            res.stages["gif_encode"] = StageResult(_best(encode, repeat), len(imgs))
+
+    if "svg_write" in stages:
+        import os
+        import tempfile
+        from .backends.svg_svgwrite import export_svg
+
+        fd, path = tempfile.mkstemp(suffix=".svg")
+        os.close(fd)
+        try:
+            res.stages["svg_write"] = StageResult(
+                _best(lambda: export_svg(scene, tl, path, frames=frames), repeat), 1, unit="export")
+        finally:
+            os.unlink(path)
+
+    if "tui_rasterize" in stages and sample:
+        from .backends.tui_rich import _rasterize_ops_to_canvas
+
+        ops = [scene.render(f.states) for f in sample]
+        res.stages["tui_rasterize"] = StageResult(
+            _best(lambda: [_rasterize_ops_to_canvas(o, scene, 100, 28) for o in ops], repeat),
+            len(ops))
+    return res
+
+
+def run_bench(sizes: Sequence[int] = DEFAULT_SIZES, events: Sequence[int] = DEFAULT_EVENTS, *,
+              stages: Sequence[str] = STAGES, sample_frames: int = 20, repeat: int = 3,
+              progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """对 sizes × events 的每个组合跑一遍，返回可直接 json.dump 的结果。"""
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        raise ValueError(f"unknown stages: {', '.join(sorted(unknown))}")
+    cases: List[Dict[str, Any]] = []
+    for ev in events:
+        for n in sizes:
+            if progress:
+                progress(f"n={n}, events={ev}")
+            r = run_case(n, ev, stages=stages, sample_frames=sample_frames, repeat=repeat)
+            cases.append({
+                "case": r.key, "n": r.n, "events": r.events, "frames": r.frames,
+                "stages": {k: dict(asdict(v), per_unit=v.per_unit) for k, v in r.stages.items()},
+            })
+    return {
+        "algoviz": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": cases,
+    }
+
+
+# --------------------- 基线对比 ---------------------
+
+@dataclass
+class Regression:
+    case: str
+    stage: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline > 0 else float("inf")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            threshold: float = 0.25) -> List[Regression]:
+    """按 (case, stage) 比较每单位耗时；慢于基线超过 threshold（相对比例）的记为回归。"""
+    base = {c["case"]: c["stages"] for c in baseline.get("cases", [])}
+    out: List[Regression] = []
+    for c in current.get("cases", []):
+        for stage, cur in c["stages"].items():
+            b = base.get(c["case"], {}).get(stage)
+            if b is None:
+                continue
+            if cur["per_unit"] > b["per_unit"] * (1.0 + threshold):
+                out.append(Regression(c["case"], stage, b["per_unit"], cur["per_unit"]))
+    return out
+
+
+def format_table(result: Dict[str, Any]) -> str:
+    stages = [s for s in STAGES if any(s in c["stages"] for c in result["cases"])]
+    header = f"{'case':<24}{'frames':>9}  " + "  ".join(f"{s:>13}" for s in stages)
+    lines = [header, "-" * len(header)]
+    for c in result["cases"]:
+        cells = []
+        for s in stages:
+            st = c["stages"].get(s)
+            cells.append(f"{st['per_unit'] * 1e3:10.4f} ms" if st else f"{'-':>13}")
+        lines.append(f"{c['case']:<24}{c['frames']:>9}  " + "  ".join(cells))
+    lines.append("(每单位耗时：build/render/raster/encode/tui 为每帧，svg_write 为每次导出)")
+    return "\n".join(lines)
+
+
+def dump(result: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return cast(Dict[str, Any], json.load(f))
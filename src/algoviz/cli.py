@@ -2,28 +2,22 @@
 from __future__ import annotations
 
 import argparse
-import importlib.util
 import sys
 from pathlib import Path
-from typing import Tuple, Optional
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, Tuple, Optional, Sequence
 
-from .backends import (
-    export_gif, GifOptions,
-    export_svg, SvgOptions,
-    play_tui,
-)
-from .core.timeline import Timeline, EASING
+# 注意：后端在各子命令分支内按需导入，避免 svg/tui 也为 Matplotlib/Pillow 付出启动开销
+from .core import fingerprint
+from .core.timeline import EASING, Timeline
+from .demo import apply_easing, load_demo, parse_size
 
 
 def _parse_size(text: str) -> Tuple[int, int]:
     try:
-        w_str, h_str = text.lower().split("x")
-        w, h = int(w_str), int(h_str)
-        if w <= 0 or h <= 0:
-            raise ValueError
-        return w, h
-    except Exception:
-        raise argparse.ArgumentTypeError("size 必须是类似 640x360 的正整数格式")
+        return parse_size(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
 
 def _positive_int(name: str, v: str) -> int:
     try:
@@ -43,34 +37,69 @@ def _nonneg_int(name: str, v: str) -> int:
         raise argparse.ArgumentTypeError(f"{name} 必须 >= 0")
     return iv
 
-def _load_demo_from_file(path: str):
-    p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"找不到 demo 文件：{p}")
-    spec = importlib.util.spec_from_file_location("algoviz_demo_module", str(p))
-    if spec is None or spec.loader is None:
-        raise RuntimeError(f"无法加载 demo 模块：{p}")
-    mod = importlib.util.module_from_spec(spec)
-    sys.modules["algoviz_demo_module"] = mod
-    spec.loader.exec_module(mod)  # type: ignore
-    if not hasattr(mod, "build"):
-        raise AttributeError(f"{p} 中未找到 build() 函数")
-    scene, tl = mod.build()
-    if not isinstance(tl, Timeline):
-        raise TypeError("build() 必须返回 (Scene, Timeline)")
-    return scene, tl
-
-def _apply_cli_easing(tl: Timeline, easing_name: Optional[str]) -> None:
-    if not easing_name:
+def _int_list(text: str) -> List[int]:
+    try:
+        vals = [int(float(t)) for t in text.split(",") if t.strip()]
+    except Exception:
+        raise argparse.ArgumentTypeError("需要逗号分隔的整数列表，如 10,100,1000")
+    if not vals or any(v <= 0 for v in vals):
+        raise argparse.ArgumentTypeError("列表中的整数必须 > 0")
+    return vals
+
+@contextmanager
+def _trace_to(path: Optional[str]) -> Iterator[None]:
+    """--trace：启用插桩，结束后写 Chrome trace JSON，并把分阶段汇总打印到 stderr。"""
+    if not path:
+        yield
+        return
+    from .core import trace
+    agg, chrome = trace.Aggregator(), trace.ChromeTrace()
+    try:
+        with trace.tracing(agg, chrome):
+            yield
+    finally:
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        chrome.dump(str(out))
+        print(agg.report(), file=sys.stderr)
+        print(f"[algoviz] trace 已写入：{out}", file=sys.stderr)
+
+@contextmanager
+def _progress_bar(enabled: bool, label: str) -> Iterator[Optional[Callable[[Any], None]]]:
+    """导出进度条（Rich，输出到 stderr）；未启用时产出 None。"""
+    if not enabled:
+        yield None
         return
-    key = next((k for k in EASING.keys() if k.lower() == easing_name.lower()), None)
-    if key is None:
-        valid = ", ".join(sorted(EASING.keys()))
-        raise ValueError(f"不支持的 easing：{easing_name}（可选：{valid}）")
-    # 把“未显式设置”的事件的 easing 写成字符串 key
-    for ev in getattr(tl, "_events", []):
-        if getattr(ev, "easing", None) is None:
-            ev.easing = key  # type: ignore[attr-defined]
+    from rich.console import Console
+    from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn
+
+    with Progress(TextColumn("[bold]{task.description}"), BarColumn(), MofNCompleteColumn(),
+                  TextColumn("{task.fields[detail]}"), console=Console(stderr=True),
+                  transient=True) as bar:
+        task = bar.add_task(label, total=None, detail="")
+
+        def update(p: Any) -> None:
+            eta = "--" if p.eta is None else f"{p.eta:.1f}s"
+            bar.update(task, total=p.total, completed=p.encoded or p.compiled,
+                       detail=f"编译 {p.compiled} · 渲染 {p.rendered} · 编码 {p.encoded}"
+                              f" · {p.fps:.1f} 帧/s · ETA {eta}")
+
+        yield update
+
+def _run_watch(loop: Callable[[], None]) -> int:
+    print("[algoviz] watch 模式：保存 demo 即增量更新，Ctrl-C 退出", file=sys.stderr)
+    try:
+        loop()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def _apply_cli_pacing(tl: Timeline, frames: Optional[int], seconds: Optional[float]) -> Timeline:
+    if frames is None and seconds is None:
+        return tl
+    if seconds is not None and seconds <= 0:
+        raise ValueError("target-seconds 必须 > 0")
+    return tl.paced(frames, seconds=seconds)
 
 def main() -> int:
     parser = argparse.ArgumentParser(prog="algoviz", description="Algorithm Visualization CLI (TUI / GIF / SVG)")
@@ -80,16 +109,45 @@ def main() -> int:
 
     # gif
     p_gif = sub.add_parser("gif", help="导出 GIF 动画")
-    p_gif.add_argument("demo", help="demo 脚本文件路径（需提供 build()）")
+    p_gif.add_argument("demo", nargs="?", default=None,
+                       help="demo 脚本文件路径（需提供 build()；使用 --ops 时省略）")
     p_gif.add_argument("--outfile", required=True, help="输出 GIF 文件路径")
     p_gif.add_argument("--size", default="640x360", type=_parse_size, help="画布尺寸，如 640x360")
-    p_gif.add_argument("--fps", default=20, type=lambda v: _positive_int("fps", v), help="逻辑帧率（用于采样时间线）")
-    p_gif.add_argument("--loop", default=0, type=lambda v: _nonneg_int("loop", v), help="GIF 循环次数（0=无限）")
-    p_gif.add_argument("--palettesize", default=256, type=lambda v: _positive_int("palettesize", v), help="调色板大小（2..256）")
+    p_gif.add_argument("--fps", default=20, type=lambda v: _positive_int("fps", v),
+                       help="逻辑帧率（用于采样时间线）")
+    p_gif.add_argument("--loop", default=0, type=lambda v: _nonneg_int("loop", v),
+                       help="GIF 循环次数（0=无限）")
+    p_gif.add_argument("--palettesize", default=256, type=lambda v: _positive_int("palettesize", v),
+                       help="调色板大小（2..256）")
     p_gif.add_argument("--subrectangles", action="store_true", help="尽量写入子矩形减少体积")
     p_gif.add_argument("--min-frame-ms", default=40, type=lambda v: _positive_int("min-frame-ms", v),
                        help="每帧最小时长（ms），用于放慢导出速度以及避免过快。")
-    p_gif.add_argument("--easing", choices=easing_choices, help="为未指定 easing 的事件设定默认缓动")
+    p_gif.add_argument("--easing", choices=easing_choices,
+                       help="为未指定 easing 的事件设定默认缓动")
+    p_gif.add_argument("--trace", default=None,
+                       help="写出 Chrome trace-event JSON，并打印分阶段耗时汇总")
+    p_gif.add_argument("--watch", action="store_true",
+                       help="监视 demo 文件，保存后只重编译/重渲染变化的尾部")
+    p_gif.add_argument("--no-progress", action="store_true",
+                       help="不显示进度条（默认仅在终端中显示）")
+    p_gif.add_argument("--force", action="store_true",
+                       help="忽略输出旁的 .fingerprint，强制重新导出")
+    p_gif.add_argument("--frame-budget", default=None,
+                       type=lambda v: _positive_int("frame-budget", v),
+                       help="总帧数上限：保留 swap/assign 动画，成串的 compare 抽样显示")
+    p_gif.add_argument("--target-seconds", default=None, type=float,
+                       help="按时长（秒 × fps）限制总帧数，规则同 --frame-budget")
+    p_gif.add_argument("--max-frames", default=None, type=lambda v: _positive_int("max-frames", v),
+                       help="预览：最多导出这么多帧，只构造被抽中的帧（不改变节奏，直接抽帧）")
+    p_gif.add_argument("--sampling", choices=("uniform", "keyframes"), default="uniform",
+                       help="--max-frames 的抽帧方式：等间隔，或只取各事件的最后一帧")
+    p_gif.add_argument("--ops", default=None,
+                       help="不用 demo，直接流式回放外部操作日志"
+                            "（.ndjson/.jsonl/.csv/.tsv/.txt，可 .gz）")
+    p_gif.add_argument("--ops-format", choices=("ndjson", "csv", "tsv", "txt"), default=None,
+                       help="操作日志格式（默认按后缀推断）")
+    p_gif.add_argument("--array", default=None,
+                       help="--ops 的初始数组（.npy / .json / 逗号或空白分隔文本）")
 
     # svg
     p_svg = sub.add_parser("svg", help="导出单帧 SVG")
@@ -97,57 +155,261 @@ def main() -> int:
     p_svg.add_argument("--outfile", required=True, help="输出 SVG 文件路径")
     p_svg.add_argument("--frame", default="last", help="帧索引或 'last'")
     p_svg.add_argument("--size", default="640x360", type=_parse_size, help="画布尺寸，如 640x360")
-    p_svg.add_argument("--easing", choices=easing_choices, help="为未指定 easing 的事件设定默认缓动")
+    p_svg.add_argument("--easing", choices=easing_choices,
+                       help="为未指定 easing 的事件设定默认缓动")
+    p_svg.add_argument("--trace", default=None,
+                       help="写出 Chrome trace-event JSON，并打印分阶段耗时汇总")
+    p_svg.add_argument("--watch", action="store_true",
+                       help="监视 demo 文件，保存后只重编译/重渲染变化的尾部")
+    p_svg.add_argument("--no-progress", action="store_true",
+                       help="不显示进度条（默认仅在终端中显示）")
+    p_svg.add_argument("--force", action="store_true",
+                       help="忽略输出旁的 .fingerprint，强制重新导出")
 
     # tui
     p_tui = sub.add_parser("tui", help="在终端播放（可用于快速预览）")
     p_tui.add_argument("demo", help="demo 脚本文件路径（需提供 build()）")
-    p_tui.add_argument("--fps", default=20, type=lambda v: _positive_int("fps", v), help="逻辑帧率（生成帧用）")
+    p_tui.add_argument("--fps", default=20, type=lambda v: _positive_int("fps", v),
+                       help="逻辑帧率（生成帧用）")
     p_tui.add_argument("--speed", default=1.0, type=float, help="播放速度倍率（>0）")
-    p_tui.add_argument("--exit-after", default=None, type=float, help="自动退出秒数（便于 CI/测试）")
-    p_tui.add_argument("--easing", choices=easing_choices, help="为未指定 easing 的事件设定默认缓动")
+    p_tui.add_argument("--exit-after", default=None, type=float,
+                       help="自动退出秒数（便于 CI/测试）")
+    p_tui.add_argument("--lookahead", default=32, type=lambda v: _nonneg_int("lookahead", v),
+                       help="后台预渲染缓冲深度（帧数，0=关闭）")
+    p_tui.add_argument("--easing", choices=easing_choices,
+                       help="为未指定 easing 的事件设定默认缓动")
+    p_tui.add_argument("--trace", default=None,
+                       help="写出 Chrome trace-event JSON，并打印分阶段耗时汇总")
+    p_tui.add_argument("--watch", action="store_true",
+                       help="监视 demo 文件，保存后只重编译/重渲染变化的尾部")
+    p_tui.add_argument("--frame-budget", default=None,
+                       type=lambda v: _positive_int("frame-budget", v),
+                       help="总帧数上限：保留 swap/assign 动画，成串的 compare 抽样显示")
+    p_tui.add_argument("--target-seconds", default=None, type=float,
+                       help="按时长（秒 × fps）限制总帧数，规则同 --frame-budget")
+
+    # batch
+    p_batch = sub.add_parser("batch", help="按清单批量导出（每个 demo 只编译一次，多 demo 并行）")
+    p_batch.add_argument("manifest", help="清单文件（.toml 或 .json）")
+    p_batch.add_argument("--jobs", "-j", default=None, type=lambda v: _positive_int("jobs", v),
+                         help="并行进程数（默认取清单中的 jobs，再缺省为 CPU 核数）")
+    p_batch.add_argument("--force", action="store_true", help="忽略指纹，全部重新导出")
+
+    # serve / submit
+    p_serve = sub.add_parser("serve", help="常驻渲染服务：预热的进程池，监听本地 Unix 套接字")
+    p_serve.add_argument("--socket", default=None,
+                         help="套接字路径（默认 $ALGOVIZ_SOCKET 或运行时目录下 algoviz.sock）")
+    p_serve.add_argument("--workers", "-j", default=None,
+                         type=lambda v: _positive_int("workers", v),
+                         help="工作进程数（默认 CPU 核数）")
+    p_submit = sub.add_parser("submit", help="把导出作业交给 algoviz serve 执行")
+    p_submit.add_argument("target", nargs="?", default=None,
+                          help="demo 脚本路径，或 batch 清单（.toml/.json）")
+    p_submit.add_argument("--output", "-o", action="append", default=[],
+                          help="输出文件（按扩展名 .gif/.svg/.cast 推断格式），可重复")
+    p_submit.add_argument("--size", default=None, help="GIF/SVG 画布尺寸，如 640x360")
+    p_submit.add_argument("--fps", default=None, type=lambda v: _positive_int("fps", v),
+                          help="GIF 逻辑帧率")
+    p_submit.add_argument("--easing", choices=easing_choices,
+                          help="为未指定 easing 的事件设定默认缓动")
+    p_submit.add_argument("--socket", default=None, help="服务套接字路径")
+    p_submit.add_argument("--force", action="store_true", help="忽略指纹，全部重新导出")
+    p_submit.add_argument("--ping", action="store_true", help="只检查服务是否在线")
+    p_submit.add_argument("--shutdown", action="store_true", help="请求服务退出")
+
+    # bench
+    p_bench = sub.add_parser("bench", help="分阶段性能基准（规模曲线 + JSON 基线对比）")
+    p_bench.add_argument("--sizes", default="10,100,1000,10000", type=_int_list,
+                         help="数组规模列表（逗号分隔），如 10,100,1000,100000")
+    p_bench.add_argument("--events", default="1000", type=_int_list,
+                         help="事件数列表（逗号分隔），如 1000,100000,1000000")
+    p_bench.add_argument("--stages", default=None,
+                         help="只跑部分阶段（逗号分隔）：build_frames,render,gif_raster,gif_encode,svg_write,tui_rasterize")
+    p_bench.add_argument("--sample-frames", default=20,
+                         type=lambda v: _positive_int("sample-frames", v),
+                         help="渲染类阶段的抽样帧数")
+    p_bench.add_argument("--repeat", default=3, type=lambda v: _positive_int("repeat", v),
+                         help="每阶段重复次数（取最小值）")
+    p_bench.add_argument("--out", default=None, help="结果 JSON 输出路径")
+    p_bench.add_argument("--baseline", default=None, help="基线 JSON；有回归时退出码为 1")
+    p_bench.add_argument("--threshold", default=0.25, type=float,
+                         help="回归阈值：每单位耗时慢于基线的比例（默认 0.25 = 25%%）")
 
     ns = parser.parse_args()
 
     try:
-        if ns.cmd == "gif":
-            scene, tl = _load_demo_from_file(ns.demo)
-            _apply_cli_easing(tl, ns.easing)
-            out = Path(ns.outfile); out.parent.mkdir(parents=True, exist_ok=True)
-            opt = GifOptions(
-                size=ns.size,
-                fps=ns.fps,
-                loop=ns.loop,
-                palettesize=ns.palettesize,
-                subrectangles=bool(ns.subrectangles),
-                min_frame_ms=ns.min_frame_ms,
-            )
-            export_gif(scene, tl, str(out), options=opt)
-            print(f"[algoviz] GIF 已导出：{out}")
-            return 0
-
-        if ns.cmd == "svg":
-            scene, tl = _load_demo_from_file(ns.demo)
-            _apply_cli_easing(tl, ns.easing)
-            out = Path(ns.outfile); out.parent.mkdir(parents=True, exist_ok=True)
-            frame_arg = ns.frame
-            frame_index: Optional[int] = None if str(frame_arg).lower() == "last" else int(frame_arg)
-            if frame_index is not None and frame_index < 0:
-                raise ValueError("frame 不能为负数")
-            opt = SvgOptions(size=ns.size, frame=frame_index)
-            export_svg(scene, tl, str(out), options=opt)
-            print(f"[algoviz] SVG 已导出：{out}")
-            return 0
-
-        if ns.cmd == "tui":
-            scene, tl = _load_demo_from_file(ns.demo)
-            _apply_cli_easing(tl, ns.easing)
-            play_tui(scene, tl, fps=ns.fps, speed=float(ns.speed), exit_after=ns.exit_after)
-            return 0
-
-        parser.print_help()
-        return 2
+        with _trace_to(getattr(ns, "trace", None)):
+            if ns.cmd == "gif":
+                from .backends.gif_mpl import export_gif, GifOptions
+                out = Path(ns.outfile)
+                out.parent.mkdir(parents=True, exist_ok=True)
+                opt = GifOptions(
+                    size=ns.size,
+                    fps=ns.fps,
+                    loop=ns.loop,
+                    palettesize=ns.palettesize,
+                    subrectangles=bool(ns.subrectangles),
+                    min_frame_ms=ns.min_frame_ms,
+                    max_frames=ns.max_frames,
+                    sampling=ns.sampling,
+                )
+                if ns.ops:
+                    if ns.demo or ns.watch:
+                        raise ValueError("--ops 不能与 demo 路径或 --watch 同时使用")
+                    if not ns.array:
+                        raise ValueError("--ops 需要 --array 提供初始数组")
+                    from .io.trace import array_scene, load_array, timeline_from_trace
+                    scene = array_scene(load_array(ns.array))
+                    tl = timeline_from_trace(ns.ops, fps=ns.fps, format=ns.ops_format)
+                elif not ns.demo:
+                    raise ValueError("需要 demo 路径或 --ops 操作日志")
+                elif ns.watch:
+                    from .watch import DemoWatcher, watch_gif
+                    watcher = DemoWatcher(ns.demo, ns.easing)
+                    return _run_watch(lambda: watch_gif(watcher, str(out), opt))
+                else:
+                    scene, tl = load_demo(ns.demo)
+                apply_easing(tl, ns.easing)
+                tl = _apply_cli_pacing(tl, ns.frame_budget, ns.target_seconds)
+                if ns.force:
+                    fingerprint.invalidate(out)
+                with _progress_bar(not ns.no_progress and sys.stderr.isatty(), "GIF") as cb:
+                    written = export_gif(scene, tl, str(out), options=opt, progress=cb,
+                                         skip_unchanged=True, source=ns.demo)
+                print(f"[algoviz] GIF 已导出：{out}" if written
+                      else f"[algoviz] 输出未变化，已跳过：{out}")
+                return 0
+
+            if ns.cmd == "svg":
+                from .backends.svg_svgwrite import export_svg, SvgOptions
+                out = Path(ns.outfile)
+                out.parent.mkdir(parents=True, exist_ok=True)
+                frame_arg = ns.frame
+                frame_index: Optional[int] = (None if str(frame_arg).lower() == "last"
+                                              else int(frame_arg))
+                if frame_index is not None and frame_index < 0:
+                    raise ValueError("frame 不能为负数")
+                svg_opt = SvgOptions(size=ns.size, frame=frame_index)
+                if ns.watch:
+                    from .watch import DemoWatcher, watch_svg
+                    return _run_watch(lambda: watch_svg(DemoWatcher(ns.demo, ns.easing), str(out),
+                                                        frame_index, svg_opt))
+                scene, tl = load_demo(ns.demo)
+                apply_easing(tl, ns.easing)
+                if ns.force:
+                    fingerprint.invalidate(out)
+                with _progress_bar(not ns.no_progress and sys.stderr.isatty(), "SVG") as cb:
+                    written = export_svg(scene, tl, str(out), options=svg_opt, progress=cb,
+                                         skip_unchanged=True, source=ns.demo)
+                print(f"[algoviz] SVG 已导出：{out}" if written
+                      else f"[algoviz] 输出未变化，已跳过：{out}")
+                return 0
+
+            if ns.cmd == "tui":
+                from .backends.tui_rich import play_tui
+                reloads = frames = None
+                if ns.watch:
+                    from .watch import DemoWatcher
+                    watcher = DemoWatcher(ns.demo, ns.easing)
+                    first = watcher.load()
+                    scene, tl, frames = first.scene, first.timeline, first.delta.frames
+                    reloads = ((r.scene, r.delta.frames) async for r in watcher.reloads())
+                else:
+                    scene, tl = load_demo(ns.demo)
+                    apply_easing(tl, ns.easing)
+                    tl = _apply_cli_pacing(tl, ns.frame_budget, ns.target_seconds)
+                play_tui(scene, tl, fps=ns.fps, speed=float(ns.speed), exit_after=ns.exit_after,
+                         lookahead=ns.lookahead, reloads=reloads, frames=frames)
+                return 0
+
+            if ns.cmd == "batch":
+                import time
+                from .batch import format_summary, load_manifest, run_batch
+                jobs, manifest_jobs = load_manifest(ns.manifest)
+                t0 = time.perf_counter()
+                n_jobs = ns.jobs if ns.jobs is not None else manifest_jobs
+                results = run_batch(jobs, n_jobs, force=ns.force)
+                print(format_summary(results, wall=time.perf_counter() - t0))
+                failed = [r for r in results if r.error]
+                for r in failed:
+                    print(f"[algoviz][error] {r.demo}: {r.error}", file=sys.stderr)
+                return 1 if failed else 0
+
+            if ns.cmd == "serve":
+                from .serve import serve
+                serve(ns.socket, ns.workers,
+                      ready=lambda p: print(f"[algoviz] serve 已就绪：{p}", flush=True))
+                return 0
+
+            if ns.cmd == "submit":
+                import time
+                from . import serve as srv
+                from .batch import DemoJob, _output_from_dict, format_summary, load_manifest
+                if ns.ping:
+                    rep = srv.ping(ns.socket)
+                    print(f"[algoviz] serve 在线：pid={rep['pid']} workers={rep['workers']}")
+                    return 0
+                if ns.shutdown:
+                    srv.shutdown(ns.socket)
+                    print("[algoviz] serve 已退出")
+                    return 0
+                if not ns.target:
+                    raise ValueError("需要 demo 路径或清单文件")
+                if Path(ns.target).suffix.lower() in (".toml", ".json"):
+                    jobs, _ = load_manifest(ns.target)
+                else:
+                    if not ns.output:
+                        raise ValueError("至少需要一个 --output/-o")
+                    outputs = []
+                    for o in ns.output:
+                        spec = _output_from_dict({"outfile": o}, Path.cwd())
+                        if ns.size and spec.format in ("gif", "svg"):
+                            spec.options["size"] = ns.size
+                        if ns.fps and spec.format == "gif":
+                            spec.options["fps"] = ns.fps
+                        outputs.append(spec)
+                    demo = str(Path(ns.target).resolve())
+                    jobs = [DemoJob(demo=demo, outputs=outputs, easing=ns.easing)]
+                t0 = time.perf_counter()
+                results = srv.submit(jobs, ns.socket, force=ns.force)
+                print(format_summary(results, wall=time.perf_counter() - t0))
+                failed = [r for r in results if r.error]
+                for r in failed:
+                    print(f"[algoviz][error] {r.demo}: {r.error}", file=sys.stderr)
+                return 1 if failed else 0
+
+            if ns.cmd == "bench":
+                from . import bench
+                stages: Sequence[str] = bench.STAGES
+                if ns.stages:
+                    stages = [t.strip() for t in ns.stages.split(",") if t.strip()]
+                result = bench.run_bench(
+                    ns.sizes, ns.events, stages=stages, sample_frames=ns.sample_frames,
+                    repeat=ns.repeat,
+                    progress=lambda m: print(f"[algoviz] bench {m}", file=sys.stderr))
+                print(bench.format_table(result))
+                if ns.out:
+                    out = Path(ns.out)
+                    out.parent.mkdir(parents=True, exist_ok=True)
+                    bench.dump(result, str(out))
+                    print(f"[algoviz] 基准结果已写入：{out}")
+                if ns.baseline:
+                    regressions = bench.compare(result, bench.load(ns.baseline), ns.threshold)
+                    for reg in regressions:
+                        print(f"[algoviz][regression] {reg.case} {reg.stage}: "
+                              f"{reg.baseline * 1e3:.4f} ms -> {reg.current * 1e3:.4f} ms "
+                              f"(x{reg.ratio:.2f})",
+                              file=sys.stderr)
+                    return 1 if regressions else 0
+                return 0
+
+            parser.print_help()
+            return 2
 
+    except KeyboardInterrupt:
+        # 导出函数已在帧边界关闭并清理了未写完的输出文件
+        print("[algoviz] 已取消", file=sys.stderr)
+        return 130
     except Exception as e:
         print(f"[algoviz][error] {e}", file=sys.stderr)
         return 1
@@ -0,0 +1,26 @@
+#algoviz/components/_patch.py
+"""
+组件状态的写时复制补丁：大数组在各帧之间共享、从不原地修改，
+事件只把改动记在 {扁平下标: 新值} 字典里；
+补丁累计超过 COMPACT 项时才复制一次数组并合并（Graph、Grid 使用）。
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:
+    import numpy as np
+
+COMPACT = 64   # 补丁项数超过此值时合并进数组
+
+
+def merged(arr: "np.ndarray", patch: Dict[int, Any]) -> "np.ndarray":
+    """arr 叠加补丁后的新数组（无补丁时直接返回 arr 本身）；多维数组按扁平下标。"""
+    if not patch:
+        return arr
+    import numpy as np
+
+    out: "np.ndarray" = arr.copy()
+    idx = np.fromiter(patch.keys(), dtype=np.int64, count=len(patch))
+    out.reshape(-1)[idx] = list(patch.values())
+    return out
@@ -1,10 +1,16 @@
 #algoviz/components/arraybar.py
 from __future__ import annotations
 
+import math
+import threading
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Set, Tuple, Any
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, List, Optional, Set, Tuple
 
-from ..core.drawops import Rect, Text
+from ..core.drawops import Rect, Rects, Segments, Text
+from ._patch import COMPACT
+
+if TYPE_CHECKING:
+    import numpy as np
 
 # ===== 主题色 =====
 DEFAULT_FILL = "#4C97FF"
@@ -13,6 +19,72 @@ COMPARE_FILL = "#FF5A5A"
 SORTED_FILL = "#33C48E"
 LABEL_COLOR = "#222"
 
+# LOD 分箱的颜色码（优先级由低到高）与调色板：实心部分 0..min，浅色部分 min..max，另画一条均值线
+BIN_DEFAULT, BIN_SORTED, BIN_HIGHLIGHT, BIN_COMPARE = 0, 1, 2, 3
+BIN_PALETTE = (DEFAULT_FILL, SORTED_FILL, HIGHLIGHT_FILL, COMPARE_FILL)
+BIN_RANGE_PALETTE = ("#B7D5FF", "#ADE7D2", "#FFE299", "#FFBDBD")
+MEAN_COLOR = "#1F3B66"
+
+_LOCK = threading.Lock()
+
+
+class BinPyramid:
+    """
+    按 2 的幂分箱的 min / max / sum 金字塔（第 m 层每箱 2**m 个槽位），逐层按需构建，
+    在各帧状态之间共享。
+    swap / assign 只把改动的槽位记入 dirty（写时复制，不动已建好的层）：查询时只有含脏槽位的箱子
+    按当前数值重算，代价与改动量有关、与数组长度无关；脏槽位超过 COMPACT 个才按当前数值重建。
+    """
+
+    def __init__(self, values: List[float], dirty: FrozenSet[int] = frozenset(),
+                 levels: Optional[List[Tuple["np.ndarray", "np.ndarray", "np.ndarray"]]] = None
+                 ) -> None:
+        self._values = values                 # 建立时的数值（状态落定后列表不再修改）
+        self._levels = [] if levels is None else levels
+        self.dirty = dirty
+
+    def touch(self, values: List[float], *slots: int) -> "BinPyramid":
+        dirty = self.dirty.union(slots)
+        if len(dirty) > COMPACT:
+            return BinPyramid(values)
+        return BinPyramid(self._values, dirty, self._levels)
+
+    def _level(self, m: int) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        import numpy as np
+
+        levels = self._levels
+        if not levels:
+            a = np.asarray(self._values, dtype=float)
+            with _LOCK:
+                if not levels:
+                    levels.append((a, a, a))
+        while len(levels) <= m:
+            top = len(levels)
+            mn, mx, sm = levels[-1]
+            idx = np.arange(0, len(mn), 2)
+            nxt = (np.minimum.reduceat(mn, idx), np.maximum.reduceat(mx, idx),
+                   np.add.reduceat(sm, idx))
+            with _LOCK:                        # 后台预渲染线程可能同时构建
+                if len(levels) == top:
+                    levels.append(nxt)
+        return levels[m]
+
+    def aggregate(self, values: List[float], m: int, b0: int,
+                  b1: int) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """第 m 层箱子 [b0, b1) 的 (min, max, mean)；values 为当前数值（用于重算脏箱子）。"""
+        import numpy as np
+
+        mn, mx, sm = (a[b0:b1] for a in self._level(m))
+        k = 1 << m
+        touched = sorted({s >> m for s in self.dirty if b0 <= s >> m < b1})
+        if touched:
+            mn, mx, sm = mn.copy(), mx.copy(), sm.copy()
+            for b in touched:
+                seg = np.asarray(values[b * k:(b + 1) * k], dtype=float)
+                mn[b - b0], mx[b - b0], sm[b - b0] = seg.min(), seg.max(), seg.sum()
+        count = np.minimum(k, len(values) - np.arange(b0, b1) * k)
+        return mn, mx, sm / count
+
 
 @dataclass
 class ArrayBarState:
@@ -24,6 +96,10 @@ class ArrayBarState:
     compare: Optional[Tuple[int, int]] = None
     # 子步插值期间的像素位移（按槽位）
     offsets: Dict[int, float] = field(default_factory=dict)
+    # 最大值缓存（None = 待计算）：swap 不变，assign 增量维护，draw 不必每帧扫描整个数组
+    vmax: Optional[float] = None
+    # LOD 分箱聚合（lod 关闭时为 None），swap / assign 增量标脏
+    bins: Optional[BinPyramid] = field(default=None, compare=False, repr=False)
 
     # 兼容 tests: s.data[item] 读取数值（映射到 values）
     @property
@@ -39,15 +115,42 @@ def _copy_state(st: ArrayBarState) -> ArrayBarState:
         highlight=set(st.highlight),
         compare=None if st.compare is None else (st.compare[0], st.compare[1]),
         offsets=dict(st.offsets),
+        vmax=st.vmax,
+        bins=st.bins,
     )
 
 
+def _swap(st: ArrayBarState, i: int, j: int) -> None:
+    st.values[i], st.values[j] = st.values[j], st.values[i]
+    st.order[i], st.order[j] = st.order[j], st.order[i]
+    if st.bins is not None:
+        st.bins = st.bins.touch(st.values, i, j)
+
+
+def _assign(st: ArrayBarState, i: int, v: float) -> None:
+    old = st.values[i]
+    st.values[i] = v
+    if st.vmax is not None:
+        if v >= st.vmax:
+            st.vmax = float(v)
+        elif old >= st.vmax:
+            st.vmax = None      # 原最大值被覆盖，下次 draw 再扫描
+    if st.bins is not None:
+        st.bins = st.bins.touch(st.values, i)
+
+
 class ArrayBar:
     """
     柱状数组组件：
       - swap/assign 子步只改 offsets，finalize 落位
       - 颜色优先级：已排序 > compare > highlight > 默认
       - order: 槽位 → 初始索引，swap 后需持久更新
+      - draw_view：场景有相机时只输出与可见矩形相交的槽位（按槽位间距直接算出范围），
+        加上正在移动的槽位
+      - LOD：槽位间距换算到输出（相机缩放 × 后端像素比，见 View.px）小于 lod 像素时，
+        把相邻槽位按 2 的幂分箱，每箱约一个像素列，画 min / max / 均值（见 BinPyramid），
+        箱子颜色优先级 compare > highlight > 已排序；
+        绘制指令是三个批量图元，元素数只与可见列数有关。柱宽不足 label_min_width 像素时不写数值
     """
 
     def __init__(
@@ -60,6 +163,9 @@ class ArrayBar:
         bar_gap: int = 4,
         height: int = 60,
         show_value: bool = True,
+        *,
+        lod: float = 1.0,
+        label_min_width: float = 8.0,
     ) -> None:
         self.name = name
         self.x = int(x)
@@ -68,9 +174,14 @@ class ArrayBar:
         self.bar_gap = int(bar_gap)
         self.height = int(height)
         self.show_value = show_value
+        self.lod = float(lod)                         # 0 = 关闭分箱
+        self.label_min_width = float(label_min_width)
 
         n = len(values)
         self._init_state = ArrayBarState(values=list(values), order=list(range(n)))
+        self._vmax(self._init_state)                  # 各帧状态复制时一并带上，不再逐帧扫描
+        if self.lod > 0:
+            self._init_state.bins = BinPyramid(self._init_state.values)
 
     # ==== 场景接口 ====
     def initial_state(self) -> ArrayBarState:
@@ -79,34 +190,109 @@ class ArrayBar:
     def _slot_x(self, slot: int) -> int:
         return self.x + (self.bar_width + self.bar_gap) * slot
 
+    def slot_center(self, slot: int) -> Tuple[float, float]:
+        """槽位柱子区域的中心（世界坐标），供相机 look_at 跟随。"""
+        return self._slot_x(slot) + self.bar_width / 2, self.y + self.height / 2
+
+    def _vmax(self, st: ArrayBarState) -> float:
+        if st.vmax is None:
+            st.vmax = float(max(st.values)) if st.values else 1.0
+        return 1.0 if st.vmax <= 0 else st.vmax
+
+    def _fill(self, st: ArrayBarState, i: int) -> str:
+        # 颜色优先级：最后覆盖者最高
+        fill = DEFAULT_FILL
+        if i in st.highlight:
+            fill = HIGHLIGHT_FILL
+        if st.compare and i in st.compare:
+            fill = COMPARE_FILL
+        if st.sorted_upto >= 0 and i <= st.sorted_upto:
+            fill = SORTED_FILL
+        return fill
+
     def draw(self, st: ArrayBarState) -> List[Any]:
-        ops: List[Any] = []
+        return self._draw(st, 0, len(st.values), 1.0)
+
+    def draw_view(self, st: ArrayBarState, view: Any) -> List[Any]:
         n = len(st.values)
-        vmax = max(st.values) if n else 1.0
-        vmax = 1.0 if vmax <= 0 else float(vmax)
+        # 数值标签在柱顶上方约 12 个单位处
+        if n == 0 or self.y + self.height < view.y or self.y - 20 > view.bottom:
+            return []
+        pitch = self.bar_width + self.bar_gap
+        lo = min(max(0, int((view.x - self.x - self.bar_width) // pitch) + 1), n)
+        hi = min(max(0, int((view.right - self.x) // pitch) + 1), n)
+        return self._draw(st, lo, hi, view.zoom * view.px)
+
+    def _draw(self, st: ArrayBarState, lo: int, hi: int, scale: float) -> List[Any]:
+        """scale：每个世界单位对应的输出像素（相机缩放 × 后端像素比）。"""
+        pitch = self.bar_width + self.bar_gap
+        if self.lod > 0 and 0 < pitch * scale < self.lod and hi > lo:
+            return self._draw_bins(st, lo, hi, scale)
+        moving = sorted(i for i in st.offsets if not lo <= i < hi)
+        show_value = self.show_value and self.bar_width * scale >= self.label_min_width
+        ops: List[Any] = []
+        vmax = self._vmax(st)
 
-        for i, v in enumerate(st.values):
+        for i in [*range(lo, hi), *moving] if moving else range(lo, hi):
+            v = st.values[i]
             x_base = self._slot_x(i)
             x = x_base + st.offsets.get(i, 0.0)
 
             h = max(1, int(round((float(v) / vmax) * self.height)))
             y_top = self.y + (self.height - h)
 
-            # 颜色优先级：最后覆盖者最高
-            fill = DEFAULT_FILL
-            if i in st.highlight:
-                fill = HIGHLIGHT_FILL
-            if st.compare and i in st.compare:
-                fill = COMPARE_FILL
-            if st.sorted_upto >= 0 and i <= st.sorted_upto:
-                fill = SORTED_FILL
-
-            ops.append(Rect(x=x, y=y_top, w=self.bar_width, h=h, fill=fill, stroke=None))
-            if self.show_value:
+            ops.append(Rect(x=x, y=y_top, w=self.bar_width, h=h, fill=self._fill(st, i),
+                            stroke=None))
+            if show_value:
                 ops.append(Text(content=str(v), x=x + self.bar_width / 2, y=y_top - 12,
                                 size=10, weight="normal", fill=LABEL_COLOR))
         return ops
 
+    def _bin_colors(self, st: ArrayBarState, b0: int, b1: int, k: int) -> "np.ndarray":
+        import numpy as np
+
+        codes = np.zeros(b1 - b0, dtype=np.int8)
+        if st.sorted_upto >= 0:
+            codes[:max(0, min(b1, st.sorted_upto // k + 1) - b0)] = BIN_SORTED
+        if st.highlight:
+            hb = np.fromiter(st.highlight, dtype=np.int64, count=len(st.highlight)) // k
+            codes[hb[(hb >= b0) & (hb < b1)] - b0] = BIN_HIGHLIGHT
+        for i in st.compare or ():
+            if b0 <= i // k < b1:
+                codes[i // k - b0] = BIN_COMPARE
+        return codes
+
+    def _draw_bins(self, st: ArrayBarState, lo: int, hi: int, scale: float) -> List[Any]:
+        import numpy as np
+
+        pitch = self.bar_width + self.bar_gap
+        m = max(0, math.ceil(math.log2(self.lod / (pitch * scale))))
+        k = 1 << m
+        b0, b1 = lo // k, (hi - 1) // k + 1
+        if st.bins is None:
+            st.bins = BinPyramid(st.values)
+        mn, mx, mean = st.bins.aggregate(st.values, m, b0, b1)
+        vmax = self._vmax(st)
+        start = np.arange(b0, b1) * k
+        x = self.x + pitch * start
+        w = pitch * np.minimum(k, len(st.values) - start) - self.bar_gap
+        h_min, h_max, h_mean = (np.maximum(1.0, np.round(a / vmax * self.height))
+                                for a in (mn, mx, mean))
+        base = self.y + self.height
+        colors = self._bin_colors(st, b0, b1, k)
+        ops: List[Any] = [
+            Rects(x, base - h_min, w, h_min, BIN_PALETTE, colors),
+            Rects(x, base - h_max, w, h_max - h_min, BIN_RANGE_PALETTE, colors),
+            Segments(x, base - h_mean, x + w, base - h_mean, (MEAN_COLOR,)),
+        ]
+        # 正在交换的槽位单独画一列，保证移动过程可见
+        for i in sorted(st.offsets):
+            h = max(1, int(round(float(st.values[i]) / vmax * self.height)))
+            ops.append(Rect(x=self._slot_x(i) + st.offsets[i], y=base - h,
+                            w=max(self.bar_width, self.lod / scale), h=h, fill=self._fill(st, i),
+                            stroke=None))
+        return ops
+
     # ==== 旧离散版（兼容）====
     def apply_event(self, st: ArrayBarState, etype: str, payload: dict) -> ArrayBarState:
         ns = _copy_state(st)
@@ -119,16 +305,10 @@ class ArrayBar:
         elif etype == "compare":
             ns.compare = (int(payload["i"]), int(payload["j"]))
         elif etype == "swap":
-            i, j = int(payload["i"]), int(payload["j"])
-            ns.values[i], ns.values[j] = ns.values[j], ns.values[i]
-            ns.order[i], ns.order[j] = ns.order[j], ns.order[i]
+            _swap(ns, int(payload["i"]), int(payload["j"]))
         elif etype == "assign":
             i = int(payload["i"])
-            if "value" in payload:
-                ns.values[i] = payload["value"]
-            else:
-                j = int(payload["j"])
-                ns.values[i] = ns.values[j]
+            _assign(ns, i, payload["value"] if "value" in payload else ns.values[int(payload["j"])])
         elif etype == "mark_sorted":
             ns.sorted_upto = max(ns.sorted_upto, int(payload["upto"]))
         return ns
@@ -174,16 +354,10 @@ class ArrayBar:
     def finalize_event(self, st: ArrayBarState, etype: str, payload: dict) -> ArrayBarState:
         ns = _copy_state(st)
         if etype == "swap":
-            i, j = int(payload["i"]), int(payload["j"])
-            ns.values[i], ns.values[j] = ns.values[j], ns.values[i]
-            ns.order[i], ns.order[j] = ns.order[j], ns.order[i]
+            _swap(ns, int(payload["i"]), int(payload["j"]))
         elif etype == "assign":
             i = int(payload["i"])
-            if "value" in payload:
-                ns.values[i] = payload["value"]
-            else:
-                j = int(payload["j"])
-                ns.values[i] = ns.values[j]
+            _assign(ns, i, payload["value"] if "value" in payload else ns.values[int(payload["j"])])
         elif etype == "compare":
             # compare 为瞬时：事件结束后清空
             ns.compare = None
@@ -0,0 +1,396 @@
+#algoviz/components/graph.py
+"""
+图组件（BFS / DFS / Dijkstra）：
+
+    g = Graph(n, edges, name="G", x=10, y=10, width=300, height=200)
+    tl.add("G", "enqueue", {"node": 0})
+    tl.add("G", "dequeue", {"node": 0})
+    tl.add("G", "visit", {"node": 3, "from": 0}, duration=6)      # 沿边 0->3 推进后标记为已访问
+    tl.add("G", "relax", {"u": 0, "v": 3, "dist": 2.5}, duration=6)
+    tl.add("G", "highlight_path", {"nodes": [0, 3, 7]})
+
+  - 状态：节点状态 / 边状态 / 距离 / 父节点 各为一个紧凑数组，各帧共享、从不原地修改；
+    事件只把改动记在小字典（补丁）里，补丁累计超过 COMPACT 项时才复制一次数组并合并
+  - 布局：构造时不计算，首次绘制时按 layout 计算（NumPy 向量化的力导向 / 分层 / 环形）并按图缓存
+  - draw：节点一个 Circles、边一个 Segments（颜色为调色板下标数组），不逐元素构造绘制指令；
+    节点数不超过 label_limit 时才加文字标签
+"""
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from ..core.drawops import Circles, Segments, Text
+from ._patch import COMPACT, merged
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# ===== 状态码与主题色 =====
+UNVISITED, QUEUED, CURRENT, VISITED, PATH = range(5)
+NODE_COLORS = ("#C9D3E0", "#FFB800", "#FF5A5A", "#4C97FF", "#33C48E")
+EDGE_PLAIN, EDGE_TREE, EDGE_PATH = range(3)
+EDGE_COLORS = ("#C9D3E0", "#4C97FF", "#33C48E")
+ACTIVE_EDGE = "#FF5A5A"
+LABEL_COLOR = "#222"
+
+LAYOUTS = ("force", "layered", "circle")
+_CACHE_SIZE = 8      # 布局缓存的图数量
+
+
+# ===== 布局（返回 [0,1]² 内的 (n, 2) 坐标）=====
+def _adjacency(n: int, src: "np.ndarray", dst: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """无向 CSR 邻接：(indptr, neighbors)。"""
+    import numpy as np
+
+    a = np.concatenate([src, dst])
+    b = np.concatenate([dst, src])
+    order = np.argsort(a, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(a, minlength=n), out=indptr[1:])
+    return indptr, b[order]
+
+
+def _normalize(pos: "np.ndarray") -> "np.ndarray":
+    lo, hi = pos.min(axis=0), pos.max(axis=0)
+    span = hi - lo
+    span[span == 0] = 1.0
+    out = (pos - lo) / span
+    out[:, (hi - lo) == 0] = 0.5
+    return out  # type: ignore[no-any-return]
+
+
+def circle_layout(n: int) -> "np.ndarray":
+    import numpy as np
+
+    a = 2 * np.pi * np.arange(n) / max(1, n)
+    return np.column_stack([0.5 + 0.5 * np.cos(a), 0.5 + 0.5 * np.sin(a)])
+
+
+def layered_layout(n: int, src: "np.ndarray", dst: "np.ndarray", root: int = 0) -> "np.ndarray":
+    """
+    BFS 分层：y 为层深，层内按父节点在上一层的次序排列（减少交叉）。各层整体展开邻居，不逐节点循环；
+    不连通时依次从最小的未到达节点开始新的 BFS（与前面的分量共用层号）。
+    """
+    import numpy as np
+
+    indptr, nbrs = _adjacency(n, src, dst)
+    depth = np.full(n, -1, dtype=np.int64)
+    key = np.zeros(n, dtype=np.float64)      # 层内排序键：父节点在其层内的位置
+    layers: List["np.ndarray"] = []
+    start = root if 0 <= root < n else 0
+    while True:
+        frontier = np.array([start], dtype=np.int64)
+        depth[start] = 0
+        d = 0
+        while frontier.size:
+            if len(layers) <= d:
+                layers.append(frontier)
+            else:
+                layers[d] = np.concatenate([layers[d], frontier])
+            starts, counts = indptr[frontier], indptr[frontier + 1] - indptr[frontier]
+            total = int(counts.sum())
+            if not total:
+                break
+            first = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            nb = nbrs[first + np.arange(total)]
+            par = np.repeat(np.arange(frontier.size), counts)
+            fresh = depth[nb] < 0
+            nb, at = np.unique(nb[fresh], return_index=True)
+            d += 1
+            depth[nb] = d
+            key[nb] = par[fresh][at]
+            frontier = nb[np.argsort(key[nb], kind="stable")]
+        rest = np.flatnonzero(depth < 0)
+        if not rest.size:
+            break
+        start = int(rest[0])
+    pos = np.empty((n, 2))
+    for d, layer in enumerate(layers):
+        pos[layer, 0] = (np.arange(layer.size) + 0.5) / layer.size
+        pos[layer, 1] = (d + 0.5) / len(layers)
+    return pos
+
+
+def force_layout(n: int, src: "np.ndarray", dst: "np.ndarray", *, iterations: int = 60,
+                 seed: int = 0) -> "np.ndarray":
+    """
+    Fruchterman–Reingold 力导向布局。n 不超过 1000 时斥力两两精确计算；更大的图每轮只与随机抽取的
+    128 个节点计算斥力再按比例放大，以分层布局为初值，内存与单轮耗时为 O(n·128 + 边数)。
+    """
+    import numpy as np
+
+    if n <= 2:
+        return circle_layout(n)
+    rng = np.random.default_rng(seed)
+    exact = n <= 1000
+    pos = rng.random((n, 2)) if exact else layered_layout(n, src, dst) + rng.normal(0, 1e-3, (n, 2))
+    k = np.sqrt(1.0 / n)
+    temp = 0.1
+    for _ in range(iterations):
+        # 斥力 Σ_j (p_i - s_j)·k²/|p_i - s_j|² 写成矩阵乘法：p_i·ΣW_ij - W @ s
+        sample = pos if exact else pos[rng.choice(n, 128, replace=False)]
+        sq = (pos ** 2).sum(axis=1)
+        d2 = sq[:, None] + (sample ** 2).sum(axis=1)[None, :] - 2.0 * (pos @ sample.T)
+        w = (k * k) / np.maximum(d2, 1e-9)
+        if exact:
+            np.fill_diagonal(w, 0.0)
+        disp = (pos * w.sum(axis=1)[:, None] - w @ sample) * (1.0 if exact else n / 128)
+        e = pos[src] - pos[dst]
+        pull = e * (np.sqrt((e ** 2).sum(axis=1)) / k)[:, None]
+        for c in (0, 1):
+            disp[:, c] += (np.bincount(dst, pull[:, c], minlength=n)
+                           - np.bincount(src, pull[:, c], minlength=n))
+        length = np.sqrt((disp ** 2).sum(axis=1))
+        length[length == 0] = 1e-9
+        pos += disp * (np.minimum(length, temp) / length)[:, None]
+        temp *= 0.95
+    return _normalize(pos)
+
+
+_LAYOUT_CACHE: "OrderedDict[Tuple[str, str, int, int], np.ndarray]" = OrderedDict()
+
+
+def cached_layout(digest: str, layout: str, n: int, src: "np.ndarray", dst: "np.ndarray", *,
+                  root: int = 0, seed: int = 0) -> "np.ndarray":
+    """按 (图摘要, 布局, root, seed) 缓存布局结果；同一张图在 watch 重载/批量导出中只计算一次。"""
+    key = (digest, layout, root, seed)
+    pos = _LAYOUT_CACHE.get(key)
+    if pos is None:
+        if layout == "circle":
+            pos = circle_layout(n)
+        elif layout == "layered":
+            pos = layered_layout(n, src, dst, root)
+        else:
+            pos = force_layout(n, src, dst, seed=seed)
+        pos.setflags(write=False)
+        _LAYOUT_CACHE[key] = pos
+        while len(_LAYOUT_CACHE) > _CACHE_SIZE:
+            _LAYOUT_CACHE.popitem(last=False)
+    else:
+        _LAYOUT_CACHE.move_to_end(key)
+    return pos
+
+
+# ===== 状态 =====
+@dataclass(eq=False)
+class GraphState:
+    node: "np.ndarray"       # int8 节点状态码（UNVISITED…PATH）
+    edge: "np.ndarray"       # int8 边状态码（EDGE_PLAIN…EDGE_PATH）
+    dist: "np.ndarray"       # float64 距离（inf = 未知）
+    parent: "np.ndarray"     # int64 父节点（-1 = 无）
+    node_patch: Dict[int, int] = field(default_factory=dict)
+    edge_patch: Dict[int, int] = field(default_factory=dict)
+    dist_patch: Dict[int, float] = field(default_factory=dict)
+    parent_patch: Dict[int, int] = field(default_factory=dict)
+    # 正在沿边推进的动画：(u, v, 进度 0..1)
+    active: Optional[Tuple[int, int, float]] = None
+    current: int = -1
+
+    # ---- 读取（合并补丁）----
+    def nodes(self) -> "np.ndarray":
+        return merged(self.node, self.node_patch)
+
+    def edges(self) -> "np.ndarray":
+        return merged(self.edge, self.edge_patch)
+
+    def dists(self) -> "np.ndarray":
+        return merged(self.dist, self.dist_patch)
+
+    def parents(self) -> "np.ndarray":
+        return merged(self.parent, self.parent_patch)
+
+    def status(self, v: int) -> int:
+        return int(self.node_patch.get(v, self.node[v]))
+
+    def distance(self, v: int) -> float:
+        return float(self.dist_patch.get(v, self.dist[v]))
+
+    def parent_of(self, v: int) -> int:
+        return int(self.parent_patch.get(v, self.parent[v]))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GraphState):
+            return NotImplemented
+        import numpy as np
+        return (self.active == other.active and self.current == other.current
+                and all(np.array_equal(a, b) for a, b in zip(
+                    (self.nodes(), self.edges(), self.parents()),
+                    (other.nodes(), other.edges(), other.parents())))
+                and np.array_equal(self.dists(), other.dists()))
+
+    def _with(self, *, node: Optional[Dict[int, int]] = None, edge: Optional[Dict[int, int]] = None,
+              dist: Optional[Dict[int, float]] = None, parent: Optional[Dict[int, int]] = None,
+              **kw: Any) -> "GraphState":
+        """新状态 = 本状态 + 改动；只复制补丁字典，补丁过大时才合并为新数组。"""
+        ns = GraphState(self.node, self.edge, self.dist, self.parent,
+                        {**self.node_patch, **(node or {})}, {**self.edge_patch, **(edge or {})},
+                        {**self.dist_patch, **(dist or {})},
+                        {**self.parent_patch, **(parent or {})},
+                        kw.get("active", self.active), kw.get("current", self.current))
+        patches = (ns.node_patch, ns.edge_patch, ns.dist_patch, ns.parent_patch)
+        if sum(len(p) for p in patches) > COMPACT:
+            ns = GraphState(ns.nodes(), ns.edges(), ns.dists(), ns.parents(),
+                            active=ns.active, current=ns.current)
+        return ns
+
+
+class Graph:
+    """
+    图组件：
+      - n 个节点（0..n-1），edges 为 (u, v) 序列或 (E, 2) 数组；
+        directed=False 时 (u, v) 与 (v, u) 指同一条边
+      - positions 给出节点坐标（任意尺度，归一化到组件区域）时不计算布局；否则按 layout
+        （"force" 力导向 / "layered" 以 root 为根的 BFS 分层 / "circle" 环形）
+      - 事件：enqueue / dequeue / visit{node, from?} / relax{u, v, dist} / highlight_path{nodes}；
+        visit 带 from、relax 时在事件期间沿边推进，结束时落位（父节点边变为树边，旧的树边还原）
+    """
+
+    def __init__(
+        self,
+        n: int,
+        edges: Any,
+        name: str,
+        x: int = 6,
+        y: int = 10,
+        width: int = 300,
+        height: int = 200,
+        *,
+        directed: bool = False,
+        positions: Any = None,
+        layout: str = "force",
+        root: int = 0,
+        seed: int = 0,
+        node_radius: Optional[float] = None,
+        show_labels: Optional[bool] = None,
+        label_limit: int = 50,
+    ) -> None:
+        import numpy as np
+
+        if layout not in LAYOUTS:
+            raise ValueError(f"unknown layout: {layout} (expected one of {', '.join(LAYOUTS)})")
+        e = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        if e.size and (e.min() < 0 or e.max() >= n):
+            raise ValueError(f"edge endpoint out of range for a graph with {n} nodes")
+        self.name = name
+        self.n = int(n)
+        self.x, self.y = int(x), int(y)
+        self.width, self.height = int(width), int(height)
+        self.directed = bool(directed)
+        self.layout = layout
+        self.root = int(root)
+        self.seed = int(seed)
+        self.src = np.ascontiguousarray(e[:, 0])
+        self.dst = np.ascontiguousarray(e[:, 1])
+        self.positions = (None if positions is None
+                          else _normalize(np.asarray(positions, dtype=np.float64)))
+        if self.positions is not None and self.positions.shape != (self.n, 2):
+            raise ValueError(f"positions must have shape ({self.n}, 2)")
+        spacing = (self.width * self.height / max(1, self.n)) ** 0.5
+        self.node_radius = (float(node_radius) if node_radius is not None
+                            else max(1.0, min(10.0, 0.3 * spacing)))
+        self.show_labels = self.n <= label_limit if show_labels is None else bool(show_labels)
+        # 图摘要：布局缓存键（也让场景指纹覆盖完整的边表，数组 repr 会被截断）
+        h = hashlib.sha1(f"{self.n}:{self.directed}".encode("utf-8"))
+        h.update(self.src.tobytes())
+        h.update(self.dst.tobytes())
+        self.digest = h.hexdigest()
+        # 边查找：键 u*n+v 排序后二分
+        keys = self.src * self.n + self.dst
+        self._edge_order = np.argsort(keys, kind="stable")
+        self._edge_keys = keys[self._edge_order]
+
+    # ==== 场景接口 ====
+    def initial_state(self) -> GraphState:
+        import numpy as np
+
+        return GraphState(np.zeros(self.n, dtype=np.int8), np.zeros(len(self.src), dtype=np.int8),
+                          np.full(self.n, np.inf), np.full(self.n, -1, dtype=np.int64))
+
+    def node_xy(self) -> "np.ndarray":
+        """节点在场景坐标中的位置 (n, 2)（布局按图缓存）。"""
+        unit = self.positions if self.positions is not None else cached_layout(
+            self.digest, self.layout, self.n, self.src, self.dst, root=self.root, seed=self.seed)
+        r = self.node_radius
+        scale = [max(0.0, self.width - 2 * r), max(0.0, self.height - 2 * r)]
+        return unit * scale + [self.x + r, self.y + r]  # type: ignore[no-any-return]
+
+    def edge_index(self, u: int, v: int) -> int:
+        import numpy as np
+
+        for key in ((u * self.n + v,) if self.directed else (u * self.n + v, v * self.n + u)):
+            k = int(np.searchsorted(self._edge_keys, key))
+            if k < len(self._edge_keys) and self._edge_keys[k] == key:
+                return int(self._edge_order[k])
+        raise ValueError(f"graph '{self.name}' has no edge {u}->{v}")
+
+    def draw(self, st: GraphState) -> List[Any]:
+        pos = self.node_xy()
+        ops: List[Any] = []
+        if len(self.src):
+            a, b = pos[self.src], pos[self.dst]
+            ops.append(Segments(a[:, 0], a[:, 1], b[:, 0], b[:, 1], EDGE_COLORS, st.edges()))
+        if st.active is not None:
+            u, v, t = st.active
+            (x0, y0), (x1, y1) = pos[u], pos[v]
+            ops.append(Segments([x0], [y0], [x0 + (x1 - x0) * t], [y0 + (y1 - y0) * t],
+                                (ACTIVE_EDGE,), width=2.5))
+        ops.append(Circles(pos[:, 0], pos[:, 1], self.node_radius, NODE_COLORS, st.nodes(),
+                           stroke="#555"))
+        if self.show_labels:
+            size = max(6, min(10, int(self.node_radius)))
+            dist = st.dists()
+            for v, (px, py) in enumerate(pos.tolist()):
+                ops.append(Text(content=str(v), x=px, y=py + size / 2, size=size, fill=LABEL_COLOR))
+                if dist[v] != float("inf"):
+                    d = dist[v]
+                    ops.append(Text(content=f"{d:g}", x=px, y=py - self.node_radius - 2, size=size,
+                                    fill=LABEL_COLOR))
+        return ops
+
+    # ==== 事件 ====
+    def _settle(self, st: GraphState, u: int, v: int, dist: Optional[float]) -> GraphState:
+        """v 的父节点改为 u：新边成为树边，旧的树边还原。"""
+        edge = {self.edge_index(u, v): EDGE_TREE}
+        old = st.parent_of(v)
+        if old >= 0 and old != u:
+            e_old = self.edge_index(old, v)
+            if int(st.edge_patch.get(e_old, st.edge[e_old])) == EDGE_TREE:
+                edge.setdefault(e_old, EDGE_PLAIN)
+        return st._with(edge=edge, parent={v: u}, dist=None if dist is None else {v: float(dist)})
+
+    def apply_event_step(self, st: GraphState, etype: str, payload: dict, t: float) -> GraphState:
+        """t 已是缓动后的 0..1；t 到 1 时已呈现事件的最终效果（瞬时事件的收尾在 finalize）。"""
+        if etype == "enqueue":
+            return st._with(node={int(payload["node"]): QUEUED})
+        if etype == "dequeue":
+            v = int(payload["node"])
+            return st._with(node={v: CURRENT}, current=v)
+        if etype == "visit":
+            v = int(payload["node"])
+            if "from" not in payload:
+                return st._with(node={v: VISITED}, current=v)
+            u = int(payload["from"])
+            if t < 1.0:
+                return st._with(active=(u, v, float(t)))
+            settled = self._settle(st, u, v, None)
+            return settled._with(node={v: VISITED}, current=v, active=(u, v, 1.0))
+        if etype == "relax":
+            u, v = int(payload["u"]), int(payload["v"])
+            if t < 1.0:
+                return st._with(active=(u, v, float(t)))
+            return self._settle(st, u, v, payload.get("dist"))._with(active=(u, v, 1.0))
+        if etype == "highlight_path":
+            nodes = [int(v) for v in payload["nodes"]]
+            edges = {self.edge_index(a, b): EDGE_PATH for a, b in zip(nodes, nodes[1:])}
+            return st._with(node={v: PATH for v in nodes}, edge=edges)
+        return st
+
+    def finalize_event(self, st: GraphState, etype: str, payload: dict) -> GraphState:
+        st = self.apply_event_step(st, etype, payload, 1.0)
+        return st._with(active=None) if st.active is not None else st
+
+    def apply_event(self, st: GraphState, etype: str, payload: dict) -> GraphState:
+        return self.finalize_event(st, etype, payload)
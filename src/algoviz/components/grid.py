@@ -0,0 +1,233 @@
+#algoviz/components/grid.py
+"""
+二维表格组件（动态规划表、矩阵、Floyd–Warshall 距离表…）：
+
+    grid = Grid((n + 1, m + 1), name="T", x=10, y=10, cell_w=20, cell_h=20)   # 或传入初始二维数组
+    tl.add("T", "highlight_cell", {"cells": [[i - 1, j], [i, j - 1]]})        # 依赖的格子
+    tl.add("T", "set_cell", {"r": i, "c": j, "value": 3}, duration=4)
+    tl.add("T", "copy_cell", {"r": i, "c": j, "from": [i - 1, j - 1]}, duration=6)
+    tl.add("T", "highlight_row", {"r": i});  tl.add("T", "highlight_col", {"c": j})
+
+  - 状态：数值（float64，NaN = 空）与格子状态码两个二维数组，各帧共享、从不原地修改；
+    set_cell / copy_cell 只记补丁（见 _patch.py），补丁超过 COMPACT 项才合并成新数组
+  - draw：整张表是一个 Cells（状态码二维数组直接交给后端按图像绘制，不逐格生成指令），
+    补丁里的“脏”格子、高亮格子/行/列与正在进行的写入另外叠加，数量与改动有关、与表大小无关；
+    格子足够大且总数不超过 label_limit 时才逐格写数值
+  - highlight_* 事件替换对应的高亮集合（传空列表即清除），不影响数值
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.drawops import Cells, Rects, Segments, Text
+from ._patch import COMPACT, merged
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# ===== 状态码与主题色 =====
+BLANK, FILLED = 0, 1
+CELL_COLORS = ("#F2F4F7", "#CFE3FF")
+HIGHLIGHT_FILL = "#FFB800"
+LINE_HIGHLIGHT = "#FF5A5A"
+WRITE_FILL = "#33C48E"
+GRID_LINE = "#FFFFFF"
+LABEL_COLOR = "#222"
+
+
+@dataclass(eq=False)
+class GridState:
+    values: "np.ndarray"      # (行, 列) float64，NaN = 空
+    status: "np.ndarray"      # (行, 列) int8 状态码
+    value_patch: Dict[int, float] = field(default_factory=dict)   # 扁平下标 -> 新值
+    status_patch: Dict[int, int] = field(default_factory=dict)
+    cells: Tuple[Tuple[int, int], ...] = ()     # 高亮格子
+    rows: Tuple[int, ...] = ()                  # 高亮行
+    cols: Tuple[int, ...] = ()                  # 高亮列
+    # 正在进行的写入：(r, c, 源行, 源列, 进度 0..1)；set_cell 的源为 (-1, -1)
+    active: Optional[Tuple[int, int, int, int, float]] = None
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape  # type: ignore[return-value]
+
+    # ---- 读取（合并补丁）----
+    def value(self, r: int, c: int) -> float:
+        k = r * self.values.shape[1] + c
+        return float(self.value_patch.get(k, self.values[r, c]))
+
+    def status_of(self, r: int, c: int) -> int:
+        k = r * self.values.shape[1] + c
+        return int(self.status_patch.get(k, self.status[r, c]))
+
+    def grid_values(self) -> "np.ndarray":
+        return merged(self.values, self.value_patch)
+
+    def grid_status(self) -> "np.ndarray":
+        return merged(self.status, self.status_patch)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GridState):
+            return NotImplemented
+        import numpy as np
+        return ((self.cells, self.rows, self.cols, self.active)
+                == (other.cells, other.rows, other.cols, other.active)
+                and np.array_equal(self.grid_status(), other.grid_status())
+                and np.array_equal(self.grid_values(), other.grid_values(), equal_nan=True))
+
+    def _with(self, *, values: Optional[Dict[int, float]] = None,
+              status: Optional[Dict[int, int]] = None, **kw: Any) -> "GridState":
+        """新状态 = 本状态 + 改动；只复制补丁字典，补丁过大时才合并为新数组。"""
+        ns = GridState(self.values, self.status, {**self.value_patch, **(values or {})},
+                       {**self.status_patch, **(status or {})}, kw.get("cells", self.cells),
+                       kw.get("rows", self.rows), kw.get("cols", self.cols),
+                       kw.get("active", self.active))
+        if len(ns.value_patch) + len(ns.status_patch) > COMPACT:
+            ns = GridState(ns.grid_values(), ns.grid_status(), cells=ns.cells, rows=ns.rows,
+                           cols=ns.cols, active=ns.active)
+        return ns
+
+
+def _pairs(payload: dict) -> Tuple[Tuple[int, int], ...]:
+    if "cells" in payload:
+        return tuple((int(r), int(c)) for r, c in payload["cells"])
+    return ((int(payload["r"]), int(payload["c"])),)
+
+
+def _indices(payload: dict, one: str, many: str) -> Tuple[int, ...]:
+    if many in payload:
+        return tuple(int(v) for v in payload[many])
+    return (int(payload[one]),)
+
+
+class Grid:
+    """
+    表格组件：
+      - values 为初始二维数组（NaN 表示空格），或 (行, 列) 形状（全空）
+      - 左上角 (x, y)，每格 cell_w × cell_h
+      - 事件：set_cell{r, c, value} / copy_cell{r, c, from: [r, c]} / highlight_cell{r, c | cells} /
+        highlight_row{r | rows} / highlight_col{c | cols}
+      - set_cell / copy_cell 在事件期间高亮目标格（copy 时从源格移向目标格），最后一帧落位
+    """
+
+    def __init__(
+        self,
+        values: Any,
+        name: str,
+        x: int = 6,
+        y: int = 10,
+        cell_w: float = 16,
+        cell_h: float = 16,
+        *,
+        show_values: Optional[bool] = None,
+        label_limit: int = 400,
+        fmt: str = "{:g}",
+    ) -> None:
+        import numpy as np
+
+        if (isinstance(values, tuple) and len(values) == 2
+                and all(isinstance(v, int) for v in values)):
+            init = np.full(values, np.nan)
+        else:
+            init = np.array(values, dtype=np.float64)
+        if init.ndim != 2:
+            raise ValueError(f"Grid values must be 2-D, got shape {init.shape}")
+        init.setflags(write=False)
+        self.name = name
+        self.x, self.y = int(x), int(y)
+        self.cell_w, self.cell_h = float(cell_w), float(cell_h)
+        self.rows, self.cols = init.shape
+        self.fmt = fmt
+        self.show_values = (init.size <= label_limit and min(self.cell_w, self.cell_h) >= 12
+                            if show_values is None else bool(show_values))
+        self._values = init
+        status = np.where(np.isnan(init), BLANK, FILLED).astype(np.int8)
+        status.setflags(write=False)
+        self._status = status
+
+    # ==== 场景接口 ====
+    def initial_state(self) -> GridState:
+        # 初始数组只读且从不原地修改，各帧直接共享
+        return GridState(self._values, self._status)
+
+    def cell_xy(self, r: int, c: int) -> Tuple[float, float]:
+        return self.x + c * self.cell_w, self.y + r * self.cell_h
+
+    def _cell_rects(self, keys: Sequence[Tuple[int, int]], palette: Tuple[str, ...],
+                    colors: Any = None, **kw: Any) -> Rects:
+        return Rects([self.x + c * self.cell_w for _, c in keys],
+                     [self.y + r * self.cell_h for r, _ in keys],
+                     self.cell_w, self.cell_h, palette, colors, **kw)
+
+    def draw(self, st: GridState) -> List[Any]:
+        ops: List[Any] = [Cells(self.x, self.y, self.cell_w, self.cell_h, st.status, CELL_COLORS)]
+        cw, ch = self.cell_w, self.cell_h
+        if st.status_patch:
+            # 脏格子：补丁里的状态叠加在整表之上
+            keys = [divmod(k, self.cols) for k in st.status_patch]
+            ops.append(self._cell_rects(keys, CELL_COLORS, list(st.status_patch.values())))
+        if min(cw, ch) >= 6:
+            W, H = self.cols * cw, self.rows * ch
+            xs = [self.x + c * cw for c in range(self.cols + 1)]
+            ys = [self.y + r * ch for r in range(self.rows + 1)]
+            ops.append(Segments(xs + [self.x] * len(ys), [self.y] * len(xs) + ys,
+                                xs + [self.x + W] * len(ys), [self.y + H] * len(xs) + ys,
+                                (GRID_LINE,)))
+        if st.cells:
+            ops.append(self._cell_rects(st.cells, (HIGHLIGHT_FILL,)))
+        if st.active is not None:
+            r, c, sr, sc, t = st.active
+            if sr < 0:
+                ops.append(self._cell_rects([(r, c)], (WRITE_FILL,)))
+            else:
+                (x0, y0), (x1, y1) = self.cell_xy(sr, sc), self.cell_xy(r, c)
+                ops.append(Rects([x0 + (x1 - x0) * t], [y0 + (y1 - y0) * t], cw, ch, (WRITE_FILL,)))
+        if st.rows or st.cols:
+            xs = [self.x] * len(st.rows) + [self.x + c * cw for c in st.cols]
+            ys = [self.y + r * ch for r in st.rows] + [self.y] * len(st.cols)
+            ws = [self.cols * cw] * len(st.rows) + [cw] * len(st.cols)
+            hs = [ch] * len(st.rows) + [self.rows * ch] * len(st.cols)
+            ops.append(Rects(xs, ys, ws, hs, (LINE_HIGHLIGHT,), filled=False))
+        if self.show_values:
+            size = max(6, min(10, int(min(cw, ch) * 0.6)))
+            for (r, c), v in zip(((r, c) for r in range(self.rows) for c in range(self.cols)),
+                                 st.grid_values().ravel().tolist()):
+                if not math.isnan(v):
+                    ops.append(Text(content=self.fmt.format(v), x=self.x + (c + 0.5) * cw,
+                                    y=self.y + (r + 0.5) * ch + size / 2, size=size,
+                                    fill=LABEL_COLOR))
+        return ops
+
+    # ==== 事件 ====
+    def _write(self, st: GridState, r: int, c: int, value: float) -> GridState:
+        k = r * self.cols + c
+        return st._with(values={k: float(value)},
+                        status={k: BLANK if math.isnan(value) else FILLED})
+
+    def apply_event_step(self, st: GridState, etype: str, payload: dict, t: float) -> GridState:
+        """t 已是缓动后的 0..1；t 到 1 时数值已写入（最后一帧落位），finalize 只清除写入动画。"""
+        if etype == "set_cell":
+            r, c = int(payload["r"]), int(payload["c"])
+            st = self._write(st, r, c, float(payload["value"])) if t >= 1.0 else st
+            return st._with(active=(r, c, -1, -1, float(t)))
+        if etype == "copy_cell":
+            r, c = int(payload["r"]), int(payload["c"])
+            sr, sc = (int(v) for v in payload["from"])
+            st = self._write(st, r, c, st.value(sr, sc)) if t >= 1.0 else st
+            return st._with(active=(r, c, sr, sc, float(t)))
+        if etype == "highlight_cell":
+            return st._with(cells=_pairs(payload))
+        if etype == "highlight_row":
+            return st._with(rows=_indices(payload, "r", "rows"))
+        if etype == "highlight_col":
+            return st._with(cols=_indices(payload, "c", "cols"))
+        return st
+
+    def finalize_event(self, st: GridState, etype: str, payload: dict) -> GridState:
+        st = self.apply_event_step(st, etype, payload, 1.0)
+        return st._with(active=None) if st.active is not None else st
+
+    def apply_event(self, st: GridState, etype: str, payload: dict) -> GridState:
+        return self.finalize_event(st, etype, payload)
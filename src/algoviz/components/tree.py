@@ -0,0 +1,583 @@
+#algoviz/components/tree.py
+"""
+树组件（二叉堆视图 / 一般的父指针树：BST、线段树…）：
+
+    heap = Tree(values, name="H", x=10, y=10, width=300, height=160)          # 数组上的二叉堆视图
+    tl.add("H", "compare", {"i": 0, "j": 1})
+    tl.add("H", "swap", {"i": 0, "j": 1}, duration=8)                        # 两个值沿边交换
+    tl.add("H", "heap_size", {"size": 6})
+
+    bst = Tree([8, 3, 10, 1, 6], name="T", parent=[-1, 0, 0, 1, 1], side=[0, 0, 1, 0, 1])
+    tl.add("T", "insert", {"node": 5, "parent": 2, "side": "right", "value": 14}, duration=6)
+    tl.add("T", "rotate", {"node": 1}, duration=8)                           # 1 上旋到父节点的位置
+
+  - 布局：Reingold–Tilford 整齐树布局，线性时间。每个子树的“形状”
+    （左右轮廓链 + 子节点相对偏移）按节点缓存；轮廓以“相对上一层的增量”链表存储，
+    平移整棵子树 O(1)，合并兄弟子树只复制较矮一侧的轮廓
+  - 结构（TreeShape）在各帧之间共享；insert / remove / rotate 只让改动节点到根的路径失效，
+    其余子树的形状原样复用，再用一次 O(n) 的前缀和得到绝对坐标。结构不变的帧不做任何布局计算
+  - 状态：数值（float64，NaN = 无值）与状态码数组各帧共享、从不原地修改，
+    改动记在补丁里（见 _patch.py）
+  - draw：边一个 Segments、节点一个 Circles；swap 期间两个节点沿连线交换位置，结构改变期间
+    所有节点从旧布局插值到新布局（新插入的节点从父节点处长出）
+"""
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.drawops import Circles, Segments, Text
+from ._patch import COMPACT, merged
+from .arraybar import COMPARE_FILL, DEFAULT_FILL, HIGHLIGHT_FILL, SORTED_FILL
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# ===== 状态码与主题色 =====
+NORMAL, SORTED = 0, 1
+DETACHED = -2                                   # parent 取值：不在树中（-1 为根）
+C_DEFAULT, C_HIGHLIGHT, C_COMPARE, C_SORTED, C_OUTSIDE = range(5)
+NODE_COLORS = (DEFAULT_FILL, HIGHLIGHT_FILL, COMPARE_FILL, SORTED_FILL, "#E3E8EF")
+EDGE_COLOR = "#9AA5B1"
+LABEL_COLOR = "#222"
+
+STRUCTURAL = ("insert", "remove", "rotate")
+_SIDES = {"left": 0, "right": 1}
+_CACHE_SIZE = 8        # 初始结构缓存的树数量
+_DERIVED_SIZE = 16     # 每个结构记住的派生结构数量（同一事件的各子步共用）
+
+
+# ===== 整齐树布局 =====
+# 子树形状：(左轮廓, 右轮廓, 高度, 子节点相对本节点的 x 偏移)。
+# 轮廓是链表 (值, 下一项)：首项为第 0 层相对子树根的 x，其后每项为相对上一层的增量。
+Contour = Tuple[float, Any]
+_LEAF: Tuple[Contour, Contour, int, Tuple[float, ...]] = ((0.0, None), (0.0, None), 0, ())
+
+
+def _merge(kids: Sequence[Tuple[Contour, Contour, int, Tuple[float, ...]]]
+           ) -> Tuple[List[float], Contour, Contour, int]:
+    """
+    把若干子树从左到右并排放置（同层节点间距至少 1）：
+    返回各子树根的偏移与整体的左右轮廓、高度。
+    """
+    lc, rc, h, _ = kids[0]
+    offs = [0.0]
+    for klc, krc, kh, _ in kids[1:]:
+        ra, lb = rc, klc
+        xa, xb = ra[0], lb[0]
+        s = xa - xb + 1.0
+        while ra[1] is not None and lb[1] is not None:
+            ra, lb = ra[1], lb[1]
+            xa += ra[0]
+            xb += lb[0]
+            s = max(s, xa - xb + 1.0)
+        offs.append(s)
+        if kh >= h:
+            if kh > h:
+                # 新子树更深：左轮廓复制已有部分（高度为较矮一侧），末尾接到新子树 h+1 层
+                vals = []
+                c: Any = lc
+                while c is not None:
+                    vals.append(c[0])
+                    c = c[1]
+                nxt = lb[1]
+                node: Any = (s + xb + nxt[0] - sum(vals), nxt[1])
+                for v in reversed(vals[1:]):
+                    node = (v, node)
+                lc = (vals[0], node)
+            rc = (krc[0] + s, krc[1])
+        else:
+            # 已有部分更深：右轮廓复制新子树的（较矮一侧），末尾接回已有右轮廓的 kh+1 层
+            vals = []
+            c = krc
+            while c is not None:
+                vals.append(c[0])
+                c = c[1]
+            nxt = ra[1]
+            node = (xa + nxt[0] - (s + sum(vals)), nxt[1])
+            for v in reversed(vals[1:]):
+                node = (v, node)
+            rc = (vals[0] + s, node)
+        h = max(h, kh)
+    return offs, lc, rc, h
+
+
+def _node_shape(kids: Sequence[Tuple[Contour, Contour, int, Tuple[float, ...]]],
+                lone_side: int = -1) -> Tuple[Contour, Contour, int, Tuple[float, ...]]:
+    """由子节点形状得到本节点形状；lone_side >= 0 表示二叉树的独子（左 0 / 右 1），偏向对应一侧。"""
+    if not kids:
+        return _LEAF
+    offs, lc, rc, h = _merge(kids)
+    if lone_side >= 0:
+        px = offs[0] + (0.5 if lone_side == 0 else -0.5)
+    else:
+        px = (offs[0] + offs[-1]) / 2
+    left: Contour = (0.0, (lc[0] - px, lc[1]))
+    right: Contour = (0.0, (rc[0] - px, rc[1]))
+    return left, right, h + 1, tuple(o - px for o in offs)
+
+
+class TreeShape:
+    """
+    树的结构快照（父指针 + 左右/次序键）与其布局。对象不可变、在各帧间共享；
+    derive() 返回改动后的新结构，未受影响子树的形状直接复用。
+    """
+
+    def __init__(self, parent: "np.ndarray", side: "np.ndarray", children: List[Tuple[int, ...]],
+                 roots: Tuple[int, ...], binary: bool, shapes: Optional[List[Any]] = None) -> None:
+        self.parent = parent
+        self.side = side
+        self.children = children
+        self.roots = roots
+        self.binary = binary
+        self._shapes: List[Any] = shapes if shapes is not None else [None] * len(parent)
+        self._placed: Optional[Tuple["np.ndarray", "np.ndarray", "np.ndarray"]] = None
+        self._xy: Dict[Tuple[float, ...], Tuple["np.ndarray", float]] = {}
+        self._derived: "OrderedDict[Any, TreeShape]" = OrderedDict()
+        self.relaid = 0        # 本结构重新计算形状的节点数（诊断用）
+
+    @classmethod
+    def build(cls, parent: "np.ndarray", side: "np.ndarray", binary: bool) -> "TreeShape":
+        import numpy as np
+
+        n = len(parent)
+        kids: List[List[int]] = [[] for _ in range(n)]
+        roots: List[int] = []
+        for v in np.lexsort((np.arange(n), side)).tolist():
+            p = int(parent[v])
+            if p >= 0:
+                kids[p].append(v)
+            elif p == -1:
+                roots.append(v)
+        parent.setflags(write=False)
+        side.setflags(write=False)
+        return cls(parent, side, [tuple(k) for k in kids], tuple(roots), binary)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TreeShape):
+            return NotImplemented
+        import numpy as np
+        return np.array_equal(self.parent, other.parent) and np.array_equal(self.side, other.side)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def _ensure(self, root: int) -> None:
+        """计算 root 子树中尚无形状的节点（先序收集、逆序计算，保证子节点先于父节点）。"""
+        shapes, children = self._shapes, self.children
+        if shapes[root] is not None:
+            return
+        todo = []
+        stack = [root]
+        while stack:
+            v = stack.pop()
+            todo.append(v)
+            stack.extend(c for c in children[v] if shapes[c] is None)
+        side = self.side
+        for v in reversed(todo):
+            kids = children[v]
+            lone = int(side[kids[0]]) if self.binary and len(kids) == 1 else -1
+            shapes[v] = _node_shape([shapes[c] for c in kids], lone)
+        self.relaid += len(todo)
+
+    def layout(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        (单位坐标 (n, 2)：x 以兄弟间距为 1、y 为深度；是否在树中；有父节点的在树节点)，
+        按结构缓存。
+        """
+        if self._placed is None:
+            import numpy as np
+
+            n = len(self.parent)
+            xs = [float("nan")] * n
+            ds = [float("nan")] * n
+            if self.roots:
+                for r in self.roots:
+                    self._ensure(r)
+                offs = _merge([self._shapes[r] for r in self.roots])[0]
+                stack = [(r, o, 0) for r, o in zip(self.roots, offs)]
+                shapes, children = self._shapes, self.children
+                while stack:
+                    v, x, d = stack.pop()
+                    xs[v], ds[v] = x, d
+                    for c, dx in zip(children[v], shapes[v][3]):
+                        stack.append((c, x + dx, d + 1))
+            pos = np.column_stack([np.array(xs), np.array(ds)])
+            inside = ~np.isnan(pos[:, 0])
+            linked = np.flatnonzero(inside & (self.parent >= 0))
+            self._placed = (pos, inside, linked)
+        return self._placed
+
+    def depth_of(self, v: int) -> int:
+        d = self.layout()[0][v, 1]
+        return -1 if d != d else int(d)
+
+    def derive(self, changes: Dict[int, Tuple[int, int]]) -> "TreeShape":
+        """changes: {节点: (新父节点, 新 side)}。结果按改动缓存，同一事件的各子步共用一个新结构。"""
+        key = tuple(sorted(changes.items()))
+        out = self._derived.get(key)
+        if out is not None:
+            return out
+        for r in self.roots:
+            self._ensure(r)
+        parent, side = self.parent.copy(), self.side.copy()
+        children = list(self.children)
+        shapes = list(self._shapes)
+        touched = set()
+        roots = set(self.roots)
+        for v, (p, s) in changes.items():
+            old = int(parent[v])
+            if old >= 0:
+                children[old] = tuple(c for c in children[old] if c != v)
+                touched.add(old)
+            roots.discard(v)
+            parent[v], side[v] = p, s
+            if p >= 0:
+                children[p] = children[p] + (v,)
+                touched.add(p)
+            elif p == -1:
+                roots.add(v)
+        for p in touched:
+            children[p] = tuple(sorted(children[p], key=lambda c: (int(side[c]), c)))
+        # 改动节点到根的路径上的形状失效；其余子树的形状原样复用
+        seen = set()
+        for u in touched:
+            while u >= 0 and u not in seen:
+                seen.add(u)
+                shapes[u] = None
+                u = int(parent[u])
+        parent.setflags(write=False)
+        side.setflags(write=False)
+        ordered = tuple(sorted(roots, key=lambda r: (int(side[r]), r)))
+        out = TreeShape(parent, side, children, ordered, self.binary, shapes)
+        self._derived[key] = out
+        while len(self._derived) > _DERIVED_SIZE:
+            self._derived.popitem(last=False)
+        return out
+
+
+_SHAPE_CACHE: "OrderedDict[str, TreeShape]" = OrderedDict()
+
+
+def cached_shape(digest: str, parent: "np.ndarray", side: "np.ndarray", binary: bool) -> TreeShape:
+    """按树摘要缓存初始结构（及其布局）；watch 重载/批量导出中同一棵树只计算一次。"""
+    shape = _SHAPE_CACHE.get(digest)
+    if shape is None:
+        shape = _SHAPE_CACHE[digest] = TreeShape.build(parent.copy(), side.copy(), binary)
+        while len(_SHAPE_CACHE) > _CACHE_SIZE:
+            _SHAPE_CACHE.popitem(last=False)
+    else:
+        _SHAPE_CACHE.move_to_end(digest)
+    return shape
+
+
+# ===== 状态 =====
+@dataclass(eq=False)
+class TreeState:
+    values: "np.ndarray"          # float64，NaN = 无值
+    status: "np.ndarray"          # int8 状态码（NORMAL / SORTED）
+    shape: TreeShape
+    size: int                     # 堆大小：序号 >= size 的节点画在堆外（一般树为节点总数）
+    value_patch: Dict[int, float] = field(default_factory=dict)
+    status_patch: Dict[int, int] = field(default_factory=dict)
+    highlight: Tuple[int, ...] = ()
+    compare: Tuple[int, ...] = ()
+    # swap 动画：(i, j, 进度 0..1)；结构动画：(旧结构, 进度 0..1)
+    active: Optional[Tuple[int, int, float]] = None
+    move: Optional[Tuple[TreeShape, float]] = None
+
+    # ---- 读取（合并补丁）----
+    def value(self, v: int) -> float:
+        return float(self.value_patch.get(v, self.values[v]))
+
+    def status_of(self, v: int) -> int:
+        return int(self.status_patch.get(v, self.status[v]))
+
+    def node_values(self) -> "np.ndarray":
+        return merged(self.values, self.value_patch)
+
+    def node_status(self) -> "np.ndarray":
+        return merged(self.status, self.status_patch)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TreeState):
+            return NotImplemented
+        import numpy as np
+        a, b = self.move, other.move
+        same_move = (a is None and b is None) or (a is not None and b is not None
+                                                  and a[1] == b[1] and a[0] == b[0])
+        return ((self.size, self.highlight, self.compare, self.active) ==
+                (other.size, other.highlight, other.compare, other.active)
+                and same_move
+                and self.shape == other.shape
+                and np.array_equal(self.node_status(), other.node_status())
+                and np.array_equal(self.node_values(), other.node_values(), equal_nan=True))
+
+    def _with(self, *, values: Optional[Dict[int, float]] = None,
+              status: Optional[Dict[int, int]] = None, **kw: Any) -> "TreeState":
+        """新状态 = 本状态 + 改动；只复制补丁字典，补丁过大时才合并为新数组。"""
+        ns = TreeState(self.values, self.status, kw.get("shape", self.shape),
+                       kw.get("size", self.size),
+                       {**self.value_patch, **(values or {})},
+                       {**self.status_patch, **(status or {})},
+                       kw.get("highlight", self.highlight), kw.get("compare", self.compare),
+                       kw.get("active", self.active), kw.get("move", self.move))
+        if len(ns.value_patch) + len(ns.status_patch) > COMPACT:
+            ns = TreeState(ns.node_values(), ns.node_status(), ns.shape, ns.size,
+                           highlight=ns.highlight, compare=ns.compare, active=ns.active,
+                           move=ns.move)
+        return ns
+
+
+def _nodes(payload: dict) -> Tuple[int, ...]:
+    if "nodes" in payload:
+        return tuple(int(v) for v in payload["nodes"])
+    return (int(payload["idx"]),)
+
+
+def _side(value: Any) -> int:
+    if isinstance(value, str):
+        if value not in _SIDES:
+            raise ValueError(f"unknown side: {value} (expected 'left' or 'right')")
+        return _SIDES[value]
+    return int(value)
+
+
+class Tree:
+    """
+    树组件：
+      - parent 为 None 时是 values 上的二叉堆视图（i 的子节点为 2i+1、2i+2），size 为初始堆大小；
+        否则 parent[v] 为父节点（-1 = 根，DETACHED = 尚未插入），side[v] 为子节点次序键
+        （二叉树：0 = 左、1 = 右；给出 side 时默认按二叉树处理）
+      - 事件（与 ArrayBar 相同的载荷）：compare{i, j} / swap{i, j} / assign{i, value | j} /
+        highlight{idx | nodes} / mark_sorted{idx | nodes}；以及 heap_size{size}、
+        insert{node, parent, side?, value?} / remove{node} /
+        rotate{node}（把 node 旋转到父节点的位置）
+      - swap 在事件期间两个节点沿连线交换位置，finalize 时落位；结构事件在最后一帧落位
+    """
+
+    def __init__(
+        self,
+        values: Sequence[Any],
+        name: str,
+        x: int = 6,
+        y: int = 10,
+        width: int = 300,
+        height: int = 160,
+        *,
+        parent: Optional[Sequence[int]] = None,
+        side: Optional[Sequence[Any]] = None,
+        size: Optional[int] = None,
+        binary: Optional[bool] = None,
+        node_radius: Optional[float] = None,
+        show_labels: Optional[bool] = None,
+        label_limit: int = 63,
+        fmt: str = "{:g}",
+    ) -> None:
+        import numpy as np
+
+        vals = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        n = len(vals)
+        self.heap = parent is None
+        if self.heap:
+            idx = np.arange(n)
+            par = (idx - 1) // 2
+            sd = ((idx - 1) % 2).astype(np.int8)
+            sd[:1] = 0
+        else:
+            par = np.asarray(parent, dtype=np.int64)
+            sd = (np.zeros(n, dtype=np.int8) if side is None
+                  else np.array([_side(s) for s in side], dtype=np.int8))
+            if par.shape != (n,) or sd.shape != (n,):
+                raise ValueError(f"parent/side must have one entry per node ({n})")
+            if ((par < DETACHED) | (par >= n)).any():
+                raise ValueError(f"parent out of range for a tree with {n} nodes")
+        vals.setflags(write=False)
+        self.name = name
+        self.n = n
+        self.x, self.y = int(x), int(y)
+        self.width, self.height = int(width), int(height)
+        self.binary = (self.heap or side is not None) if binary is None else bool(binary)
+        self.size = n if size is None or not self.heap else max(0, min(n, int(size)))
+        self.node_radius = None if node_radius is None else float(node_radius)
+        self.show_labels = n <= label_limit if show_labels is None else bool(show_labels)
+        self.fmt = fmt
+        self._values = vals
+        self._parent = np.ascontiguousarray(par, dtype=np.int64)
+        self._side = np.ascontiguousarray(sd, dtype=np.int8)
+        # 树摘要：结构缓存键（也让场景指纹覆盖完整的数组，数组 repr 会被截断）
+        h = hashlib.sha1(f"{n}:{self.binary}".encode("utf-8"))
+        for arr in (self._parent, self._side, vals):
+            h.update(arr.tobytes())
+        self.digest = h.hexdigest()
+
+    # ==== 场景接口 ====
+    def initial_state(self) -> TreeState:
+        import numpy as np
+
+        shape = cached_shape(self.digest, self._parent, self._side, self.binary)
+        return TreeState(self._values, np.zeros(self.n, dtype=np.int8), shape, self.size)
+
+    def node_xy(self, shape: TreeShape) -> Tuple["np.ndarray", float]:
+        """结构在场景坐标中的节点位置 (n, 2)（不在树中的为 NaN）与节点半径，按结构缓存。"""
+        import numpy as np
+
+        key = (self.x, self.y, self.width, self.height, self.node_radius or 0.0)
+        hit = shape._xy.get(key)
+        if hit is not None:
+            return hit
+        pos, inside, _ = shape.layout()
+        if inside.any():
+            lo, hi = np.nanmin(pos, axis=0), np.nanmax(pos, axis=0)
+        else:
+            lo, hi = np.zeros(2), np.zeros(2)
+        span = hi - lo
+        r = self.node_radius or max(1.0, min(10.0, 0.35 * min(self.width / (span[0] + 1),
+                                                               self.height / (span[1] + 1))))
+        room = np.array([max(0.0, self.width - 2 * r), max(0.0, self.height - 2 * r)])
+        unit = np.where(span > 0, (pos - lo) / np.where(span > 0, span, 1.0), 0.5)
+        unit[:, 1] = np.where(span[1] > 0, unit[:, 1], 0.0)
+        xy = unit * room + [self.x + r, self.y + r]
+        xy.setflags(write=False)
+        shape._xy.clear()
+        shape._xy[key] = (xy, r)
+        return xy, r
+
+    def _colors(self, st: TreeState) -> "np.ndarray":
+        import numpy as np
+
+        status = st.node_status()
+        codes = np.full(self.n, C_DEFAULT, dtype=np.int8)
+        if st.size < self.n:
+            codes[st.size:] = C_OUTSIDE
+        if st.highlight:
+            codes[list(st.highlight)] = C_HIGHLIGHT
+        if st.compare:
+            codes[list(st.compare)] = C_COMPARE
+        codes[status == SORTED] = C_SORTED
+        return codes
+
+    def draw(self, st: TreeState) -> List[Any]:
+        import numpy as np
+
+        shape = st.shape
+        xy, r = self.node_xy(shape)
+        _, inside, linked = shape.layout()
+        visible = inside
+        if st.move is not None:
+            old, t = st.move
+            oxy, _ = self.node_xy(old)
+            o_inside = old.layout()[1]
+            start = oxy.copy()
+            fresh = np.flatnonzero(inside & ~o_inside)
+            if fresh.size:
+                # 新进入树的节点从（旧布局中的）父节点处长出
+                p = np.maximum(shape.parent[fresh], 0)
+                ok = (shape.parent[fresh] >= 0) & o_inside[p]
+                start[fresh] = np.where(ok[:, None], oxy[p], xy[fresh])
+            end = np.where(inside[:, None], xy, oxy)
+            xy = start + (end - start) * t
+            visible = inside | o_inside
+        elif st.active is not None:
+            i, j, t = st.active
+            xy = xy.copy()
+            xy[[i, j]] = xy[[i, j]] + (xy[[j, i]] - xy[[i, j]]) * t
+        if self.heap and st.size < self.n:
+            linked = linked[linked < st.size]
+        ops: List[Any] = []
+        if linked.size:
+            a, b = xy[shape.parent[linked]], xy[linked]
+            ops.append(Segments(a[:, 0], a[:, 1], b[:, 0], b[:, 1], (EDGE_COLOR,), width=1.5))
+        codes = self._colors(st)
+        nodes = np.flatnonzero(visible)
+        if st.active is not None:
+            # 交换中的两个节点最后画，位于其它节点之上
+            pair = np.array(st.active[:2], dtype=np.int64)
+            nodes = np.concatenate([nodes[~np.isin(nodes, pair)], pair])
+        if nodes.size:
+            ops.append(Circles(xy[nodes, 0], xy[nodes, 1], r, NODE_COLORS, codes[nodes],
+                               stroke="#555"))
+        if self.show_labels and nodes.size:
+            size = max(6, min(10, int(r)))
+            vals = st.node_values()
+            for v, (px, py) in zip(nodes.tolist(), xy[nodes].tolist()):
+                if vals[v] == vals[v]:
+                    ops.append(Text(content=self.fmt.format(vals[v]), x=px, y=py + size / 2,
+                                    size=size, fill=LABEL_COLOR))
+        return ops
+
+    # ==== 结构事件 ====
+    def _changes(self, shape: TreeShape, etype: str, payload: dict) -> Dict[int, Tuple[int, int]]:
+        v = int(payload["node"])
+        if not 0 <= v < self.n:
+            raise ValueError(f"tree '{self.name}' has no node {v}")
+        if etype == "remove":
+            return {v: (DETACHED, 0)}
+        if etype == "insert":
+            p = int(payload.get("parent", -1))
+            s = _side(payload.get("side", 0))
+            if p != -1:
+                if not 0 <= p < self.n or shape.depth_of(p) < 0:
+                    raise ValueError(f"tree '{self.name}': parent {p} is not in the tree")
+                u = p
+                while u >= 0:
+                    if u == v:
+                        raise ValueError(f"tree '{self.name}': cannot insert node {v} "
+                                         f"below its own subtree")
+                    u = int(shape.parent[u])
+                if self.binary and any(c != v and int(shape.side[c]) == s
+                                       for c in shape.children[p]):
+                    raise ValueError(f"tree '{self.name}': node {p} "
+                                     f"already has a child on side {s}")
+            return {v: (p, s)}
+        # rotate：v 上旋到父节点 p 的位置，v 的内侧子树改挂到 p
+        if not self.binary:
+            raise ValueError("rotate requires a binary tree")
+        p = int(shape.parent[v])
+        if p < 0:
+            raise ValueError(f"tree '{self.name}': cannot rotate root node {v}")
+        s = int(shape.side[v])
+        changes = {v: (int(shape.parent[p]), int(shape.side[p])), p: (v, 1 - s)}
+        for c in shape.children[v]:
+            if int(shape.side[c]) == 1 - s:
+                changes[c] = (p, s)
+        return changes
+
+    # ==== 事件 ====
+    def apply_event_step(self, st: TreeState, etype: str, payload: dict, t: float) -> TreeState:
+        """t 已是缓动后的 0..1；结构事件在 t 到 1 时落位，swap/assign 在 finalize 落位。"""
+        if etype in STRUCTURAL:
+            shape = st.shape.derive(self._changes(st.shape, etype, payload))
+            values = {int(payload["node"]): float(payload["value"])} if "value" in payload else None
+            move = None if t >= 1.0 else (st.shape, float(t))
+            return st._with(shape=shape, values=values, move=move)
+        if etype == "swap":
+            return st._with(active=(int(payload["i"]), int(payload["j"]), float(t)))
+        if etype == "compare":
+            return st._with(compare=(int(payload["i"]), int(payload["j"])))
+        if etype == "assign":
+            return st._with(compare=(int(payload["i"]),))
+        if etype == "highlight":
+            return st._with(highlight=_nodes(payload))
+        if etype == "mark_sorted":
+            return st._with(status={v: SORTED for v in _nodes(payload)})
+        if etype == "heap_size":
+            return st._with(size=max(0, min(self.n, int(payload["size"]))))
+        return st
+
+    def finalize_event(self, st: TreeState, etype: str, payload: dict) -> TreeState:
+        """收到的是 t=1 的状态：swap/assign 在此落位，compare 清除，结构事件只清除动画。"""
+        if etype == "swap":
+            i, j = int(payload["i"]), int(payload["j"])
+            return st._with(values={i: st.value(j), j: st.value(i)}, active=None)
+        if etype == "assign":
+            i = int(payload["i"])
+            value = float(payload["value"]) if "value" in payload else st.value(int(payload["j"]))
+            return st._with(values={i: value}, compare=())
+        if etype == "compare":
+            return st._with(compare=())
+        return st._with(move=None) if st.move is not None else st
+
+    def apply_event(self, st: TreeState, etype: str, payload: dict) -> TreeState:
+        return self.finalize_event(self.apply_event_step(st, etype, payload, 1.0), etype, payload)
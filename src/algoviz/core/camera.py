@@ -0,0 +1,201 @@
+#algoviz/core/camera.py
+"""
+相机 / 视口：场景（世界坐标）比画布大时，只显示其中一块，并可由时间线事件平移、缩放。
+
+    scene.add(Camera(zoom=4))                                   # 名字默认为 "camera"
+    tl.add("camera", "look_at", {"x": bar.slot_center(i)[0]}, duration=6)   # 跟随活动区域
+    tl.add("camera", "pan", {"dx": 120}, duration=8)
+    tl.add("camera", "zoom", {"zoom": 1, "x": 0, "y": 0}, duration=10)
+
+  - 状态 CameraState(x, y, zoom)：视口左上角的世界坐标与缩放倍数；
+    画布尺寸（viewport）在加入场景时取场景尺寸
+  - 事件（均为瞬时事件，末帧即到达目标）：
+      pan      {x?, y?} 或 {dx?, dy?}：移动视口左上角
+      zoom     {zoom, x?, y?}：缩放，世界点 (x, y)（默认视口中心）在画布上的位置不变
+      look_at  {x?, y?, zoom?}：把视口中心移到世界点 (x, y)
+    子步插值时缩放按几何级数变化，并绕“起止两视口的不动点”缩放，平移 + 缩放合成一个连续的镜头运动
+  - 场景只对动态层做世界→画布变换与裁剪；静态层（背景、图例）固定在画布坐标，缓存不受相机影响。
+    actor 若实现 draw_view(state, view)，会收到可见的世界矩形，只输出可见部分（见 ArrayBar）
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .drawops import Cells, Circles, DrawOp, Line, Rect, Rects, Segments, Text
+
+
+@dataclass(frozen=True)
+class CameraState:
+    x: float = 0.0
+    y: float = 0.0
+    zoom: float = 1.0
+
+
+@dataclass(frozen=True)
+class View:
+    """
+    可见的世界矩形 (x, y, w, h) 与缩放倍数：画布坐标 = (世界坐标 - 左上角) * zoom。
+    px 为后端给出的水平方向“输出像素 / 画布单位”（GIF 为图像宽 / 场景宽，TUI 为字符列数 / 场景宽）。
+    """
+    x: float
+    y: float
+    w: float
+    h: float
+    zoom: float = 1.0
+    px: float = 1.0
+
+    @property
+    def right(self) -> float:
+        return self.x + self.w
+
+    @property
+    def bottom(self) -> float:
+        return self.y + self.h
+
+
+def _zoom_of(value: Any) -> float:
+    z = float(value)
+    if not z > 0 or math.isinf(z):
+        raise ValueError(f"camera zoom must be a positive number, got {value!r}")
+    return z
+
+
+class Camera:
+    """场景相机（不绘制任何内容，只决定动态层的可见区域）。"""
+
+    def __init__(self, name: str = "camera", x: float = 0.0, y: float = 0.0, zoom: float = 1.0, *,
+                 viewport: Optional[Tuple[int, int]] = None) -> None:
+        self.name = name
+        self.x = float(x)
+        self.y = float(y)
+        self.zoom = _zoom_of(zoom)
+        # 画布尺寸（场景坐标）；None 时由 Scene.add 填为场景尺寸
+        self.viewport = None if viewport is None else (int(viewport[0]), int(viewport[1]))
+
+    # ==== 场景接口 ====
+    def initial_state(self) -> CameraState:
+        return CameraState(self.x, self.y, self.zoom)
+
+    def draw(self, state: CameraState) -> List[DrawOp]:
+        return []
+
+    def view(self, state: CameraState, px: float = 1.0) -> View:
+        w, h = self.viewport or (0, 0)
+        return View(state.x, state.y, w / state.zoom, h / state.zoom, state.zoom, px)
+
+    def _target(self, st: CameraState, etype: str, p: Dict[str, Any]) -> CameraState:
+        w, h = self.viewport or (0, 0)
+        if etype == "pan":
+            x = float(p["x"]) if "x" in p else st.x + float(p.get("dx", 0.0))
+            y = float(p["y"]) if "y" in p else st.y + float(p.get("dy", 0.0))
+            return CameraState(x, y, st.zoom)
+        if etype == "zoom":
+            z = _zoom_of(p["zoom"])
+            ax = float(p.get("x", st.x + w / (2 * st.zoom)))
+            ay = float(p.get("y", st.y + h / (2 * st.zoom)))
+            k = st.zoom / z
+            return CameraState(ax - (ax - st.x) * k, ay - (ay - st.y) * k, z)
+        if etype == "look_at":
+            z = _zoom_of(p.get("zoom", st.zoom))
+            cx = float(p.get("x", st.x + w / (2 * st.zoom)))
+            cy = float(p.get("y", st.y + h / (2 * st.zoom)))
+            return CameraState(cx - w / (2 * z), cy - h / (2 * z), z)
+        raise ValueError(f"unknown camera event: {etype}")
+
+    def apply_event_step(self, st: CameraState, etype: str, payload: dict, t: float) -> CameraState:
+        end = self._target(st, etype, payload)
+        t = float(t)
+        if end.zoom == st.zoom:
+            return CameraState(st.x + (end.x - st.x) * t, st.y + (end.y - st.y) * t, st.zoom)
+        # 绕不动点 a 缩放：(a - x0) * z0 == (a - x1) * z1，各子步保持 a 在画布上的位置不变
+        z = st.zoom * (end.zoom / st.zoom) ** t
+        dz = end.zoom - st.zoom
+        ax = (end.x * end.zoom - st.x * st.zoom) / dz
+        ay = (end.y * end.zoom - st.y * st.zoom) / dz
+        k = st.zoom / z
+        return CameraState(ax - (ax - st.x) * k, ay - (ay - st.y) * k, z)
+
+    def apply_event(self, st: CameraState, etype: str, payload: dict) -> CameraState:
+        return self._target(st, etype, payload)
+
+    def finalize_event(self, st: CameraState, etype: str, payload: dict) -> CameraState:
+        return st
+
+
+# ---- 世界坐标 → 画布坐标（同时裁掉视口外的图元）----
+
+def _take(v: Any, mask: Any) -> Any:
+    import numpy as np
+
+    return v if np.ndim(v) == 0 else np.asarray(v)[mask]
+
+
+def project(ops: List[DrawOp], view: View) -> List[DrawOp]:
+    """
+    把世界坐标的绘制指令变换到画布坐标；完全不可见的图元（批量图元按元素）直接丢弃。
+    文字字号不随缩放变化。
+    """
+    import numpy as np
+
+    z, ox, oy, right, bottom = view.zoom, view.x, view.y, view.right, view.bottom
+    out: List[DrawOp] = []
+    for op in ops:
+        if isinstance(op, Rect):
+            if op.x + op.w < ox or op.x > right or op.y + op.h < oy or op.y > bottom:
+                continue
+            out.append(Rect((op.x - ox) * z, (op.y - oy) * z, op.w * z, op.h * z,
+                            op.fill, op.stroke, op.label))
+        elif isinstance(op, Text):
+            # 锚点在视口外一个文字宽度内仍保留
+            m = (op.size or 12) * max(1, len(op.content)) / z
+            if not (ox - m <= op.x <= right + m and oy - m <= op.y <= bottom + m):
+                continue
+            out.append(Text((op.x - ox) * z, (op.y - oy) * z, op.content, op.size, op.weight,
+                            op.fill))
+        elif isinstance(op, Line):
+            (ax, ay), (bx, by) = op.p1, op.p2
+            if max(ax, bx) < ox or min(ax, bx) > right or max(ay, by) < oy or min(ay, by) > bottom:
+                continue
+            out.append(Line(((ax - ox) * z, (ay - oy) * z), ((bx - ox) * z, (by - oy) * z),
+                            op.stroke, op.width))
+        elif isinstance(op, Circles):
+            x, y = np.asarray(op.x, dtype=float), np.asarray(op.y, dtype=float)
+            r = np.asarray(op.r, dtype=float)
+            keep = (x + r >= ox) & (x - r <= right) & (y + r >= oy) & (y - r <= bottom)
+            if keep.any():
+                colors = None if op.colors is None else _take(op.colors, keep)
+                out.append(Circles((x[keep] - ox) * z, (y[keep] - oy) * z, _take(r, keep) * z,
+                                   op.palette, colors, op.stroke))
+        elif isinstance(op, Segments):
+            x0, y0, x1, y1 = (np.asarray(v, dtype=float) for v in (op.x0, op.y0, op.x1, op.y1))
+            keep = ((np.maximum(x0, x1) >= ox) & (np.minimum(x0, x1) <= right)
+                    & (np.maximum(y0, y1) >= oy) & (np.minimum(y0, y1) <= bottom))
+            if keep.any():
+                colors = None if op.colors is None else _take(op.colors, keep)
+                out.append(Segments((x0[keep] - ox) * z, (y0[keep] - oy) * z, (x1[keep] - ox) * z,
+                                    (y1[keep] - oy) * z, op.palette, colors, op.width))
+        elif isinstance(op, Rects):
+            x, y = np.asarray(op.x, dtype=float), np.asarray(op.y, dtype=float)
+            w, h = np.asarray(op.w, dtype=float), np.asarray(op.h, dtype=float)
+            keep = (x + w >= ox) & (x <= right) & (y + h >= oy) & (y <= bottom)
+            if keep.any():
+                colors = None if op.colors is None else _take(op.colors, keep)
+                out.append(Rects((x[keep] - ox) * z, (y[keep] - oy) * z,
+                                 _take(w, keep) * z, _take(h, keep) * z,
+                                 op.palette, colors, op.stroke, op.filled))
+        elif isinstance(op, Cells):
+            # 只保留与视口相交的行列
+            rows, cols = np.shape(op.codes)
+            c0 = min(max(0, int((ox - op.x) // op.cw)), cols)
+            c1 = min(max(0, int(math.ceil((right - op.x) / op.cw))), cols)
+            r0 = min(max(0, int((oy - op.y) // op.ch)), rows)
+            r1 = min(max(0, int(math.ceil((bottom - op.y) / op.ch))), rows)
+            if c1 > c0 and r1 > r0:
+                out.append(Cells((op.x + c0 * op.cw - ox) * z, (op.y + r0 * op.ch - oy) * z,
+                                 op.cw * z, op.ch * z, np.asarray(op.codes)[r0:r1, c0:c1],
+                                 op.palette))
+        else:
+            out.append(op)
+    return out
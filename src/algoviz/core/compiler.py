@@ -0,0 +1,192 @@
+#src/algoviz/core/compiler.py
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .fingerprint import scene_signature
+from .timeline import Event, Frame, Timeline
+
+
+class BackgroundCompiler:
+    """
+    在后台线程中逐事件编译 Timeline，消费者可以边编译边取帧：
+      - total    ：总帧数（编译前即可得到）
+      - compiled ：已编译完成的帧数（“前沿”）
+      - get(idx) ：取帧；idx 超过前沿时只等待到该帧编译完成
+    编译线程抛出的异常会在 get()/wait_for() 中重新抛出。
+    """
+
+    def __init__(self, scene: Any, timeline: Timeline) -> None:
+        self.scene = scene
+        self.timeline = timeline
+        self.total = timeline.frame_count()
+        self._frames: List[Frame] = []
+        self._cond = threading.Condition()
+        self._done = False
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- 生命周期 ----
+    def start(self) -> "BackgroundCompiler":
+        self._thread = threading.Thread(target=self._run, name="algoviz-compile", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __enter__(self) -> "BackgroundCompiler":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        try:
+            for fr in self.timeline.iter_frames(self.scene):
+                with self._cond:
+                    if self._closed:
+                        return
+                    self._frames.append(fr)
+                    self._cond.notify_all()
+            with self._cond:
+                # 以实际产出为准（理论上与 frame_count() 一致）
+                self.total = len(self._frames)
+        except BaseException as e:  # 交给消费端重新抛出
+            with self._cond:
+                self._error = e
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    # ---- 消费端 ----
+    @property
+    def compiled(self) -> int:
+        return len(self._frames)
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def wait_for(self, idx: int, timeout: Optional[float] = None) -> bool:
+        """阻塞直到第 idx 帧可用；超时返回 False。idx 越界（编译结束仍不可达）抛 IndexError。"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: idx < len(self._frames) or self._done or self._closed, timeout=timeout)
+            if self._error is not None:
+                raise self._error
+            if idx < len(self._frames):
+                return True
+            if self._done:
+                raise IndexError(f"frame index out of range: {idx}")
+            return False
+
+    def get(self, idx: int, timeout: Optional[float] = None) -> Frame:
+        if not self.wait_for(idx, timeout):
+            raise TimeoutError(f"frame {idx} not compiled yet")
+        return self._frames[idx]
+
+    def __len__(self) -> int:
+        return self.total
+
+
+class StaticFrames:
+    """已编译好的帧序列，接口与 BackgroundCompiler 相同（watch 模式重载后交给播放器）。"""
+
+    def __init__(self, frames: Sequence[Frame]) -> None:
+        self._frames = list(frames)
+        self.total = len(self._frames)
+
+    @property
+    def compiled(self) -> int:
+        return self.total
+
+    @property
+    def done(self) -> bool:
+        return True
+
+    def wait_for(self, idx: int, timeout: Optional[float] = None) -> bool:
+        if not 0 <= idx < self.total:
+            raise IndexError(f"frame index out of range: {idx}")
+        return True
+
+    def get(self, idx: int, timeout: Optional[float] = None) -> Frame:
+        return self._frames[idx]
+
+    def start(self) -> "StaticFrames":
+        return self
+
+    def close(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return self.total
+
+
+# --------------------- 增量重编译（watch 模式） ---------------------
+
+@dataclass
+class CompileDelta:
+    frames: List[Frame]
+    first_event: int      # 第一个与上次不同的事件序号（== 事件数 表示事件序列未变/只是截断）
+    first_frame: int      # 第一个可能不同的帧序号；此前的帧与上次编译完全相同
+    resumed_from: int     # 实际从哪个事件的检查点开始重新编译
+    changed: bool         # 与上次编译结果是否有任何差异
+
+
+class IncrementalCompiler:
+    """
+    记住上次编译的事件序列、帧与周期性检查点
+    （每 checkpoint_every 个事件保存一次事件开始前的基线状态）。
+    再次 compile() 时与上次逐事件比较，从第一个不同事件之前最近的检查点恢复编译，前缀帧直接复用。
+    场景配置（fingerprint.scene_signature）变化时整段重编译。
+    """
+
+    def __init__(self, checkpoint_every: int = 16) -> None:
+        self.checkpoint_every = max(1, int(checkpoint_every))
+        self._signature: Optional[str] = None
+        self._events: List[Event] = []
+        self._frames: List[Frame] = []
+        # 事件序号 -> (该事件第一帧的帧序号, 事件开始前的基线状态)
+        self._checkpoints: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+
+    def compile(self, scene: Any, timeline: Timeline) -> CompileDelta:
+        events = timeline._events
+        sig = scene_signature(scene)
+        first = 0
+        if sig != self._signature:
+            self._frames, self._checkpoints = [], {}
+        else:
+            for a, b in zip(self._events, events):
+                if a != b:
+                    break
+                first += 1
+        if sig == self._signature and first == len(events) == len(self._events):
+            return CompileDelta(self._frames, first, len(self._frames), first, False)
+
+        k = max((c for c in self._checkpoints if c <= first), default=0)
+        if k in self._checkpoints:
+            offset, states = self._checkpoints[k]
+        else:
+            offset, states = 0, timeline._initial_states(scene)
+        frames = self._frames[:offset]
+        checkpoints = {c: v for c, v in self._checkpoints.items() if c <= k}
+        for idx, base, out in timeline.iter_events(scene, k, states):
+            if idx % self.checkpoint_every == 0:
+                checkpoints[idx] = (len(frames), base)
+            frames.extend(out)
+
+        first_frame = offset + sum(max(1, int(ev.duration)) for ev in self._events[k:first])
+        self._signature = sig
+        # 前缀与旧副本相等，直接沿用；只复制变化部分（防止调用方之后原地修改事件）
+        fresh = [replace(ev, payload=dict(ev.payload)) for ev in events[first:]]
+        self._events = self._events[:first] + fresh
+        self._frames = frames
+        self._checkpoints = checkpoints
+        return CompileDelta(frames, first, first_frame, k, True)
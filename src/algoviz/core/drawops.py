@@ -1,14 +1,14 @@
 #src/algoviz/core/drawops.py
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Literal, Tuple
+from typing import Any, List, Literal, Optional, Tuple
 
 Color = str  # hex like "#RRGGBB"
 Point = Tuple[float, float]
 
 @dataclass(frozen=True)
 class DrawOp:
-    kind: Literal["rect", "line", "text"]
+    kind: Literal["rect", "line", "text", "circles", "segments", "rects", "cells"]
 
 @dataclass(frozen=True)
 class Rect(DrawOp):
@@ -67,3 +67,120 @@ class Text(DrawOp):
         object.__setattr__(self, "fill", fill)
 
 DrawList = List[DrawOp]
+
+
+# ---- 批量图元：一个 op 携带整组元素（NumPy 数组或序列），后端整体处理，不逐元素构造对象 ----
+# 颜色以 palette + 下标数组给出：第 k 个元素的颜色为 palette[colors[k]]；
+# colors 为 None 时全部用 palette[0]
+
+@dataclass(frozen=True, eq=False)
+class Circles(DrawOp):
+    x: Any
+    y: Any
+    r: Any                      # 标量或与 x 等长的数组（场景坐标）
+    palette: Tuple[Color, ...]
+    colors: Any = None
+    stroke: Color | None = None
+
+    def __init__(self, x: Any, y: Any, r: Any, palette: Tuple[Color, ...], colors: Any = None,
+                 stroke: Color | None = None):
+        object.__setattr__(self, "kind", "circles")
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "y", y)
+        object.__setattr__(self, "r", r)
+        object.__setattr__(self, "palette", tuple(palette))
+        object.__setattr__(self, "colors", colors)
+        object.__setattr__(self, "stroke", stroke)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+@dataclass(frozen=True, eq=False)
+class Segments(DrawOp):
+    x0: Any
+    y0: Any
+    x1: Any
+    y1: Any
+    palette: Tuple[Color, ...]
+    colors: Any = None
+    width: float = 1.0
+
+    def __init__(self, x0: Any, y0: Any, x1: Any, y1: Any, palette: Tuple[Color, ...],
+                 colors: Any = None, width: float = 1.0):
+        object.__setattr__(self, "kind", "segments")
+        object.__setattr__(self, "x0", x0)
+        object.__setattr__(self, "y0", y0)
+        object.__setattr__(self, "x1", x1)
+        object.__setattr__(self, "y1", y1)
+        object.__setattr__(self, "palette", tuple(palette))
+        object.__setattr__(self, "colors", colors)
+        object.__setattr__(self, "width", width)
+
+    def __len__(self) -> int:
+        return len(self.x0)
+
+
+@dataclass(frozen=True, eq=False)
+class Rects(DrawOp):
+    x: Any
+    y: Any
+    w: Any                      # 标量或与 x 等长的数组
+    h: Any
+    palette: Tuple[Color, ...]
+    colors: Any = None
+    stroke: Color | None = None
+    filled: bool = True         # False：只描边（颜色取 palette，stroke 被忽略）
+
+    def __init__(self, x: Any, y: Any, w: Any, h: Any, palette: Tuple[Color, ...],
+                 colors: Any = None, stroke: Color | None = None, filled: bool = True):
+        object.__setattr__(self, "kind", "rects")
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "y", y)
+        object.__setattr__(self, "w", w)
+        object.__setattr__(self, "h", h)
+        object.__setattr__(self, "palette", tuple(palette))
+        object.__setattr__(self, "colors", colors)
+        object.__setattr__(self, "stroke", stroke)
+        object.__setattr__(self, "filled", filled)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+
+@dataclass(frozen=True, eq=False)
+class Cells(DrawOp):
+    """
+    规则网格：左上角 (x, y)，单元格 cw × ch，codes 为 (行, 列) 的调色板下标二维数组
+    （后端按整幅图像处理）。
+    """
+    x: float
+    y: float
+    cw: float
+    ch: float
+    codes: Any
+    palette: Tuple[Color, ...]
+
+    def __init__(self, x: float, y: float, cw: float, ch: float, codes: Any,
+                 palette: Tuple[Color, ...]):
+        object.__setattr__(self, "kind", "cells")
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "y", y)
+        object.__setattr__(self, "cw", cw)
+        object.__setattr__(self, "ch", ch)
+        object.__setattr__(self, "codes", codes)
+        object.__setattr__(self, "palette", tuple(palette))
+
+
+def color_groups(palette: Tuple[Color, ...], colors: Optional[Any],
+                 n: int) -> List[Tuple[Color, Any]]:
+    """
+    按颜色分组：返回 [(颜色, 该颜色元素的下标数组)]，
+    供逐颜色批量输出的后端（SVG/TUI）使用。
+    """
+    import numpy as np
+
+    if colors is None:
+        return [(palette[0], np.arange(n))] if n else []
+    idx = np.asarray(colors)
+    return [(c, np.flatnonzero(idx == k)) for k, c in enumerate(palette) if (idx == k).any()]
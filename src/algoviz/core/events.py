@@ -0,0 +1,430 @@
+#src/algoviz/core/events.py
+"""
+事件存储：Timeline 的事件序列由若干段组成——逐条 API（tl.swap/compare…）追加的 Event 列表段，
+extend_bulk / Timeline.load 产生的列式 EventTable 段，以及 add_source 接入的惰性事件源
+（如 algoviz.io.trace.TraceSource，实现与 EventTable 相同的段接口）。消费端（构帧、计数、指纹…）
+统一按 Sequence[Event] 访问 EventList；表段只在迭代时按块解码成 Event，不常驻内存。
+
+EventTable 的列（NumPy 数组，长度相同）：
+  actor   uint16  -> actors 名字表        etype  uint8  -> etypes 名字表
+  i, j    int32   （INT_NONE 表示缺省）   dur    int32
+  easing  int8    -> easings（-1 = 未指定） note   int32  -> notes 驻留表（-1 = 无）
+  value / vkind   可选：assign 的常量值（float64）与其类型（0 无 / 1 float / 2 int）
+  payload int32   可选：无法用上述列表达的 payload，存 JSON 驻留表的序号（-1 = 无）
+payload 的键由 etype 决定（见 _decode_payload），与逐条 API 生成的 payload 完全一致。
+"""
+from __future__ import annotations
+
+import bisect
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:  # 运行期按需导入 NumPy，保持 core 轻量
+    import numpy as np
+
+INT_NONE = -(2 ** 31)
+_INT32_MAX = 2 ** 31 - 1
+_BLOCK = 4096          # 表段按块解码的行数
+
+# extend_bulk 未给 durations 时按 etype 取与逐条 API 相同的默认子步数
+DEFAULT_DURATIONS = {"swap": 10, "assign": 8}
+# 组合事件（Timeline.add_group / parallel()）：
+#   payload = {"events": [成员 Event 字段], "tracks": [轨道号]}
+PARALLEL = "parallel"
+
+
+@dataclass
+class Event:
+    actor: str
+    etype: str
+    payload: Dict[str, Any]
+    duration: int = 1     # 子步数
+    easing: Optional[str] = None
+    note: Optional[str] = None
+
+
+def min_duration(etype: str, payload: Dict[str, Any]) -> int:
+    """事件可缩放到的最小帧数：组合事件为最长轨道上的事件个数（每个成员至少 1 帧），其余为 1。"""
+    if etype != PARALLEL:
+        return 1
+    tracks = payload.get("tracks")
+    if not tracks:
+        return 1
+    counts: Dict[Any, int] = {}
+    for t in tracks:
+        counts[t] = counts.get(t, 0) + 1
+    return max(counts.values())
+
+
+def _decode_payload(etype: str, i: int, j: int, value: Any) -> Dict[str, Any]:
+    if etype == "compare" or etype == "swap":
+        return {"i": i, "j": j}
+    if etype == "assign":
+        return {"i": i, "j": j} if j != INT_NONE else {"i": i, "value": value}
+    if etype == "highlight":
+        return {"idx": i} if j == INT_NONE else {"start": i, "end": j}
+    if etype == "mark_sorted":
+        return {"upto": i}
+    p: Dict[str, Any] = {}
+    if i != INT_NONE:
+        p["i"] = i
+    if j != INT_NONE:
+        p["j"] = j
+    if value is not None:
+        p["value"] = value
+    return p
+
+
+def _small_int(v: Any) -> bool:
+    return type(v) is int and INT_NONE < v <= _INT32_MAX
+
+
+def _encode_payload(etype: str, p: Dict[str, Any]) -> Optional[Tuple[int, int, Any]]:
+    """payload -> (i, j, value)；无法用列表达（键不符、类型不是小整数）时返回 None。"""
+    keys = set(p)
+    if etype in ("compare", "swap"):
+        ok = keys == {"i", "j"} and _small_int(p["i"]) and _small_int(p["j"])
+        return (p["i"], p["j"], None) if ok else None
+    if etype == "assign":
+        if keys == {"i", "j"} and _small_int(p["i"]) and _small_int(p["j"]):
+            return p["i"], p["j"], None
+        v = p.get("value")
+        if keys == {"i", "value"} and _small_int(p["i"]) and (
+                type(v) is float or (type(v) is int and abs(v) < 2 ** 53)):
+            return p["i"], INT_NONE, v
+        return None
+    if etype == "highlight":
+        if keys == {"idx"} and _small_int(p["idx"]):
+            return p["idx"], INT_NONE, None
+        if keys == {"start", "end"} and _small_int(p["start"]) and _small_int(p["end"]):
+            return p["start"], p["end"], None
+        return None
+    if etype == "mark_sorted":
+        return (p["upto"], INT_NONE, None) if keys == {"upto"} and _small_int(p["upto"]) else None
+    if keys <= {"i", "j"} and all(_small_int(p[k]) for k in keys):
+        return p.get("i", INT_NONE), p.get("j", INT_NONE), None
+    return None
+
+
+class _Interner:
+    def __init__(self, items: Sequence[str] = ()) -> None:
+        self.items: List[str] = list(items)
+        self._ids = {s: k for k, s in enumerate(self.items)}
+
+    def id(self, s: Optional[str]) -> int:
+        if s is None:
+            return -1
+        k = self._ids.get(s)
+        if k is None:
+            k = self._ids[s] = len(self.items)
+            self.items.append(s)
+        return k
+
+
+class EventTable:
+    """列式事件块；列可以是普通数组，也可以是 np.memmap（Timeline.load(mmap=True)）。"""
+
+    COLUMNS = ("actor", "etype", "i", "j", "dur", "easing", "note")
+    OPTIONAL = ("value", "vkind", "payload")
+
+    def __init__(self, cols: Dict[str, "np.ndarray"], *, actors: Sequence[str],
+                 etypes: Sequence[str], easings: Sequence[str] = (), notes: Sequence[str] = (),
+                 payloads: Sequence[str] = ()) -> None:
+        self.cols = cols
+        self.actors = list(actors)
+        self.etypes = list(etypes)
+        self.easings = list(easings)
+        self.notes = list(notes)
+        self.payloads = list(payloads)
+        self._n = len(cols["etype"])
+        self._frames: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self._n
+
+    def frame_count(self) -> int:
+        if self._frames is None:
+            import numpy as np
+            self._frames = int(np.maximum(self.cols["dur"], 1).sum(dtype=np.int64))
+        return self._frames
+
+    def etype_durations(self) -> Dict[str, int]:
+        """各事件类型的帧数合计（每个事件至少 1 帧）。"""
+        import numpy as np
+        sums = np.bincount(self.cols["etype"], weights=np.maximum(self.cols["dur"], 1),
+                           minlength=len(self.etypes))
+        return {name: int(sums[k]) for k, name in enumerate(self.etypes) if sums[k]}
+
+    # ---- 解码 ----
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Event]:
+        """按块解码 [start, stop) 行为 Event；内存占用与块大小有关，与表长无关。"""
+        stop = self._n if stop is None else min(stop, self._n)
+        c = self.cols
+        value, vkind, payload = c.get("value"), c.get("vkind"), c.get("payload")
+        actors, etypes, easings, notes = self.actors, self.etypes, self.easings, self.notes
+        for b in range(start, stop, _BLOCK):
+            e = min(b + _BLOCK, stop)
+            a_l, t_l = c["actor"][b:e].tolist(), c["etype"][b:e].tolist()
+            i_l, j_l, d_l = c["i"][b:e].tolist(), c["j"][b:e].tolist(), c["dur"][b:e].tolist()
+            es_l, n_l = c["easing"][b:e].tolist(), c["note"][b:e].tolist()
+            v_l = value[b:e].tolist() if value is not None else None
+            k_l = vkind[b:e].tolist() if vkind is not None else None
+            p_l = payload[b:e].tolist() if payload is not None else None
+            for r in range(e - b):
+                etype = etypes[t_l[r]]
+                if p_l is not None and p_l[r] >= 0:
+                    pl = json.loads(self.payloads[p_l[r]])
+                else:
+                    v = None
+                    if k_l is not None and k_l[r]:
+                        v = v_l[r] if k_l[r] == 1 else int(v_l[r])  # type: ignore[index]
+                    pl = _decode_payload(etype, i_l[r], j_l[r], v)
+                es, nt = es_l[r], n_l[r]
+                yield Event(actors[a_l[r]], etype, pl, d_l[r],
+                            easings[es] if es >= 0 else None, notes[nt] if nt >= 0 else None)
+
+    def row(self, k: int) -> Event:
+        return next(self.rows(k, k + 1))
+
+    # ---- 变换 ----
+    def scaled(self, factor: float) -> "EventTable":
+        import numpy as np
+        cols = dict(self.cols)
+        cols["dur"] = np.maximum(1, np.round(self.cols["dur"] * factor)).astype(np.int32)
+        if PARALLEL in self.etypes and "payload" in cols:
+            # 组合事件不能缩到比最长轨道的事件数还短
+            rows = np.nonzero(cols["etype"] == self.etypes.index(PARALLEL))[0]
+            for r in rows.tolist():
+                k = int(cols["payload"][r])
+                if k >= 0:
+                    low = min_duration(PARALLEL, json.loads(self.payloads[k]))
+                    cols["dur"][r] = max(int(cols["dur"][r]), low)
+        return EventTable(cols, actors=self.actors, etypes=self.etypes, easings=self.easings,
+                          notes=self.notes, payloads=self.payloads)
+
+    def set_default_easing(self, name: str) -> None:
+        """未指定 easing 的行改用 name（生成新列，不写回 memmap）。"""
+        import numpy as np
+        it = _Interner(self.easings)
+        eid = it.id(name)
+        self.easings = it.items
+        col = self.cols["easing"]
+        self.cols["easing"] = np.where(col < 0, eid, col).astype(np.int8)
+
+    def update_hash(self, h: Any) -> None:
+        import numpy as np
+        for name in self.COLUMNS + self.OPTIONAL:
+            col = self.cols.get(name)
+            if col is not None:
+                h.update(name.encode())
+                h.update(np.ascontiguousarray(col).tobytes())
+        for table in (self.actors, self.etypes, self.easings, self.notes, self.payloads):
+            h.update(json.dumps(table).encode("utf-8"))
+
+    # ---- 构造 ----
+    @classmethod
+    def from_events(cls, events: Sequence[Event]) -> "EventTable":
+        """把逐条 Event 编码为列式表（Timeline.save 使用）；payload 需可 JSON 序列化。"""
+        import numpy as np
+        n = len(events)
+        actors, etypes, easings, notes, payloads = (_Interner() for _ in range(5))
+        cols: Dict[str, "np.ndarray"] = {
+            "actor": np.empty(n, np.uint16), "etype": np.empty(n, np.uint8),
+            "i": np.empty(n, np.int32), "j": np.empty(n, np.int32), "dur": np.empty(n, np.int32),
+            "easing": np.empty(n, np.int8), "note": np.empty(n, np.int32),
+        }
+        value = np.zeros(n, np.float64)
+        vkind = np.zeros(n, np.uint8)
+        payload = np.full(n, -1, np.int32)
+        for k, ev in enumerate(events):
+            cols["actor"][k] = actors.id(ev.actor)
+            cols["etype"][k] = etypes.id(ev.etype)
+            cols["dur"][k] = int(ev.duration)
+            cols["easing"][k] = easings.id(ev.easing)
+            cols["note"][k] = notes.id(ev.note)
+            enc = _encode_payload(ev.etype, ev.payload)
+            if enc is None:
+                payload[k] = payloads.id(json.dumps(ev.payload, ensure_ascii=False, sort_keys=True))
+                cols["i"][k] = cols["j"][k] = INT_NONE
+            else:
+                cols["i"][k], cols["j"][k], v = enc
+                if v is not None:
+                    value[k] = v
+                    vkind[k] = 1 if type(v) is float else 2
+        if len(actors.items) > 65535 or len(etypes.items) > 255 or len(easings.items) > 127:
+            raise ValueError("too many distinct actors/etypes/easings for the columnar format")
+        if vkind.any():
+            cols["value"], cols["vkind"] = value, vkind
+        if (payload >= 0).any():
+            cols["payload"] = payload
+        return cls(cols, actors=actors.items, etypes=etypes.items, easings=easings.items,
+                   notes=notes.items, payloads=payloads.items)
+
+    @classmethod
+    def from_columns(cls, actor: str, etypes: Any, i: Any, j: Any = None,
+                     durations: Any = None, *, values: Any = None, easing: Optional[str] = None,
+                     notes: Any = None) -> "EventTable":
+        """extend_bulk 的实现：标量参数广播到 len(i) 行。"""
+        import numpy as np
+        i_arr = np.asarray(i)
+        n = int(i_arr.shape[0]) if i_arr.ndim else 1
+        i_arr = np.broadcast_to(i_arr, (n,))
+
+        if isinstance(etypes, str):
+            et_names, et_codes = [etypes], np.zeros(n, np.uint8)
+        else:
+            et_arr = np.asarray(etypes)
+            if et_arr.shape != (n,):
+                raise ValueError("etypes must be a string or have the same length as i")
+            names, inv = np.unique(et_arr.astype(str), return_inverse=True)
+            if len(names) > 255:
+                raise ValueError("too many distinct etypes")
+            et_names, et_codes = [str(x) for x in names], inv.astype(np.uint8)
+
+        def ints(a: Any, what: str) -> "np.ndarray":
+            arr = np.broadcast_to(np.asarray(a), (n,))
+            if n and arr.dtype.kind not in "iu":
+                raise TypeError(f"{what} must be integers")
+            if n and (arr.min() <= INT_NONE or arr.max() > _INT32_MAX):
+                raise ValueError(f"{what} out of int32 range")
+            return arr.astype(np.int32)
+
+        cols: Dict[str, Any] = {
+            "actor": np.zeros(n, np.uint16),
+            "etype": et_codes,
+            "i": ints(i_arr, "i"),
+            "j": np.full(n, INT_NONE, np.int32) if j is None else ints(j, "j"),
+        }
+        if durations is None:
+            dur = np.ones(n, np.int32)
+            for k, name in enumerate(et_names):
+                if name in DEFAULT_DURATIONS:
+                    dur[et_codes == k] = DEFAULT_DURATIONS[name]
+            cols["dur"] = dur
+        else:
+            cols["dur"] = np.maximum(ints(durations, "durations"), 1)
+
+        easings: List[str] = []
+        if easing is None:
+            cols["easing"] = np.full(n, -1, np.int8)
+        else:
+            easings = [easing]
+            cols["easing"] = np.zeros(n, np.int8)
+
+        note_table: List[str] = []
+        if notes is None:
+            cols["note"] = np.full(n, -1, np.int32)
+        elif isinstance(notes, str):
+            note_table = [notes]
+            cols["note"] = np.zeros(n, np.int32)
+        else:
+            it = _Interner()
+            cols["note"] = np.fromiter((it.id(s) for s in notes), np.int32, count=n)
+            note_table = it.items
+
+        if values is not None:
+            v = np.broadcast_to(np.asarray(values), (n,))
+            if n and v.dtype.kind not in "iuf":
+                raise TypeError("values must be numeric")
+            cols["value"] = v.astype(np.float64)
+            kind = 2 if v.dtype.kind in "iu" else 1
+            has = cols["j"] == INT_NONE
+            cols["vkind"] = np.where(has, kind, 0).astype(np.uint8)
+        return cls(cols, actors=[actor], etypes=et_names, easings=easings, notes=note_table)
+
+
+Segment = Union[List[Event], EventTable, Any]   # Any：实现段接口的惰性事件源
+
+
+class EventList:
+    """Timeline 的事件序列：Event 列表段与表段/事件源段的拼接，对外表现为 Sequence[Event]。"""
+
+    def __init__(self) -> None:
+        self.segments: List[Segment] = []
+        self._starts: List[int] = []     # 每段第一个事件的全局序号
+        self._len = 0
+
+    def append(self, ev: Event) -> None:
+        if not self.segments or not isinstance(self.segments[-1], list):
+            self._starts.append(self._len)
+            self.segments.append([])
+        self.segments[-1].append(ev)  # type: ignore[union-attr]
+        self._len += 1
+
+    def add_table(self, table: Any) -> None:
+        if len(table) == 0:
+            return
+        self._starts.append(self._len)
+        self.segments.append(table)
+        self._len += len(table)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Event]:
+        return self.iter_from(0)
+
+    def iter_from(self, start: int) -> Iterator[Event]:
+        if start >= self._len:
+            return
+        s = bisect.bisect_right(self._starts, max(0, start)) - 1
+        for k in range(s, len(self.segments)):
+            seg, off = self.segments[k], max(0, start - self._starts[k])
+            if isinstance(seg, list):
+                yield from seg[off:] if off else seg
+            else:
+                yield from seg.rows(off)
+
+    def __getitem__(self, idx: Any) -> Any:
+        if isinstance(idx, slice):
+            a, b, step = idx.indices(self._len)
+            if step != 1:
+                return list(self)[idx]
+            out: List[Event] = []
+            for ev in self.iter_from(a):
+                if len(out) >= b - a:
+                    break
+                out.append(ev)
+            return out
+        k = int(idx)
+        if k < 0:
+            k += self._len
+        if not 0 <= k < self._len:
+            raise IndexError("event index out of range")
+        s = bisect.bisect_right(self._starts, k) - 1
+        seg = self.segments[s]
+        off = k - self._starts[s]
+        return seg[off] if isinstance(seg, list) else seg.row(off)
+
+    def frame_count(self) -> int:
+        total = 0
+        for seg in self.segments:
+            if isinstance(seg, list):
+                total += sum(max(1, int(ev.duration)) for ev in seg)
+            else:
+                total += seg.frame_count()
+        return total
+
+    def etype_durations(self) -> Dict[str, int]:
+        """各事件类型的帧数合计；表段向量化统计，事件源段顺序读一遍。"""
+        out: Dict[str, int] = {}
+        for seg in self.segments:
+            if hasattr(seg, "etype_durations"):
+                part = seg.etype_durations()
+            else:
+                part = {}
+                for ev in (seg if isinstance(seg, list) else seg.rows()):
+                    part[ev.etype] = part.get(ev.etype, 0) + max(1, int(ev.duration))
+            for name, d in part.items():
+                out[name] = out.get(name, 0) + d
+        return out
+
+    def update_hash(self, h: Any) -> None:
+        for seg in self.segments:
+            if isinstance(seg, list):
+                for ev in seg:
+                    h.update(repr(ev).encode("utf-8"))
+                    h.update(b"\n")
+            else:
+                seg.update_hash(h)
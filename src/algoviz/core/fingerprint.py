@@ -0,0 +1,111 @@
+#src/algoviz/core/fingerprint.py
+"""
+导出产物的内容指纹（make 式的“是否最新”检查）。
+
+指纹 = sha256(algoviz 版本, 输出类型, 导出选项, 场景配置, 时间线 fps/节奏与全部事件, demo 源码)。
+导出成功后写到输出旁边的 `<outfile>.fingerprint`；下次导出时指纹相同且输出文件仍在，即可整体跳过。
+"""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import os
+from typing import Any, List, Optional
+
+SUFFIX = ".fingerprint"
+
+
+_PLAIN = frozenset((int, float, str, bool, type(None)))
+
+
+def _canon(obj: Any, depth: int = 0) -> Any:
+    """
+    可稳定 repr 的等价结构。NumPy 数组按 (形状, dtype, 字节的 sha256)——
+    大数组的 repr 会用 "..." 省略中间元素，改动中间的值不会改变 repr；
+    dataclass 按参与比较的字段（缓存字段声明为 compare=False），其他对象按 vars() 递归。
+    """
+    if depth > 8:
+        return repr(obj)
+    if type(obj).__name__ == "ndarray" and hasattr(obj, "tobytes"):
+        import numpy as np
+
+        arr = np.ascontiguousarray(obj)
+        return ("ndarray", arr.shape, arr.dtype.str, hashlib.sha256(arr.tobytes()).hexdigest())
+    if isinstance(obj, dict):
+        return sorted((repr(k), _canon(v, depth + 1)) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        if set(map(type, obj)) <= _PLAIN:
+            return repr(obj)
+        return type(obj).__name__, [_canon(v, depth + 1) for v in obj]
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return (type(obj).__qualname__, [(f.name, _canon(getattr(obj, f.name), depth + 1))
+                                         for f in dataclasses.fields(obj) if f.compare])
+    if hasattr(obj, "__dict__") and not callable(obj):
+        return type(obj).__qualname__, _canon(vars(obj), depth + 1)
+    return repr(obj)
+
+
+def scene_signature(scene: Any) -> str:
+    """场景配置指纹：尺寸 + 每个 actor 的类型与属性（见 _canon）+ 绘制层（z 序 / 静态）。"""
+    actors = getattr(scene, "actors", {})
+    items = actors.items() if isinstance(actors, dict) else enumerate(actors)
+    parts: List[Any] = [getattr(scene, "width", None), getattr(scene, "height", None)]
+    for name, a in items:
+        attrs = _canon(vars(a)) if hasattr(a, "__dict__") else repr(a)
+        parts.append((name, type(a).__module__, type(a).__qualname__, attrs))
+    layers = getattr(scene, "layers", None)
+    if layers:
+        parts.append(sorted(layers.items()))
+    return repr(parts)
+
+
+def compute(scene: Any, timeline: Any, options: Any = None, *, kind: str,
+            source: Optional[str] = None, extra: Any = None) -> str:
+    from .. import __version__
+
+    h = hashlib.sha256()
+    is_instance = dataclasses.is_dataclass(options) and not isinstance(options, type)
+    opts = dataclasses.asdict(options) if is_instance else options  # type: ignore[arg-type]
+    for part in (__version__, kind, repr(opts), repr(extra), scene_signature(scene),
+                 repr(getattr(timeline, "fps", None)), repr(getattr(timeline, "pacing", None))):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    events = getattr(timeline, "_events", ())
+    if hasattr(events, "update_hash"):
+        events.update_hash(h)  # 列式段直接哈希列字节
+    else:
+        for ev in events:
+            h.update(repr(ev).encode("utf-8"))
+            h.update(b"\n")
+    if source is not None:
+        with open(source, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def sidecar_path(outfile: str | os.PathLike) -> str:
+    return os.fspath(outfile) + SUFFIX
+
+
+def is_fresh(outfile: str | os.PathLike, digest: str) -> bool:
+    """输出存在且旁边记录的指纹与 digest 相同。"""
+    if not os.path.exists(outfile):
+        return False
+    try:
+        with open(sidecar_path(outfile), "r", encoding="utf-8") as f:
+            return f.read().strip() == digest
+    except OSError:
+        return False
+
+
+def invalidate(outfile: str | os.PathLike) -> None:
+    """开始重写输出前删除旧指纹，避免导出中途失败后留下“看似最新”的记录。"""
+    try:
+        os.remove(sidecar_path(outfile))
+    except OSError:
+        pass
+
+
+def record(outfile: str | os.PathLike, digest: str) -> None:
+    with open(sidecar_path(outfile), "w", encoding="utf-8") as f:
+        f.write(digest + "\n")
@@ -0,0 +1,135 @@
+#src/algoviz/core/pacing.py
+"""
+自适应节奏：把时间线压缩到给定的总帧数（或时长），而不复制事件。
+
+每个事件的“帧份额” = duration × min(1, s × 权重)。权重按事件类型给出（默认 swap/assign 等为 1，
+compare 0.1，highlight/mark_sorted 0.5），s 由各类型帧数合计解出，使份额总和恰好等于预算：
+预算宽裕时 swap/assign 保持完整动画、只压缩 compare；预算更紧时所有类型一起按权重缩短。
+份额按累计值取整分配到事件：
+  - 分到 0 帧的事件照常作用于状态，但不产出帧（一长串 compare 只抽样显示其中几个）
+  - 分到 f 帧的事件以 duration=f 编译；组合事件不能短于其最短布局时，编译后均匀抽取 f 帧
+  - 最后一个事件额外多占 1 帧（份额按 预算-1 求解），保证末帧总是最终状态
+"""
+from __future__ import annotations
+
+import itertools
+import math
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .events import Event, min_duration
+from .timeline import Frame, Timeline
+
+DEFAULT_WEIGHTS: Dict[str, float] = {"compare": 0.1, "highlight": 0.5, "mark_sorted": 0.5}
+
+# (事件, 基线状态) -> (帧, 下一事件的基线状态)，见 Timeline._compiler
+CompileOne = Callable[[Event, Dict[str, Any]], Tuple[List[Frame], Dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class Pacing:
+    budget: int
+    weights: Tuple[Tuple[str, float], ...]
+
+
+def solve_scale(totals: Dict[str, int], weights: Dict[str, float], budget: int) -> float:
+    """解 Σ_t D_t·min(1, s·w_t) = budget（分段线性、单调）；预算足够时返回 inf。"""
+    if budget >= sum(totals.values()):
+        return math.inf
+    items = [(d, weights.get(t, 1.0)) for t, d in totals.items()]
+    fixed = 0.0                                   # 已饱和（min 取 1）的类型
+    slope = sum(d * w for d, w in items if w > 0)
+    s = 0.0
+    for b, d, w in sorted((1.0 / w, d, w) for d, w in items if w > 0):
+        if fixed + slope * b >= budget:
+            break
+        fixed += d
+        slope -= d * w
+        s = b
+    else:
+        return s
+    return (budget - fixed) / slope if slope > 0 else s
+
+
+class PacedTimeline(Timeline):
+    """Timeline 的节奏视图：与原时间线共用事件存储，编译时按份额重新分配帧数。"""
+
+    def __init__(self, base: Timeline, budget: int,
+                 weights: Optional[Dict[str, float]] = None) -> None:
+        super().__init__(base.fps)
+        self.base = base
+        self._events = base._events
+        self._weights = dict(DEFAULT_WEIGHTS)
+        self._weights.update(weights or {})
+        self.pacing = Pacing(max(1, int(budget)), tuple(sorted(self._weights.items())))
+        self._scale: Optional[float] = None
+        self._total = 0
+
+    def _solve(self) -> float:
+        if self._scale is None:
+            totals = self._events.etype_durations()
+            s = solve_scale(totals, self._weights, self.pacing.budget - 1)
+            kept = sum(d * min(1.0, s * self._weights.get(t, 1.0)) for t, d in totals.items())
+            self._total = int(kept + 0.5) + 1
+            self._scale = s
+        return self._scale
+
+    def share(self, ev: Event) -> float:
+        """事件的帧份额（未取整）。"""
+        return max(1, int(ev.duration)) * min(1.0, self._solve() * self._weights.get(ev.etype, 1.0))
+
+    def frame_count(self) -> int:
+        self._solve()
+        return self._total
+
+    def scaled(self, factor: float) -> Timeline:
+        """预算按 factor 缩放（仍以原时间线为基础）。"""
+        budget = max(1, int(round(self.pacing.budget * factor)))
+        return self.base.paced(budget, weights=self._weights)
+
+    def _event_frame_counts(self) -> Iterator[int]:
+        pos = 0.0
+        last = len(self._events) - 1
+        for k, ev in enumerate(self._events):
+            a = int(pos + 0.5)
+            pos += self.share(ev)
+            yield int(pos + 0.5) - a + (k == last)
+
+    @staticmethod
+    def _compile_at(compile_one: CompileOne, ev: Event, f: int,
+                    states: Dict[str, Any]) -> Tuple[List[Frame], Dict[str, Any]]:
+        """iter_frames_at 按各事件的帧份额编译（同 _iter_compiled）。"""
+        return _compile_paced(compile_one, ev, f, states)
+
+    def _iter_compiled(self, compile_one: CompileOne, start: int, states: Dict[str, Any],
+                       ) -> Iterator[Tuple[int, Dict[str, Any], List[Frame]]]:
+        pos = 0.0
+        if start:
+            for ev in itertools.islice(self._events.iter_from(0), start):
+                pos += self.share(ev)
+        k = start
+        last = len(self._events) - 1
+
+        def paced(ev: Event, states: Dict[str, Any]) -> Tuple[List[Frame], Dict[str, Any]]:
+            nonlocal pos, k
+            a = int(pos + 0.5)
+            pos += self.share(ev)
+            f = int(pos + 0.5) - a + (k == last)
+            k += 1
+            return _compile_paced(compile_one, ev, f, states)
+
+        return super()._iter_compiled(paced, start, states)
+
+
+def _compile_paced(compile_one: CompileOne, ev: Event, f: int,
+                   states: Dict[str, Any]) -> Tuple[List[Frame], Dict[str, Any]]:
+    """按 f 帧编译一个事件；f<=0 时只推进状态（编译为最短形式后丢弃帧）。"""
+    low = min_duration(ev.etype, ev.payload)
+    if f <= 0:
+        _, nxt = compile_one(ev if ev.duration == low else replace(ev, duration=low), states)
+        return [], nxt
+    steps = max(f, low)
+    out, nxt = compile_one(ev if ev.duration == steps else replace(ev, duration=steps), states)
+    if len(out) > f:
+        out = [out[(q + 1) * len(out) // f - 1] for q in range(f)]
+    return out, nxt
@@ -0,0 +1,91 @@
+#src/algoviz/core/progress.py
+"""
+长时间导出的进度回报与取消。
+
+    token = CancelToken()
+    export_gif(scene, tl, "out.gif", progress=print, cancel=token)
+    # 另一线程 / 信号处理里：token.cancel() -> 导出在下一帧边界抛出 ExportCancelled
+
+进度回调每处理完一帧调用一次（最后以 stage="done" 再调用一次）。
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Optional
+
+
+class ExportCancelled(Exception):
+    """导出被 CancelToken 取消（已写出的部分文件已关闭并清理）。"""
+
+
+class CancelToken:
+    """线程安全的取消标志；导出在帧粒度上检查。"""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise ExportCancelled("export cancelled")
+
+
+@dataclass
+class ExportProgress:
+    stage: str              # "compile" | "render" | "encode" | "done"
+    total: int              # 需要处理的帧数
+    compiled: int = 0
+    rendered: int = 0
+    encoded: int = 0
+    elapsed: float = 0.0    # 秒
+    fps: float = 0.0        # 吞吐：已编码帧 / 秒（尚未开始编码时按已编译帧计）
+    eta: Optional[float] = None  # 剩余秒数（尚无吞吐数据时为 None）
+
+
+ProgressCallback = Callable[[ExportProgress], None]
+
+
+class ProgressTracker:
+    """导出内部使用：累计三类计数，计算吞吐与 ETA，并检查取消。"""
+
+    def __init__(self, total: int, callback: Optional[ProgressCallback] = None,
+                 cancel: Optional[CancelToken] = None) -> None:
+        self.callback = callback
+        self.cancel = cancel
+        self._t0 = time.perf_counter()
+        self.state = ExportProgress(stage="compile", total=int(total))
+
+    def check(self) -> None:
+        if self.cancel is not None:
+            self.cancel.raise_if_cancelled()
+
+    def step(self, stage: str, n: int = 1) -> None:
+        st = self.state
+        if stage == "compile":
+            st.compiled += n
+        elif stage == "render":
+            st.rendered += n
+        elif stage == "encode":
+            st.encoded += n
+        st.stage = stage
+
+    def report(self, stage: Optional[str] = None) -> None:
+        st = self.state
+        if stage is not None:
+            st.stage = stage
+        st.elapsed = time.perf_counter() - self._t0
+        done = st.encoded or st.compiled
+        st.fps = done / st.elapsed if st.elapsed > 0 else 0.0
+        st.eta = (st.total - done) / st.fps if st.fps > 0 else None
+        if st.stage == "done":
+            st.eta = 0.0
+        if self.callback is not None:
+            self.callback(replace(st))  # 传快照，回调方可安全保存
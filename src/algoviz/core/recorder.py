@@ -0,0 +1,144 @@
+#src/algoviz/core/recorder.py
+"""
+多线程算法的并发事件记录。
+
+    rec = ConcurrentRecorder()
+    def worker(lo, hi):            # 各工作线程直接记录
+        rec.compare("A", lo, hi)
+        rec.swap("A", lo, hi)
+    ...启动并 join 线程...
+    rec.flush(tl)                  # 按时间戳归并进时间线
+    rec.flush(tl, shared=True)     # 或：不同线程同时发生、互不冲突的事件共用同一段帧
+
+  - 每个线程第一次记录时登记一个自己的缓冲区，此后记录只是 (时间戳, …) 追加到本线程的列表，不加锁
+  - 时间戳取单调时钟 time.perf_counter_ns()；同一线程内天然有序，flush 时对各缓冲区做 k 路归并
+    （时间戳相同按线程登记顺序）
+  - flush 可以在工作线程仍在记录时调用：只取走调用时已写入的部分，之后的记录留给下一次 flush
+"""
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .events import Event
+from .timeline import Timeline, event_keys, keys_conflict
+
+
+@dataclass
+class Record:
+    ts_ns: int          # 单调时钟读数
+    thread: str         # 记录线程名
+    event: Event
+    thread_index: int = 0   # 线程登记序号（线程名可能重复，分组以此区分线程）
+
+
+class _Buffer:
+    __slots__ = ("index", "thread", "items")
+
+    def __init__(self, index: int, thread: str) -> None:
+        self.index = index
+        self.thread = thread
+        # (ts_ns, actor, etype, payload, duration, easing, note)
+        self.items: List[Tuple[Any, ...]] = []
+
+
+class ConcurrentRecorder:
+    """
+    线程安全的事件记录器；事件 API 与 Timeline 相同
+    （compare/swap/assign/highlight/mark_sorted/add）。
+    """
+
+    def __init__(self, clock: Callable[[], int] = time.perf_counter_ns) -> None:
+        self._clock = clock
+        self._local = threading.local()
+        self._buffers: List[_Buffer] = []
+        self._lock = threading.Lock()
+
+    def _buffer(self) -> _Buffer:
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            with self._lock:
+                buf = _Buffer(len(self._buffers), threading.current_thread().name)
+                self._buffers.append(buf)
+            self._local.buf = buf
+        return buf
+
+    # ===== 事件 API =====
+    def add(self, actor: str, etype: str, payload: Dict[str, Any], *, duration: int = 1,
+            easing: Optional[str] = None, note: Optional[str] = None) -> "ConcurrentRecorder":
+        self._buffer().items.append((self._clock(), actor, etype, payload, int(duration), easing,
+                                     note))
+        return self
+
+    # 便捷方法复用 Timeline 的实现（它们只构造 payload 再调用 self.add）
+    highlight = Timeline.highlight
+    compare = Timeline.compare
+    swap = Timeline.swap
+    assign = Timeline.assign
+    mark_sorted = Timeline.mark_sorted
+
+    # ===== 归并 =====
+    def __len__(self) -> int:
+        """尚未 flush 的事件数。"""
+        return sum(len(b.items) for b in list(self._buffers))
+
+    def _drain(self) -> Iterator[Record]:
+        with self._lock:
+            buffers = list(self._buffers)
+        streams = []
+        for b in buffers:
+            n = len(b.items)
+            items = b.items[:n]
+            del b.items[:n]  # 只删除已取走的前缀；记录线程此时追加的内容保留
+            streams.append(self._keyed(b, items))
+        for ts, index, _, thread, it in heapq.merge(*streams):
+            yield Record(ts, thread, Event(*it[1:]), index)
+
+    @staticmethod
+    def _keyed(b: _Buffer, items: List[Tuple[Any, ...]]) -> Iterator[Tuple[Any, ...]]:
+        for k, it in enumerate(items):
+            yield it[0], b.index, k, b.thread, it
+
+    def records(self) -> List[Record]:
+        """取走当前已记录的全部事件，按时间戳排序（不写入时间线）。"""
+        return list(self._drain())
+
+    def flush(self, timeline: Timeline, *, shared: bool = False, window_ns: Optional[int] = None,
+              tag_threads: bool = False) -> int:
+        """
+        把已记录的事件按时间戳顺序追加到 timeline，返回事件数。
+          shared       True 时把相邻的、来自不同线程且互不冲突（event_keys）的事件打包成一组共用帧
+                       （Timeline.add_group）；同一线程的事件总是先后发生
+          window_ns    shared 时一组内首尾事件的最大时间差（None 不限制）
+          tag_threads  在 note 前加上线程名
+        """
+        n = 0
+        group: List[Record] = []
+        keys: set = set()
+
+        def close() -> None:
+            timeline.add_group([r.event for r in group])
+            group.clear()
+            keys.clear()
+
+        for rec in self._drain():
+            n += 1
+            ev = rec.event
+            if tag_threads:
+                ev.note = f"{rec.thread}: {ev.note}" if ev.note else rec.thread
+            if not shared:
+                timeline._events.append(ev)
+                continue
+            k = event_keys(ev)
+            if group and (any(r.thread_index == rec.thread_index for r in group)
+                          or keys_conflict(keys, k)
+                          or (window_ns is not None and rec.ts_ns - group[0].ts_ns > window_ns)):
+                close()
+            group.append(rec)
+            keys |= k
+        if group:
+            close()
+        return n
@@ -1,15 +1,47 @@
 #algoviz/core/scene.py
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any, List, Protocol
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Sequence, Tuple
+from .camera import Camera, View, project
 from .drawops import DrawList, DrawOp
+from . import trace
 
 class Actor(Protocol):
     name: str
     def initial_state(self) -> Any: ...
     def draw(self, state: Any) -> DrawList: ...
-    # apply_event 返回：该事件持续的每一帧状态（长度=duration）与事件结束后要“持久化”的最终状态
-    def apply_event(self, state: Any, event_type: str, payload: Dict[str, Any], duration: int) -> tuple[List[Any], Any]: ...
+    # 事件接口按需实现，Timeline 编译时按 hasattr 查找（静态层可以都不实现）：
+    #   apply_event_step(state, etype, payload, t) -> 进度 t 处的状态，或
+    #   apply_event(state, etype, payload) -> 事件结束后的状态；可选 finalize_event 同后者
+
+
+@dataclass(frozen=True)
+class Layer:
+    """actor 的绘制层：z 小的在下（相同 z 按加入顺序）；static=True 表示绘制结果不随帧变化。"""
+    name: str
+    z: int = 0
+    static: bool = False
+
+
+class Decoration:
+    """
+    由固定绘制指令组成的静态层（背景、坐标轴、图例…）：不接收事件，后端只绘制一次并缓存。
+        scene.add(Decoration("bg", [Rect(0, 0, 320, 180, fill="#F7F9FC")], z=-1))
+    """
+
+    static = True
+
+    def __init__(self, name: str, ops: Iterable[DrawOp], *, z: int = -1) -> None:
+        self.name = name
+        self.ops = tuple(ops)
+        self.z = int(z)
+
+    def initial_state(self) -> None:
+        return None
+
+    def draw(self, state: Any) -> List[DrawOp]:
+        return list(self.ops)
+
 
 @dataclass
 class Scene:
@@ -21,16 +53,102 @@ class Scene:
         self.width = width
         self.height = height
         self.actors = {}
+        self.layers: Dict[str, Layer] = {}
+        self._idle: Dict[str, Any] = {}                   # 帧里没有的 actor：初始状态只取一次
+        self._bands: Optional[Tuple[Tuple[bool, Tuple[str, ...]], ...]] = None
+        self._static: Dict[Any, Any] = {}                 # 后端的静态层缓存（见 static_cache）
+        self.camera: Optional[str] = None                 # 相机 actor 的名字（见 camera.py）
 
-    def add(self, actor: Actor) -> "Scene":
+    def add(self, actor: Actor, *, z: Optional[int] = None,
+            static: Optional[bool] = None) -> "Scene":
+        """
+        加入 actor；z / static 未给出时取 actor 自身的同名属性（默认 0 / False）。
+        Camera 不占绘制层。
+        """
         if actor.name in self.actors:
             raise ValueError(f"Actor name duplicated: {actor.name}")
+        if isinstance(actor, Camera):
+            if self.camera is not None:
+                raise ValueError(f"Scene already has a camera: {self.camera}")
+            if actor.viewport is None:
+                actor.viewport = (self.width, self.height)
+            self.actors[actor.name] = actor
+            self.camera = actor.name
+            return self
         self.actors[actor.name] = actor
+        if z is None:
+            z = getattr(actor, "z", 0)
+        if static is None:
+            static = getattr(actor, "static", False)
+        self.layers[actor.name] = Layer(actor.name, int(z), bool(static))
+        self._bands = None
+        self._static.clear()
         return self
 
-    def render(self, frame_states: Dict[str, Any]) -> List[DrawOp]:
+    def ordered(self) -> List[str]:
+        """按 z 排序的 actor 名（稳定排序）。"""
+        return [name for band in self.bands() for name in band[1]]
+
+    def bands(self) -> Tuple[Tuple[bool, Tuple[str, ...]], ...]:
+        """
+        按 z 排序后把相邻的同类层合并为段：((是否静态, actor 名…), …)。
+        后端把静态段各绘制一次并缓存，每帧只绘制动态段再按顺序合成。
+        """
+        if self._bands is None:
+            layers = sorted((self.layers.get(name) or Layer(name)
+                             for name in self.actors if name != self.camera),
+                            key=lambda layer: layer.z)
+            out: List[Tuple[bool, List[str]]] = []
+            for layer in layers:
+                if out and out[-1][0] == layer.static:
+                    out[-1][1].append(layer.name)
+                else:
+                    out.append((layer.static, [layer.name]))
+            self._bands = tuple((static, tuple(names)) for static, names in out)
+        return self._bands
+
+    def state_of(self, name: str, frame_states: Dict[str, Any]) -> Any:
+        if name in frame_states:
+            return frame_states[name]
+        if name not in self._idle:
+            self._idle[name] = self.actors[name].initial_state()
+        return self._idle[name]
+
+    def view(self, frame_states: Dict[str, Any], px: float = 1.0) -> View:
+        """当前帧的可见世界矩形；没有相机时就是整个场景（缩放 1）。px 见 View。"""
+        if self.camera is None:
+            return View(0.0, 0.0, float(self.width), float(self.height), 1.0, px)
+        camera: Camera = self.actors[self.camera]  # type: ignore[assignment]
+        return camera.view(self.state_of(self.camera, frame_states), px)
+
+    def draw_layers(self, names: Sequence[str], frame_states: Dict[str, Any], *,
+                    px: float = 1.0) -> List[DrawOp]:
+        """
+        指定 actor 的绘制指令（按给出的顺序）。
+        实现了 draw_view(state, view) 的动态层只输出可见部分，有相机时再经 project 变换到画布坐标
+        并裁剪；静态层始终按画布坐标绘制。
+        px 为后端的“输出像素 / 场景单位”，供 actor 决定细节层次（见 ArrayBar 的 LOD）。
+        """
         ops: List[DrawOp] = []
-        for name, actor in self.actors.items():
-            state = frame_states.get(name, actor.initial_state())
-            ops.extend(actor.draw(state))
+        with trace.span("scene.render"):
+            view = self.view(frame_states, px)
+            for name in names:
+                actor, st = self.actors[name], self.state_of(name, frame_states)
+                layer = self.layers.get(name)
+                if layer is not None and layer.static:
+                    ops.extend(actor.draw(st))
+                    continue
+                out = actor.draw_view(st, view) if hasattr(actor, "draw_view") else actor.draw(st)  # type: ignore[attr-defined]
+                ops.extend(out if self.camera is None else project(out, view))
         return ops
+
+    def render(self, frame_states: Dict[str, Any], *, px: float = 1.0) -> List[DrawOp]:
+        """整帧的绘制指令（按 z 序；不做静态层缓存，供只需要指令列表的调用方使用）。"""
+        return self.draw_layers(self.ordered(), frame_states, px=px)
+
+    def static_cache(self, key: Any, build: Callable[[], Any]) -> Any:
+        """后端缓存静态段的绘制结果（栅格 / 字符画布 / SVG 组）；加入 actor 时整体失效。"""
+        hit = self._static.get(key)
+        if hit is None:
+            hit = self._static[key] = build()
+        return hit
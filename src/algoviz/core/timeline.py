@@ -3,8 +3,16 @@
 from __future__ import annotations
 
 
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional
+import bisect
+import itertools
+from array import array
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from . import trace
+from .events import PARALLEL, Event, EventList, EventTable, min_duration
+from .fingerprint import scene_signature
 
 # ====== Easing（默认：easeInOutCubic）======
 def _linear(t: float) -> float:
@@ -20,15 +28,117 @@ EASING: Dict[str, Callable[[float], float]] = {
 }
 DEFAULT_EASING = "easeInOutCubic"
 
+# 持久性事件：最后一帧体现落位（finalize 替换最后一帧）；其余为瞬时事件
+PERSISTENT_ETYPES = ("swap", "assign")
 
-@dataclass
-class Event:
-    actor: str
-    etype: str
-    payload: Dict[str, Any]
-    duration: int = 1     # 子步数
-    easing: Optional[str] = None
-    note: Optional[str] = None
+# 帧抽样方式（Timeline.sample_indices）
+SAMPLINGS = ("uniform", "keyframes")
+
+# 抽样访问（Timeline.iter_frames_at）每隔多少个事件保存一次基线状态检查点
+CHECKPOINT_EVERY = 16
+
+
+def uniform_indices(total: int, count: int) -> List[int]:
+    """从 total 帧中等间隔取 count 个帧序号（升序，最后一个总是 total-1）。"""
+    count = min(max(1, int(count)), total)
+    return [(q + 1) * total // count - 1 for q in range(count)]
+
+
+def event_keys(ev: Event) -> Set[Tuple[str, Any]]:
+    """
+    事件会读写的 (actor, 键)：槽位下标，或 "#compare"/"#highlight"/"#sorted" 这类整体字段；
+    未知事件类型保守地返回 (actor, "*")，与该 actor 上的任何事件都冲突。
+    """
+    p, a = ev.payload, ev.actor
+    if ev.etype in ("swap", "compare", "assign"):
+        keys = {(a, p[k]) for k in ("i", "j") if k in p}
+        if ev.etype == "compare":
+            keys.add((a, "#compare"))
+        return keys
+    if ev.etype == "highlight":
+        return {(a, "#highlight")}
+    if ev.etype == "mark_sorted":
+        return {(a, "#sorted")}
+    if ev.etype == PARALLEL:
+        return set().union(*(event_keys(Event(**m)) for m in p["events"]))
+    return {(a, "*")}
+
+
+def keys_conflict(a: Set[Tuple[str, Any]], b: Set[Tuple[str, Any]]) -> bool:
+    if a & b:
+        return True
+    wild_a = {actor for actor, k in a if k == "*"}
+    wild_b = {actor for actor, k in b if k == "*"}
+    return any(actor in wild_a for actor, _ in b) or any(actor in wild_b for actor, _ in a)
+
+
+def _track_spans(durations: Sequence[int],
+                 tracks: Sequence[int]) -> Tuple[List[Tuple[int, int]], int]:
+    """
+    组内布局：同一轨道上的成员首尾相接，各轨道从 0 开始并行。
+    返回每个成员的 [start, end) 与总帧数。
+    """
+    ends: Dict[int, int] = {}
+    spans: List[Tuple[int, int]] = []
+    for d, t in zip(durations, tracks):
+        start = ends.get(t, 0)
+        ends[t] = start + max(1, int(d))
+        spans.append((start, ends[t]))
+    return spans, max(ends.values(), default=1)
+
+
+def _fit_spans(spans: Sequence[Tuple[int, int]], tracks: Sequence[int], total: int,
+               steps: int) -> List[Tuple[int, int]]:
+    """把布局等比缩放到 steps 帧：边界取整后保证每个成员至少 1 帧、每条轨道不超出 steps。"""
+    f = steps / total
+    by_track: Dict[int, List[int]] = {}
+    for k, t in enumerate(tracks):
+        by_track.setdefault(t, []).append(k)
+    out = list(spans)
+    for idxs in by_track.values():
+        m = len(idxs)
+        bounds = [0] + [int(round(spans[k][1] * f)) for k in idxs]
+        for q in range(1, m + 1):
+            bounds[q] = max(bounds[q], bounds[q - 1] + 1)
+        for q in range(m, 0, -1):
+            bounds[q] = min(bounds[q], steps - (m - q))
+            bounds[q - 1] = min(bounds[q - 1], bounds[q] - 1) if q > 1 else 0
+        for q, k in enumerate(idxs):
+            out[k] = (bounds[q], bounds[q + 1])
+    return out
+
+
+def find_conflict(members: Sequence[Event],
+                  tracks: Sequence[int]) -> Optional[Tuple[Event, Event, Any]]:
+    """
+    找出不同轨道上时间重叠、且读写同一 (actor, 键) 的两个成员；返回 (a, b, 冲突键) 或 None。
+    同一轨道上的成员先后发生，不算冲突。
+    """
+    spans, _ = _track_spans([m.duration for m in members], tracks)
+    by_key: Dict[Tuple[str, Any], List[int]] = {}
+    wild: Dict[str, List[int]] = {}
+    keys = [event_keys(m) for m in members]
+    for k, ks in enumerate(keys):
+        for key in ks:
+            by_key.setdefault(key, []).append(k)
+            if key[1] == "*":
+                wild.setdefault(key[0], []).append(k)
+
+    def clash(a: int, b: int) -> bool:
+        return tracks[a] != tracks[b] and spans[a][0] < spans[b][1] and spans[b][0] < spans[a][1]
+
+    for key, idxs in by_key.items():
+        for x in range(len(idxs)):
+            for y in range(x + 1, len(idxs)):
+                if clash(idxs[x], idxs[y]):
+                    return members[idxs[x]], members[idxs[y]], key[1]
+    for actor, idxs in wild.items():
+        others = [k for k, ks in enumerate(keys) if any(a == actor for a, _ in ks)]
+        for a in idxs:
+            for b in others:
+                if a != b and clash(a, b):
+                    return members[a], members[b], "*"
+    return None
 
 
 @dataclass
@@ -37,15 +147,59 @@ class Frame:
     note: Optional[str] = None
 
 
+class ParallelBlock:
+    """
+    tl.parallel() 块内收集的事件：默认每个事件单独一条轨道；
+    在 block.track() 内追加的事件同属一条轨道。
+    """
+
+    def __init__(self) -> None:
+        self.tracks: List[List[Event]] = []
+        self._current: Optional[List[Event]] = None
+
+    def add(self, ev: Event) -> None:
+        if self._current is None:
+            self.tracks.append([ev])
+        else:
+            self._current.append(ev)
+
+    @contextmanager
+    def track(self) -> Iterator["ParallelBlock"]:
+        """块内的一条轨道：其中的事件依次进行，与其他轨道并行。"""
+        if self._current is not None:
+            raise RuntimeError("parallel tracks cannot be nested")
+        self._current = []
+        self.tracks.append(self._current)
+        try:
+            yield self
+        finally:
+            self._current = None
+
+    def members(self) -> Tuple[List[Event], List[int]]:
+        evs: List[Event] = []
+        ids: List[int] = []
+        for t, track in enumerate(x for x in self.tracks if x):
+            evs.extend(track)
+            ids.extend([t] * len(track))
+        return evs, ids
+
+
 class Timeline:
     def __init__(self, fps: int = 20) -> None:
         self.fps = int(fps)
-        self._events: List[Event] = []
+        self._events = EventList()
+        self._parallel: Optional[ParallelBlock] = None
+        # iter_frames_at 的定位表：(场景指纹, 事件数, 各事件的累计帧数, 检查点基线状态)
+        self._seek: Optional[Tuple[str, int, "array[int]", List[Dict[str, Any]]]] = None
 
     # ===== 事件 API =====
     def add(self, actor: str, etype: str, payload: Dict[str, Any],
             *, duration: int = 1, easing: Optional[str] = None, note: Optional[str] = None) -> "Timeline":
-        self._events.append(Event(actor, etype, payload, int(duration), easing, note))
+        ev = Event(actor, etype, payload, int(duration), easing, note)
+        if self._parallel is not None:
+            self._parallel.add(ev)
+        else:
+            self._events.append(ev)
         return self
 
     def highlight(self, actor: str, *,
@@ -92,17 +246,166 @@ class Timeline:
             raise TypeError("assign(): missing j or value")
         return self.add(actor, "assign", payload, duration=duration, easing=easing, note=note)
 
+    def extend_bulk(self, actor: str, etypes: Any, i: Any, j: Any = None,
+                    durations: Any = None, *, values: Any = None,
+                    easing: Optional[str] = None, notes: Any = None) -> "Timeline":
+        """
+        批量追加事件（列式存储，不逐条创建 Event/payload）：
+          etypes     单个事件类型字符串，或与 i 等长的序列/数组
+          i, j       整数数组或序列（j 可省略）；payload 与逐条 API 相同，
+                     如 swap/compare -> {"i","j"}，highlight -> {"idx"} 或
+                     {"start","end"}（j 给出时），mark_sorted -> {"upto": i}
+          durations  整数或数组；省略时按 etype 取逐条 API 的默认值（swap 10、assign 8、其余 1）
+          values     assign 的常量值（j 缺省的行使用）；easing 为整批共用的缓动名
+          notes      None、单个字符串或与 i 等长的序列（相同字符串只存一份）
+        """
+        table = EventTable.from_columns(actor, etypes, i, j, durations, values=values,
+                                        easing=easing, notes=notes)
+        if self._parallel is not None:
+            for ev in table.rows():
+                self._parallel.add(ev)
+        else:
+            self._events.add_table(table)
+        return self
+
+    def add_source(self, source: Any) -> "Timeline":
+        """
+        追加一个惰性事件段（如 algoviz.io.trace.TraceSource）：事件在构帧时才从源中逐条读出。
+        源需实现与 EventTable 相同的段接口
+        （len/rows/row/frame_count/scaled/set_default_easing/update_hash）。
+        """
+        if self._parallel is not None:
+            raise RuntimeError("add_source() cannot be used inside parallel()")
+        self._events.add_table(source)
+        return self
+
+    def add_group(self, events: Sequence[Event], *, tracks: Optional[Sequence[int]] = None,
+                  note: Optional[str] = None) -> "Timeline":
+        """
+        追加一组同时进行的事件，它们共用同一段帧。
+        tracks 给出每个成员的轨道号：同一轨道上的成员首尾相接，不同轨道并行；
+        省略时每个成员单独一条轨道。帧数 = 最长轨道的总 duration。
+        不检查冲突（见 parallel()）；单个成员时等价于直接追加该事件。
+        """
+        members = list(events)
+        if self._parallel is not None:
+            raise RuntimeError("add_group() cannot be used inside parallel()")
+        if not members:
+            return self
+        if len(members) == 1:
+            self._events.append(members[0])
+            return self
+        ids = list(range(len(members))) if tracks is None else [int(t) for t in tracks]
+        if len(ids) != len(members):
+            raise ValueError("tracks must have one entry per event")
+        _, total = _track_spans([m.duration for m in members], ids)
+        notes = [m.note for m in members if m.note]
+        payload: Dict[str, Any] = {"events": [asdict(m) for m in members]}
+        if tracks is not None:
+            payload["tracks"] = ids
+        self._events.append(Event(members[0].actor, PARALLEL, payload, total, None,
+                                  note if note is not None else (" | ".join(notes) or None)))
+        return self
+
+    @contextmanager
+    def parallel(self, *, on_conflict: str = "error",
+                 note: Optional[str] = None) -> Iterator[ParallelBlock]:
+        """
+        块内追加的事件同时进行、共用帧：
+
+            with tl.parallel():                 # 每个事件一条轨道
+                tl.swap("A", 0, 1); tl.swap("A", 2, 3)
+            with tl.parallel() as p:            # 轨道内依次进行，轨道之间并行
+                with p.track(): tl.compare("A", 0, 1); tl.swap("A", 0, 1)
+                with p.track(): tl.swap("B", 4, 5)
+
+        退出时检查冲突（不同轨道上时间重叠、且读写同一 actor 槽位/字段的事件，见 event_keys）：
+        on_conflict="error" 抛 ValueError；"sequential" 放弃并行，把块内事件按追加顺序依次加入。
+        块内抛出异常时丢弃块内事件。
+        """
+        if on_conflict not in ("error", "sequential"):
+            raise ValueError("on_conflict must be 'error' or 'sequential'")
+        if self._parallel is not None:
+            raise RuntimeError("parallel() blocks cannot be nested")
+        block = self._parallel = ParallelBlock()
+        try:
+            yield block
+        finally:
+            self._parallel = None
+        members, ids = block.members()
+        clash = find_conflict(members, ids)
+        if clash is None:
+            self.add_group(members, tracks=ids if len(set(ids)) < len(ids) else None, note=note)
+            return
+        if on_conflict == "error":
+            a, b, key = clash
+            raise ValueError(f"parallel(): {a.etype}{a.payload} and {b.etype}{b.payload} "
+                             f"both touch actor '{a.actor}' ({key})")
+        for track in block.tracks:
+            for ev in track:
+                self._events.append(ev)
+
+    def set_default_easing(self, name: str) -> None:
+        """未显式指定 easing 的事件统一改用 name。"""
+        self._seek = None
+        for seg in self._events.segments:
+            if isinstance(seg, list):
+                for ev in seg:
+                    if ev.easing is None:
+                        ev.easing = name
+            else:
+                seg.set_default_easing(name)
+
     def mark_sorted(self, actor: str, upto: int, *, duration: int = 1, note: Optional[str] = None) -> "Timeline":
         return self.add(actor, "mark_sorted", {"upto": int(upto)}, duration=duration, note=note)
 
     def scaled(self, factor: float) -> "Timeline":
         f = max(0.01, float(factor))
         nt = Timeline(self.fps)
-        for ev in self._events:
-            dur = max(1, int(round(ev.duration * f)))
-            nt._events.append(Event(ev.actor, ev.etype, ev.payload, dur, ev.easing, ev.note))
+        for seg in self._events.segments:
+            if not isinstance(seg, list):
+                nt._events.add_table(seg.scaled(f))
+                continue
+            for ev in seg:
+                dur = max(min_duration(ev.etype, ev.payload), int(round(ev.duration * f)))
+                nt._events.append(Event(ev.actor, ev.etype, ev.payload, dur, ev.easing, ev.note))
         return nt
 
+    def paced(self, max_frames: Optional[int] = None, *, seconds: Optional[float] = None,
+              weights: Optional[Dict[str, float]] = None) -> "Timeline":
+        """
+        按总帧数（或 seconds × fps）压缩节奏的视图（见 core/pacing.py）：swap/assign 尽量保留动画，
+        成串的 compare 只抽样显示。weights 覆盖各事件类型的权重
+        （默认 compare 0.1、highlight/mark_sorted 0.5、其余 1）。原时间线不超过预算时直接返回自身。
+        """
+        from .pacing import PacedTimeline
+
+        if max_frames is None and seconds is None:
+            raise TypeError("paced() requires max_frames or seconds")
+        budgets = [int(max_frames)] if max_frames is not None else []
+        if seconds is not None:
+            budgets.append(int(round(float(seconds) * self.fps)))
+        budget = max(1, min(budgets))
+        if self.frame_count() <= budget:
+            return self
+        return PacedTimeline(self, budget, weights)
+
+    # ===== 存档 =====
+    def save(self, path: str) -> None:
+        """保存为紧凑的列式二进制文件（格式见 core/tlfile.py）；payload 需可 JSON 序列化。"""
+        from . import tlfile
+        tlfile.save(path, self.fps, self._events.segments)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "Timeline":
+        """读取 save() 的文件；mmap=True 时各列以只读内存映射打开，事件在构帧时才按块解码。"""
+        from . import tlfile
+        fps, tables = tlfile.load(path, mmap=mmap)
+        tl = cls(fps)
+        for t in tables:
+            tl._events.add_table(t)
+        return tl
+
     # ===== 场景辅助 =====
     @staticmethod
     def _resolve_actor(scene: Any, name: str) -> Any:
@@ -135,45 +438,238 @@ class Timeline:
         return states
 
     # ===== 编译为帧序列 =====
-    def build_frames(self, scene: Any) -> List[Frame]:
-        frames: List[Frame] = []
-        states: Dict[str, Any] = self._initial_states(scene)
+    def frame_count(self) -> int:
+        """编译后的总帧数（无需真正构帧；每个事件至少 1 帧）。"""
+        return self._events.frame_count()
 
-        for ev in self._events:
-            actor = self._resolve_actor(scene, ev.actor)
-            steps = max(1, int(ev.duration))
-            easing_name = ev.easing or DEFAULT_EASING
-            easing_fn = EASING.get(easing_name, _linear)
-
-            for k in range(steps):
-                t = (k + 1) / steps
-                ns = dict(states)  # 浅拷贝映射
-                st = ns[ev.actor]
-                if hasattr(actor, "apply_event_step"):
-                    ns[ev.actor] = actor.apply_event_step(st, ev.etype, ev.payload, easing_fn(t))  # type: ignore[attr-defined]
-                elif hasattr(actor, "apply_event"):
-                    ns[ev.actor] = actor.apply_event(st, ev.etype, ev.payload)  # type: ignore[attr-defined]
-                else:
-                    raise AttributeError(f"actor '{ev.actor}' has no apply_event[_step]()")
-                frames.append(Frame(states=ns, note=ev.note))
-
-            # finalize：根据事件类型决定是否“替换最后一帧”
+    @staticmethod
+    def _event_frames(actor: Any, ev: Event,
+                      states: Dict[str, Any]) -> Tuple[List[Frame], Dict[str, Any]]:
+        """编译单个事件：返回该事件的帧，以及下一事件的基线状态。"""
+        out: List[Frame] = []
+        steps = max(1, int(ev.duration))
+        easing_name = ev.easing or DEFAULT_EASING
+        easing_fn = EASING.get(easing_name, _linear)
+
+        for k in range(steps):
+            t = (k + 1) / steps
+            ns = dict(states)  # 浅拷贝映射
+            st = ns[ev.actor]
+            if hasattr(actor, "apply_event_step"):
+                ns[ev.actor] = actor.apply_event_step(st, ev.etype, ev.payload, easing_fn(t))  # type: ignore[attr-defined]
+            elif hasattr(actor, "apply_event"):
+                ns[ev.actor] = actor.apply_event(st, ev.etype, ev.payload)  # type: ignore[attr-defined]
+            else:
+                raise AttributeError(f"actor '{ev.actor}' has no apply_event[_step]()")
+            out.append(Frame(states=ns, note=ev.note))
+
+        # finalize：根据事件类型决定是否“替换最后一帧”
+        if hasattr(actor, "finalize_event"):
+            last_states = dict(out[-1].states)
+            finalized_actor = actor.finalize_event(last_states[ev.actor], ev.etype, ev.payload)  # type: ignore[attr-defined]
+
+            if ev.etype in ("swap", "assign"):
+                # 持久性事件：最后一帧需体现已落位
+                replaced = dict(out[-1].states)
+                replaced[ev.actor] = finalized_actor
+                out[-1] = Frame(states=replaced, note=ev.note)
+                states = replaced
+            else:
+                # 瞬时事件（如 compare）：不改最后一帧，但更新下一事件的基线
+                base_next = dict(out[-1].states)
+                base_next[ev.actor] = finalized_actor
+                states = base_next
+        else:
+            states = dict(out[-1].states)
+        return out, states
+
+    @staticmethod
+    def _group_frames(resolve: Callable[[str], Any], ev: Event,
+                      states: Dict[str, Any]) -> Tuple[List[Frame], Dict[str, Any]]:
+        """
+        编译组合事件：成员逐帧叠加在同一份状态上。成员按轨道布局
+        （_track_spans，组的 duration 与布局总长不同时等比缩放），语义与逐个编译一致——
+        持久性成员在其最后一帧落位，瞬时成员的 finalize 只影响后续帧的基线。
+        """
+        members = [Event(**m) for m in ev.payload["events"]]
+        tracks = ev.payload.get("tracks") or list(range(len(members)))
+        spans, total = _track_spans([m.duration for m in members], tracks)
+        steps = max(min_duration(ev.etype, ev.payload), int(ev.duration))
+        if steps != total:
+            spans = _fit_spans(spans, tracks, total, steps)
+        actors = [resolve(m.actor) for m in members]
+        eases = [EASING.get(m.easing or ev.easing or DEFAULT_EASING, _linear) for m in members]
+
+        def step(k: int, st: Any, t: float) -> Any:
+            actor, m = actors[k], members[k]
+            if hasattr(actor, "apply_event_step"):
+                return actor.apply_event_step(st, m.etype, m.payload, eases[k](t))
+            if hasattr(actor, "apply_event"):
+                return actor.apply_event(st, m.etype, m.payload)
+            raise AttributeError(f"actor '{m.actor}' has no apply_event[_step]()")
+
+        def settle(k: int, st: Any) -> Any:
+            actor, m = actors[k], members[k]
+            st = step(k, st, 1.0)
             if hasattr(actor, "finalize_event"):
-                last_states = dict(frames[-1].states)
-                finalized_actor = actor.finalize_event(last_states[ev.actor], ev.etype, ev.payload)  # type: ignore[attr-defined]
-
-                if ev.etype in ("swap", "assign"):
-                    # 持久性事件：最后一帧需体现已落位
-                    replaced = dict(frames[-1].states)
-                    replaced[ev.actor] = finalized_actor
-                    frames[-1] = Frame(states=replaced, note=ev.note)
-                    states = replaced
-                else:
-                    # 瞬时事件（如 compare）：不改最后一帧，但更新下一事件的基线
-                    base_next = dict(frames[-1].states)
-                    base_next[ev.actor] = finalized_actor
-                    states = base_next
+                return actor.finalize_event(st, m.etype, m.payload)
+            return st
+
+        carry = dict(states)
+        out: List[Frame] = []
+        for s in range(steps):
+            ending = [k for k, (_, e) in enumerate(spans) if e == s + 1]
+            landed = {k for k in ending if members[k].etype in PERSISTENT_ETYPES}
+            for k in landed:
+                carry[members[k].actor] = settle(k, carry[members[k].actor])
+            ns = dict(carry)
+            for k, (b, e) in enumerate(spans):
+                if b <= s < e and k not in landed:
+                    ns[members[k].actor] = step(k, ns[members[k].actor], (s - b + 1) / (e - b))
+            out.append(Frame(states=ns, note=ev.note))
+            for k in ending:
+                if k not in landed:
+                    carry[members[k].actor] = settle(k, carry[members[k].actor])
+        return out, carry
+
+    def _compiler(self, scene: Any) -> Callable[[Event, Dict[str, Any]],
+                                                Tuple[List[Frame], Dict[str, Any]]]:
+        """
+        返回编译单个事件的函数（带 actor 解析缓存）：
+        (事件, 基线状态) -> (帧, 下一事件的基线状态)。
+        """
+        actors: Dict[str, Any] = {}
+
+        def resolve(name: str) -> Any:
+            actor = actors.get(name)
+            if actor is None:
+                actor = actors[name] = self._resolve_actor(scene, name)
+            return actor
+
+        def compile_one(ev: Event, states: Dict[str, Any]) -> Tuple[List[Frame], Dict[str, Any]]:
+            if ev.etype == PARALLEL:
+                return self._group_frames(resolve, ev, states)
+            return self._event_frames(resolve(ev.actor), ev, states)
+
+        return compile_one
+
+    def iter_events(self, scene: Any, start: int = 0, states: Optional[Dict[str, Any]] = None
+                    ) -> Iterator[Tuple[int, Dict[str, Any], List[Frame]]]:
+        """
+        逐事件编译：产出 (事件序号, 该事件开始前的基线状态, 该事件的帧)。
+        传入 start 与对应的基线 states 即可从检查点继续编译（增量重编译使用）。
+        """
+        if states is None:
+            if start:
+                raise ValueError("iter_events(start>0) requires the baseline states of that event")
+            states = self._initial_states(scene)
+        return self._iter_compiled(self._compiler(scene), start, states)
+
+    def _iter_compiled(self, compile_one: Callable[[Event, Dict[str, Any]],
+                                                   Tuple[List[Frame], Dict[str, Any]]],
+                       start: int, states: Dict[str, Any]
+                       ) -> Iterator[Tuple[int, Dict[str, Any], List[Frame]]]:
+        tr = trace.active()
+        for k, ev in enumerate(self._events.iter_from(start), start):
+            base = states
+            if tr is None:
+                out, states = compile_one(ev, states)
             else:
-                states = dict(frames[-1].states)
+                with tr.span("compile_event", etype=ev.etype):
+                    out, states = compile_one(ev, states)
+                tr.count("frames_compiled", len(out))
+            yield k, base, out
+
+    # ===== 抽样访问 =====
+    def _event_frame_counts(self) -> Iterator[int]:
+        """按事件顺序产出每个事件占的帧数。"""
+        for ev in self._events:
+            yield max(1, int(ev.duration))
 
-        return frames
+    def sample_indices(self, max_frames: int, sampling: str = "uniform") -> List[int]:
+        """
+        选出不超过 max_frames 个帧序号（升序，总包含最后一帧）；
+        总帧数不超过 max_frames 时返回全部帧：
+          uniform    等间隔抽取
+          keyframes  只取各事件的最后一帧（swap/assign 已落位、compare/highlight 已显示），
+                     事件多于 max_frames 时在这些帧中等间隔抽取
+        """
+        if sampling not in SAMPLINGS:
+            expected = ", ".join(SAMPLINGS)
+            raise ValueError(f"unknown sampling: {sampling} (expected one of {expected})")
+        total = self.frame_count()
+        if total <= max_frames:
+            return list(range(total))
+        if sampling == "uniform":
+            return uniform_indices(total, max_frames)
+        ends = sorted({e - 1 for e in itertools.accumulate(self._event_frame_counts()) if e > 0})
+        return [ends[k] for k in uniform_indices(len(ends), max_frames)]
+
+    def _seek_table(self, scene: Any) -> Tuple["array[int]", List[Dict[str, Any]]]:
+        """
+        (各事件结束处的累计帧数, 检查点)；检查点 c 是第 c×CHECKPOINT_EVERY 个事件开始前的基线状态，
+        在 iter_frames_at 推进时逐个补齐。事件数或场景配置变化后重建。
+        """
+        sig = scene_signature(scene)
+        seek = self._seek
+        if seek is None or seek[0] != sig or seek[1] != len(self._events):
+            ends = array("q", itertools.accumulate(self._event_frame_counts()))
+            seek = self._seek = (sig, len(self._events), ends, [self._initial_states(scene)])
+        return seek[2], seek[3]
+
+    @staticmethod
+    def _compile_at(compile_one: Callable[[Event, Dict[str, Any]],
+                                          Tuple[List[Frame], Dict[str, Any]]],
+                    ev: Event, f: int, states: Dict[str, Any]
+                    ) -> Tuple[List[Frame], Dict[str, Any]]:
+        """按 f 帧编译一个事件；f<=0 时只推进状态（编译为最短形式后丢弃帧）。"""
+        if f > 0:
+            return compile_one(ev, states)
+        low = min_duration(ev.etype, ev.payload)
+        _, nxt = compile_one(ev if ev.duration == low else replace(ev, duration=low), states)
+        return [], nxt
+
+    def iter_frames_at(self, scene: Any, indices: Sequence[int]) -> Iterator[Frame]:
+        """
+        只构造 indices 处的帧（按帧序号升序产出）。每个所选帧先按累计帧数定位到所在事件，
+        再从该事件之前最近的检查点（或当前位置，若更近）出发：途经的事件以最短形式编译、只推进状态，
+        所在事件正常编译后取出所需帧；两个所选帧之间的其余事件直接跳过。
+        检查点（每 CHECKPOINT_EVERY 个事件一个）随推进补齐并缓存在时间线上，
+        首次访问某段时仍要顺序推进到那里；之后同一场景上的抽样代价为
+        O(所选帧数 × CHECKPOINT_EVERY)，与事件总数无关。
+        """
+        wanted = sorted({int(i) for i in indices})
+        if not wanted:
+            return
+        if wanted[0] < 0 or wanted[-1] >= self.frame_count():
+            bad = wanted[0] if wanted[0] < 0 else wanted[-1]
+            raise IndexError(f"frame index out of range: {bad}")
+        ends, marks = self._seek_table(scene)
+        compile_one = self._compiler(scene)
+        k, states = 0, marks[0]      # 当前位置：states 是第 k 个事件开始前的基线
+        q = 0
+        while q < len(wanted):
+            e = bisect.bisect_right(ends, wanted[q])     # 所选帧所在的事件
+            c = min(e // CHECKPOINT_EVERY, len(marks) - 1)
+            if not c * CHECKPOINT_EVERY <= k <= e:
+                k, states = c * CHECKPOINT_EVERY, marks[c]
+            for ev in self._events.iter_from(k):
+                start = ends[k - 1] if k else 0
+                out, nxt = self._compile_at(compile_one, ev, (ends[k] - start) * (k == e), states)
+                while q < len(wanted) and wanted[q] < ends[k]:
+                    yield out[wanted[q] - start]
+                    q += 1
+                k, states = k + 1, nxt
+                if k % CHECKPOINT_EVERY == 0 and k // CHECKPOINT_EVERY == len(marks):
+                    marks.append(states)
+                if k > e:
+                    break
+
+    def iter_frames(self, scene: Any) -> Iterator[Frame]:
+        """逐事件增量编译并产出帧（供渐进播放/流式导出使用）。"""
+        for _, _, out in self.iter_events(scene):
+            yield from out
+
+    def build_frames(self, scene: Any) -> List[Frame]:
+        with trace.span("build_frames"):
+            return list(self.iter_frames(scene))
@@ -0,0 +1,134 @@
+#src/algoviz/core/tlfile.py
+"""
+Timeline 的紧凑二进制存档（Timeline.save / Timeline.load）。
+
+文件布局（小端）：
+  8 字节魔数 b"AVZTL\\0\\0\\1" | uint32 头长度 | UTF-8 JSON 头 | 填充到 64 字节对齐 |
+  各列数据（每列 64 字节对齐）
+JSON 头：
+  {"version": 1, "fps": 20, "events": N,
+   "segments": [{"n": ..., "actors": [...], "etypes": [...], "easings": [...], "notes": [...],
+                 "payloads": [...], "columns": {"i": {"dtype": "<i4", "offset": ...}, ...}}, ...]}
+每段就是一个 EventTable（列含义见 core/events.py）；逐条 API 记录的 Event 列表段在保存时编码成表，
+惰性事件源（日志文件）按块编码成多个表。
+加载时 mmap=True 直接把各列映射为只读 np.memmap 视图：打开 10M 事件的文件只需解析头，
+事件在构帧时按块解码，只有被访问到的页才会读入内存。
+"""
+from __future__ import annotations
+
+import json
+import os
+import struct
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+from .events import EventTable
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MAGIC = b"AVZTL\0\0\1"
+VERSION = 1
+_ALIGN = 64
+
+
+def _pad(n: int) -> int:
+    return -n % _ALIGN
+
+
+def _tables(segments: List[Any]) -> List[EventTable]:
+    out: List[EventTable] = []
+    for seg in segments:
+        if isinstance(seg, list):
+            parts = [EventTable.from_events(seg)]
+        elif isinstance(seg, EventTable):
+            parts = [seg]
+        else:  # 惰性事件源：分块编码，不整体读入内存
+            parts = list(seg.tables())
+        out.extend(t for t in parts if len(t))
+    return out
+
+
+def save(path: str | os.PathLike, fps: int, segments: List[Any]) -> None:
+    import numpy as np
+
+    tables = _tables(segments)
+    layout: List[Tuple[Dict[str, Any], List["np.ndarray"]]] = []
+    offset = 0  # 相对数据区起点
+    for t in tables:
+        cols: Dict[str, Any] = {}
+        arrays = []
+        for name in EventTable.COLUMNS + EventTable.OPTIONAL:
+            col = t.cols.get(name)
+            if col is None:
+                continue
+            arr = np.ascontiguousarray(col)
+            arr = arr.astype(arr.dtype.newbyteorder("<"), copy=False)
+            cols[name] = {"dtype": arr.dtype.str, "offset": offset}
+            arrays.append(arr)
+            offset += arr.nbytes + _pad(arr.nbytes)
+        layout.append(({"n": len(t), "actors": t.actors, "etypes": t.etypes, "easings": t.easings,
+                        "notes": t.notes, "payloads": t.payloads, "columns": cols}, arrays))
+
+    head = {"version": VERSION, "fps": int(fps), "events": sum(len(t) for t in tables),
+            "segments": [meta for meta, _ in layout]}
+    header = json.dumps(head, ensure_ascii=False).encode("utf-8")
+    prefix = len(MAGIC) + 4 + len(header)
+    tmp = os.fspath(path) + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            f.write(b"\0" * _pad(prefix))
+            for _, arrays in layout:
+                for arr in arrays:
+                    f.write(arr.data.cast("B"))
+                    f.write(b"\0" * _pad(arr.nbytes))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def load(path: str | os.PathLike, mmap: bool = True) -> Tuple[int, List[EventTable]]:
+    """返回 (fps, 表段列表)；mmap=False 时把所有列一次读入内存。"""
+    import numpy as np
+
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic[:5] != MAGIC[:5]:
+            raise ValueError(f"not an algoviz timeline file: {os.fspath(path)}")
+        (hlen,) = struct.unpack("<I", f.read(4))
+        head = json.loads(f.read(hlen).decode("utf-8"))
+    if head.get("version") != VERSION:
+        raise ValueError(f"unsupported timeline file version: {head.get('version')}")
+    base = len(MAGIC) + 4 + hlen
+    base += _pad(base)
+
+    if mmap:
+        size = os.path.getsize(path)
+        buf: Any = np.empty(0, np.uint8)
+        if size > base:
+            buf = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        with open(path, "rb") as f:
+            buf = np.frombuffer(f.read(), dtype=np.uint8)
+
+    tables: List[EventTable] = []
+    for seg in head["segments"]:
+        n = int(seg["n"])
+        cols: Dict[str, Any] = {}
+        for name, spec in seg["columns"].items():
+            dt = np.dtype(spec["dtype"])
+            start = base + int(spec["offset"])
+            stop = start + n * dt.itemsize
+            if stop > len(buf):
+                raise ValueError(f"truncated timeline file: {os.fspath(path)}")
+            cols[name] = buf[start:stop].view(dt)
+        tables.append(EventTable(cols, actors=seg["actors"], etypes=seg["etypes"],
+                                 easings=seg["easings"], notes=seg["notes"],
+                                 payloads=seg["payloads"]))
+    return int(head["fps"]), tables
@@ -0,0 +1,195 @@
+#src/algoviz/core/trace.py
+"""
+轻量插桩：span（区间）+ counter（计数）回调。
+
+    from algoviz.core import trace
+    agg, chrome = trace.Aggregator(), trace.ChromeTrace()
+    with trace.tracing(agg, chrome):
+        export_gif(scene, tl, "out.gif")
+    print(agg.report())
+    chrome.dump("trace.json")        # chrome://tracing / Perfetto 可直接打开
+
+关闭时（不在 tracing() 内）插桩点只做一次 `_ACTIVE is None` 判断；
+热循环里应先取 active() 到局部变量再判断。
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Tuple
+
+
+class Sink(Protocol):
+    def on_span(self, name: str, start: float, end: float, attrs: Dict[str, Any]) -> None: ...
+    def on_counter(self, name: str, value: float, ts: float) -> None: ...
+
+
+class _Span:
+    __slots__ = ("_tracer", "_name", "_attrs", "_t0")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._attrs = attrs
+        self._t0 = 0.0
+
+    def __enter__(self) -> "_Span":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        t1 = time.perf_counter()
+        for s in self._tracer.sinks:
+            s.on_span(self._name, self._t0, t1, self._attrs)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    def __init__(self, *sinks: Sink) -> None:
+        self.sinks: Tuple[Sink, ...] = tuple(sinks)
+
+    def span(self, name: str, **attrs: Any) -> _Span:
+        return _Span(self, name, attrs)
+
+    def count(self, name: str, value: float = 1) -> None:
+        ts = time.perf_counter()
+        for s in self.sinks:
+            s.on_counter(name, value, ts)
+
+
+# 进程级当前 tracer（None = 关闭）；后台编译/预渲染线程同样可见
+_ACTIVE: Optional[Tracer] = None
+
+
+def active() -> Optional[Tracer]:
+    return _ACTIVE
+
+
+def span(name: str, **attrs: Any) -> Any:
+    tr = _ACTIVE
+    return _NULL_SPAN if tr is None else tr.span(name, **attrs)
+
+
+def count(name: str, value: float = 1) -> None:
+    tr = _ACTIVE
+    if tr is not None:
+        tr.count(name, value)
+
+
+@contextmanager
+def tracing(*sinks: Sink) -> Iterator[Tracer]:
+    """在 with 块内启用插桩；可嵌套，退出时恢复外层 tracer。"""
+    global _ACTIVE
+    prev = _ACTIVE
+    tr = Tracer(*sinks)
+    _ACTIVE = tr
+    try:
+        yield tr
+    finally:
+        _ACTIVE = prev
+
+
+# --------------------- 内置 sink ---------------------
+
+def _percentile(sorted_vals: List[float], p: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    k = (len(sorted_vals) - 1) * p
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_vals) - 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (k - lo)
+
+
+class Aggregator:
+    """按阶段聚合：次数、总耗时、p50/p95/max，以及吞吐（次/秒，逐帧阶段即帧/秒）。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.durations: Dict[str, List[float]] = {}
+        self.counters: Dict[str, float] = {}
+
+    def on_span(self, name: str, start: float, end: float, attrs: Dict[str, Any]) -> None:
+        with self._lock:
+            self.durations.setdefault(name, []).append(end - start)
+
+    def on_counter(self, name: str, value: float, ts: float) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0.0) + value
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        out: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            items = [(k, sorted(v)) for k, v in self.durations.items()]
+        for name, vals in items:
+            total = sum(vals)
+            out[name] = {
+                "count": len(vals),
+                "total": total,
+                "p50": _percentile(vals, 0.50),
+                "p95": _percentile(vals, 0.95),
+                "max": vals[-1],
+                "rate": len(vals) / total if total > 0 else 0.0,
+            }
+        return out
+
+    def report(self) -> str:
+        st = self.stats()
+        header = f"{'stage':<20}{'count':>8}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'/s':>10}"
+        lines = [header, "-" * len(header)]
+        for name in sorted(st, key=lambda k: -st[k]["total"]):
+            s = st[name]
+            lines.append(f"{name:<20}{int(s['count']):>8}{s['total']:>10.3f}"
+                         f"{s['p50'] * 1e3:>10.3f}{s['p95'] * 1e3:>10.3f}{s['rate']:>10.1f}")
+        for name, v in sorted(self.counters.items()):
+            lines.append(f"{name:<20}{v:>8g}")
+        return "\n".join(lines)
+
+
+class ChromeTrace:
+    """收集为 Chrome trace-event 格式（ph=X 区间事件 / ph=C 计数事件）。"""
+
+    def __init__(self) -> None:
+        self.events: List[Dict[str, Any]] = []
+        self._pid = os.getpid()
+        self._t0 = time.perf_counter()
+        self._totals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _us(self, t: float) -> float:
+        return round((t - self._t0) * 1e6, 3)
+
+    def on_span(self, name: str, start: float, end: float, attrs: Dict[str, Any]) -> None:
+        ev = {"name": name, "cat": "algoviz", "ph": "X", "ts": self._us(start),
+              "dur": round((end - start) * 1e6, 3), "pid": self._pid, "tid": threading.get_ident()}
+        if attrs:
+            ev["args"] = {k: (v if isinstance(v, (int, float, str, bool)) else repr(v))
+                          for k, v in attrs.items()}
+        self.events.append(ev)
+
+    def on_counter(self, name: str, value: float, ts: float) -> None:
+        with self._lock:
+            total = self._totals[name] = self._totals.get(name, 0.0) + value
+        self.events.append({"name": name, "cat": "algoviz", "ph": "C", "ts": self._us(ts),
+                            "pid": self._pid, "args": {name: total}})
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f)
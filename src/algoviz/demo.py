@@ -0,0 +1,59 @@
+#algoviz/demo.py
+"""
+demo 文件的加载与通用参数解析：CLI、batch、serve、watch 共用，不依赖 argparse。
+
+    scene, tl = load_demo("demos/sort_bubble_full.py")   # 执行 demo 的 build()
+    apply_easing(tl, "linear")                           # 未显式设置 easing 的事件改用该缓动
+    parse_size("640x360")                                # -> (640, 360)
+"""
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from .core.timeline import EASING, Timeline
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    """解析 "宽x高"（正整数）；格式不对时抛 ValueError。"""
+    try:
+        w_str, h_str = text.lower().split("x")
+        w, h = int(w_str), int(h_str)
+    except ValueError:
+        w = h = 0
+    if w <= 0 or h <= 0:
+        raise ValueError("size 必须是类似 640x360 的正整数格式")
+    return w, h
+
+
+def load_demo(path: str) -> Tuple[Any, Timeline]:
+    """导入 demo 文件并调用其 build()，返回 (Scene, Timeline)。"""
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"找不到 demo 文件：{p}")
+    spec = importlib.util.spec_from_file_location("algoviz_demo_module", str(p))
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"无法加载 demo 模块：{p}")
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules["algoviz_demo_module"] = mod
+    spec.loader.exec_module(mod)
+    if not hasattr(mod, "build"):
+        raise AttributeError(f"{p} 中未找到 build() 函数")
+    scene, tl = mod.build()
+    if not isinstance(tl, Timeline):
+        raise TypeError("build() 必须返回 (Scene, Timeline)")
+    return scene, tl
+
+
+def apply_easing(tl: Timeline, easing_name: Optional[str]) -> None:
+    """把未显式设置 easing 的事件改用 easing_name（大小写不敏感）；None/空串时不变。"""
+    if not easing_name:
+        return
+    key = next((k for k in EASING.keys() if k.lower() == easing_name.lower()), None)
+    if key is None:
+        valid = ", ".join(sorted(EASING.keys()))
+        raise ValueError(f"不支持的 easing：{easing_name}（可选：{valid}）")
+    # 把“未显式设置”的事件的 easing 写成字符串 key
+    tl.set_default_easing(key)
@@ -0,0 +1,2 @@
+#algoviz/io/__init__.py
+"""外部数据接入：操作日志读取（trace）。"""
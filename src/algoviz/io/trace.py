@@ -0,0 +1,296 @@
+#src/algoviz/io/trace.py
+"""
+外部操作日志 -> 时间线：把其他进程里真实算法记录的 compare/swap/… 日志流式读成事件。
+
+支持的格式（按后缀推断，.gz 透明解压；也可用 format= 指定）：
+  ndjson  .ndjson/.jsonl  每行一个对象：{"op": "swap", "i": 3, "j": 4, "duration": 2, "note": "..."}
+                          op 也可写作 etype/type；actor/duration(dur)/easing/note 可选，
+                          其余键即 payload
+  csv     .csv            有表头（首列名为 op/etype/type）时按列名取值；否则按位置 op,i,j
+  tsv     .tsv            同 csv，制表符分隔
+  txt     .txt/.log       空白分隔的 "compare 3 4"，按位置 op,i,j
+空行与 # 开头的行忽略。按位置给出的 i/j 按事件类型映射为与逐条 API 相同的 payload
+（highlight i [j] -> idx 或 start/end，mark_sorted i -> upto，assign i j / assign i value=…）。
+未给 duration 时取逐条 API 的默认值（swap 10、assign 8、其余 1）。
+
+TraceSource 是 Timeline 的惰性事件段：不把日志读进内存，每次迭代重新顺序读文件、逐行解析。
+事件数与总帧数在第一次被问到时扫描一遍得到并缓存；未压缩文件扫描时每 4096 个事件记一个字节偏移，
+之后从任意事件开始迭代可以直接 seek 过去。
+"""
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import os
+from typing import IO, Any, Dict, Iterator, List, Optional, Sequence, Tuple, cast
+
+from ..core.events import (DEFAULT_DURATIONS, INT_NONE, Event, EventTable, _decode_payload,
+                           min_duration)
+
+FORMATS = ("ndjson", "csv", "tsv", "txt")
+_SUFFIX_FORMAT = {".ndjson": "ndjson", ".jsonl": "ndjson",
+                  ".csv": "csv", ".tsv": "tsv", ".txt": "txt", ".log": "txt"}
+_INDEX_EVERY = 4096
+
+
+def detect_format(path: str | os.PathLike) -> str:
+    p = os.fspath(path).lower()
+    if p.endswith(".gz"):
+        p = p[:-3]
+    fmt = _SUFFIX_FORMAT.get(os.path.splitext(p)[1])
+    if fmt is None:
+        raise ValueError(f"cannot infer trace format from file name: {os.fspath(path)} "
+                         f"(use format=)")
+    return fmt
+
+
+def _number(s: str) -> Any:
+    try:
+        return int(s)
+    except ValueError:
+        pass
+    try:
+        return float(s)
+    except ValueError:
+        return s
+
+
+def _event(rec: Dict[str, Any], default_actor: str, where: str) -> Event:
+    """把一条记录（列名 -> 值）转换为 Event；rec 会被修改。"""
+    etype = rec.pop("op", None) or rec.pop("etype", None) or rec.pop("type", None)
+    if not isinstance(etype, str) or not etype:
+        raise ValueError(f"{where}: missing op")
+    actor = rec.pop("actor", None) or default_actor
+    dur = rec.pop("duration", None)
+    if dur is None:
+        dur = rec.pop("dur", None)
+    easing = rec.pop("easing", None)
+    note = rec.pop("note", None)
+    if set(rec) <= {"i", "j", "value"} and etype in ("highlight", "mark_sorted", "assign"):
+        # 按位置给出的 i/j/value -> 与逐条 API 相同的 payload 键
+        i, j = rec.get("i", INT_NONE), rec.get("j", INT_NONE)
+        if not all(type(v) is int for v in (i, j)):
+            raise ValueError(f"{where}: i/j must be integers")
+        if etype == "assign" and j == INT_NONE and "value" not in rec:
+            raise ValueError(f"{where}: assign needs j or value")
+        rec = _decode_payload(etype, i, j, rec.get("value"))
+    try:
+        duration = DEFAULT_DURATIONS.get(etype, 1) if dur is None else int(dur)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: duration must be an integer")
+    return Event(str(actor), etype, rec, duration, easing, None if note is None else str(note))
+
+
+class _Parser:
+    """逐行解析；csv/tsv 的表头在读到第一行有效内容时确定。"""
+
+    def __init__(self, fmt: str, actor: str, name: str) -> None:
+        self.fmt = fmt
+        self.actor = actor
+        self.name = name
+        self.columns: Optional[List[str]] = None if fmt != "txt" else ["op", "i", "j"]
+
+    def _cells(self, text: str) -> List[str]:
+        if self.fmt == "csv":
+            return next(csv.reader([text]))
+        if self.fmt == "tsv":
+            return text.split("\t")
+        return text.split()
+
+    def parse(self, raw: bytes, lineno: int) -> Optional[Event]:
+        text = raw.decode("utf-8").strip()
+        if not text or text.startswith("#"):
+            return None
+        where = f"{self.name}:{lineno}"
+        if self.fmt == "ndjson":
+            try:
+                rec = json.loads(text)
+            except ValueError as e:
+                raise ValueError(f"{where}: invalid JSON ({e})") from None
+            if not isinstance(rec, dict):
+                raise ValueError(f"{where}: expected a JSON object")
+            return _event(rec, self.actor, where)
+        cells = [c.strip() for c in self._cells(text)]
+        if self.columns is None:
+            if cells[0].lower() in ("op", "etype", "type"):
+                self.columns = [c.lower() for c in cells]
+                return None
+            self.columns = ["op", "i", "j"]
+        if len(cells) > len(self.columns):
+            raise ValueError(f"{where}: too many fields ({len(cells)} > {len(self.columns)})")
+        rec = {k: (v if k in ("op", "etype", "type", "actor", "easing", "note") else _number(v))
+               for k, v in zip(self.columns, cells) if v != ""}
+        return _event(rec, self.actor, where)
+
+
+class TraceSource:
+    """
+    操作日志文件上的惰性事件段（实现与 EventTable 相同的段接口：len/rows/row/frame_count/
+    scaled/set_default_easing/update_hash），通过 Timeline.add_source() 接入时间线。
+    """
+
+    def __init__(self, path: str | os.PathLike, *, format: Optional[str] = None,
+                 actor: str = "A") -> None:
+        self.path = os.fspath(path)
+        self.format = format or detect_format(self.path)
+        if self.format not in FORMATS:
+            raise ValueError(f"unknown trace format: {self.format} "
+                             f"(expected one of {', '.join(FORMATS)})")
+        self.actor = actor
+        self.scale: Optional[float] = None
+        self.default_easing: Optional[str] = None
+        self._n: Optional[int] = None
+        self._frames: Optional[int] = None
+        self._index: List[Tuple[int, int, int]] = []   # (事件序号, 字节偏移, 行号)
+        self._columns: Optional[List[str]] = None       # 扫描得到的 csv 表头
+
+    @property
+    def compressed(self) -> bool:
+        return self.path.lower().endswith(".gz")
+
+    def _open(self) -> IO[bytes]:
+        if self.compressed:
+            return cast(IO[bytes], gzip.open(self.path, "rb"))
+        return open(self.path, "rb")
+
+    def _lines(self, start: int) -> Iterator[Tuple[int, Event, int, int]]:
+        """产出 (事件序号, Event, 该行字节偏移, 行号)；有索引时从 start 之前最近的索引点开始读。"""
+        parser = _Parser(self.format, self.actor, self.path)
+        k, offset, lineno = 0, 0, 0
+        if start and self._index and not self.compressed:
+            k, offset, lineno = self._index[min(len(self._index) - 1, start // _INDEX_EVERY)]
+            parser.columns = self._columns
+        with self._open() as f:
+            if offset:
+                f.seek(offset)
+            for raw in f:
+                lineno += 1
+                ev = parser.parse(raw, lineno)
+                if ev is not None:
+                    if self._columns is None:
+                        self._columns = parser.columns
+                    yield k, self._adjust(ev), offset, lineno - 1
+                    k += 1
+                offset += len(raw)
+
+    def _adjust(self, ev: Event) -> Event:
+        if self.scale is not None:
+            ev.duration = max(min_duration(ev.etype, ev.payload),
+                              int(round(ev.duration * self.scale)))
+        if ev.easing is None and self.default_easing is not None:
+            ev.easing = self.default_easing
+        return ev
+
+    def _scan(self) -> None:
+        n = -1
+        frames = 0
+        index: List[Tuple[int, int, int]] = []
+        for n, ev, offset, lineno in self._lines(0):
+            if n % _INDEX_EVERY == 0:
+                index.append((n, offset, lineno))
+            frames += max(1, int(ev.duration))
+        self._n, self._frames, self._index = n + 1, frames, index
+
+    # ---- 段接口 ----
+    def __len__(self) -> int:
+        if self._n is None:
+            self._scan()
+        return self._n  # type: ignore[return-value]
+
+    def frame_count(self) -> int:
+        if self._frames is None:
+            self._scan()
+        return self._frames  # type: ignore[return-value]
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Event]:
+        for k, ev, _, _ in self._lines(start):
+            if stop is not None and k >= stop:
+                return
+            if k >= start:
+                yield ev
+
+    def __iter__(self) -> Iterator[Event]:
+        return self.rows()
+
+    def row(self, k: int) -> Event:
+        for ev in self.rows(k, k + 1):
+            return ev
+        raise IndexError("event index out of range")
+
+    def scaled(self, factor: float) -> "TraceSource":
+        out = TraceSource(self.path, format=self.format, actor=self.actor)
+        out.scale = factor * (self.scale or 1.0)
+        out.default_easing = self.default_easing
+        out._n, out._index, out._columns = self._n, self._index, self._columns
+        return out
+
+    def set_default_easing(self, name: str) -> None:
+        self.default_easing = self.default_easing or name
+
+    def update_hash(self, h: Any) -> None:
+        """按路径、大小与修改时间计入指纹，不读取日志内容（日志可能有数 GB）。"""
+        st = os.stat(self.path)
+        key = ("trace", os.path.abspath(self.path), st.st_size, st.st_mtime_ns, self.format,
+               self.actor, self.scale, self.default_easing)
+        h.update(repr(key).encode("utf-8"))
+
+    def tables(self, chunk: int = 65536) -> Iterator[EventTable]:
+        """按块编码为 EventTable（Timeline.save 使用），内存占用与 chunk 有关。"""
+        buf: List[Event] = []
+        for ev in self.rows():
+            buf.append(ev)
+            if len(buf) >= chunk:
+                yield EventTable.from_events(buf)
+                buf = []
+        if buf:
+            yield EventTable.from_events(buf)
+
+
+def read_events(path: str | os.PathLike, *, format: Optional[str] = None,
+                actor: str = "A") -> Iterator[Event]:
+    """逐条读取日志中的事件（一次性生成器）。"""
+    return TraceSource(path, format=format, actor=actor).rows()
+
+
+def timeline_from_trace(path: str | os.PathLike, *, fps: int = 20, format: Optional[str] = None,
+                        actor: str = "A") -> Any:
+    """以日志文件为唯一事件段的 Timeline（事件不进内存）。"""
+    from ..core.timeline import Timeline
+
+    return Timeline(fps).add_source(TraceSource(path, format=format, actor=actor))
+
+
+def load_array(path: str | os.PathLike) -> List[Any]:
+    """读取初始数组：.npy（NumPy）、.json（列表），其余按逗号/空白分隔的文本。"""
+    p = os.fspath(path)
+    suffix = os.path.splitext(p)[1].lower()
+    if suffix == ".npy":
+        import numpy as np
+        arr = np.load(p, mmap_mode="r")
+        if arr.ndim != 1:
+            raise ValueError(f"{p}: expected a 1-D array, got shape {arr.shape}")
+        return list(arr.tolist())
+    with open(p, "r", encoding="utf-8") as f:
+        text = f.read()
+    if suffix == ".json":
+        values = json.loads(text)
+        if not isinstance(values, list):
+            raise ValueError(f"{p}: expected a JSON list")
+        return values
+    values = [_number(t) for t in text.replace(",", " ").split()]
+    if any(isinstance(v, str) for v in values):
+        raise ValueError(f"{p}: non-numeric value in array file")
+    return values
+
+
+def array_scene(values: Sequence[Any], name: str = "A") -> Any:
+    """为日志回放构造只含一个 ArrayBar 的场景（布局同 bench 的合成场景）。"""
+    from ..components.arraybar import ArrayBar
+    from ..core.scene import Scene
+
+    n = len(values)
+    scene = Scene(width=max(120, 14 * n + 12), height=80)
+    scene.add(ArrayBar(list(values), name=name, x=6, y=10, bar_width=10, bar_gap=4, height=60))
+    return scene
+
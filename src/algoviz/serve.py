@@ -0,0 +1,256 @@
+#algoviz/serve.py
+"""
+常驻渲染服务：预热好的进程池 + 本地 Unix 套接字上的作业协议。
+
+    algoviz serve [--socket PATH] [--workers N]
+    algoviz submit demos/sort_bubble.py -o out/bubble.gif -o out/bubble.svg
+    algoviz submit jobs.toml                 # 也可以直接提交 batch 清单
+
+每个工作进程启动时导入 Matplotlib/NumPy/Pillow/Rich，并渲染一帧带文字的小场景以建好字体缓存；
+之后每个作业只付 demo 加载 + 编译 + 输出的代价。作业执行复用 batch.run_job（一次编译，多路输出）。
+
+协议：换行分隔的 JSON（NDJSON），一条连接上可以连续发送多条请求，响应按完成顺序返回、用 id 对应。
+  请求  {"id": 1, "demo": "/abs/demo.py", "easing": null, "force": false,
+         "outputs": [{"outfile": "/abs/a.gif", ...}]}
+        {"id": 2, "op": "ping"}   {"op": "shutdown"}
+  响应  {"id": 1, "ok": true, "demo": ..., "outputs": [...], "skipped": [...],
+         "timings": {...}, "error": null}
+路径由客户端解析为绝对路径后再发送（服务端的工作目录可能不同）。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .batch import DemoJob, JobResult, _output_from_dict, run_job
+
+
+def default_socket_path() -> str:
+    """ALGOVIZ_SOCKET > $XDG_RUNTIME_DIR/algoviz.sock > <tmp>/algoviz-<uid>.sock"""
+    env = os.environ.get("ALGOVIZ_SOCKET")
+    if env:
+        return env
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return os.path.join(runtime, "algoviz.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"algoviz-{uid}.sock")
+
+
+def _require_unix_sockets() -> None:
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("algoviz serve/submit 需要 Unix 域套接字支持")
+
+
+# --------------------- 工作进程 ---------------------
+
+def _warm() -> None:
+    """进程池 initializer：预先导入各后端，并完整走一遍 GIF/SVG/TUI 渲染以预热字体与图形缓存。"""
+    import io
+
+    from .backends.gif_mpl import GifOptions, export_gif
+    from .backends.svg_svgwrite import export_svg
+    from .backends.tui_rich import _rasterize_ops_to_canvas
+    from .components.arraybar import ArrayBar
+    from .core.scene import Scene
+    from .core.timeline import Timeline
+
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar([3, 1, 2], name="A", x=6, y=10, bar_width=10, bar_gap=4, height=60))
+    tl = Timeline(fps=10)
+    tl.swap("A", 0, 1, duration=2)
+    frames = tl.build_frames(scene)
+    export_gif(scene, tl, io.BytesIO(), options=GifOptions(size=(160, 90)), frames=frames)
+    export_svg(scene, tl, io.StringIO(), frames=frames)
+    _rasterize_ops_to_canvas(scene.render(frames[-1].states), scene, 40, 12)
+
+
+def _probe() -> int:
+    return os.getpid()
+
+
+def _job_from_request(req: Dict[str, Any]) -> DemoJob:
+    if "demo" not in req:
+        raise ValueError("请求缺少 demo")
+    outputs = [_output_from_dict(o, Path(req.get("cwd") or ".")) for o in req.get("outputs", [])]
+    if not outputs:
+        raise ValueError("请求没有任何 outputs")
+    return DemoJob(demo=str(Path(req["demo"]).resolve()), outputs=outputs, easing=req.get("easing"))
+
+
+# --------------------- 服务端 ---------------------
+
+def _claim_socket(path: str) -> None:
+    """已有服务在监听则报错；残留的套接字文件（上次异常退出）直接删除。"""
+    if not os.path.exists(path):
+        return
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(path)
+    except OSError:
+        os.unlink(path)
+        return
+    finally:
+        s.close()
+    raise RuntimeError(f"已有 algoviz serve 在监听：{path}")
+
+
+def _new_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn：工作进程不继承事件循环/线程状态；启动代价只在 serve 启动（或重建进程池）时付一次
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_warm)
+
+
+async def _serve(path: str, workers: int, ready: Optional[Callable[[str], None]]) -> None:
+    loop = asyncio.get_running_loop()
+    pool = _new_pool(workers)
+    stop = asyncio.Event()
+    try:
+        # 让每个工作进程都先起来并完成预热，再开始接受作业
+        await asyncio.gather(*(loop.run_in_executor(pool, _probe) for _ in range(workers)))
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            lock = asyncio.Lock()
+            pending: List[asyncio.Task] = []
+
+            async def send(msg: Dict[str, Any]) -> None:
+                async with lock:
+                    writer.write(json.dumps(msg, ensure_ascii=False).encode("utf-8") + b"\n")
+                    await writer.drain()
+
+            async def run(req: Dict[str, Any]) -> None:
+                nonlocal pool
+                rid = req.get("id")
+                try:
+                    job = _job_from_request(req)
+                except Exception as e:
+                    await send({"id": rid, "ok": False, "demo": req.get("demo"), "outputs": [],
+                                "timings": {}, "error": f"{type(e).__name__}: {e}"})
+                    return
+                force = bool(req.get("force"))
+                used = pool
+                try:
+                    res: JobResult = await loop.run_in_executor(used, run_job, job, force)
+                except BrokenProcessPool as e:
+                    # 工作进程意外退出（段错误、被 OOM 杀掉、demo 调了 os._exit……）：
+                    # 整个池已不可用，换一个新池（并发失败的请求只重建一次），本请求报错
+                    if pool is used:
+                        pool = _new_pool(workers)
+                        used.shutdown(wait=False, cancel_futures=True)
+                    await send({"id": rid, "ok": False, "demo": job.demo, "outputs": [],
+                                "timings": {}, "error": f"BrokenProcessPool: {e}"})
+                    return
+                await send({"id": rid, "ok": res.error is None, **asdict(res)})
+
+            try:
+                while line := await reader.readline():
+                    try:
+                        req = json.loads(line)
+                    except ValueError:
+                        await send({"id": None, "ok": False, "error": "invalid JSON request"})
+                        continue
+                    op = req.get("op", "job")
+                    if op == "ping":
+                        await send({"id": req.get("id"), "ok": True, "pid": os.getpid(),
+                                    "workers": workers})
+                    elif op == "shutdown":
+                        await send({"id": req.get("id"), "ok": True})
+                        stop.set()
+                        break
+                    elif op == "job":
+                        pending.append(asyncio.ensure_future(run(req)))
+                    else:
+                        await send({"id": req.get("id"), "ok": False, "error": f"unknown op: {op}"})
+                await asyncio.gather(*pending)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                pass  # 客户端中途断开：已提交的作业照常跑完
+            finally:
+                writer.close()
+
+        server = await asyncio.start_unix_server(handle, path=path)
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):  # pragma: no cover - 非主线程
+                pass
+        if ready is not None:
+            ready(path)
+        async with server:
+            await stop.wait()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def serve(socket_path: Optional[str] = None, workers: Optional[int] = None, *,
+          ready: Optional[Callable[[str], None]] = None) -> None:
+    """前台运行服务，直到收到 shutdown 请求或 SIGINT/SIGTERM。ready(path) 在开始监听后调用。"""
+    _require_unix_sockets()
+    path = socket_path or default_socket_path()
+    _claim_socket(path)
+    n = max(1, int(workers or os.cpu_count() or 1))
+    asyncio.run(_serve(path, n, ready))
+
+
+# --------------------- 客户端 ---------------------
+
+def request(messages: List[Dict[str, Any]], socket_path: Optional[str] = None,
+            timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """在一条连接上发送多条请求，收齐全部响应后按请求顺序返回（按 id 对应；缺省 id 依次编号）。"""
+    _require_unix_sockets()
+    msgs = [dict(m, id=m.get("id", k)) for k, m in enumerate(messages)]
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout)
+        try:
+            s.connect(socket_path or default_socket_path())
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise RuntimeError(f"无法连接 algoviz serve：{socket_path or default_socket_path()}"
+                               f"（先运行 algoviz serve）")
+        s.sendall(b"".join(json.dumps(m, ensure_ascii=False).encode("utf-8") + b"\n" for m in msgs))
+        replies: Dict[Any, Dict[str, Any]] = {}
+        with s.makefile("rb") as f:
+            while len(replies) < len(msgs):
+                line = f.readline()
+                if not line:
+                    raise RuntimeError("algoviz serve 提前关闭了连接")
+                rep = json.loads(line)
+                replies[rep.get("id")] = rep
+    return [replies[m["id"]] for m in msgs]
+
+
+def submit(jobs: List[DemoJob], socket_path: Optional[str] = None,
+           timeout: Optional[float] = None, *, force: bool = False) -> List[JobResult]:
+    """
+    把作业交给常驻服务执行，按提交顺序返回 JobResult
+    （指纹未变的输出会被跳过，force=True 全部重写）。
+    """
+    msgs = [{"demo": j.demo, "easing": j.easing, "force": force,
+             "outputs": [dict(o.options, format=o.format, outfile=o.outfile) for o in j.outputs]}
+            for j in jobs]
+    out: List[JobResult] = []
+    for rep in request(msgs, socket_path, timeout):
+        out.append(JobResult(demo=rep.get("demo") or "", timings=rep.get("timings") or {},
+                             outputs=rep.get("outputs") or [], skipped=rep.get("skipped") or [],
+                             error=rep.get("error")))
+    return out
+
+
+def ping(socket_path: Optional[str] = None, timeout: Optional[float] = 5.0) -> Dict[str, Any]:
+    return request([{"op": "ping"}], socket_path, timeout)[0]
+
+
+def shutdown(socket_path: Optional[str] = None, timeout: Optional[float] = 30.0) -> None:
+    request([{"op": "shutdown"}], socket_path, timeout)
@@ -0,0 +1,130 @@
+#algoviz/watch.py
+"""
+watch 模式：demo 文件保存后自动重新 build()，并只重编译/重渲染受影响的尾部。
+
+  - 变更检测：轮询 demo 文件的 (mtime_ns, size)，无额外依赖
+  - 编译：IncrementalCompiler 与上次的事件序列逐个比较，从第一个不同事件之前最近的检查点恢复
+  - 输出：GIF 用 IncrementalGifExporter 复用未变化前缀的栅格；SVG 仅在目标帧受影响时重写；
+    TUI 播放器原地换上新帧并保持当前位置
+demo 里的语法/运行错误只打印出来，继续等待下一次保存。
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Optional, Tuple
+
+from .core.compiler import CompileDelta, IncrementalCompiler
+from .demo import apply_easing, load_demo
+
+
+@dataclass
+class Reload:
+    scene: Any
+    timeline: Any
+    delta: CompileDelta
+    seconds: float          # build() + 增量编译耗时
+
+
+class DemoWatcher:
+    def __init__(self, path: str, easing: Optional[str] = None, *,
+                 checkpoint_every: int = 16) -> None:
+        self.path = str(path)
+        self.easing = easing
+        self.compiler = IncrementalCompiler(checkpoint_every)
+        self._stamp: Optional[Tuple[int, int]] = None
+
+    def _current_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def changed(self) -> bool:
+        return self._current_stamp() != self._stamp
+
+    def load(self) -> Reload:
+        """重新执行 demo 的 build() 并增量编译（首次调用即完整编译）。"""
+        self._stamp = self._current_stamp()
+        t0 = time.perf_counter()
+        scene, tl = load_demo(self.path)
+        apply_easing(tl, self.easing)
+        delta = self.compiler.compile(scene, tl)
+        return Reload(scene, tl, delta, time.perf_counter() - t0)
+
+    def poll(self, interval: float = 0.2,
+             stop: Optional[Callable[[], bool]] = None) -> Optional[Reload]:
+        """阻塞到文件变化并重新加载；stop() 为真时返回 None。加载出错时打印并继续等待。"""
+        while stop is None or not stop():
+            time.sleep(interval)
+            if not self.changed():
+                continue
+            try:
+                return self.load()
+            except Exception as e:
+                print(f"[algoviz][watch] {type(e).__name__}: {e}", file=sys.stderr)
+        return None
+
+    async def reloads(self, interval: float = 0.2) -> AsyncIterator[Reload]:
+        """异步版本：每次文件变化产出一个 Reload（供 TUI 播放器使用）。"""
+        while True:
+            await asyncio.sleep(interval)
+            if not self.changed():
+                continue
+            try:
+                yield self.load()
+            except Exception as e:
+                print(f"[algoviz][watch] {type(e).__name__}: {e}", file=sys.stderr)
+
+
+def describe(r: Reload, rendered: Optional[int] = None) -> str:
+    d = r.delta
+    if not d.changed:
+        return "[algoviz][watch] 事件序列未变化"
+    msg = (f"[algoviz][watch] 从事件 {d.first_event} 起变化（自检查点 {d.resumed_from} 重编译），"
+           f"复用 {d.first_frame}/{len(d.frames)} 帧")
+    if rendered is not None:
+        msg += f"，重渲染 {rendered} 帧"
+    return msg + f"，用时 {r.seconds:.3f}s"
+
+
+def watch_gif(watcher: DemoWatcher, outfile: str, options: Any = None, *, interval: float = 0.2,
+              stop: Optional[Callable[[], bool]] = None) -> None:
+    from .backends.gif_mpl import IncrementalGifExporter
+
+    exporter = IncrementalGifExporter(outfile, options)
+    r: Optional[Reload] = watcher.load()
+    first = True
+    while r is not None:
+        if r.delta.changed or first:
+            t0 = time.perf_counter()
+            n = exporter.update(r.scene, r.delta.frames, 0 if first else r.delta.first_frame)
+            r.seconds += time.perf_counter() - t0
+            msg = describe(r, n) if not first else f"[algoviz] 已导出 GIF：{outfile}（{n} 帧）"
+            print(msg, flush=True)
+        first = False
+        r = watcher.poll(interval, stop)
+
+
+def watch_svg(watcher: DemoWatcher, outfile: str, frame_index: Optional[int],
+              options: Any = None, *,
+              interval: float = 0.2, stop: Optional[Callable[[], bool]] = None) -> None:
+    from .backends.svg_svgwrite import export_svg
+
+    r: Optional[Reload] = watcher.load()
+    last: Optional[Tuple[int, int]] = None   # (目标帧序号, 总帧数)
+    while r is not None:
+        frames = r.delta.frames
+        idx = len(frames) - 1 if frame_index is None or frame_index < 0 else frame_index
+        if last is None or idx != last[0] or idx >= r.delta.first_frame:
+            export_svg(r.scene, r.timeline, outfile, idx, options, frames=frames)
+            msg = describe(r, 1) if last is not None else f"[algoviz] 已导出 SVG：{outfile}"
+            print(msg, flush=True)
+        else:
+            print(describe(r, 0), flush=True)
+        last = (idx, len(frames))
+        r = watcher.poll(interval, stop)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import numpy as np
+
+from algoviz.backends.gif_mpl import FrameRasterizer
+from algoviz.backends.svg_svgwrite import SvgOptions, export_svg
+from algoviz.backends.tui_rich import _rasterize_frame
+from algoviz.components.arraybar import BIN_COMPARE, BIN_HIGHLIGHT, BIN_SORTED, ArrayBar
+from algoviz.components._patch import COMPACT
+from algoviz.core.drawops import Rect, Rects, Segments, Text
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+N = 200_000
+PX = 320 / (2 * N)           # 场景宽 2N，输出 320 像素
+
+
+def _scene(n=N, **kw):
+    values = [(k * 7919) % 1000 + 1 for k in range(n)]
+    scene = Scene(width=2 * n, height=120)
+    scene.add(ArrayBar(values, name="A", x=0, y=20, bar_width=2, bar_gap=0, height=90, **kw))
+    return scene
+
+
+def _brute(values, k):
+    a = np.asarray(values, dtype=float)
+    pad = (-len(a)) % k
+    mn = np.concatenate([a, np.full(pad, np.inf)]).reshape(-1, k).min(1)
+    mx = np.concatenate([a, np.full(pad, -np.inf)]).reshape(-1, k).max(1)
+    starts = np.arange(0, len(a), k)
+    return mn, mx, np.add.reduceat(a, starts) / np.minimum(k, len(a) - starts)
+
+
+def test_bins_bound_draw_cost_and_match_brute_force():
+    scene = _scene()
+    st = scene.state_of("A", {})
+    ops = scene.render({}, px=PX)
+    assert [type(op) for op in ops] == [Rects, Rects, Segments]
+    solid = ops[0]
+    assert len(solid) <= 320                        # 每箱 2 的幂个槽位，箱宽 >= 1 像素
+    k = 1024
+    assert len(solid) == -(-N // k) and np.asarray(solid.w)[0] == 2 * k
+    for got, want in zip(st.bins.aggregate(st.values, 10, 0, len(solid)), _brute(st.values, k)):
+        assert np.allclose(got, want)
+    # 像素足够时逐柱绘制；柱宽不足 label_min_width 像素时不写数值
+    small = _scene(n=100)
+    assert len(small.render({}, px=8)) == 200 and len(small.render({}, px=2)) == 100
+    assert not any(isinstance(op, Text) for op in small.render({}, px=2))
+    assert len(_scene(n=5000, lod=0).render({}, px=PX)) == 5000
+
+
+def test_swaps_update_bins_incrementally():
+    scene = _scene()
+    tl = Timeline()
+    tl.compare("A", 5, 150_000)
+    tl.highlight("A", idx=3000)
+    tl.swap("A", 5, 150_000, duration=4)
+    tl.assign("A", 70_000, value=5000)
+    tl.mark_sorted("A", 20_000)
+    frames = tl.build_frames(scene)
+    first, last = frames[0].states["A"], frames[-1].states["A"]
+    scene.render(frames[0].states, px=PX)
+    assert last.bins._levels is first.bins._levels                    # 已建好的层在各帧之间共享
+    assert last.bins.dirty == {5, 150_000, 70_000}
+    for m in (0, 4, 10):
+        got = last.bins.aggregate(last.values, m, 0, -(-N // (1 << m)))
+        for g, w in zip(got, _brute(last.values, 1 << m)):
+            assert np.allclose(g, w)
+    codes = np.asarray(scene.render(frames[0].states, px=PX)[0].colors)
+    assert codes[0] == BIN_COMPARE and codes[150_000 // 1024] == BIN_COMPARE
+    assert (codes != 0).sum() == 2
+    codes = np.asarray(scene.render(frames[1].states, px=PX)[0].colors)
+    assert codes[3000 // 1024] == BIN_HIGHLIGHT and (codes != 0).sum() == 1
+    codes = np.asarray(scene.render(frames[-1].states, px=PX)[0].colors)
+    head = codes[:20_000 // 1024 + 1]                                  # 高亮优先于已排序
+    assert head[3000 // 1024] == BIN_HIGHLIGHT
+    assert (np.delete(head, 3000 // 1024) == BIN_SORTED).all()
+    assert (codes[20_000 // 1024 + 1:] == 0).all()
+    # 交换中的两个槽位单独画出
+    mid = scene.render(frames[3].states, px=PX)
+    assert [type(op) for op in mid] == [Rects, Rects, Segments, Rect, Rect]
+    # 脏槽位超过 COMPACT 个后按当前数值重建
+    bins = last.bins
+    for s in range(COMPACT + 1 - len(bins.dirty)):
+        bins = bins.touch(last.values, 1000 + s)
+    assert not bins.dirty and bins._levels is not first.bins._levels
+
+
+def test_backends_render_bins(tmp_path):
+    scene = _scene(n=20_000)
+    tl = Timeline()
+    tl.swap("A", 0, 19_999, duration=3)
+    frames = tl.build_frames(scene)
+    img = FrameRasterizer(scene, (320, 120))(frames[-1])
+    assert (img[100:108, 5:315, :3] != 255).any(axis=-1).mean() > 0.9  # 每个像素列都有柱子
+    out = tmp_path / "lod.svg"
+    export_svg(scene, tl, str(out), frames=frames, options=SvgOptions(size=(320, 120)))
+    svg = out.read_text(encoding="utf-8")
+    assert svg.count("<path") <= 10 and "<text" not in svg
+    assert "█" in _rasterize_frame(scene, frames[-1].states, 40, 12).plain
@@ -0,0 +1,53 @@
+from __future__ import annotations
+import copy
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from algoviz import bench
+
+
+def test_synthetic_sort_has_exact_event_count():
+    scene, tl = bench.synthetic_sort(8, 50, seed=1)
+    assert len(tl._events) == 50
+    assert {ev.etype for ev in tl._events} <= {"compare", "swap"}
+    assert tl.frame_count() == len(tl.build_frames(scene))
+
+
+def test_run_bench_reports_every_stage():
+    result = bench.run_bench([5, 20], [30], sample_frames=2, repeat=1)
+    assert [c["case"] for c in result["cases"]] == ["n=5,events=30", "n=20,events=30"]
+    for c in result["cases"]:
+        assert set(c["stages"]) == set(bench.STAGES)
+        for st in c["stages"].values():
+            assert st["seconds"] >= 0 and st["units"] >= 1 and st["per_unit"] >= 0
+    json.dumps(result)  # 可直接序列化
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold():
+    cur = {"cases": [{"case": "n=5,events=30", "stages": {
+        "render": {"per_unit": 2.0}, "build_frames": {"per_unit": 1.1},
+        "svg_write": {"per_unit": 1.0}}}]}
+    base = copy.deepcopy(cur)
+    base["cases"][0]["stages"]["render"]["per_unit"] = 1.0
+    base["cases"][0]["stages"]["build_frames"]["per_unit"] = 1.0
+    regs = bench.compare(cur, base, threshold=0.25)
+    assert [(r.stage, round(r.ratio, 2)) for r in regs] == [("render", 2.0)]
+
+
+def test_cli_bench_fails_against_faster_baseline(tmp_path: Path):
+    out = tmp_path / "bench.json"
+    cmd = [sys.executable, "-m", "algoviz.cli", "bench", "--sizes", "5", "--events", "20",
+           "--stages", "build_frames,render", "--repeat", "1", "--out", str(out)]
+    cp = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=60)
+    assert cp.returncode == 0, cp.stderr
+    data = json.loads(out.read_text(encoding="utf-8"))
+    for st in data["cases"][0]["stages"].values():
+        st["per_unit"] /= 1000.0  # 伪造一个快得多的基线
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(data), encoding="utf-8")
+    cp = subprocess.run(cmd[:-2] + ["--baseline", str(baseline)], stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE, text=True, timeout=60)
+    assert cp.returncode == 1
+    assert "[algoviz][regression]" in cp.stderr
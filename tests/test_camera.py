@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from algoviz.backends.gif_mpl import FrameRasterizer
+from algoviz.backends.tui_rich import _rasterize_frame
+from algoviz.components.arraybar import ArrayBar
+from algoviz.components.grid import Grid
+from algoviz.core.camera import Camera, CameraState, View, project
+from algoviz.core.drawops import Cells, Rect, Text
+from algoviz.core.scene import Decoration, Scene
+from algoviz.core.timeline import Timeline
+
+
+def _big(n=100_000, **cam):
+    scene = Scene(width=320, height=120)
+    values = [(k * 7919) % 1000 + 1 for k in range(n)]
+    scene.add(ArrayBar(values, name="A", x=0, y=30, bar_width=10, bar_gap=2, height=80))
+    scene.add(Camera(**cam))
+    return scene
+
+
+def test_draw_cost_follows_visible_slots():
+    scene = _big(x=600_000.5, y=50, zoom=2)
+    bar = scene.actors["A"]
+    ops = scene.render({})
+    rects = [op for op in ops if isinstance(op, Rect)]
+    assert 10 <= len(rects) <= 16                                      # 160 / 12 个槽位可见
+    assert all(-20 < r.x < 320 and r.w == 20 for r in rects)
+    assert rects[0].x == pytest.approx((bar._slot_x(50_000) - 600_000.5) * 2)
+    # 与“整条画出再裁剪”的结果一致
+    st = scene.state_of("A", {})
+    rng = random.Random(7)
+    for _ in range(20):
+        view = View(rng.uniform(-50, 1_200_000), 20.25, rng.uniform(10, 500), 100, 1.5)
+        a = [op for op in project(bar.draw_view(st, view), view) if isinstance(op, Rect)]
+        b = [op for op in project(bar.draw(st), view) if isinstance(op, Rect)]
+        assert a == b
+    assert bar.draw_view(st, View(0, 200, 320, 100)) == []
+
+
+def test_camera_events_interpolate_and_follow():
+    scene = _big(n=1000)
+    bar = scene.actors["A"]
+    tl = Timeline()
+    tl.add("camera", "zoom", {"zoom": 4, "x": 120, "y": 110}, duration=5)
+    tl.add("camera", "look_at", {"x": bar.slot_center(800)[0]}, duration=6)
+    tl.add("camera", "pan", {"dy": 10}, duration=2)
+    tl.add("A", "swap", {"i": 800, "j": 801}, duration=3)
+    frames = tl.build_frames(scene)
+    zooms = [f.states["camera"].zoom for f in frames[:5]]
+    assert zooms == sorted(zooms) and zooms[-1] == 4
+    for f in frames[:5]:                                               # 缩放锚点在画布上不动
+        st = f.states["camera"]
+        assert (120 - st.x) * st.zoom == pytest.approx(120)
+        assert (110 - st.y) * st.zoom == pytest.approx(110)
+    st = frames[10].states["camera"]
+    view = scene.actors["camera"].view(st)
+    assert view.x + view.w / 2 == pytest.approx(bar.slot_center(800)[0]) and view.w == 80
+    assert frames[-1].states["camera"] == CameraState(st.x, st.y + 10, 4)
+    # swap 中的两个槽位都在视口内，正常绘制
+    mid = [op for op in scene.render(frames[-2].states) if isinstance(op, Rect)]
+    assert 5 <= len(mid) <= 9
+
+
+def test_static_layers_and_other_ops_with_camera():
+    scene = Scene(width=200, height=100)
+    scene.add(Decoration("legend", [Rect(150, 4, 40, 10, fill="#FFFFFF"), Text(170, 9, "L")], z=5))
+    scene.add(Grid((50, 50), name="G", x=0, y=0, cell_w=10, cell_h=10))
+    scene.add(Camera(x=95, y=5, zoom=2))
+    assert scene.bands() == ((False, ("G",)), (True, ("legend",)))
+    ops = scene.render({})
+    cells = [op for op in ops if isinstance(op, Cells)][0]
+    assert np.shape(cells.codes) == (6, 11)                          # 只剩可见的行列
+    assert (cells.x, cells.y, cells.cw) == (-10, -10, 20)
+    assert ops[-2] == Rect(150, 4, 40, 10, fill="#FFFFFF")             # 静态层保持画布坐标
+    with pytest.raises(ValueError, match="already has a camera"):
+        scene.add(Camera(name="cam2"))
+    with pytest.raises(ValueError, match="zoom"):
+        Camera(zoom=0)
+
+
+def test_backends_follow_camera():
+    scene = _big(n=5000)
+    tl = Timeline()
+    tl.add("camera", "pan", {"x": 30_000}, duration=4)
+    frames = tl.build_frames(scene)
+    raster = FrameRasterizer(scene, (320, 120))
+    imgs = [raster(f) for f in frames]
+    assert not np.array_equal(imgs[0], imgs[-1])
+    first, last = (_rasterize_frame(scene, f.states, 40, 12).plain for f in (frames[0], frames[-1]))
+    assert first != last and last.strip()
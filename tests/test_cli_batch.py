@@ -0,0 +1,68 @@
+from __future__ import annotations
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from algoviz.batch import DemoJob, OutputSpec, load_manifest, run_job
+from algoviz.core.timeline import Timeline
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMOS = ROOT / "demos"
+
+
+def _manifest(tmp_path: Path) -> Path:
+    data = {
+        "jobs": 2,
+        "demos": [
+            {"path": str(DEMOS / "sort_bubble.py"),
+             "outputs": [{"outfile": "out/a.gif", "size": "160x100", "fps": 10},
+                         {"outfile": "out/a.svg", "frame": "last"}]},
+            {"path": str(DEMOS / "sort_bubble_full.py"), "easing": "linear",
+             "outputs": [{"format": "svg", "outfile": "out/b.svg", "size": [320, 180], "frame": 3},
+                         {"outfile": "out/b.cast", "size": "80x24", "fps": 10}]},
+        ],
+    }
+    p = tmp_path / "batch.json"
+    p.write_text(json.dumps(data), encoding="utf-8")
+    return p
+
+
+def test_load_manifest_resolves_paths_and_formats(tmp_path: Path):
+    jobs, n = load_manifest(str(_manifest(tmp_path)))
+    assert n == 2 and len(jobs) == 2
+    assert [o.format for o in jobs[0].outputs] == ["gif", "svg"]
+    assert jobs[1].outputs[1].format == "cast"
+    assert jobs[0].outputs[0].outfile == str((tmp_path / "out" / "a.gif").resolve())
+
+
+def test_run_job_compiles_once(tmp_path: Path, monkeypatch):
+    calls = []
+    orig = Timeline.build_frames
+
+    def counting(self, scene):
+        calls.append(1)
+        return orig(self, scene)
+
+    monkeypatch.setattr(Timeline, "build_frames", counting)
+    job = DemoJob(demo=str(DEMOS / "sort_bubble.py"), outputs=[
+        OutputSpec("svg", str(tmp_path / "x.svg")),
+        OutputSpec("svg", str(tmp_path / "y.svg"), {"frame": 0}),
+        OutputSpec("cast", str(tmp_path / "z.cast"), {"size": "60x20"}),
+    ])
+    res = run_job(job)
+    assert res.error is None, res.error
+    assert len(calls) == 1
+    assert set(res.timings) == {"load", "compile", "svg", "cast"}
+    lines = (tmp_path / "z.cast").read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[0])["version"] == 2 and len(lines) > 2
+
+
+def test_cli_batch_parallel(tmp_path: Path):
+    manifest = _manifest(tmp_path)
+    cmd = [sys.executable, "-m", "algoviz.cli", "batch", str(manifest), "--jobs", "2"]
+    cp = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=60)
+    assert cp.returncode == 0, cp.stderr
+    for name in ("a.gif", "a.svg", "b.svg", "b.cast"):
+        assert (tmp_path / "out" / name).stat().st_size > 0
+    assert "compile" in cp.stdout and "wall time" in cp.stdout
@@ -0,0 +1,58 @@
+from __future__ import annotations
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demos" / "sort_bubble.py"
+HEAVY = ("matplotlib", "numpy", "imageio", "PIL")
+
+# algoviz.cli 自身（不含任何后端）的累计导入耗时上限；宽松取值，只为拦住“又把重依赖挂回顶层”的回归
+CLI_IMPORT_BUDGET_US = 300_000
+
+
+def _importtime(args) -> Dict[str, int]:
+    """用 -X importtime 运行，返回 {模块名: 累计导入微秒}。"""
+    cmd = [sys.executable, "-X", "importtime", *args]
+    cp = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=30)
+    assert cp.returncode == 0, cp.stderr
+    mods: Dict[str, int] = {}
+    for line in cp.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            mods[name.strip()] = int(cumulative)
+    return mods
+
+
+def _heavy(mods: Dict[str, int]):
+    return sorted(m for m in mods if m.split(".")[0] in HEAVY)
+
+
+def test_cli_module_import_is_light():
+    mods = _importtime(["-c", "import algoviz.cli"])
+    assert _heavy(mods) == []
+    assert mods["algoviz.cli"] < CLI_IMPORT_BUDGET_US, mods["algoviz.cli"]
+
+
+def test_svg_subcommand_skips_matplotlib(tmp_path: Path):
+    out = tmp_path / "x.svg"
+    mods = _importtime(["-m", "algoviz.cli", "svg", str(DEMO), "--outfile", str(out)])
+    assert out.exists()
+    assert _heavy(mods) == []
+    assert "rich" not in mods
+
+
+def test_tui_subcommand_skips_matplotlib():
+    mods = _importtime(["-m", "algoviz.cli", "tui", str(DEMO), "--exit-after", "0.2"])
+    assert _heavy(mods) == []
+    assert "rich" in mods
+
+
+def test_backends_package_is_lazy():
+    code = ("import sys, algoviz.backends as b; b.export_svg; "
+            "print(sorted(m for m in sys.modules if m.startswith('algoviz.backends.')))")
+    cp = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, text=True, timeout=30)
+    assert cp.stdout.strip() == "['algoviz.backends.svg_svgwrite']"
@@ -0,0 +1,93 @@
+from __future__ import annotations
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from algoviz import serve as srv
+from algoviz.batch import DemoJob, OutputSpec
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demos" / "sort_bubble.py"
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="需要 Unix 域套接字")
+
+
+@pytest.fixture
+def server():
+    d = tempfile.mkdtemp(prefix="avz")  # Unix 套接字路径有长度上限，不用 tmp_path
+    path = os.path.join(d, "s.sock")
+    cmd = [sys.executable, "-m", "algoviz.cli", "serve", "--socket", path, "--workers", "2"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                rep = srv.ping(path, timeout=2)
+                break
+            except (RuntimeError, OSError):
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise AssertionError(proc.communicate()[1])
+                time.sleep(0.1)
+        assert rep["ok"] and rep["workers"] == 2
+        yield path
+    finally:
+        if proc.poll() is None:
+            try:
+                srv.shutdown(path)
+            except (RuntimeError, OSError):
+                proc.terminate()
+        proc.wait(timeout=30)
+        shutil.rmtree(d, ignore_errors=True)
+
+
+def test_submit_jobs_and_shutdown(server: str, tmp_path: Path):
+    jobs = [
+        DemoJob(demo=str(DEMO), outputs=[
+            OutputSpec("gif", str(tmp_path / f"a{k}.gif"), {"size": "160x90"}),
+            OutputSpec("svg", str(tmp_path / f"a{k}.svg")),
+        ])
+        for k in range(3)
+    ]
+    jobs.append(DemoJob(demo=str(tmp_path / "missing.py"),
+                        outputs=[OutputSpec("svg", str(tmp_path / "x.svg"))]))
+    results = srv.submit(jobs, server, timeout=60)
+    assert [r.error for r in results[:3]] == [None] * 3
+    assert results[3].error and "FileNotFoundError" in results[3].error
+    for k in range(3):
+        assert (tmp_path / f"a{k}.gif").read_bytes()[:6] == b"GIF89a"
+        assert (tmp_path / f"a{k}.svg").exists()
+    assert set(results[0].timings) >= {"load", "compile", "gif", "svg"}
+
+
+def test_cli_submit_and_stale_socket(server: str, tmp_path: Path):
+    out = tmp_path / "c.svg"
+    cmd = [sys.executable, "-m", "algoviz.cli", "submit", str(DEMO), "-o", str(out),
+           "--socket", server]
+    cp = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=60)
+    assert cp.returncode == 0, cp.stderr
+    assert out.exists()
+
+    # 已有服务在监听时不允许第二个实例抢占同一套接字
+    with pytest.raises(RuntimeError):
+        srv._claim_socket(server)
+
+
+def test_crashed_worker_rebuilds_pool(server: str, tmp_path: Path):
+    crash = tmp_path / "crash.py"
+    crash.write_text("import os\n\n\ndef build():\n    os._exit(1)\n", encoding="utf-8")
+    bad = DemoJob(demo=str(crash), outputs=[OutputSpec("svg", str(tmp_path / "x.svg"))])
+    [res] = srv.submit([bad], server, timeout=60)
+    assert res.error and "BrokenProcessPool" in res.error
+
+    # 服务仍在，换了新进程池后后续作业照常完成
+    ok = DemoJob(demo=str(DEMO), outputs=[OutputSpec("svg", str(tmp_path / "ok.svg"))])
+    [res] = srv.submit([ok], server, timeout=60)
+    assert res.error is None
+    assert (tmp_path / "ok.svg").exists()
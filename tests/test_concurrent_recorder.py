@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import itertools
+import threading
+
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core.events import Event
+from algoviz.core.recorder import ConcurrentRecorder
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import PARALLEL, Timeline
+
+
+def _scene():
+    scene = Scene(width=200, height=80)
+    scene.add(ArrayBar([8, 7, 6, 5, 4, 3, 2, 1], name="A"))
+    return scene
+
+
+def _run(rec: ConcurrentRecorder, jobs):
+    """依次在各自的线程里执行 jobs（保证时间戳先后可预期）。"""
+    for job in jobs:
+        t = threading.Thread(target=job, name=job.__name__)
+        t.start()
+        t.join()
+
+
+def test_threads_record_concurrently_and_merge_by_timestamp():
+    rec = ConcurrentRecorder()
+    n = 2000
+
+    def worker(k: int) -> None:
+        for x in range(n):
+            rec.compare("A", k, k + 1, note=str(x))
+
+    threads = [threading.Thread(target=worker, args=(k,), name=f"w{k}") for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    records = rec.records()
+    assert len(records) == 4 * n and len(rec) == 0
+    assert [r.ts_ns for r in records] == sorted(r.ts_ns for r in records)
+    for k in range(4):
+        mine = [r.event.note for r in records if r.thread == f"w{k}"]
+        assert mine == [str(x) for x in range(n)]
+        assert {r.event.payload["i"] for r in records if r.thread == f"w{k}"} == {k}
+
+
+def test_flush_sequential_matches_direct_recording():
+    clock = itertools.count()
+    rec = ConcurrentRecorder(clock=lambda: next(clock))
+
+    def left():
+        rec.compare("A", 0, 1).swap("A", 0, 1)
+
+    def right():
+        rec.swap("A", 6, 7, duration=4).assign("A", 5, value=9)
+
+    _run(rec, [left, right])
+    tl = Timeline()
+    assert rec.flush(tl, tag_threads=True) == 4
+    ref = Timeline().compare("A", 0, 1).swap("A", 0, 1)
+    ref.swap("A", 6, 7, duration=4).assign("A", 5, value=9)
+    assert [(e.etype, e.payload, e.duration) for e in tl._events] == \
+           [(e.etype, e.payload, e.duration) for e in ref._events]
+    assert tl._events[0].note == "left" and tl._events[3].note == "right"
+    assert rec.flush(Timeline()) == 0
+
+
+def _paired_swaps(rec: ConcurrentRecorder) -> None:
+    """两个线程每轮各交换一次自己那半边的槽位；屏障保证同一轮的两次交换先于下一轮。"""
+    before, after = threading.Barrier(2), threading.Barrier(2)
+
+    def worker(lo: int) -> None:
+        for _ in range(3):
+            before.wait()
+            rec.swap("A", lo, lo + 1, duration=4)
+            after.wait()
+
+    threads = [threading.Thread(target=worker, args=(lo,)) for lo in (0, 4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def test_shared_frames_pack_independent_events():
+    seq, shared = Timeline(), Timeline()
+    for tl, kw in ((seq, {}), (shared, {"shared": True})):
+        rec = ConcurrentRecorder()
+        _paired_swaps(rec)
+        assert rec.flush(tl, **kw) == 6
+
+    assert len(shared._events) == 3 and all(e.etype == PARALLEL for e in shared._events)
+    assert shared.frame_count() == 12 and seq.frame_count() == 24
+    scene = _scene()
+    last = seq.build_frames(scene)[-1].states["A"]
+    assert shared.build_frames(scene)[-1].states["A"].values == last.values
+
+
+def test_group_semantics_match_sequential_for_single_and_conflicting_members():
+    scene = _scene()
+    tl = Timeline().add_group([Event("A", "swap", {"i": 0, "j": 1}, 6)])
+    ref = Timeline().swap("A", 0, 1, duration=6)
+    assert [f.states for f in tl.build_frames(scene)] == [f.states for f in ref.build_frames(scene)]
+
+    # 冲突事件（同一槽位）不会被打包到同一组
+    clock = itertools.count()
+    rec = ConcurrentRecorder(clock=lambda: next(clock))
+    _run(rec, [lambda: rec.swap("A", 0, 1), lambda: rec.swap("A", 1, 2),
+               lambda: rec.compare("A", 5, 6)])
+    out = Timeline()
+    rec.flush(out, shared=True)
+    assert [e.etype for e in out._events] == ["swap", PARALLEL]
+
+
+def test_group_members_finish_at_their_own_pace():
+    scene = _scene()
+    tl = Timeline().add_group([Event("A", "compare", {"i": 2, "j": 3}, 2),
+                               Event("A", "swap", {"i": 0, "j": 1}, 8)])
+    frames = tl.build_frames(scene)
+    assert len(frames) == tl.frame_count() == 8
+    assert frames[0].states["A"].compare == (2, 3) and frames[2].states["A"].compare is None
+    assert frames[-1].states["A"].values[:2] == [7, 8] and not frames[-1].states["A"].offsets
+    assert tl.scaled(0.5).frame_count() == 4
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from algoviz.backends import GifOptions, export_gif, export_gif_async, export_svg_async
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+
+def _scene_tl(swaps: int = 1):
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar([3, 1, 2], name="A", x=6, y=10, bar_width=10, bar_gap=4, height=60))
+    tl = Timeline(fps=10)
+    for _ in range(swaps):
+        tl.compare("A", 0, 1, duration=2)
+        tl.swap("A", 0, 1, duration=3)
+    return scene, tl
+
+
+class _Sink:
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    async def write(self, data: bytes) -> None:
+        await asyncio.sleep(0)
+        self.chunks.append(data)
+
+
+def test_gif_async_streams_same_bytes_to_sink(tmp_path: Path):
+    scene, tl = _scene_tl()
+    opt = GifOptions(size=(80, 60))
+    export_gif(scene, tl, str(tmp_path / "ref.gif"), options=opt)
+    sink = _Sink()
+    seen = []
+
+    async def main() -> int:
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        t = asyncio.ensure_future(ticker())
+        await export_gif_async(scene, tl, sink, options=opt, progress=seen.append, chunk_size=512)
+        t.cancel()
+        return ticks
+
+    ticks = asyncio.run(main())
+    assert b"".join(sink.chunks) == (tmp_path / "ref.gif").read_bytes()
+    assert len(sink.chunks) > 1      # 按块逐步写出，而不是结束时一次性
+    assert ticks > 1                 # 导出期间事件循环没有被阻塞
+    assert seen[-1].stage == "done"
+
+
+def test_gif_async_sink_receives_bytes_while_frames_progress():
+    scene, tl = _scene_tl(swaps=6)
+    total = tl.frame_count()
+    seen = []
+    sink = _Sink()
+    rendered_at_write = []
+
+    async def write(data: bytes) -> None:
+        rendered_at_write.append(seen[-1].rendered if seen else 0)
+        sink.chunks.append(data)
+
+    sink.write = write  # type: ignore[method-assign]
+    asyncio.run(export_gif_async(scene, tl, sink, options=GifOptions(size=(80, 60)),
+                                 progress=seen.append, chunk_size=256))
+    assert len(rendered_at_write) > 2
+    assert rendered_at_write[0] < total // 2      # 首块在前半段帧渲染时就已写出
+    assert len(set(rendered_at_write)) > 2        # 写出分散在整个导出过程中
+
+
+def test_svg_async_to_sink_and_path(tmp_path: Path):
+    scene, tl = _scene_tl()
+    sink = _Sink()
+    asyncio.run(export_svg_async(scene, tl, sink))
+    text = b"".join(sink.chunks).decode("utf-8")
+    assert text.startswith("<svg") and text.endswith("</svg>")
+    asyncio.run(export_svg_async(scene, tl, str(tmp_path / "a.svg")))
+    assert (tmp_path / "a.svg").read_text(encoding="utf-8") == text
+
+
+def test_cancelling_task_stops_export_and_removes_file(tmp_path: Path):
+    scene, tl = _scene_tl(swaps=20)
+    out = tmp_path / "c.gif"
+
+    async def main() -> None:
+        started = asyncio.Event()
+
+        def on_progress(p) -> None:
+            started.set()
+
+        task = asyncio.ensure_future(export_gif_async(scene, tl, str(out),
+                                                      options=GifOptions(size=(80, 60)),
+                                                      progress=on_progress))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert not out.exists()
+
+
+def test_concurrent_exports_share_bounded_pool(tmp_path: Path):
+    from algoviz.backends.aio import get_executor
+
+    scene, tl = _scene_tl()
+
+    async def main() -> None:
+        await asyncio.gather(*(export_svg_async(scene, tl, str(tmp_path / f"{k}.svg"))
+                               for k in range(6)))
+
+    asyncio.run(main())
+    pool = get_executor()
+    assert pool is get_executor()
+    assert len(pool._threads) <= pool._max_workers
+    assert all((tmp_path / f"{k}.svg").exists() for k in range(6))
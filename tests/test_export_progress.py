@@ -0,0 +1,105 @@
+from __future__ import annotations
+import io
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image, ImageSequence
+
+from algoviz.backends import GifOptions, export_gif, export_svg
+from algoviz.backends.gif_mpl import GifStreamWriter, _render_frame
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core.progress import CancelToken, ExportCancelled
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+
+def _scene_tl():
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar([3, 1, 2], name="A", x=6, y=10, bar_width=10, bar_gap=4, height=60))
+    tl = Timeline(fps=10)
+    tl.compare("A", 0, 1, duration=2)
+    tl.swap("A", 0, 1, duration=3)
+    tl.mark_sorted("A", 2, duration=2)
+    return scene, tl
+
+
+def test_gif_progress_is_monotonic_and_ends_with_done(tmp_path: Path):
+    scene, tl = _scene_tl()
+    seen = []
+    export_gif(scene, tl, str(tmp_path / "p.gif"), options=GifOptions(size=(80, 60)),
+               progress=seen.append)
+    total = tl.frame_count()
+    assert seen[-1].stage == "done" and seen[-1].eta == 0.0
+    assert all(p.total == total for p in seen)
+    assert [p.rendered for p in seen[:-1]] == list(range(1, total + 1))
+    # 写出器推迟一帧以合并相同帧：进行中 encoded 落后于 rendered，结束时追平
+    assert all(p.encoded < p.rendered for p in seen[:-1]) and seen[-1].encoded == total
+    for a, b in zip(seen, seen[1:]):
+        assert b.compiled >= a.compiled and b.rendered >= a.rendered and b.elapsed >= a.elapsed
+    assert seen[-1].fps > 0
+
+
+def test_gif_encoded_counts_only_frames_whose_bytes_are_written():
+    scene, tl = _scene_tl()
+    buf = io.BytesIO()
+    seen = []
+    export_gif(scene, tl, buf, options=GifOptions(size=(80, 60)),
+               progress=lambda p: seen.append((p.encoded, len(buf.getvalue()))))
+    assert seen[-1][1] == len(buf.getvalue())
+    for (enc_a, size_a), (enc_b, size_b) in zip(seen, seen[1:]):
+        assert size_b >= size_a and (enc_b == enc_a or size_b > size_a)
+    assert 0 < seen[-2][1] < seen[-1][1]       # 逐帧写出，而不是结束时一次性编码
+
+
+def test_gif_cancel_removes_partial_file(tmp_path: Path):
+    scene, tl = _scene_tl()
+    token = CancelToken()
+    out = tmp_path / "c.gif"
+
+    def on_progress(p):
+        if p.encoded == 2:
+            token.cancel()
+
+    with pytest.raises(ExportCancelled):
+        export_gif(scene, tl, str(out), options=GifOptions(size=(80, 60)),
+                   progress=on_progress, cancel=token)
+    assert not out.exists()
+
+
+def test_svg_cancel_writes_nothing(tmp_path: Path):
+    scene, tl = _scene_tl()
+    token = CancelToken()
+    token.cancel()
+    out = tmp_path / "c.svg"
+    with pytest.raises(ExportCancelled):
+        export_svg(scene, tl, str(out), cancel=token)
+    assert not out.exists()
+
+
+def test_svg_progress_counts_compiled_frames(tmp_path: Path):
+    scene, tl = _scene_tl()
+    seen = []
+    export_svg(scene, tl, str(tmp_path / "a.svg"), frame_index=3, progress=seen.append)
+    assert seen[-1].stage == "done"
+    assert seen[-1].total == seen[-1].compiled == 4
+
+
+def test_stream_writer_merges_identical_frames_and_round_trips():
+    scene, tl = _scene_tl()
+    frames = tl.build_frames(scene)
+    imgs = [_render_frame(scene, f, (80, 60)) for f in frames]
+    buf = io.BytesIO()
+    w = GifStreamWriter(buf)
+    for img in imgs:
+        w.write(img, 100)
+    w.write(imgs[-1], 100)  # 与上一帧相同：合并时长而不是新增一帧
+    w.close()
+    assert buf.getvalue().endswith(b";")
+
+    buf.seek(0)
+    with Image.open(buf) as im:
+        decoded = [np.asarray(f.convert("RGB")) for f in ImageSequence.Iterator(im)]
+        n = im.n_frames
+    assert n == w.frames_written <= len(imgs)
+    assert np.array_equal(decoded[-1], imgs[-1][..., :3])
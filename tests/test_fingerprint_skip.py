@@ -0,0 +1,107 @@
+from __future__ import annotations
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from algoviz.backends import GifOptions, export_gif, export_svg
+from algoviz.batch import DemoJob, OutputSpec, format_summary, run_batch
+from algoviz.components.arraybar import ArrayBar
+from algoviz.components.grid import Grid
+from algoviz.core import fingerprint
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+ROOT = Path(__file__).resolve().parents[1]
+DEMO = ROOT / "demos" / "sort_bubble.py"
+
+
+def _scene_tl(dur: int = 3):
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar([3, 1, 2], name="A", x=6, y=10, bar_width=10, bar_gap=4, height=60))
+    tl = Timeline(fps=10)
+    tl.compare("A", 0, 1, duration=2)
+    tl.swap("A", 0, 1, duration=dur)
+    return scene, tl
+
+
+def test_fingerprint_covers_events_scene_and_options():
+    scene, tl = _scene_tl()
+    base = fingerprint.compute(scene, tl, GifOptions(), kind="gif")
+    assert base == fingerprint.compute(*_scene_tl(), GifOptions(), kind="gif")
+    assert base != fingerprint.compute(*_scene_tl(dur=4), GifOptions(), kind="gif")
+    assert base != fingerprint.compute(scene, tl, GifOptions(fps=12), kind="gif")
+    assert base != fingerprint.compute(scene, tl, GifOptions(), kind="svg")
+    scene.actors["A"].x = 7
+    assert base != fingerprint.compute(scene, tl, GifOptions(), kind="gif")
+
+
+def test_fingerprint_sees_changes_inside_large_arrays(tmp_path: Path):
+    # 超过 NumPy 打印阈值（1000 个元素）的数组，repr 会省略中间部分
+    def build(values: np.ndarray) -> tuple:
+        scene = Scene(width=200, height=200)
+        scene.add(Grid(values, name="G", x=0, y=0, cell_w=3, cell_h=3))
+        tl = Timeline()
+        tl.add("G", "highlight_cell", {"cells": [[0, 0]]})
+        return scene, tl
+
+    values = np.zeros((60, 60))
+    out = tmp_path / "g.svg"
+    assert export_svg(*build(values), str(out), skip_unchanged=True) is True
+    assert export_svg(*build(values), str(out), skip_unchanged=True) is False
+    values[30, 30] = 9
+    assert export_svg(*build(values), str(out), skip_unchanged=True) is True
+    big = np.zeros((100, 100))
+    sig = fingerprint.scene_signature(build(big)[0])
+    big[50, 50] = 1
+    assert fingerprint.scene_signature(build(big)[0]) != sig
+
+
+def test_export_skips_when_fingerprint_matches(tmp_path: Path):
+    out = tmp_path / "a.gif"
+    opt = GifOptions(size=(80, 60))
+    assert export_gif(*_scene_tl(), str(out), options=opt, skip_unchanged=True) is True
+    assert Path(fingerprint.sidecar_path(out)).exists()
+    mtime = out.stat().st_mtime_ns
+    assert export_gif(*_scene_tl(), str(out), options=opt, skip_unchanged=True) is False
+    assert out.stat().st_mtime_ns == mtime
+    assert export_gif(*_scene_tl(dur=5), str(out), options=opt, skip_unchanged=True) is True
+
+    out.unlink()  # 指纹还在但输出没了：必须重新导出
+    assert export_gif(*_scene_tl(dur=5), str(out), options=opt, skip_unchanged=True) is True
+
+    svg = tmp_path / "a.svg"
+    assert export_svg(*_scene_tl(), str(svg), 0, skip_unchanged=True) is True
+    assert export_svg(*_scene_tl(), str(svg), 0, skip_unchanged=True) is False
+    assert export_svg(*_scene_tl(), str(svg), 1, skip_unchanged=True) is True
+
+
+def test_batch_skips_compile_when_everything_is_fresh(tmp_path: Path):
+    jobs = [DemoJob(demo=str(DEMO), outputs=[
+        OutputSpec("gif", str(tmp_path / "a.gif"), {"size": "80x60"}),
+        OutputSpec("svg", str(tmp_path / "a.svg")),
+    ])]
+    first = run_batch(jobs, 1)[0]
+    assert first.error is None and len(first.outputs) == 2 and "compile" in first.timings
+
+    second = run_batch(jobs, 1)[0]
+    assert second.outputs == [] and len(second.skipped) == 2
+    assert "compile" not in second.timings
+    assert "up-to-date" in format_summary([second])
+
+    forced = run_batch(jobs, 1, force=True)[0]
+    assert len(forced.outputs) == 2 and forced.skipped == []
+
+
+def test_cli_force_flag(tmp_path: Path):
+    out = tmp_path / "x.svg"
+    cmd = [sys.executable, "-m", "algoviz.cli", "svg", str(DEMO), "--outfile", str(out)]
+
+    def run(*extra: str) -> subprocess.CompletedProcess:
+        return subprocess.run(cmd + list(extra), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              text=True, timeout=30)
+
+    assert "已导出" in run().stdout
+    assert "跳过" in run().stdout
+    assert "已导出" in run("--force").stdout
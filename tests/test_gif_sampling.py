@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import io
+import random
+
+import pytest
+from PIL import Image
+
+from algoviz.backends import GifOptions, export_gif
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import CHECKPOINT_EVERY, Timeline
+
+VALUES = [7, 2, 9, 4, 1, 8, 3, 6, 5, 0]
+
+
+def _scene():
+    scene = Scene(width=160, height=80)
+    scene.add(ArrayBar(VALUES, name="A"))
+    return scene
+
+
+def _timeline():
+    tl = Timeline()
+    a = list(VALUES)
+    for end in range(len(a) - 1, 0, -1):
+        for i in range(end):
+            tl.compare("A", i, i + 1)
+            if a[i] > a[i + 1]:
+                tl.swap("A", i, i + 1)
+                a[i], a[i + 1] = a[i + 1], a[i]
+        tl.mark_sorted("A", end)
+    with tl.parallel():
+        tl.assign("A", 0, value=3)
+        tl.assign("A", 5, j=6)
+    tl.extend_bulk("A", ["compare", "swap", "highlight"], [1, 2, 3], [2, 3, 4])
+    return tl
+
+
+def test_iter_frames_at_matches_full_build():
+    tl = _timeline()
+    full = tl.build_frames(_scene())
+    rng = random.Random(3)
+    idx = sorted(rng.sample(range(len(full)), 25)) + [len(full) - 1]
+    got = list(tl.iter_frames_at(_scene(), idx))
+    assert [f.states for f in got] == [full[i].states for i in sorted(set(idx))]
+    assert [f.note for f in got] == [full[i].note for i in sorted(set(idx))]
+    with pytest.raises(IndexError):
+        list(tl.iter_frames_at(_scene(), [len(full)]))
+
+
+def test_iter_frames_at_only_compiles_sampled_events(monkeypatch):
+    tl = _timeline()
+    calls = []
+    orig = Timeline._event_frames
+
+    def counting(actor, ev, states):
+        out, nxt = orig(actor, ev, states)
+        calls.append(len(out))
+        return out, nxt
+
+    monkeypatch.setattr(Timeline, "_event_frames", staticmethod(counting))
+    list(tl.iter_frames_at(_scene(), tl.sample_indices(5)))
+    # 未被选中的事件只以 1 帧推进状态：事件数 + 5 个被选事件的帧
+    assert sum(calls) <= len(tl._events) + 5 * 10 < tl.frame_count()
+
+
+def test_iter_frames_at_seeks_from_checkpoints(monkeypatch):
+    tl = _timeline()
+    full = tl.build_frames(_scene())
+    list(tl.iter_frames_at(_scene(), [len(full) - 1]))       # 推进一遍，补齐检查点
+    calls = []
+    orig = Timeline._event_frames
+
+    def counting(actor, ev, states):
+        calls.append(ev)
+        return orig(actor, ev, states)
+
+    monkeypatch.setattr(Timeline, "_event_frames", staticmethod(counting))
+    idx = [3, len(full) // 2, len(full) - 1]
+    got = list(tl.iter_frames_at(_scene(), idx))
+    assert [f.states for f in got] == [full[i].states for i in idx]
+    # 每个所选帧最多从检查点推进 CHECKPOINT_EVERY 个事件，与事件总数无关
+    assert len(calls) <= len(idx) * CHECKPOINT_EVERY < len(tl._events)
+
+    # 追加事件后定位表重建，结果仍与完整编译一致
+    tl.swap("A", 0, 9)
+    full = tl.build_frames(_scene())
+    assert list(tl.iter_frames_at(_scene(), [len(full) - 1]))[0].states == full[-1].states
+
+
+def test_paced_iter_frames_at_matches_full_build(monkeypatch):
+    paced = _timeline().paced(300)
+    full = paced.build_frames(_scene())
+    idx = paced.sample_indices(7) + [0, 150]
+    got = list(paced.iter_frames_at(_scene(), idx))
+    assert [f.states for f in got] == [full[i].states for i in sorted(set(idx))]
+    calls = []
+    orig = Timeline._event_frames
+
+    def counting(actor, ev, states):
+        out, nxt = orig(actor, ev, states)
+        calls.append(len(out))
+        return out, nxt
+
+    monkeypatch.setattr(Timeline, "_event_frames", staticmethod(counting))
+    list(paced.iter_frames_at(_scene(), [len(full) - 1]))
+    assert sum(calls) < len(full)                                   # 未选事件不按份额构帧
+
+
+def test_sample_indices():
+    tl = _timeline()
+    total = tl.frame_count()
+    uni = tl.sample_indices(40)
+    assert len(uni) == 40 and uni[-1] == total - 1 and uni == sorted(set(uni))
+    keys = tl.sample_indices(40, "keyframes")
+    ends = set()
+    pos = 0
+    for ev in tl._events:
+        pos += max(1, ev.duration)
+        ends.add(pos - 1)
+    assert len(keys) == 40 and keys[-1] == total - 1 and set(keys) <= ends
+    assert tl.sample_indices(total + 5) == list(range(total))
+    with pytest.raises(ValueError):
+        tl.sample_indices(10, "random")
+    paced = tl.paced(60)
+    pk = paced.sample_indices(20, "keyframes")
+    assert len(pk) == 20 and pk[-1] == 59
+    assert len(list(paced.iter_frames_at(_scene(), pk))) == 20
+
+
+@pytest.mark.parametrize("sampling", ["uniform", "keyframes"])
+def test_export_gif_max_frames(sampling):
+    tl = _timeline()
+    opt = GifOptions(size=(160, 80), max_frames=12, sampling=sampling)
+    buf = io.BytesIO()
+    export_gif(_scene(), tl, buf, options=opt)
+    buf.seek(0)
+    with Image.open(buf) as im:
+        assert 1 < im.n_frames <= 12
+    # 预先编译好的帧（batch）直接按序号取用
+    frames = tl.build_frames(_scene())
+    again = io.BytesIO()
+    export_gif(_scene(), tl, again, options=opt, frames=frames)
+    assert again.getvalue() == buf.getvalue()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from algoviz.backends.svg_svgwrite import export_svg
+from algoviz.backends.tui_rich import _rasterize_ops_to_canvas
+from algoviz.components import graph as graph_mod
+from algoviz.components.graph import (CURRENT, EDGE_PATH, EDGE_PLAIN, EDGE_TREE, PATH, UNVISITED,
+                                      VISITED, Graph, force_layout, layered_layout)
+from algoviz.core.drawops import Circles, Segments, Text
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+# 0-1-2-3 链 + 0-3 捷径
+EDGES = [(0, 1), (1, 2), (2, 3), (0, 3)]
+
+
+def _scene(n=4, edges=EDGES, **kw):
+    scene = Scene(width=200, height=120)
+    scene.add(Graph(n, edges, name="G", x=0, y=0, width=200, height=120, **kw))
+    return scene
+
+
+def test_events_update_status_parent_and_tree_edges():
+    scene = _scene()
+    g = scene.actors["G"]
+    tl = Timeline()
+    tl.add("G", "enqueue", {"node": 0})
+    tl.add("G", "dequeue", {"node": 0})
+    tl.add("G", "visit", {"node": 1, "from": 0}, duration=4)
+    tl.add("G", "relax", {"u": 0, "v": 3, "dist": 5.0}, duration=3)
+    tl.add("G", "relax", {"u": 2, "v": 3, "dist": 3.0}, duration=3)   # 更短：父节点改为 2
+    frames = tl.build_frames(scene)
+    assert len(frames) == tl.frame_count() == 12
+
+    st = frames[1].states["G"]
+    assert st.status(0) == CURRENT and st.current == 0
+    mid = frames[3].states["G"]                      # visit 进行中：沿边推进、尚未落位
+    assert mid.active[:2] == (0, 1) and 0 < mid.active[2] < 1 and mid.status(1) == UNVISITED
+    done = frames[5].states["G"]                     # visit 最后一帧
+    assert done.status(1) == VISITED and done.parent_of(1) == 0
+    assert done.edges()[g.edge_index(1, 0)] == EDGE_TREE
+
+    last = frames[-1].states["G"]
+    assert last.distance(3) == 3.0 and last.parent_of(3) == 2
+    assert last.edges()[g.edge_index(2, 3)] == EDGE_TREE
+    assert last.edges()[g.edge_index(3, 0)] == EDGE_PLAIN   # 旧的树边还原
+    with pytest.raises(ValueError, match="no edge"):
+        g.edge_index(1, 3)
+
+
+def test_highlight_path_and_state_equality():
+    scene = _scene()
+    g = scene.actors["G"]
+    tl = Timeline()
+    tl.add("G", "highlight_path", {"nodes": [0, 1, 2]})
+    st = tl.build_frames(scene)[-1].states["G"]
+    assert st.nodes().tolist() == [PATH, PATH, PATH, 0]
+    assert st.edges()[g.edge_index(1, 2)] == EDGE_PATH
+    fresh = g.initial_state()
+    assert fresh == g.initial_state() and fresh != st
+    assert g.apply_event(fresh, "highlight_path", {"nodes": [0, 1, 2]}) == st
+
+
+def test_patches_are_small_and_shared_arrays_never_mutate():
+    n = 500
+    edges = [(v, v + 1) for v in range(n - 1)]
+    scene = _scene(n, edges)
+    init = scene.actors["G"].initial_state()
+    base_node = init.node
+    tl = Timeline()
+    for v in range(1, n):
+        tl.add("G", "visit", {"node": v, "from": v - 1}, duration=2)
+    frames = tl.build_frames(scene)
+    assert not base_node.any()                               # 初始数组未被原地修改
+    assert all(len(f.states["G"].node_patch) <= graph_mod.COMPACT for f in frames)
+    last = frames[-1].states["G"]
+    assert (last.nodes()[1:] == VISITED).all()
+    assert last.parents().tolist() == [-1] + list(range(n - 1))
+
+
+def test_draw_is_batched_and_layout_cached(monkeypatch):
+    n = 2000
+    rng = np.random.default_rng(1)
+    edges = np.column_stack([np.arange(1, n), rng.integers(0, np.arange(1, n))])
+    scene = _scene(n, edges, layout="layered")
+    g = scene.actors["G"]
+    calls = []
+    orig = graph_mod.layered_layout
+    def counting(*a, **k):
+        calls.append(1)
+        return orig(*a, **k)
+
+    monkeypatch.setattr(graph_mod, "layered_layout", counting)
+    graph_mod._LAYOUT_CACHE.clear()
+    ops = scene.render({"G": g.initial_state()})
+    ops = scene.render({"G": g.initial_state()})
+    assert calls == [1]
+    assert [type(op) for op in ops] == [Segments, Circles]           # 无标签、每类一个批量 op
+    assert len(ops[0]) == n - 1 and len(ops[1]) == n
+    xy = g.node_xy()
+    assert xy[:, 0].min() >= 0 and xy[:, 0].max() <= 200 and xy[:, 1].max() <= 120
+
+
+def test_layouts():
+    n = 40
+    src, dst = np.arange(1, n), (np.arange(1, n) - 1) // 2          # 二叉树
+    pos = layered_layout(n, src, dst, root=0)
+    depth = np.floor(np.log2(np.arange(n) + 1))
+    assert (np.argsort(pos[:, 1], kind="stable") == np.argsort(depth, kind="stable")).all()
+    f = force_layout(n, src, dst)
+    assert f.shape == (n, 2) and np.isfinite(f).all() and f.min() >= 0 and f.max() <= 1
+    # 相连节点平均距离小于任意节点对
+    linked = np.linalg.norm(f[src] - f[dst], axis=1).mean()
+    anyp = np.linalg.norm(f[:, None] - f[None], axis=2).mean()
+    assert linked < anyp
+    with pytest.raises(ValueError):
+        Graph(3, [(0, 5)], name="G")
+    with pytest.raises(ValueError):
+        Graph(3, [(0, 1)], name="G", layout="spring")
+
+
+def test_backends_render_graph(tmp_path):
+    scene = _scene(show_labels=True)
+    tl = Timeline()
+    tl.add("G", "visit", {"node": 1, "from": 0}, duration=4)
+    tl.add("G", "relax", {"u": 1, "v": 2, "dist": 7})
+    out = tmp_path / "g.svg"
+    export_svg(scene, tl, str(out), frame_index=1)
+    svg = out.read_text(encoding="utf-8")
+    assert svg.count("<circle") == 4 and "<path" in svg and ">7<" not in svg
+    export_svg(scene, tl, str(out))
+    assert ">7<" in out.read_text(encoding="utf-8")
+    ops = scene.render(tl.build_frames(scene)[-1].states)
+    assert any(isinstance(op, Text) for op in ops)
+    plain = _scene(show_labels=False)
+    ops = plain.render(tl.build_frames(plain)[-1].states)
+    canvas = _rasterize_ops_to_canvas(ops, plain, 40, 12).plain
+    assert canvas.count("●") >= 3 and "·" in canvas
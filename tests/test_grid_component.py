@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import io
+import math
+
+import numpy as np
+import pytest
+
+from algoviz.backends import GifOptions, export_gif
+from algoviz.backends.svg_svgwrite import export_svg
+from algoviz.components._patch import COMPACT
+from algoviz.components.grid import BLANK, FILLED, Grid
+from algoviz.core.drawops import Cells, Rects, Text
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+
+def _scene(values=(3, 4), **kw):
+    scene = Scene(width=120, height=80)
+    scene.add(Grid(values, name="T", x=0, y=0, cell_w=20, cell_h=20, **kw))
+    return scene
+
+
+def test_set_and_copy_cell_land_on_last_frame():
+    scene = _scene()
+    tl = Timeline()
+    tl.add("T", "set_cell", {"r": 0, "c": 1, "value": 5}, duration=3)
+    tl.add("T", "copy_cell", {"r": 2, "c": 3, "from": [0, 1]}, duration=4)
+    frames = tl.build_frames(scene)
+    first = frames[0].states["T"]
+    assert math.isnan(first.value(0, 1))
+    assert first.active == (0, 1, -1, -1, pytest.approx(first.active[4]))
+    written = frames[2].states["T"]
+    assert written.value(0, 1) == 5 and written.status_of(0, 1) == FILLED
+    moving = [f.states["T"].active for f in frames[3:6]]
+    assert all(a[:4] == (2, 3, 0, 1) for a in moving)
+    assert [a[4] for a in moving] == sorted(a[4] for a in moving)
+    last = frames[-1].states["T"]
+    assert last.value(2, 3) == 5 and last.status_of(2, 3) == FILLED
+    assert last.status_of(1, 1) == BLANK
+    done = scene.actors["T"].finalize_event(last, "copy_cell", {"r": 2, "c": 3, "from": [0, 1]})
+    assert done.active is None
+
+
+def test_highlights_replace_and_clear():
+    scene = _scene()
+    g = scene.actors["T"]
+    st = g.initial_state()
+    st = g.apply_event(st, "highlight_cell", {"cells": [[0, 0], [1, 2]]})
+    st = g.apply_event(st, "highlight_row", {"r": 2})
+    st = g.apply_event(st, "highlight_col", {"cols": [1, 3]})
+    assert st.cells == ((0, 0), (1, 2)) and st.rows == (2,) and st.cols == (1, 3)
+    st = g.apply_event(st, "highlight_cell", {"r": 1, "c": 1})
+    assert st.cells == ((1, 1),)
+    st = g.apply_event(st, "highlight_cell", {"cells": []})
+    assert st.cells == () and st.rows == (2,)
+
+
+def test_large_grid_draw_does_not_scale_with_table_size():
+    n = 1000
+    scene = _scene((n, n), show_values=False)
+    g = scene.actors["T"]
+    init = g.initial_state()
+    tl = Timeline()
+    for k in range(200):
+        tl.add("T", "set_cell", {"r": k, "c": (7 * k) % n, "value": k})
+        tl.add("T", "highlight_row", {"r": k})
+    frames = tl.build_frames(scene)
+    assert all(len(f.states["T"].value_patch) <= COMPACT for f in frames)
+    assert np.isnan(init.values).all()                # 初始数组未被修改
+    for f in frames[::37]:
+        st = f.states["T"]
+        ops = g.draw(st)
+        assert isinstance(ops[0], Cells) and ops[0].codes is st.status        # 整表直接引用，不复制
+        assert sum(len(op) for op in ops[1:] if isinstance(op, Rects)) <= COMPACT + 3
+    last = frames[-1].states["T"]
+    grid = last.grid_values()
+    assert grid[199, (7 * 199) % n] == 199 and np.isfinite(grid).sum() == 200
+
+
+def test_labels_and_backends(tmp_path):
+    scene = _scene([[0, 1, float("nan")], [2, 3, 4]])
+    assert scene.actors["T"].show_values
+    tl = Timeline()
+    tl.add("T", "highlight_cell", {"r": 0, "c": 0})
+    tl.add("T", "set_cell", {"r": 0, "c": 2, "value": 9}, duration=2)
+    ops = scene.render(tl.build_frames(scene)[-1].states)
+    labels = sorted(op.content for op in ops if isinstance(op, Text))
+    assert labels == ["0", "1", "2", "3", "4", "9"]
+    out = tmp_path / "t.svg"
+    export_svg(scene, tl, str(out))
+    svg = out.read_text(encoding="utf-8")
+    assert svg.count("h20.00v20.00h-20.00z") >= 6 and ">9<" in svg
+    buf = io.BytesIO()
+    export_gif(scene, tl, buf, options=GifOptions(size=(120, 80)))
+    assert buf.getvalue()[:6] == b"GIF89a"
+    with pytest.raises(ValueError):
+        Grid([1, 2, 3], name="bad")
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from rich.console import Console
+
+from algoviz.backends import PlayerState, render_sidebar
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core.compiler import BackgroundCompiler
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+
+def _scene_tl():
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar([4, 3, 2, 1], name="A"))
+    tl = Timeline(fps=10)
+    for i in range(3):
+        tl.compare("A", i, i + 1, duration=2, note=f"c{i}")
+        tl.swap("A", i, i + 1, duration=5, note=f"s{i}")
+    return scene, tl
+
+
+def test_frame_count_matches_build_and_iter():
+    scene, tl = _scene_tl()
+    frames = tl.build_frames(scene)
+    assert tl.frame_count() == len(frames) == 21
+    assert [f.note for f in tl.iter_frames(scene)] == [f.note for f in frames]
+
+
+def test_background_compiler_serves_frames_in_order():
+    scene, tl = _scene_tl()
+    expected = tl.build_frames(scene)
+    with BackgroundCompiler(scene, tl) as comp:
+        assert comp.total == len(expected)
+        # 直接跳到末帧：只等待到该帧就绪
+        last = comp.get(comp.total - 1, timeout=5)
+        assert last.states["A"].order == expected[-1].states["A"].order
+        assert comp.compiled == comp.total
+        assert comp.get(3).note == expected[3].note
+        try:
+            comp.get(comp.total, timeout=5)
+        except IndexError:
+            pass
+        else:
+            raise AssertionError("expected IndexError past the end")
+
+
+def test_sidebar_shows_compile_progress():
+    state = PlayerState(frame_idx=0, paused=False, speed=1.0, total_frames=40, fps=20, compiled=12)
+    console = Console(width=80, record=True)
+    console.print(render_sidebar(state))
+    assert "Compiled: 12/40" in console.export_text()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+
+from algoviz.backends.gif_mpl import FrameRasterizer
+from algoviz.backends.svg_svgwrite import export_svg
+from algoviz.backends.tui_rich import _rasterize_frame, _rasterize_ops_to_canvas
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core import fingerprint
+from algoviz.core.drawops import Rect, Text
+from algoviz.core.scene import Decoration, Scene
+from algoviz.core.timeline import Timeline
+
+
+class Counting(Decoration):
+    """记录 draw 调用次数的静态层。"""
+
+    def __init__(self, *args, **kw):
+        super().__init__(*args, **kw)
+        self.calls = 0
+
+    def draw(self, state):
+        self.calls += 1
+        return super().draw(state)
+
+
+def _scene(static=True):
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar([3, 1, 2, 5], name="A", x=6, y=20, bar_width=10, bar_gap=4, height=50))
+    scene.add(Counting("legend", [Rect(70, 4, 40, 14, fill="#FFFFFF", stroke="#333333"),
+                                  Text(90, 16, "legend", size=8)], z=5), static=static)
+    scene.add(Counting("bg", [Rect(0, 0, 120, 80, fill="#EEF2F7"),
+                              Rect(4, 70, 112, 2, fill="#888888")]), static=static)
+    tl = Timeline()
+    tl.add("A", "compare", {"i": 0, "j": 1}, duration=2)
+    tl.add("A", "swap", {"i": 0, "j": 1}, duration=4)
+    return scene, tl
+
+
+def test_bands_follow_z_order_and_idle_state_is_taken_once():
+    scene, _ = _scene()
+    assert scene.bands() == ((True, ("bg",)), (False, ("A",)), (True, ("legend",)))
+    assert scene.ordered() == ["bg", "A", "legend"]
+    calls = []
+    bar = scene.actors["A"]
+    orig = bar.initial_state
+    bar.initial_state = lambda: calls.append(1) or orig()
+    ops = scene.render({})
+    assert ops[0].fill == "#EEF2F7" and isinstance(ops[-1], Text)     # 背景最下、图例最上
+    for _ in range(5):
+        scene.render({})
+    assert len(calls) == 1
+    flat, _ = _scene(static=False)
+    assert flat.bands() == ((False, ("bg", "A", "legend")),)
+    assert fingerprint.scene_signature(scene) != fingerprint.scene_signature(flat)
+
+
+def test_gif_static_layers_are_drawn_once_and_composited():
+    scene, tl = _scene()
+    frames = tl.build_frames(scene)
+    raster = FrameRasterizer(scene, (240, 160))
+    imgs = [raster(f) for f in frames]
+    assert scene.actors["bg"].calls == 1 and scene.actors["legend"].calls == 1
+    flat, _ = _scene(static=False)
+    ref = FrameRasterizer(flat, (240, 160))
+    for img, fr in zip(imgs, frames):
+        assert np.array_equal(img, ref(fr))                            # 与逐帧整图绘制一致
+    assert flat.actors["bg"].calls == len(frames)
+    assert not np.array_equal(imgs[0], imgs[-1])
+
+
+def test_tui_and_svg_cache_static_layers(tmp_path):
+    scene, tl = _scene()
+    frames = tl.build_frames(scene)
+    for fr in frames:
+        text = _rasterize_frame(scene, fr.states, 40, 12).plain
+        assert text == _rasterize_ops_to_canvas(scene.render(fr.states), scene, 40, 12).plain
+    before = scene.actors["bg"].calls
+    for fr in frames:
+        _rasterize_frame(scene, fr.states, 40, 12)
+    assert scene.actors["bg"].calls == before                          # 同一画布尺寸只画一次
+    out = tmp_path / "s.svg"
+    export_svg(scene, tl, str(out), frames=frames)
+    svg = out.read_text(encoding="utf-8")
+    assert svg.count('<g class="static-layer">') == 2
+    assert svg.index("#EEF2F7") < svg.index("#4C97FF") < svg.index(">legend<")
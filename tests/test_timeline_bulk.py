@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core.events import EventTable
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Event, Timeline
+
+
+def _scene():
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar([5, 3, 4, 1, 2], name="A"))
+    return scene
+
+
+def _states(tl: Timeline):
+    return [f.states for f in tl.build_frames(_scene())]
+
+
+def test_extend_bulk_matches_per_call_api():
+    ref = Timeline()
+    ref.compare("A", 0, 1, note="c")
+    ref.swap("A", 0, 1)
+    ref.assign("A", 2, value=7)
+    ref.assign("A", 3, j=4)
+    ref.highlight("A", idx=1)
+    ref.highlight("A", start=1, end=3)
+    ref.mark_sorted("A", 2, note="c")
+
+    tl2 = Timeline()
+    tl2.extend_bulk("A", "compare", [0], [1], notes="c")
+    tl2.extend_bulk("A", "swap", [0], [1])
+    tl2.extend_bulk("A", "assign", [2], values=[7])
+    tl2.extend_bulk("A", "assign", [3], [4])
+    tl2.extend_bulk("A", "highlight", [1])
+    tl2.extend_bulk("A", "highlight", [1], [3])
+    tl2.extend_bulk("A", "mark_sorted", [2], notes="c")
+    assert list(tl2._events) == list(ref._events)
+    assert tl2.frame_count() == ref.frame_count()
+    assert _states(tl2) == _states(ref)
+
+
+def test_bulk_accepts_numpy_and_keeps_order_with_per_call_events():
+    n = 1000
+    rng = np.random.default_rng(0)
+    i = rng.integers(0, 4, n)
+    etypes = np.where(rng.random(n) < 0.5, "compare", "swap")
+    tl = Timeline()
+    tl.compare("A", 0, 1)
+    tl.extend_bulk("A", etypes, i, i + 1, durations=rng.integers(1, 4, n), easing="linear")
+    tl.swap("A", 3, 4)
+
+    ref = Timeline()
+    ref.compare("A", 0, 1)
+    for e, a, d in zip(etypes.tolist(), i.tolist(), tl._events[1:n + 1]):
+        ref.add("A", e, {"i": a, "j": a + 1}, duration=d.duration, easing="linear")
+    ref.swap("A", 3, 4)
+
+    assert len(tl._events) == n + 2
+    assert tl._events[-1] == ref._events[-1] and tl._events[500] == ref._events[500]
+    assert tl._events[10:20] == ref._events[10:20]
+    assert tl.frame_count() == ref.frame_count()
+    assert _states(tl) == _states(ref)
+    assert tl.scaled(2.0).frame_count() == ref.scaled(2.0).frame_count()
+
+
+def test_default_durations_and_easing():
+    tl = Timeline()
+    tl.extend_bulk("A", ["swap", "compare", "assign"], [0, 1, 2], [1, 2, 3])
+    assert [ev.duration for ev in tl._events] == [10, 1, 8]
+    tl.compare("A", 0, 1)
+    tl.set_default_easing("linear")
+    assert {ev.easing for ev in tl._events} == {"linear"}
+
+
+def test_bulk_table_is_compact():
+    n = 100_000
+    tl = Timeline()
+    tl.extend_bulk("A", "swap", np.arange(n) % 4, np.arange(n) % 4 + 1)
+    table = tl._events.segments[0]
+    assert isinstance(table, EventTable)
+    assert sum(c.nbytes for c in table.cols.values()) < 24 * n
+
+
+def test_bulk_validation():
+    tl = Timeline()
+    with pytest.raises(ValueError):
+        tl.extend_bulk("A", ["swap", "swap"], [0, 1, 2], [1, 2, 3])
+    with pytest.raises(TypeError):
+        tl.extend_bulk("A", "swap", [0.5], [1])
+    assert isinstance(tl.extend_bulk("A", "swap", [], []), Timeline) and len(tl._events) == 0
+    assert Event("A", "swap", {"i": 0, "j": 1}) == Event("A", "swap", {"i": 0, "j": 1})
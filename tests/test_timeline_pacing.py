@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core.pacing import PacedTimeline, solve_scale
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+
+def _bubble(values):
+    tl = Timeline()
+    a = list(values)
+    for end in range(len(a) - 1, 0, -1):
+        for i in range(end):
+            tl.compare("A", i, i + 1)
+            if a[i] > a[i + 1]:
+                tl.swap("A", i, i + 1)
+                a[i], a[i + 1] = a[i + 1], a[i]
+        tl.mark_sorted("A", end)
+    return tl
+
+
+VALUES = [9, 3, 7, 1, 8, 2, 6, 4, 5, 0, 11, 10]
+
+
+def _scene():
+    scene = Scene(width=200, height=80)
+    scene.add(ArrayBar(VALUES, name="A"))
+    return scene
+
+
+@pytest.mark.parametrize("budget", [300, 120, 30, 1])
+def test_paced_hits_budget_and_ends_on_final_state(budget):
+    tl = _bubble(VALUES)
+    full = tl.build_frames(_scene())
+    assert tl.frame_count() > budget
+    paced = tl.paced(budget)
+    assert isinstance(paced, PacedTimeline) and paced._events is tl._events
+    frames = paced.build_frames(_scene())
+    assert len(frames) == paced.frame_count() == budget
+    assert frames[-1].states == full[-1].states
+
+
+def test_swaps_keep_animation_when_compares_can_absorb_the_cut():
+    tl = _bubble(VALUES)
+    totals = tl._events.etype_durations()
+    budget = totals["swap"] + 40
+    paced = tl.paced(budget)
+    swaps = [ev for ev in tl._events if ev.etype == "swap"]
+    assert all(paced.share(ev) == ev.duration for ev in swaps)
+    assert all(paced.share(ev) < 1 for ev in tl._events if ev.etype == "compare")
+    # 份额总和 = 预算 - 1（末事件另占 1 帧）
+    assert sum(paced.share(ev) for ev in tl._events) == pytest.approx(budget - 1)
+
+
+def test_paced_is_identity_when_under_budget_and_by_seconds():
+    tl = _bubble(VALUES)
+    assert tl.paced(10 ** 6) is tl
+    by_seconds = tl.paced(seconds=2.0)
+    assert by_seconds.frame_count() == 2 * tl.fps
+    with pytest.raises(TypeError):
+        tl.paced()
+    assert tl.paced(100).scaled(0.5).frame_count() == 50
+
+
+def test_solve_scale_piecewise():
+    totals = {"swap": 100, "compare": 1000}
+    w = {"compare": 0.1}
+    assert solve_scale(totals, w, 10 ** 4) == float("inf")
+    s = solve_scale(totals, w, 300)      # swap 饱和：100 + 1000·0.1·s = 300
+    assert s == pytest.approx(2.0)
+    s = solve_scale(totals, w, 50)       # 都未饱和：(100 + 100)·s = 50
+    assert s == pytest.approx(0.25)
+
+
+def test_paced_groups_and_fingerprint_distinguishes_budgets():
+    from algoviz.core import fingerprint
+
+    tl = Timeline()
+    for _ in range(20):
+        with tl.parallel() as p:
+            with p.track():
+                tl.swap("A", 0, 1)
+                tl.swap("A", 1, 2)
+            tl.swap("A", 5, 6)
+    frames = tl.paced(15).build_frames(_scene())
+    assert len(frames) == 15
+    fp = [fingerprint.compute(_scene(), t, kind="gif") for t in (tl, tl.paced(15), tl.paced(16))]
+    assert len(set(fp)) == 3
+
+
+def test_cli_frame_budget(tmp_path):
+    root = Path(__file__).resolve().parents[1]
+    out = tmp_path / "paced.gif"
+    cmd = [sys.executable, "-m", "algoviz.cli", "gif", str(root / "demos" / "sort_bubble_full.py"),
+           "--outfile", str(out), "--size", "160x90", "--frame-budget", "12", "--no-progress"]
+    cp = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=60)
+    assert cp.returncode == 0, cp.stderr
+    from PIL import Image
+    with Image.open(out) as im:
+        assert im.n_frames <= 12
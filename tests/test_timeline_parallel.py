@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import pytest
+
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core.events import PARALLEL
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+
+def _scene(values=(8, 7, 6, 5, 4, 3, 2, 1)):
+    scene = Scene(width=200, height=80)
+    scene.add(ArrayBar(list(values), name="A"))
+    scene.add(ArrayBar([3, 2, 1], name="B"))
+    return scene
+
+
+def _odd_even(tl: Timeline, values, parallel: bool) -> None:
+    a = list(values)
+    n = len(a)
+    for rnd in range(n):
+        pairs = [(i, i + 1) for i in range(rnd % 2, n - 1, 2) if a[i] > a[i + 1]]
+        if not pairs:
+            continue
+        if parallel:
+            with tl.parallel():
+                for i, j in pairs:
+                    tl.swap("A", i, j, duration=4)
+        else:
+            for i, j in pairs:
+                tl.swap("A", i, j, duration=4)
+        for i, j in pairs:
+            a[i], a[j] = a[j], a[i]
+
+
+def test_odd_even_transposition_shares_frames():
+    values = [8, 7, 6, 5, 4, 3, 2, 1]
+    seq, par = Timeline(), Timeline()
+    _odd_even(seq, values, parallel=False)
+    _odd_even(par, values, parallel=True)
+    assert par.frame_count() * 3 < seq.frame_count()
+    assert any(ev.etype == PARALLEL for ev in par._events)
+    scene = _scene(values)
+    frames = par.build_frames(scene)
+    assert len(frames) == par.frame_count()
+    assert frames[-1].states["A"].values == sorted(values)
+    assert frames[-1].states["A"].values == seq.build_frames(scene)[-1].states["A"].values
+    # 动画中途两对交换同时在移动
+    mid = frames[1].states["A"].offsets
+    assert len(mid) == 8
+
+
+def test_tracks_run_sequentially_within_and_parallel_across():
+    tl = Timeline()
+    with tl.parallel() as p:
+        with p.track():
+            tl.compare("A", 0, 1, duration=2)
+            tl.swap("A", 0, 1, duration=4)
+        with p.track():
+            tl.swap("B", 0, 2, duration=3)
+    (ev,) = list(tl._events)
+    assert ev.etype == PARALLEL and ev.duration == 6 and tl.frame_count() == 6
+    frames = tl.build_frames(_scene())
+    assert frames[0].states["A"].compare == (0, 1)
+    assert frames[2].states["A"].compare is None and frames[2].states["B"].values == [1, 2, 3]
+    assert frames[-1].states["A"].values[:2] == [7, 8]
+
+    half = tl.scaled(0.5)
+    assert half.frame_count() == 3 and half.build_frames(_scene())[-1].states == frames[-1].states
+    assert tl.scaled(0.01).frame_count() == 2    # 不短于最长轨道的事件数
+
+
+def test_conflicts_are_detected():
+    tl = Timeline()
+    with pytest.raises(ValueError, match="both touch actor 'A'"):
+        with tl.parallel():
+            tl.swap("A", 0, 1)
+            tl.swap("A", 1, 2)
+    with pytest.raises(ValueError):
+        with tl.parallel():
+            tl.compare("A", 0, 1)
+            tl.compare("A", 4, 5)       # 同一个 compare 字段
+    with pytest.raises(ValueError):
+        with tl.parallel():
+            tl.add("A", "custom", {})   # 未知事件类型占用整个 actor
+            tl.swap("A", 4, 5)
+    assert len(tl._events) == 0
+
+    with tl.parallel() as p:            # 同一轨道上先后发生，不冲突
+        with p.track():
+            tl.swap("A", 0, 1)
+            tl.swap("A", 1, 2)
+        tl.swap("B", 0, 1, duration=30)
+    assert len(tl._events) == 1
+
+    with tl.parallel(on_conflict="sequential"):
+        tl.swap("A", 0, 1)
+        tl.swap("A", 1, 2)
+    assert [ev.etype for ev in tl._events][1:] == ["swap", "swap"]
+
+
+def test_exceptions_and_nesting():
+    tl = Timeline()
+    with pytest.raises(KeyError):
+        with tl.parallel():
+            tl.swap("A", 0, 1)
+            raise KeyError("boom")
+    assert len(tl._events) == 0
+    with pytest.raises(RuntimeError):
+        with tl.parallel():
+            with tl.parallel():
+                pass
+    tl.swap("A", 0, 1)                   # 块外恢复正常追加
+    assert len(tl._events) == 1
+
+
+def test_parallel_bulk_and_roundtrip(tmp_path):
+    tl = Timeline()
+    with tl.parallel():
+        tl.extend_bulk("A", "swap", [0, 2, 4, 6], [1, 3, 5, 7], durations=5)
+    (ev,) = list(tl._events)
+    assert ev.etype == PARALLEL and ev.duration == 5
+    path = tmp_path / "par.avtl"
+    tl.save(str(path))
+    back = Timeline.load(str(path))
+    assert list(back._events) == list(tl._events)
+    assert back.build_frames(_scene())[-1].states["A"].values == [7, 8, 5, 6, 3, 4, 1, 2]
+    assert back.scaled(0.1).frame_count() == 1
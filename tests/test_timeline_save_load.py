@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core.events import EventTable
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+
+def _scene():
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar([5, 3, 4, 1, 2], name="A"))
+    return scene
+
+
+def _timeline() -> Timeline:
+    tl = Timeline(fps=12)
+    tl.compare("A", 0, 1, note="比较")
+    tl.swap("A", 0, 1, easing="linear")
+    tl.assign("A", 2, value=7)
+    tl.assign("A", 3, value=1.5)
+    tl.assign("A", 3, j=4)
+    tl.highlight("A", start=1, end=3)
+    tl.add("A", "custom", {"tag": "x", "xs": [1, 2]})
+    tl.extend_bulk("A", ["compare", "swap"] * 50, np.arange(100) % 4, np.arange(100) % 4 + 1)
+    tl.mark_sorted("A", 2)
+    return tl
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load_roundtrip(tmp_path, mmap):
+    tl = _timeline()
+    path = tmp_path / "run.avtl"
+    tl.save(str(path))
+    back = Timeline.load(str(path), mmap=mmap)
+    assert back.fps == 12
+    assert list(back._events) == list(tl._events)
+    assert back.frame_count() == tl.frame_count()
+    expected = [f.states for f in tl.build_frames(_scene())]
+    assert [f.states for f in back.build_frames(_scene())] == expected
+
+
+def test_load_is_memory_mapped_and_lazy(tmp_path):
+    n = 200_000
+    tl = Timeline()
+    tl.extend_bulk("A", "compare", np.arange(n) % 4, np.arange(n) % 4 + 1)
+    path = tmp_path / "big.avtl"
+    tl.save(str(path))
+    back = Timeline.load(str(path))
+    (table,) = back._events.segments
+    assert isinstance(table, EventTable)
+    assert all(isinstance(c.base, np.memmap) or isinstance(c, np.memmap)
+               for c in table.cols.values())
+    assert back._events[n - 1] == tl._events[n - 1]
+    assert path.stat().st_size < 24 * n + 4096
+
+    # 存档后的时间线仍可改缓动/缩放（生成新列，不写回文件）
+    back.set_default_easing("linear")
+    assert back._events[0].easing == "linear"
+    assert Timeline.load(str(path))._events[0].easing is None
+
+
+def test_load_rejects_other_files(tmp_path):
+    bad = tmp_path / "x.avtl"
+    bad.write_bytes(b"GIF89a....")
+    with pytest.raises(ValueError):
+        Timeline.load(str(bad))
+
+
+def test_empty_timeline(tmp_path):
+    path = tmp_path / "empty.avtl"
+    Timeline(fps=5).save(str(path))
+    back = Timeline.load(str(path))
+    assert back.fps == 5 and len(back._events) == 0
@@ -0,0 +1,67 @@
+from __future__ import annotations
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from algoviz.backends import GifOptions, export_gif, export_svg
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core import trace
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _scene_tl():
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar([3, 1, 2], name="A", x=6, y=10, bar_width=10, bar_gap=4, height=60))
+    tl = Timeline(fps=10)
+    tl.compare("A", 0, 1, duration=2)
+    tl.swap("A", 0, 1, duration=3)
+    return scene, tl
+
+
+def test_disabled_tracing_is_a_no_op():
+    assert trace.active() is None
+    with trace.span("anything"):
+        pass
+    trace.count("anything")
+
+
+def test_aggregator_and_chrome_trace_cover_pipeline(tmp_path: Path):
+    scene, tl = _scene_tl()
+    agg, chrome = trace.Aggregator(), trace.ChromeTrace()
+    with trace.tracing(agg, chrome):
+        # 导出走 iter_frames 逐帧流水线，不再经过 build_frames；单独构帧一次以覆盖该 span
+        tl.build_frames(scene)
+        export_gif(scene, tl, str(tmp_path / "a.gif"), options=GifOptions(size=(80, 60)))
+        export_svg(scene, tl, str(tmp_path / "a.svg"))
+    assert trace.active() is None
+
+    st = agg.stats()
+    for name in ("build_frames", "compile_event", "scene.render", "gif.raster", "gif.encode",
+                 "gif.export", "svg.export"):
+        assert name in st, name
+    assert st["compile_event"]["count"] == 6  # 构帧 + 两次导出，各两个事件
+    assert st["gif.raster"]["count"] == 5
+    assert st["gif.raster"]["p50"] <= st["gif.raster"]["p95"] <= st["gif.raster"]["max"]
+    assert agg.counters["frames_compiled"] == 15
+    assert "gif.raster" in agg.report()
+
+    out = tmp_path / "trace.json"
+    chrome.dump(str(out))
+    events = json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    assert {"name", "ts", "dur", "pid", "tid"} <= set(spans[0])
+    assert any(e["ph"] == "C" and e["name"] == "frames_compiled" for e in events)
+
+
+def test_cli_trace_flag(tmp_path: Path):
+    out = tmp_path / "t.json"
+    cmd = [sys.executable, "-m", "algoviz.cli", "svg", str(ROOT / "demos" / "sort_bubble.py"),
+           "--outfile", str(tmp_path / "x.svg"), "--trace", str(out)]
+    cp = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=30)
+    assert cp.returncode == 0, cp.stderr
+    assert "svg.export" in cp.stderr
+    assert json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
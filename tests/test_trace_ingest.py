@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import gzip
+import json
+import subprocess
+import sys
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from algoviz.core.timeline import Timeline
+from algoviz.io.trace import TraceSource, array_scene, load_array, timeline_from_trace
+
+
+def _reference() -> Timeline:
+    tl = Timeline()
+    tl.highlight("A", start=0, end=4)
+    tl.compare("A", 0, 1, note="c")
+    tl.swap("A", 0, 1, duration=3)
+    tl.assign("A", 2, value=7)
+    tl.assign("A", 3, j=4)
+    tl.mark_sorted("A", 1)
+    return tl
+
+
+NDJSON = "\n".join([
+    '{"op": "highlight", "start": 0, "end": 4}',
+    '{"op": "compare", "i": 0, "j": 1, "note": "c"}',
+    "",
+    '{"op": "swap", "i": 0, "j": 1, "duration": 3}',
+    '{"op": "assign", "i": 2, "value": 7}',
+    '{"op": "assign", "i": 3, "j": 4}',
+    '{"op": "mark_sorted", "upto": 1}',
+]) + "\n"
+
+CSV = "op,i,j,value,duration,note\nhighlight,0,4,,,\ncompare,0,1,,,c\nswap,0,1,,3,\n" \
+      "assign,2,,7,,\nassign,3,4,,,\nmark_sorted,1,,,,\n"
+
+TXT = "# op i j\nhighlight 0 4\ncompare 0 1\nswap 0 1\nassign 3 4\nmark_sorted 1\n"
+
+
+def _events(tl: Timeline):
+    return list(tl._events)
+
+
+@pytest.mark.parametrize("name,text", [("ops.ndjson", NDJSON), ("ops.csv", CSV)])
+def test_formats_match_per_call_api(tmp_path, name, text):
+    p = tmp_path / name
+    p.write_text(text, encoding="utf-8")
+    tl = timeline_from_trace(p)
+    assert _events(tl) == _events(_reference())
+    assert tl.frame_count() == _reference().frame_count()
+    scene = array_scene([5, 3, 4, 1, 2])
+    expected = [f.states for f in _reference().build_frames(scene)]
+    assert [f.states for f in tl.build_frames(scene)] == expected
+
+
+def test_positional_text_and_gzip(tmp_path):
+    p = tmp_path / "ops.log.gz"
+    with gzip.open(p, "wt", encoding="utf-8") as f:
+        f.write(TXT)
+    ref = Timeline()
+    ref.highlight("A", start=0, end=4).compare("A", 0, 1).swap("A", 0, 1)
+    ref.assign("A", 3, j=4).mark_sorted("A", 1)
+    assert _events(timeline_from_trace(p)) == _events(ref)
+
+
+def test_random_access_uses_offset_index(tmp_path):
+    n = 20_000
+    p = tmp_path / "big.ndjson"
+    with open(p, "w") as f:
+        for k in range(n):
+            rec = {"op": "swap" if k % 3 else "compare", "i": k % 7, "j": k % 7 + 1}
+            f.write(json.dumps(rec) + "\n")
+    src = TraceSource(p)
+    tl = Timeline().add_source(src)
+    assert len(tl._events) == n and len(src._index) > 1
+    ref = Timeline().add("A", "compare", {"i": 12345 % 7, "j": 12345 % 7 + 1})
+    assert tl._events[12345] == ref._events[0]
+    assert tl._events[n - 2: n] == list(src.rows())[n - 2:]
+    scaled = sum(max(1, round(ev.duration * 0.5)) for ev in src.rows())
+    assert tl.scaled(0.5).frame_count() == scaled
+
+
+def test_streaming_memory_is_bounded(tmp_path):
+    n = 50_000
+    p = tmp_path / "big.txt"
+    p.write_text("".join(f"compare {k % 9} {k % 9 + 1}\n" for k in range(n)))
+    tl = timeline_from_trace(p)
+    scene = array_scene(list(range(10)))
+    tracemalloc.start()
+    count = sum(1 for _ in tl.iter_frames(scene))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert count == n
+    assert peak < 2_000_000
+
+
+def test_errors_report_line_numbers(tmp_path):
+    p = tmp_path / "bad.ndjson"
+    p.write_text('{"op": "swap", "i": 0, "j": 1}\n{"i": 1}\n')
+    with pytest.raises(ValueError, match=r"bad\.ndjson:2"):
+        list(TraceSource(p).rows())
+    with pytest.raises(ValueError):
+        TraceSource(tmp_path / "ops.bin")
+
+
+def test_save_trace_timeline(tmp_path):
+    p = tmp_path / "ops.csv"
+    p.write_text(CSV)
+    tl = timeline_from_trace(p)
+    tl.save(str(tmp_path / "ops.avtl"))
+    assert _events(Timeline.load(str(tmp_path / "ops.avtl"))) == _events(tl)
+
+
+def test_fingerprint_uses_file_stat_not_contents(tmp_path, monkeypatch):
+    import builtins
+    import os
+
+    from algoviz.core import fingerprint
+
+    p = tmp_path / "ops.ndjson"
+    p.write_text(NDJSON)
+    scene = array_scene([5, 3, 4, 1, 2])
+    tl = timeline_from_trace(p)
+    first = fingerprint.compute(scene, tl, kind="gif")
+
+    def no_open(*args, **kw):
+        raise AssertionError("trace contents must not be read for the fingerprint")
+
+    with monkeypatch.context() as m:
+        m.setattr(builtins, "open", no_open)
+        assert fingerprint.compute(scene, tl, kind="gif") == first
+    p.write_text(NDJSON + '{"op": "compare", "i": 1, "j": 2}\n')
+    os.utime(p, ns=(1, 1))
+    assert fingerprint.compute(scene, timeline_from_trace(p), kind="gif") != first
+
+
+def test_load_array(tmp_path):
+    np.save(tmp_path / "a.npy", np.array([3, 1, 2]))
+    (tmp_path / "a.txt").write_text("3, 1\n2.5")
+    assert load_array(tmp_path / "a.npy") == [3, 1, 2]
+    assert load_array(tmp_path / "a.txt") == [3, 1, 2.5]
+
+
+def test_cli_gif_from_ops(tmp_path):
+    ops = tmp_path / "ops.ndjson"
+    ops.write_text(NDJSON)
+    np.save(tmp_path / "data.npy", np.array([5, 3, 4, 1, 2]))
+    out = tmp_path / "ops.gif"
+    cmd = [sys.executable, "-m", "algoviz.cli", "gif", "--ops", str(ops),
+           "--array", str(tmp_path / "data.npy"), "--outfile", str(out), "--size", "160x90",
+           "--no-progress"]
+    cp = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=60)
+    assert cp.returncode == 0, cp.stderr
+    assert out.read_bytes()[:6] == b"GIF89a"
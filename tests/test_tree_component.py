@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from algoviz.backends.svg_svgwrite import export_svg
+from algoviz.backends.tui_rich import _rasterize_ops_to_canvas
+from algoviz.components.tree import C_OUTSIDE, DETACHED, SORTED, Tree, TreeShape
+from algoviz.core.drawops import Circles, Segments, Text
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+
+def _scene(values, **kw):
+    scene = Scene(width=240, height=140)
+    scene.add(Tree(values, name="T", x=0, y=0, width=240, height=140, **kw))
+    return scene
+
+
+def _bst(keys, n=None):
+    """按插入顺序建 BST，返回 parent/side（其余节点为 DETACHED）。"""
+    n = n or len(keys)
+    parent, side = [DETACHED] * n, [0] * n
+    left, right = {}, {}
+    for v in range(1, len(keys)):
+        u = 0
+        while True:
+            s = int(keys[v] > keys[u])
+            child = (right if s else left).get(u)
+            if child is None:
+                (right if s else left)[u] = v
+                parent[v], side[v] = u, s
+                break
+            u = child
+    parent[0] = -1
+    return parent, side
+
+
+def _check_tidy(shape):
+    pos, inside, linked = shape.layout()
+    for d in np.unique(pos[inside, 1]):
+        xs = np.sort(pos[inside & (pos[:, 1] == d), 0])
+        assert (np.diff(xs) >= 1 - 1e-9).all()                       # 同层不重叠
+    assert (pos[linked, 1] == pos[shape.parent[linked], 1] + 1).all()
+    for v, kids in enumerate(shape.children):
+        if inside[v] and len(kids) > 1:                                # 父节点居中于首末子节点之上
+            assert pos[v, 0] == pytest.approx((pos[kids[0], 0] + pos[kids[-1], 0]) / 2)
+
+
+def test_heap_layout_is_tidy_and_shared_between_frames():
+    scene = _scene(list(range(15)))
+    t = scene.actors["T"]
+    st = t.initial_state()
+    assert st.shape is t.initial_state().shape                        # 按树摘要缓存
+    pos, inside, _ = st.shape.layout()
+    assert inside.all() and pos[:, 1].tolist() == [0] + [1] * 2 + [2] * 4 + [3] * 8
+    assert (np.diff(pos[7:, 0]) == 1).all()
+    _check_tidy(st.shape)
+    tl = Timeline()
+    tl.add("T", "compare", {"i": 0, "j": 1})
+    tl.add("T", "swap", {"i": 0, "j": 1}, duration=4)
+    tl.add("T", "heap_size", {"size": 10})
+    frames = tl.build_frames(scene)
+    assert all(f.states["T"].shape is st.shape for f in frames)
+
+
+def test_swap_moves_along_edge_and_lands_on_finalize():
+    scene = _scene([5, 9, 3])
+    t = scene.actors["T"]
+    tl = Timeline()
+    tl.add("T", "compare", {"i": 0, "j": 1}, duration=2)
+    tl.add("T", "swap", {"i": 0, "j": 1}, duration=4)
+    frames = tl.build_frames(scene)
+    assert frames[1].states["T"].compare == (0, 1) and frames[2].states["T"].compare == ()
+    mid = frames[3].states["T"]
+    assert mid.active[:2] == (0, 1) and mid.value(0) == 5
+    xy, r = t.node_xy(mid.shape)
+    circles = [op for op in scene.render({"T": mid}) if isinstance(op, Circles)][0]
+    moved = np.column_stack([circles.x, circles.y])[-2:]              # 交换中的两个节点最后画
+    p0, p1 = xy[0], xy[1]
+    cross = (p1 - p0)[0] * (moved[0] - p0)[1] - (p1 - p0)[1] * (moved[0] - p0)[0]
+    assert cross == pytest.approx(0, abs=1e-6) and not np.allclose(moved[0], p0)   # 沿边移动
+    last = frames[-1].states["T"]
+    assert last.active is None and (last.value(0), last.value(1)) == (9, 5)
+
+
+def test_heap_sort_demo_and_heap_size():
+    from demos.heap_sort import build
+
+    scene, tl = build()
+    last = tl.build_frames(scene)[-1].states["H"]
+    assert last.node_values().tolist() == sorted(last.node_values().tolist())
+    assert (last.node_status() == SORTED).all() and last.size == 1
+    t = scene.actors["H"]
+    st = t.apply_event(t.initial_state(), "heap_size", {"size": 4})
+    ops = scene.render({"H": st})
+    segs = [op for op in ops if isinstance(op, Segments)][0]
+    assert len(segs) == 3                                              # 堆外节点不连边
+    assert (t._colors(st)[4:] == C_OUTSIDE).all()
+
+
+def test_insert_and_rotate_relayout_only_affected_path():
+    rng = random.Random(3)
+    keys = rng.sample(range(10000), 2000)
+    parent, side = _bst(keys, 2001)
+    scene = _scene(keys + [None], parent=parent, side=side)
+    t = scene.actors["T"]
+    st = t.initial_state()
+    shape = st.shape
+    shape.layout()
+    # 新节点 2000 挂到某个没有右子节点的节点下
+    leaf = next(v for v in range(2000) if not any(shape.side[c] == 1 for c in shape.children[v]))
+    depth = shape.depth_of(leaf)
+    tl = Timeline()
+    tl.add("T", "insert", {"node": 2000, "parent": leaf, "side": "right", "value": 1.5}, duration=4)
+    frames = tl.build_frames(scene)
+    new = frames[-1].states["T"].shape
+    assert all(f.states["T"].shape is new for f in frames)             # 各子步共用一个新结构
+    assert [f.states["T"].move is not None for f in frames] == [True, True, True, False]
+    new.layout()
+    assert new.relaid == depth + 2                  # 只重算新节点与插入点到根的路径
+    fresh = TreeShape.build(new.parent.copy(), new.side.copy(), True)
+    assert np.allclose(new.layout()[0], fresh.layout()[0], equal_nan=True)
+    assert frames[-1].states["T"].value(2000) == 1.5
+
+    child = shape.children[shape.roots[0]][0]
+    st2 = t.apply_event(st, "rotate", {"node": child})
+    assert st2.shape.roots == (child,) and st2.shape.parent[shape.roots[0]] == child
+    st2.shape.layout()
+    assert st2.shape.relaid == 2
+    fresh = TreeShape.build(st2.shape.parent.copy(), st2.shape.side.copy(), True)
+    assert np.allclose(st2.shape.layout()[0], fresh.layout()[0], equal_nan=True)
+    _check_tidy(st2.shape)
+
+
+def test_rotate_remove_and_errors():
+    # 8 的左子 3（子节点 1、6），右子 10
+    scene = _scene([8, 3, 10, 1, 6], parent=[-1, 0, 0, 1, 1], side=[0, 0, 1, 0, 1])
+    t = scene.actors["T"]
+    st = t.initial_state()
+    rot = t.apply_event(st, "rotate", {"node": 1})
+    assert rot.shape.parent.tolist() == [1, -1, 0, 1, 0]               # 6 改挂到 8 的左侧
+    assert rot.shape.side.tolist() == [1, 0, 1, 0, 0]
+    assert t.apply_event(rot, "rotate", {"node": 0}).shape == st.shape
+    gone = t.apply_event(st, "remove", {"node": 1})
+    assert gone.shape.layout()[1].tolist() == [True, False, True, False, False]
+    assert len([op for op in scene.render({"T": gone}) if isinstance(op, Text)]) == 2
+    with pytest.raises(ValueError, match="already has a child"):
+        t.apply_event(st, "insert", {"node": 3, "parent": 1, "side": "right"})
+    with pytest.raises(ValueError, match="own subtree"):
+        t.apply_event(st, "insert", {"node": 1, "parent": 4, "side": "left"})
+    with pytest.raises(ValueError, match="root"):
+        t.apply_event(st, "rotate", {"node": 0})
+    with pytest.raises(ValueError, match="parent"):
+        Tree([1, 2], name="T", parent=[-1, 5])
+
+
+def test_backends_render_tree(tmp_path):
+    scene = _scene([7, 4, 9, 1])
+    tl = Timeline()
+    tl.add("T", "swap", {"i": 0, "j": 1}, duration=4)
+    out = tmp_path / "t.svg"
+    export_svg(scene, tl, str(out))
+    svg = out.read_text(encoding="utf-8")
+    assert svg.count("<circle") == 4 and "<path" in svg and ">4<" in svg
+    ops = scene.render(tl.build_frames(scene)[-1].states)
+    assert [type(op) for op in ops[:2]] == [Segments, Circles]
+    plain = _scene([7, 4, 9, 1], show_labels=False)
+    ops = plain.render({"T": plain.actors["T"].initial_state()})
+    canvas = _rasterize_ops_to_canvas(ops, plain, 40, 12).plain
+    assert canvas.count("●") >= 3
@@ -0,0 +1,94 @@
+from __future__ import annotations
+import asyncio
+import io
+import os
+import sys
+import time
+
+import pytest
+from rich.console import Console
+
+from algoviz.backends import PlayerState, apply_key, play_tui_async
+from algoviz.backends.tui_rich import _decode_keys
+from algoviz.components.arraybar import ArrayBar
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+
+def _scene_tl():
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar([4, 3, 2, 1], name="A"))
+    tl = Timeline(fps=10)
+    for i in range(3):
+        tl.swap("A", i, i + 1, duration=10)
+    return scene, tl
+
+
+def _headless_console() -> Console:
+    return Console(file=io.StringIO(), width=100, height=30, force_terminal=False)
+
+
+def test_apply_key_transitions():
+    st = PlayerState(frame_idx=5, paused=False, speed=1.0, total_frames=100, fps=20)
+    assert apply_key(st, " ") is False and st.paused
+    apply_key(st, "left")
+    assert st.frame_idx == 4 and st.direction == -1
+    apply_key(st, "right")
+    assert st.frame_idx == 5 and st.direction == 1
+    apply_key(st, "]")
+    assert st.speed == 1.25
+    apply_key(st, "7")
+    assert st.frame_idx == 70
+    assert apply_key(st, "q") is True
+
+
+def test_decode_posix_key_bytes():
+    assert _decode_keys(b"\x1b[D\x1b[Cq [9x") == ["left", "right", "q", " ", "[", "9"]
+
+
+def test_injected_keys_drive_player_and_quit():
+    scene, tl = _scene_tl()
+
+    async def keys():
+        yield " "        # 暂停
+        yield "5"        # 跳到 50%
+        yield "right"    # 单步
+        await asyncio.sleep(0.05)
+        yield "q"
+
+    t0 = time.monotonic()
+    st = asyncio.run(play_tui_async(scene, tl, fps=20, keys=keys(), console=_headless_console(),
+                                    exit_after=5.0))
+    # 收到 q 立即退出，而不是等到 exit_after
+    assert time.monotonic() - t0 < 3.0
+    assert st is not None and st.paused
+    assert st.frame_idx == 16
+
+
+def test_clock_advances_without_input():
+    scene, tl = _scene_tl()
+    st = asyncio.run(play_tui_async(scene, tl, fps=20, speed=4.0, console=_headless_console(),
+                                    exit_after=0.6))
+    assert st is not None and st.frame_idx > 0
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="POSIX pty only")
+def test_posix_keys_reads_from_tty():
+    from algoviz.backends.tui_rich import posix_keys
+
+    master, slave = os.openpty()
+
+    async def run():
+        it = posix_keys(slave).__aiter__()
+        first = asyncio.ensure_future(it.__anext__())
+        await asyncio.sleep(0.05)  # 等待切换到 cbreak 并注册到 selector
+        os.write(master, b"]\x1b[C")
+        got = [await asyncio.wait_for(first, 2.0), await asyncio.wait_for(it.__anext__(), 2.0)]
+        await it.aclose()
+        return got
+
+    try:
+        assert asyncio.run(run()) == ["]", "right"]
+    finally:
+        os.close(master)
+        os.close(slave)
@@ -11,6 +11,9 @@ def test_advance_frame_basic():
     # 越界：夹到最后一帧
     idx3 = advance_idx(idx=119, paused=False, fps=60, speed=4.0, dt=1.0, total=120)
     assert idx3 == 119
+    # 带步长：增量向下取整到步长的倍数（7 帧 -> 6）
+    idx4 = advance_idx(idx=10, paused=False, fps=70, speed=1.0, dt=0.1, total=120, stride=3)
+    assert idx4 == 16
 
 def test_speed_adjust():
     # 初始 1.0，向下两步 -> 0.5
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import threading
+import time
+
+from rich.console import Console
+
+from algoviz.backends import PrerenderBuffer, PlayerState, render_sidebar
+
+
+def _wait_ready(buf: PrerenderBuffer, n: int, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while len(buf._ring) < n and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_prerender_hits_after_producer_fills_ring():
+    rendered = []
+    lock = threading.Lock()
+
+    def render(idx: int, cols: int, rows: int) -> str:
+        with lock:
+            rendered.append(idx)
+        return f"frame-{idx}@{cols}x{rows}"
+
+    with PrerenderBuffer(render, total=100, depth=8) as buf:
+        buf.reset(10, direction=1, stride=2, size=(40, 10))
+        _wait_ready(buf, 8)
+        # 从 10 开始按步长 2 向后生产，环形缓冲容量 8
+        assert [i for i, _ in buf._ring] == [10, 12, 14, 16, 18, 20, 22, 24]
+        assert buf.get(10) == "frame-10@40x10"
+        assert buf.get(14) == "frame-14@40x10"
+        assert (buf.hits, buf.misses) == (2, 0)
+        # 步长之间的帧未预渲染：同步渲染并计为 miss
+        assert buf.get(15) == "frame-15@40x10"
+        assert buf.misses == 1
+        # 错位的请求让生产者从 15 之后按步长重新对齐，后续帧重新命中
+        _wait_ready(buf, 8)
+        assert [i for i, _ in buf._ring][:3] == [17, 19, 21]
+        assert buf.get(17) == "frame-17@40x10"
+        assert (buf.hits, buf.misses) == (3, 1)
+
+
+def test_prerender_reset_invalidates_and_reverses():
+    with PrerenderBuffer(lambda i, c, r: (i, c, r), total=50, depth=4) as buf:
+        buf.reset(0, size=(20, 6))
+        _wait_ready(buf, 4)
+        # 跳转 + 尺寸变化：旧缓冲作废，从新位置沿逆向重新生产
+        buf.reset(30, direction=-1, stride=1, size=(30, 8))
+        _wait_ready(buf, 4)
+        assert [i for i, _ in buf._ring] == [30, 29, 28, 27]
+        assert buf.get(29) == (29, 30, 8)
+        assert buf.hits == 1
+        assert buf.matches(direction=-1, stride=1, size=(30, 8))
+        assert not buf.matches(direction=1, stride=1, size=(30, 8))
+
+
+def test_sidebar_shows_buffer_counters():
+    state = PlayerState(frame_idx=4, paused=True, speed=2.0, total_frames=9, fps=20,
+                        buffer_hits=7, buffer_misses=3)
+    console = Console(width=80, record=True)
+    console.print(render_sidebar(state))
+    assert "Buffer: 7 hit / 3 miss" in console.export_text()
@@ -0,0 +1,183 @@
+from __future__ import annotations
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from algoviz.backends import GifOptions, export_gif
+from algoviz.backends.gif_mpl import IncrementalGifExporter
+from algoviz.components.arraybar import ArrayBar
+from algoviz.components.grid import Grid
+from algoviz.core.compiler import IncrementalCompiler
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+
+
+def _build(n_swaps: int, tweak_at: int | None = None, values=(5, 3, 4, 1, 2)):
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar(list(values), name="A", x=6, y=10, bar_width=10, bar_gap=4, height=60))
+    tl = Timeline(fps=10)
+    for k in range(n_swaps):
+        i = k % 4
+        tl.compare("A", i, i + 1, duration=1)
+        tl.swap("A", i, i + 1, duration=3 if k != tweak_at else 5)
+    return scene, tl
+
+
+def _states(frames):
+    return [f.states for f in frames]
+
+
+def test_incremental_compile_matches_full_build():
+    ic = IncrementalCompiler(checkpoint_every=4)
+    scene, tl = _build(20)
+    d0 = ic.compile(scene, tl)
+    assert d0.changed and d0.first_frame == 0
+    assert _states(d0.frames) == _states(tl.build_frames(scene))
+
+    scene, tl = _build(20, tweak_at=12)  # 第 25 个事件（swap #12）变化
+    d1 = ic.compile(scene, tl)
+    assert d1.first_event == 25
+    assert d1.resumed_from == 24
+    assert d1.first_frame == 12 * 4 + 1
+    assert _states(d1.frames) == _states(tl.build_frames(scene))
+
+    scene, tl = _build(20, tweak_at=12)
+    assert not ic.compile(scene, tl).changed
+
+    scene, tl = _build(25, tweak_at=12)  # 追加事件
+    d2 = ic.compile(scene, tl)
+    assert d2.first_event == 40 and d2.first_frame == 20 * 4 + 2
+    assert _states(d2.frames) == _states(tl.build_frames(scene))
+
+    scene, tl = _build(25, tweak_at=12, values=(9, 3, 4, 1, 2))  # 场景配置变化：整段重编译
+    d3 = ic.compile(scene, tl)
+    assert d3.resumed_from == 0 and d3.first_frame == 0
+    assert _states(d3.frames) == _states(tl.build_frames(scene))
+
+
+def test_incremental_compile_sees_changes_inside_large_arrays():
+    ic = IncrementalCompiler(checkpoint_every=4)
+    values = np.zeros((60, 60), dtype=int)        # 超过 numpy 打印阈值，repr 会省略中间元素
+    for k in range(2):
+        scene, tl = _build(6)
+        scene.add(Grid(values, name="G", x=0, y=0, cell_w=1, cell_h=1))
+        d = ic.compile(scene, tl)
+        assert d.changed and d.resumed_from == 0 and d.first_frame == 0
+        values[30, 30] = 9
+
+
+def test_incremental_gif_matches_full_export(tmp_path: Path):
+    opt = GifOptions(size=(80, 60))
+    ic = IncrementalCompiler()
+    out = tmp_path / "w.gif"
+    exporter = IncrementalGifExporter(str(out), opt)
+
+    scene, tl = _build(10)
+    d = ic.compile(scene, tl)
+    assert exporter.update(scene, d.frames, d.first_frame) == len(d.frames)
+
+    scene, tl = _build(10, tweak_at=8)
+    d = ic.compile(scene, tl)
+    rendered = exporter.update(scene, d.frames, d.first_frame)
+    assert rendered < len(d.frames) // 2
+
+    ref = tmp_path / "ref.gif"
+    export_gif(scene, tl, str(ref), options=opt)
+    assert out.read_bytes() == ref.read_bytes()
+    assert not list(tmp_path.glob("*.tmp*"))
+
+
+DEMO = """
+from algoviz.core.scene import Scene
+from algoviz.core.timeline import Timeline
+from algoviz.components.arraybar import ArrayBar
+
+def build():
+    scene = Scene(width=120, height=80)
+    scene.add(ArrayBar([3, 1, 2], name="A", x=6, y=10, bar_width=10, bar_gap=4, height=60))
+    tl = Timeline(fps=10)
+    tl.compare("A", 0, 1, duration=2)
+    tl.swap("A", 0, 1, duration=SWAP)
+    return scene, tl
+"""
+
+
+def _wait_for_line(proc, needle: str, timeout: float = 30.0) -> str:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        line = proc.stdout.readline()
+        if needle in line:
+            return line
+        if not line and proc.poll() is not None:
+            break
+    err = proc.stderr.read() if proc.poll() is not None else ""
+    raise AssertionError(f"did not see {needle!r}: {err}")
+
+
+def test_cli_gif_watch_reexports_on_save(tmp_path: Path):
+    demo = tmp_path / "demo.py"
+    demo.write_text(DEMO.replace("SWAP", "3"), encoding="utf-8")
+    out = tmp_path / "w.gif"
+    cmd = [sys.executable, "-m", "algoviz.cli", "gif", str(demo), "--outfile", str(out),
+           "--size", "80x60", "--watch"]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        _wait_for_line(proc, "已导出 GIF")
+        time.sleep(0.05)
+        demo.write_text(DEMO.replace("SWAP", "6"), encoding="utf-8")
+        line = _wait_for_line(proc, "复用")
+        assert "复用 2/8 帧" in line
+    finally:
+        proc.send_signal(signal.SIGINT)
+        assert proc.wait(timeout=10) == 0
+
+    ref = tmp_path / "ref.gif"
+    cmd = [sys.executable, "-m", "algoviz.cli", "gif", str(demo), "--outfile", str(ref),
+           "--size", "80x60"]
+    cp = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    assert cp.returncode == 0, cp.stderr
+    assert out.read_bytes() == ref.read_bytes()
+
+
+def test_tui_player_swaps_in_reloaded_frames():
+    import asyncio
+    import io
+
+    from rich.console import Console
+
+    from algoviz.backends import play_tui_async
+
+    scene, tl = _build(3)
+    scene2, tl2 = _build(6)
+    frames2 = tl2.build_frames(scene2)
+
+    async def reloads():
+        await asyncio.sleep(0.1)
+        yield scene2, frames2
+
+    console = Console(file=io.StringIO(), width=100, height=30, force_terminal=False)
+    st = asyncio.run(play_tui_async(scene, tl, fps=50, speed=4.0, exit_after=1.0, lookahead=4,
+                                    keys=None, console=console, reloads=reloads()))
+    assert st.total_frames == len(frames2)
+    assert st.frame_idx == len(frames2) - 1
+
+
+def test_tui_player_plays_precompiled_frames():
+    import asyncio
+    import io
+
+    from rich.console import Console
+
+    from algoviz.backends import play_tui_async
+
+    scene, tl = _build(3)
+    frames = IncrementalCompiler().compile(scene, tl).frames
+    console = Console(file=io.StringIO(), width=100, height=30, force_terminal=False)
+    # 给出 frames 时不再编译 timeline（这里传一个空时间线也照常播放）
+    st = asyncio.run(play_tui_async(scene, Timeline(), fps=50, speed=4.0, exit_after=0.5,
+                                    lookahead=4, keys=None, console=console, frames=frames))
+    assert st.total_frames == len(frames) and st.compiled == len(frames)